@@ -1,6 +1,6 @@
 import atexit
 import datetime
-import logging.config
+import logging
 import os
 import time
 
@@ -13,11 +13,18 @@ from flask_jwt_extended import JWTManager
 from config import Config
 from models import db
 from routes import register_routes
+from security.middleware import init_security_scan
 from socketio_config import init_socketio
+from utils.attachment_tasks import init_attachment_tasks, shutdown_attachment_tasks
+from utils.audit_writer import init_audit_writer, shutdown_audit_writer
+from utils.leader_lock import init_leader_election, shutdown_leader_election
+from utils.log_pipeline import init_logging, restart_log_listener
 from utils.logging_utils import setup_request_logging
-from utils.resource_monitor import init_resource_monitoring
-from utils.scheduled_backup import init_scheduled_backup, shutdown_scheduled_backup
-from utils.scheduled_maintenance import init_scheduled_maintenance, shutdown_scheduled_maintenance
+from utils.metrics import init_metrics, init_metrics_exporter
+from utils.read_markers import init_read_markers, shutdown_read_markers
+from utils.request_metrics import init_request_metrics
+from utils.scheduler import init_scheduler, shutdown_scheduler
+from utils.sqlite_profile import configure_sqlite_engines, init_sqlite_profile
 
 
 def create_app():
@@ -64,15 +71,6 @@ def create_app():
     if runtime_db_url:
         app.config["SQLALCHEMY_DATABASE_URI"] = runtime_db_url
 
-    # Normalize engine options when using SQLite (particularly in tests)
-    db_uri = app.config.get("SQLALCHEMY_DATABASE_URI", "")
-    if db_uri.startswith("sqlite"):
-        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-            "echo": False,
-            "pool_pre_ping": True,
-            "connect_args": {"check_same_thread": False},
-        }
-
     # Determine if we're running in a testing environment
     is_testing_env = bool(
         app.config.get("TESTING")
@@ -82,6 +80,11 @@ def create_app():
     if is_testing_env:
         app.config["TESTING"] = True
 
+    # SQLite engine profile: pragmas, single writer pool and read-only engine
+    db_uri = app.config.get("SQLALCHEMY_DATABASE_URI", "")
+    if db_uri.startswith("sqlite"):
+        configure_sqlite_engines(app, is_testing=is_testing_env)
+
     # Validate security configuration (deferred to allow test fixtures to set values)
     Config.validate_security_config(app.config)
 
@@ -96,8 +99,10 @@ def create_app():
     # Configure structured logging
     if hasattr(Config, "LOGGING_CONFIG"):
         try:
-            logging.config.dictConfig(Config.LOGGING_CONFIG)
-            logging.getLogger(__name__).info("Structured logging configured successfully")
+            pipeline = init_logging(Config)
+            logging.getLogger(__name__).info("Structured logging configured successfully", extra={
+                "async": pipeline.listener is not None
+            })
         except Exception as e:
             logging.getLogger(__name__).warning("Error configuring logging: %s", e)
             # Fall back to basic logging
@@ -147,14 +152,15 @@ def create_app():
     # Initialize session cleanup - DISABLED since Flask-Session is disabled
     # init_session_cleanup(app)
 
-    # Initialize resource monitoring
-    init_resource_monitoring(app)
-
     # Setup request logging middleware
     setup_request_logging(app)
 
     # Initialize database with app
     db.init_app(app)
+    init_sqlite_profile(app)
+    init_request_metrics(app)
+    init_metrics(app)
+    init_security_scan(app)
 
     # Initialize SocketIO for real-time messaging
     init_socketio(app)
@@ -249,37 +255,74 @@ def create_app():
         "routes": [f"{rule} - {rule.methods}" for rule in app.url_map.iter_rules()]
     })
 
-    # Initialize scheduled backup service
-    if not is_testing_env:
-        try:
-            logger.info("Initializing scheduled backup service...")
-            init_scheduled_backup(app)
+    # Background threads do not survive fork, so when gunicorn preloads the
+    # app (gunicorn_config.py) each worker starts them after forking instead
+    defer_services = os.environ.get("DEFER_BACKGROUND_SERVICES", "False").lower() in ("true", "1", "yes")
+    if not defer_services:
+        init_worker_services(app)
 
-            # Register cleanup on shutdown
-            atexit.register(shutdown_scheduled_backup)
+    return app
 
-            logger.info("Scheduled backup service initialized")
-        except Exception as e:
-            logger.error("Error initializing scheduled backup service", exc_info=True, extra={
-                "error_message": str(e)
-            })
 
-    # Initialize scheduled maintenance service
-    if not is_testing_env:
-        try:
-            logger.info("Initializing scheduled maintenance service...")
-            init_scheduled_maintenance(app)
+def init_process_services(app):
+    """Start the background workers every server process needs its own copy of."""
+    # Initialize attachment thumbnail workers and batched download tracking
+    init_attachment_tasks(app)
+    atexit.register(shutdown_attachment_tasks)
 
-            # Register cleanup on shutdown
-            atexit.register(shutdown_scheduled_maintenance)
+    # Write audit log entries from a background batch writer
+    init_audit_writer(app)
+    atexit.register(shutdown_audit_writer)
 
-            logger.info("Scheduled maintenance service initialized")
-        except Exception as e:
-            logger.error("Error initializing scheduled maintenance service", exc_info=True, extra={
-                "error_message": str(e)
-            })
+    # Debounce channel read-marker updates into batched writes
+    init_read_markers(app)
+    atexit.register(shutdown_read_markers)
 
-    return app
+    # Share this worker's metrics with the others for /metrics
+    init_metrics_exporter(app)
+
+
+def init_background_services(app):
+    """Start the services that must run in exactly one process (the leader)."""
+    logger = logging.getLogger(__name__)
+
+    # Maintenance, scheduled backups and resource checks run as scheduler jobs
+    try:
+        logger.info("Initializing background job scheduler...")
+        init_scheduler(app)
+
+        # Register cleanup on shutdown
+        atexit.register(shutdown_scheduler)
+
+        logger.info("Background job scheduler initialized")
+    except Exception as e:
+        logger.error("Error initializing background job scheduler", exc_info=True, extra={
+            "error_message": str(e)
+        })
+
+
+def init_worker_services(app, forked=False):
+    """
+    Start this process's background workers and join the leader election
+    for the singleton services.
+
+    Args:
+        app: Flask application instance
+        forked: The app was created in a parent process (gunicorn preload),
+            whose pooled database connections must not be reused here
+    """
+    if forked:
+        restart_log_listener()
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
+
+    init_process_services(app)
+
+    # Tests drive maintenance and backups directly rather than on a schedule
+    if not app.config.get("TESTING"):
+        init_leader_election(app, init_background_services)
+        atexit.register(shutdown_leader_election)
 
 if __name__ == "__main__":
     app = create_app()
@@ -0,0 +1,38 @@
+"""
+Load testing and benchmarks
+
+``datagen`` fills a database with production-sized synthetic data and
+``runner`` replays request scenarios against it from concurrent workers,
+reporting throughput and p50/p95/p99 latency per step and comparing runs
+against a stored baseline. ``python -m benchmarks --help`` drives both.
+"""
+
+from .datagen import SCALES, DataGenerator, Scale, generate_dataset
+from .runner import (
+    SCENARIOS,
+    FlaskClientTransport,
+    HttpTransport,
+    Step,
+    compare_reports,
+    format_report,
+    load_report,
+    run_scenario,
+    write_report,
+)
+
+
+__all__ = [
+    "SCALES",
+    "SCENARIOS",
+    "DataGenerator",
+    "FlaskClientTransport",
+    "HttpTransport",
+    "Scale",
+    "Step",
+    "compare_reports",
+    "format_report",
+    "generate_dataset",
+    "load_report",
+    "run_scenario",
+    "write_report",
+]
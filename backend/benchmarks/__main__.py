@@ -0,0 +1,129 @@
+"""
+Command line for the benchmark suite
+
+    python -m benchmarks generate --scale production
+    python -m benchmarks run --scenario browse --workers 8 --requests 200 --baseline baseline.json
+    python -m benchmarks run --url http://127.0.0.1:5000 --employee-number ADMIN001 --password ...
+
+Run from the backend directory. ``generate`` writes into the database the app is configured for
+(DATABASE_URL, or the SQLite file), so point it at a scratch database.
+``run`` without ``--url`` serves requests in this process through the Flask
+test client, authenticated as ``--as-user`` (the generated admin by default).
+With ``--baseline`` the run is compared against an earlier report and the
+command exits with status 1 on a regression; ``--save-baseline`` stores the
+run as that baseline instead.
+"""
+
+import argparse
+import sys
+
+from .datagen import DEFAULT_PASSWORD, DEFAULT_PREFIX, SCALES, generate_dataset
+from .runner import (
+    DEFAULT_TOLERANCE,
+    SCENARIOS,
+    FlaskClientTransport,
+    HttpTransport,
+    compare_reports,
+    format_report,
+    load_report,
+    run_scenario,
+    write_report,
+)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="SupplyLine load testing and benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="Fill the configured database with synthetic data")
+    generate.add_argument("--scale", choices=sorted(SCALES), default="smoke")
+    generate.add_argument("--seed", type=int, default=42)
+    generate.add_argument("--prefix", default=DEFAULT_PREFIX, help="Marker prepended to generated identifiers")
+    for name in ("tools", "chemicals", "transactions", "kits"):
+        generate.add_argument(f"--{name}", type=int, help=f"Override the scale's {name} count")
+
+    run = commands.add_parser("run", help="Run a request scenario and report latency percentiles")
+    run.add_argument("--scenario", choices=sorted(SCENARIOS), default="browse")
+    run.add_argument("--workers", type=int, default=4)
+    run.add_argument("--requests", type=int, default=100, help="Measured requests per worker")
+    run.add_argument("--duration", type=float, help="Run for this many seconds instead of a request count")
+    run.add_argument("--warmup", type=int, default=10, help="Unmeasured requests per worker")
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument("--url", help="Benchmark a running server instead of the in-process test client")
+    run.add_argument("--employee-number", default=f"{DEFAULT_PREFIX}U00000", help="Login for --url runs")
+    run.add_argument("--password", default=DEFAULT_PASSWORD, help="Password for --url runs")
+    run.add_argument("--as-user", default=f"{DEFAULT_PREFIX}U00000",
+                     help="Employee number to authenticate as in-process (falls back to any admin)")
+    run.add_argument("--output", help="Write the JSON report here")
+    run.add_argument("--baseline", help="Compare against this report; exit 1 on regression")
+    run.add_argument("--save-baseline", action="store_true", help="Store this run as --baseline")
+    run.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                     help="Allowed relative slowdown before a step counts as a regression")
+    return parser
+
+
+def _create_app():
+    from app import create_app
+
+    return create_app()
+
+
+def _in_process_transport(app, employee_number):
+    from auth import JWTManager
+    from models import User
+
+    with app.app_context():
+        user = (User.query.filter_by(employee_number=employee_number).first()
+                or User.query.filter_by(is_admin=True, is_active=True).first())
+        if user is None:
+            raise SystemExit("No user to authenticate as; run 'generate' first")
+        tokens = JWTManager.generate_tokens(user)
+    return FlaskClientTransport(app, {"Authorization": f"Bearer {tokens['access_token']}"})
+
+
+def generate(args):
+    overrides = {name: getattr(args, name) for name in ("tools", "chemicals", "transactions", "kits")
+                 if getattr(args, name) is not None}
+    app = _create_app()
+    with app.app_context():
+        counts = generate_dataset(args.scale, seed=args.seed, prefix=args.prefix, **overrides)
+    for table, count in counts.items():
+        print(f"{table:<24}{count:>10}")
+    return 0
+
+
+def run(args):
+    if args.url:
+        transport = HttpTransport.login(args.url, args.employee_number, args.password)
+    else:
+        transport = _in_process_transport(_create_app(), args.as_user)
+
+    report = run_scenario(
+        transport,
+        scenario=args.scenario,
+        workers=args.workers,
+        requests_per_worker=args.requests,
+        duration=args.duration,
+        warmup=args.warmup,
+        seed=args.seed,
+    )
+    if args.output:
+        write_report(report, args.output)
+
+    regressions = None
+    if args.baseline and args.save_baseline:
+        write_report(report, args.baseline)
+    elif args.baseline:
+        regressions = compare_reports(report, load_report(args.baseline), args.tolerance)
+
+    print(format_report(report, regressions))
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return generate(args) if args.command == "generate" else run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,312 @@
+"""
+Synthetic Data Generator
+
+Fills a database with production-sized, reproducible data for benchmarks:
+tools, chemicals, inventory transactions and kits, together with the
+warehouses, users, aircraft types, boxes and kit items they reference.
+
+Rows are built as plain dicts and written with Core ``INSERT`` executemany
+batches, bypassing the ORM unit of work, so a million transactions take
+seconds rather than the hours ``session.add`` would. Primary keys are
+assigned here, after the highest existing id, so later tables can refer to
+earlier ones without reading them back; PostgreSQL sequences are moved past
+the new ids afterwards.
+
+The same seed and scale always produce the same rows. Every generated
+name, number and lot carries ``prefix`` so the data can be told apart from
+real records; generating twice into one database needs a second prefix.
+"""
+
+import logging
+import random
+import time
+from dataclasses import dataclass, replace
+from datetime import timedelta
+
+from sqlalchemy import func, select, text
+from werkzeug.security import generate_password_hash
+
+from models import Chemical, InventoryTransaction, Tool, User, Warehouse, db, get_current_time
+from models_kits import AircraftType, Kit, KitBox, KitItem
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PREFIX = "BENCH-"
+DEFAULT_PASSWORD = "Bench-Password-1"
+BATCH_SIZE = 10000
+
+
+@dataclass(frozen=True)
+class Scale:
+    """Row counts for one generated dataset."""
+
+    tools: int
+    chemicals: int
+    transactions: int
+    kits: int
+    boxes_per_kit: int = 3
+    items_per_kit: int = 5
+
+    @property
+    def warehouses(self):
+        return max(2, self.tools // 10000)
+
+    @property
+    def users(self):
+        return max(5, self.tools // 1000)
+
+
+SCALES = {
+    "smoke": Scale(tools=200, chemicals=500, transactions=1000, kits=20),
+    "medium": Scale(tools=10000, chemicals=50000, transactions=100000, kits=1000),
+    "production": Scale(tools=100000, chemicals=500000, transactions=1000000, kits=10000),
+}
+
+AIRCRAFT_TYPES = ("Q400", "RJ85", "CL415")
+BOX_TYPES = ("expendable", "tooling", "consumable", "loose", "floor")
+TOOL_NOUNS = ("Torque Wrench", "Multimeter", "Rivet Gun", "Borescope", "Crimper", "Drill", "Socket Set", "Gauge")
+TOOL_CATEGORIES = ("General", "CL415", "RJ85", "Q400", "Engine", "Avionics", "Sheetmetal")
+CONDITIONS = ("New", "Excellent", "Good", "Fair")
+MANUFACTURERS = ("PPG Aerospace", "3M", "Henkel", "Dow", "Sherwin-Williams", "BASF")
+CHEMICAL_CATEGORIES = ("Sealant", "Adhesive", "Paint", "Lubricant", "Solvent", "Primer")
+UNITS = ("each", "ml", "oz", "gal", "tube", "kit")
+DEPARTMENTS = ("Maintenance", "Materials", "Quality", "Engineering")
+TOOL_TRANSACTIONS = ("checkout", "return", "transfer", "adjustment", "calibration")
+CHEMICAL_TRANSACTIONS = ("receipt", "issuance", "adjustment", "transfer")
+
+
+class DataGenerator:
+    """
+    Writes one synthetic dataset.
+
+    Args:
+        scale: Scale (or the name of one in SCALES)
+        seed: Random seed; the same seed always produces the same rows
+        prefix: Marker prepended to every generated identifier
+        batch_size: Rows per INSERT batch
+    """
+
+    def __init__(self, scale, seed=42, prefix=DEFAULT_PREFIX, batch_size=BATCH_SIZE):
+        self.scale = SCALES[scale] if isinstance(scale, str) else scale
+        self.rng = random.Random(seed)
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.now = get_current_time().replace(microsecond=0)
+        self.counts = {}
+        self.ids = {}
+
+    def generate(self):
+        """
+        Generate the whole dataset.
+
+        Returns:
+            dict: Rows written per table
+        """
+        started = time.perf_counter()
+        self._generate(Warehouse, self.scale.warehouses, self._warehouse)
+        self._generate(User, self.scale.users, self._user_rows())
+        self._aircraft_types()
+        self._generate(Tool, self.scale.tools, self._tool)
+        self._generate(Chemical, self.scale.chemicals, self._chemical)
+        self._generate(InventoryTransaction, self.scale.transactions, self._transaction)
+        self._generate(Kit, self.scale.kits, self._kit)
+        self._generate(KitBox, self.scale.kits * self.scale.boxes_per_kit, self._box)
+        self._generate(KitItem, self.scale.kits * self.scale.items_per_kit, self._kit_item)
+        self._sync_sequences()
+
+        logger.info("Synthetic data generated", extra={
+            "counts": self.counts,
+            "duration_seconds": round(time.perf_counter() - started, 2),
+        })
+        return dict(self.counts)
+
+    def _generate(self, model, count, make_row):
+        """Insert ``count`` rows built by ``make_row(index)`` in batches."""
+        table = model.__table__
+        first_id = (db.session.scalar(select(func.max(table.c.id))) or 0) + 1
+        self.ids[model] = range(first_id, first_id + count)
+
+        batch = []
+        for index, row_id in enumerate(self.ids[model]):
+            batch.append({"id": row_id, **make_row(index)})
+            if len(batch) >= self.batch_size:
+                db.session.execute(table.insert(), batch)
+                batch = []
+        if batch:
+            db.session.execute(table.insert(), batch)
+        db.session.commit()
+
+        self.counts[table.name] = count
+        logger.debug("Generated %d %s", count, table.name)
+
+    def _sync_sequences(self):
+        """Move PostgreSQL id sequences past the explicitly assigned ids."""
+        if db.engine.dialect.name != "postgresql":
+            return
+        for model in self.ids:
+            table = model.__tablename__
+            db.session.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))"
+            ))
+        db.session.commit()
+
+    def _aircraft_types(self):
+        """Reuse existing aircraft types and create the missing ones."""
+        existing = dict(db.session.execute(select(AircraftType.name, AircraftType.id)).all())
+        for name in AIRCRAFT_TYPES:
+            if name not in existing:
+                aircraft_type = AircraftType(name=name, description=f"{name} (benchmark)")
+                db.session.add(aircraft_type)
+                db.session.flush()
+                existing[name] = aircraft_type.id
+        db.session.commit()
+        self.aircraft_type_ids = [existing[name] for name in AIRCRAFT_TYPES]
+
+    def _past(self, days=365):
+        return self.now - timedelta(seconds=self.rng.randrange(days * 86400))
+
+    def _warehouse(self, index):
+        return {
+            "name": f"{self.prefix}Warehouse {index:04d}",
+            "city": self.rng.choice(("Seattle", "Spokane", "Boise", "Portland")),
+            "warehouse_type": "main" if index == 0 else "satellite",
+            "is_active": True,
+            "created_at": self.now,
+            "updated_at": self.now,
+        }
+
+    def _user_rows(self):
+        # Hashing is deliberately slow, so every generated user shares one hash
+        password_hash = generate_password_hash(DEFAULT_PASSWORD)
+
+        def make_row(index):
+            return {
+                "name": f"{self.prefix}User {index:05d}",
+                "employee_number": f"{self.prefix}U{index:05d}",
+                "department": DEPARTMENTS[index % len(DEPARTMENTS)],
+                "password_hash": password_hash,
+                "is_admin": index == 0,
+                "is_active": True,
+                "created_at": self.now,
+                "password_changed_at": self.now,
+            }
+
+        return make_row
+
+    def _tool(self, index):
+        requires_calibration = self.rng.random() < 0.2
+        last_calibration = self._past(180) if requires_calibration else None
+        return {
+            "tool_number": f"{self.prefix}T{index:06d}",
+            "serial_number": f"{self.prefix}SN{index:07d}",
+            "description": f"{self.rng.choice(TOOL_NOUNS)} {self.rng.randint(1, 999)}",
+            "condition": self.rng.choice(CONDITIONS),
+            "location": f"Aisle {self.rng.randint(1, 40)} Bin {self.rng.randint(1, 200)}",
+            "category": self.rng.choice(TOOL_CATEGORIES),
+            "status": self.rng.choices(("available", "checked_out", "maintenance"), (80, 15, 5))[0],
+            "warehouse_id": self.rng.choice(self.ids[Warehouse]),
+            "created_at": self._past(),
+            "requires_calibration": requires_calibration,
+            "calibration_frequency_days": 365 if requires_calibration else None,
+            "last_calibration_date": last_calibration,
+            "next_calibration_date": last_calibration + timedelta(days=365) if requires_calibration else None,
+            "calibration_status": "current" if requires_calibration else None,
+        }
+
+    def _chemical(self, index):
+        # About twenty lots per part number, as receiving produces in practice
+        part = self.rng.randrange(max(1, self.scale.chemicals // 20))
+        return {
+            "part_number": f"{self.prefix}P{part:06d}",
+            "lot_number": f"{self.prefix}L{index:07d}",
+            "description": f"{self.rng.choice(CHEMICAL_CATEGORIES)} {part}",
+            "manufacturer": self.rng.choice(MANUFACTURERS),
+            "quantity": self.rng.randint(0, 200),
+            "unit": self.rng.choice(UNITS),
+            "location": f"Cabinet {self.rng.randint(1, 60)}",
+            "category": self.rng.choice(CHEMICAL_CATEGORIES),
+            "status": self.rng.choices(("available", "low_stock", "out_of_stock", "expired"), (75, 12, 8, 5))[0],
+            "warehouse_id": self.rng.choice(self.ids[Warehouse]),
+            "date_added": self._past(),
+            "expiration_date": self.now + timedelta(days=self.rng.randint(-60, 730)),
+            "minimum_stock_level": self.rng.choice((None, 5, 10, 25)),
+        }
+
+    def _transaction(self, _index):
+        if self.rng.random() < 0.6:
+            item_type, item_id = "tool", self.rng.choice(self.ids[Tool])
+            transaction_type = self.rng.choice(TOOL_TRANSACTIONS)
+            quantity_change = None
+        else:
+            item_type, item_id = "chemical", self.rng.choice(self.ids[Chemical])
+            transaction_type = self.rng.choice(CHEMICAL_TRANSACTIONS)
+            quantity_change = float(self.rng.randint(-20, 50))
+        return {
+            "item_type": item_type,
+            "item_id": item_id,
+            "transaction_type": transaction_type,
+            "timestamp": self._past(),
+            "user_id": self.rng.choice(self.ids[User]),
+            "quantity_change": quantity_change,
+            "location_from": f"Aisle {self.rng.randint(1, 40)}",
+            "location_to": f"Aisle {self.rng.randint(1, 40)}",
+        }
+
+    def _kit(self, index):
+        return {
+            "name": f"{self.prefix}Kit {index:05d}",
+            "aircraft_type_id": self.rng.choice(self.aircraft_type_ids),
+            "description": "Benchmark kit",
+            "status": self.rng.choices(("active", "maintenance", "inactive"), (90, 5, 5))[0],
+            "created_at": self._past(),
+            "updated_at": self.now,
+            "created_by": self.rng.choice(self.ids[User]),
+        }
+
+    def _box(self, index):
+        kit_index, box_index = divmod(index, self.scale.boxes_per_kit)
+        return {
+            "kit_id": self.ids[Kit][kit_index],
+            "box_number": f"Box{box_index + 1}",
+            "box_type": BOX_TYPES[box_index % len(BOX_TYPES)],
+            "created_at": self.now,
+        }
+
+    def _kit_item(self, index):
+        kit_index = index // self.scale.items_per_kit
+        box_ids = self.ids[KitBox]
+        box_id = box_ids[kit_index * self.scale.boxes_per_kit + self.rng.randrange(self.scale.boxes_per_kit)]
+        tool_index = self.rng.randrange(self.scale.tools)
+        return {
+            "kit_id": self.ids[Kit][kit_index],
+            "box_id": box_id,
+            "item_type": "tool",
+            "item_id": self.ids[Tool][tool_index],
+            "part_number": f"{self.prefix}T{tool_index:06d}",
+            "serial_number": f"{self.prefix}SN{tool_index:07d}",
+            "description": "Benchmark kit item",
+            "quantity": 1.0,
+            "status": "available",
+            "added_date": self.now,
+            "last_updated": self.now,
+        }
+
+
+def generate_dataset(scale="smoke", seed=42, prefix=DEFAULT_PREFIX, **overrides):
+    """
+    Generate a synthetic dataset in the current app's database.
+
+    Must run inside an app context.
+
+    Args:
+        scale: Name of a scale in SCALES, or a Scale
+        seed: Random seed
+        prefix: Marker prepended to every generated identifier
+        **overrides: Scale fields to change (e.g. ``kits=500``)
+
+    Returns:
+        dict: Rows written per table
+    """
+    base = SCALES[scale] if isinstance(scale, str) else scale
+    return DataGenerator(replace(base, **overrides), seed=seed, prefix=prefix).generate()
@@ -0,0 +1,450 @@
+"""
+Benchmark Scenario Runner
+
+Replays a weighted mix of API requests (a scenario) from concurrent worker
+threads and reports throughput and latency percentiles per step.
+
+Requests go either through Flask's test client in this process, which needs
+no server and measures the application and database alone, or over HTTP to
+a running server (``python run.py`` or gunicorn), which adds the WSGI
+server, sockets and worker processes. Ids for detail pages are discovered
+through the list endpoints before the run, so both transports work against
+any populated database (see datagen.py).
+
+Reports are plain JSON so they can be stored as a baseline and compared with
+later runs; ``compare_reports`` flags steps whose latency grew, or whose
+throughput fell, by more than a tolerance.
+"""
+
+import http.client
+import json
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from http.cookies import SimpleCookie
+from random import Random
+from urllib.parse import urlsplit
+
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 95, 99)
+DEFAULT_TOLERANCE = 0.2
+# Latency changes smaller than this are noise however large the ratio
+MIN_LATENCY_DELTA_MS = 1.0
+# Steps with fewer requests than this in either run are too noisy to compare
+MIN_COMPARE_SAMPLES = 20
+
+
+@dataclass(frozen=True)
+class Step:
+    """
+    One kind of request in a scenario.
+
+    ``path`` may contain ``{tool_id}``, ``{chemical_id}``, ``{kit_id}``,
+    ``{page}`` and ``{term}``, filled in per request from the discovered targets.
+    """
+
+    name: str
+    path: str
+    weight: int = 1
+    method: str = "GET"
+    json: dict | None = None
+
+
+SCENARIOS = {
+    "browse": (
+        Step("tools.list", "/api/tools?page={page}&per_page=50", weight=4),
+        Step("tools.search", "/api/tools?q={term}&per_page=50", weight=2),
+        Step("tools.detail", "/api/tools/{tool_id}", weight=3),
+        Step("chemicals.list", "/api/chemicals?page={page}&per_page=50", weight=4),
+        Step("chemicals.detail", "/api/chemicals/{chemical_id}", weight=2),
+        Step("kits.list", "/api/kits?page={page}&per_page=50", weight=2),
+        Step("kits.detail", "/api/kits/{kit_id}", weight=2),
+        Step("warehouses.list", "/api/warehouses", weight=1),
+    ),
+    "history": (
+        Step("tools.transactions", "/api/inventory/tool/{tool_id}/transactions", weight=3),
+        Step("chemicals.transactions", "/api/inventory/chemical/{chemical_id}/transactions", weight=3),
+        Step("tools.checkouts", "/api/tools/{tool_id}/checkouts", weight=2),
+    ),
+}
+SCENARIOS["mixed"] = SCENARIOS["browse"] + SCENARIOS["history"]
+
+SEARCH_TERMS = ("wrench", "drill", "gauge", "sn0", "socket", "crimp")
+
+
+class FlaskClientTransport:
+    """
+    Sends requests through the Flask test client of an app in this process.
+
+    Args:
+        app: Flask application instance
+        headers: Headers for every request (usually the Authorization header)
+    """
+
+    def __init__(self, app, headers=None):
+        self.app = app
+        self.headers = dict(headers or {})
+
+    def session(self):
+        """A client for one worker thread."""
+        return _FlaskSession(self.app.test_client(), self.headers)
+
+
+class _FlaskSession:
+    def __init__(self, client, headers):
+        self.client = client
+        self.headers = headers
+
+    def request(self, method, path, json=None):
+        response = self.client.open(path, method=method, json=json, headers=self.headers)
+        return response.status_code, response.get_data()
+
+    def close(self):
+        pass
+
+
+class HttpTransport:
+    """
+    Sends requests to a running server over keep-alive HTTP connections.
+
+    Args:
+        base_url: Server URL, e.g. ``http://127.0.0.1:5000``
+        headers: Headers for every request (usually the Authorization header)
+        timeout: Socket timeout in seconds
+    """
+
+    def __init__(self, base_url, headers=None, timeout=30):
+        self.base_url = base_url
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+
+    @classmethod
+    def login(cls, base_url, employee_number, password, timeout=30):
+        """
+        Log in and authenticate later requests with the issued access token.
+
+        Raises:
+            RuntimeError: If the login is rejected
+        """
+        transport = cls(base_url, timeout=timeout)
+        session = transport.session()
+        try:
+            status, _body, response_headers = session.request_with_headers(
+                "POST", "/api/auth/login", {"employee_number": employee_number, "password": password}
+            )
+        finally:
+            session.close()
+        cookies = SimpleCookie()
+        for header in response_headers.get_all("Set-Cookie") or []:
+            cookies.load(header)
+        if status != 200 or "access_token" not in cookies:
+            raise RuntimeError(f"Login as {employee_number} failed with HTTP {status}")
+        transport.headers["Authorization"] = f"Bearer {cookies['access_token'].value}"
+        return transport
+
+    def session(self):
+        """A connection for one worker thread."""
+        return _HttpSession(self.base_url, self.headers, self.timeout)
+
+
+class _HttpSession:
+    def __init__(self, base_url, headers, timeout):
+        parts = urlsplit(base_url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.connection = connection_class(parts.netloc, timeout=timeout)
+        self.prefix = parts.path.rstrip("/")
+        self.headers = headers
+
+    def request_with_headers(self, method, path, json_body=None):
+        headers = dict(self.headers)
+        body = None
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            headers["Content-Type"] = "application/json"
+        try:
+            self.connection.request(method, self.prefix + path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            # Reconnect on the next request rather than reuse a broken socket
+            self.connection.close()
+            raise
+        return response.status, data, response.msg
+
+    def request(self, method, path, json=None):
+        status, data, _headers = self.request_with_headers(method, path, json)
+        return status, data
+
+    def close(self):
+        self.connection.close()
+
+
+@dataclass
+class Targets:
+    """Ids and page counts the scenario paths are filled from."""
+
+    tool_ids: list = field(default_factory=list)
+    chemical_ids: list = field(default_factory=list)
+    kit_ids: list = field(default_factory=list)
+    pages: int = 1
+
+    def sample(self, rng):
+        return {
+            "tool_id": rng.choice(self.tool_ids) if self.tool_ids else 0,
+            "chemical_id": rng.choice(self.chemical_ids) if self.chemical_ids else 0,
+            "kit_id": rng.choice(self.kit_ids) if self.kit_ids else 0,
+            "page": rng.randint(1, self.pages),
+            "term": rng.choice(SEARCH_TERMS),
+        }
+
+
+def discover_targets(session, limit=500):
+    """
+    Collect ids for detail requests from the first page of each list endpoint.
+
+    Args:
+        session: A transport session
+        limit: Page size to request
+
+    Returns:
+        Targets
+    """
+    def ids(path, key):
+        status, body = session.request("GET", path)
+        if status != 200:
+            logger.warning("Target discovery failed", extra={"path": path, "status_code": status})
+            return [], 0
+        data = json.loads(body)
+        items = data if isinstance(data, list) else data.get(key, [])
+        total = data.get("pagination", {}).get("total", len(items)) if isinstance(data, dict) else len(items)
+        return [item["id"] for item in items], total
+
+    tool_ids, tool_total = ids(f"/api/tools?per_page={limit}", "tools")
+    chemical_ids, chemical_total = ids(f"/api/chemicals?per_page={limit}", "chemicals")
+    kit_ids, _kit_total = ids(f"/api/kits?page=1&per_page={limit}", "kits")
+    # The scenarios list 50 per page; stay within the shorter of the two lists
+    pages = max(1, math.ceil(min(tool_total, chemical_total) / 50))
+    return Targets(tool_ids, chemical_ids, kit_ids, pages)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies_ms, errors, elapsed):
+    """
+    Throughput and latency statistics for one step (or the whole run).
+
+    Args:
+        latencies_ms: Latency of every request in milliseconds
+        errors: Requests that failed or answered with HTTP 4xx/5xx
+        elapsed: Wall-clock seconds of the measured run
+
+    Returns:
+        dict of count, errors, throughput, mean_ms and p50/p95/p99 in ms
+    """
+    values = sorted(latencies_ms)
+    summary = {
+        "count": len(values),
+        "errors": errors,
+        "throughput": round(len(values) / elapsed, 2) if elapsed > 0 else None,
+        "mean_ms": round(sum(values) / len(values), 3) if values else None,
+    }
+    for pct in PERCENTILES:
+        value = percentile(values, pct)
+        summary[f"p{pct}_ms"] = round(value, 3) if value is not None else None
+    return summary
+
+
+def run_scenario(transport, scenario="browse", workers=4, requests_per_worker=100, duration=None,
+                 warmup=10, seed=42):
+    """
+    Run a scenario and report per-step throughput and latency.
+
+    Args:
+        transport: FlaskClientTransport or HttpTransport
+        scenario: Name of a scenario in SCENARIOS, or a sequence of Steps
+        workers: Concurrent worker threads
+        requests_per_worker: Measured requests per worker (ignored with ``duration``)
+        duration: Run for this many seconds instead of a fixed request count
+        warmup: Unmeasured requests per worker before the run starts
+        seed: Random seed; each worker draws the same steps for the same seed
+
+    Returns:
+        dict: The report (see ``summarize`` for the per-step fields)
+    """
+    steps = SCENARIOS[scenario] if isinstance(scenario, str) else tuple(scenario)
+    weights = [step.weight for step in steps]
+
+    discovery = transport.session()
+    try:
+        targets = discover_targets(discovery)
+    finally:
+        discovery.close()
+
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    start = threading.Barrier(workers + 1)
+    timing = {}
+
+    def work(index):
+        rng = Random(seed + index)
+        session = transport.session()
+        local_samples = defaultdict(list)
+        local_errors = defaultdict(int)
+        try:
+            for _ in range(warmup):
+                step = rng.choices(steps, weights)[0]
+                _send(session, step, targets.sample(rng))
+            start.wait()
+            deadline = timing["started"] + duration if duration else None
+            sent = 0
+            while time.perf_counter() < deadline if deadline is not None else sent < requests_per_worker:
+                step = rng.choices(steps, weights)[0]
+                began = time.perf_counter()
+                ok = _send(session, step, targets.sample(rng))
+                local_samples[step.name].append((time.perf_counter() - began) * 1000)
+                if not ok:
+                    local_errors[step.name] += 1
+                sent += 1
+        finally:
+            session.close()
+            with lock:
+                for name, values in local_samples.items():
+                    samples[name].extend(values)
+                for name, count in local_errors.items():
+                    errors[name] += count
+
+    threads = [threading.Thread(target=work, args=(index,), daemon=True) for index in range(workers)]
+    for thread in threads:
+        thread.start()
+    # Set before releasing the barrier so every worker sees it
+    timing["started"] = time.perf_counter()
+    start.wait()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - timing["started"]
+
+    endpoints = {name: summarize(samples[name], errors[name], elapsed) for name in sorted(samples)}
+    all_latencies = [value for values in samples.values() for value in values]
+    return {
+        "scenario": scenario if isinstance(scenario, str) else "custom",
+        "workers": workers,
+        "seed": seed,
+        "started_at": datetime.now(UTC).isoformat(),
+        "duration_seconds": round(elapsed, 3),
+        "targets": {"tools": len(targets.tool_ids), "chemicals": len(targets.chemical_ids),
+                    "kits": len(targets.kit_ids)},
+        "total": summarize(all_latencies, sum(errors.values()), elapsed),
+        "endpoints": endpoints,
+    }
+
+
+def _send(session, step, values):
+    """Send one request; True when it succeeded."""
+    try:
+        status, _body = session.request(step.method, step.path.format(**values), step.json)
+    except (OSError, http.client.HTTPException) as e:
+        logger.debug("Benchmark request failed", extra={"step": step.name, "error": str(e)})
+        return False
+    return status < 400
+
+
+def compare_reports(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Find steps that got slower than the baseline.
+
+    A step regresses when its p95 or p99 latency grew by more than
+    ``tolerance`` (and by at least MIN_LATENCY_DELTA_MS), or its throughput
+    fell by more than ``tolerance``. Steps missing from either report, or
+    with fewer than MIN_COMPARE_SAMPLES requests in either, are skipped.
+
+    Args:
+        report: Report from ``run_scenario``
+        baseline: Earlier report to compare against
+        tolerance: Allowed relative change, e.g. 0.2 for 20%
+
+    Returns:
+        list of dicts with endpoint, metric, baseline, current and change
+    """
+    regressions = []
+    for name, current in report["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if not previous or min(previous.get("count", 0), current.get("count", 0)) < MIN_COMPARE_SAMPLES:
+            continue
+        for metric in ("p95_ms", "p99_ms"):
+            before, after = previous.get(metric), current.get(metric)
+            if before and after and after > before * (1 + tolerance) and after - before >= MIN_LATENCY_DELTA_MS:
+                regressions.append(_regression(name, metric, before, after))
+        before, after = previous.get("throughput"), current.get("throughput")
+        if before and after is not None and after < before * (1 - tolerance):
+            regressions.append(_regression(name, "throughput", before, after))
+    return regressions
+
+
+def _regression(endpoint, metric, before, after):
+    return {
+        "endpoint": endpoint,
+        "metric": metric,
+        "baseline": before,
+        "current": after,
+        "change": round((after - before) / before, 3),
+    }
+
+
+def format_report(report, regressions=None):
+    """
+    Render a report (and any regressions) as a text table.
+
+    Returns:
+        str
+    """
+    header = f"{'step':<24}{'count':>8}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    lines = [
+        f"Scenario {report['scenario']}: {report['workers']} workers, {report['duration_seconds']}s",
+        header,
+        "-" * len(header),
+    ]
+
+    def row(name, stats):
+        def number(value):
+            return f"{value:.1f}" if value is not None else "-"
+        return (f"{name:<24}{stats['count']:>8}{stats['errors']:>8}{number(stats['throughput']):>10}"
+                f"{number(stats['p50_ms']):>10}{number(stats['p95_ms']):>10}{number(stats['p99_ms']):>10}")
+
+    lines.extend(row(name, stats) for name, stats in report["endpoints"].items())
+    lines.append("-" * len(header))
+    lines.append(row("total", report["total"]))
+
+    if regressions is not None:
+        lines.append("")
+        if not regressions:
+            lines.append("No regressions against the baseline")
+        for item in regressions:
+            lines.append(f"REGRESSION {item['endpoint']} {item['metric']}: "
+                         f"{item['baseline']} -> {item['current']} ({item['change']:+.0%})")
+    return "\n".join(lines)
+
+
+def write_report(report, path):
+    """Write a report (or baseline) as JSON."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+
+def load_report(path):
+    """Read a report (or baseline) written by ``write_report``."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
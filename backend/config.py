@@ -61,6 +61,17 @@ class Config:
             "pool_pre_ping": True,  # Validate connections before use
         }
 
+    # SQLite engine profile (see utils/sqlite_profile.py): "tuned" applies WAL, busy_timeout
+    # and cache pragmas, caps the writer pool and adds a read-only engine for GET requests;
+    # "default" keeps SQLite's own settings
+    SQLITE_PROFILE = os.environ.get("SQLITE_PROFILE", "tuned").lower()
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get("SQLITE_CACHE_SIZE_KB", 65536))
+    SQLITE_MMAP_SIZE_MB = int(os.environ.get("SQLITE_MMAP_SIZE_MB", 256))
+    SQLITE_WRITER_POOL_SIZE = int(os.environ.get("SQLITE_WRITER_POOL_SIZE", 1))
+    SQLITE_POOL_TIMEOUT = int(os.environ.get("SQLITE_POOL_TIMEOUT", 30))
+    SQLITE_READ_ENGINE = os.environ.get("SQLITE_READ_ENGINE", "True").lower() in ("true", "1", "yes")
+
     # Session configuration - Enhanced security
     PERMANENT_SESSION_LIFETIME = timedelta(hours=8)  # Shorter timeout for security
     SESSION_INACTIVITY_TIMEOUT_MINUTES = int(
@@ -73,13 +84,22 @@ class Config:
     SESSION_COOKIE_HTTPONLY = True  # Prevent JavaScript access to session cookies
     SESSION_COOKIE_SAMESITE = "Lax"  # CSRF protection
 
-    # Structured logging configuration
+    # Structured logging configuration (applied by utils/log_pipeline.py)
+    # LOG_LEVEL gates records before they are created; set DEBUG to get per-item debug lines
+    LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+    # Hand records to a background listener thread for formatting and file I/O
+    LOG_ASYNC = os.environ.get("LOG_ASYNC", "True").lower() in ("true", "1", "yes")
+    LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", 10000))
+    # Per-request sampling of records up to LOG_SAMPLE_MAX_LEVEL on hot routes: "prefix=rate,..."
+    LOG_SAMPLE_RULES = os.environ.get("LOG_SAMPLE_RULES", "/api/health=0.01,/health=0.01,/api/me/unread=0.1")
+    LOG_SAMPLE_MAX_LEVEL = os.environ.get("LOG_SAMPLE_MAX_LEVEL", "INFO").upper()
+
     LOGGING_CONFIG = {
         "version": 1,
         "disable_existing_loggers": False,
         "formatters": {
             "json": {
-                "class": "pythonjsonlogger.jsonlogger.JsonFormatter",
+                "class": "utils.log_pipeline.FastJsonFormatter",
                 "format": "%(asctime)s %(name)s %(levelname)s %(message)s %(pathname)s %(lineno)d"
             },
             "standard": {
@@ -112,7 +132,7 @@ class Config:
         "loggers": {
             "": {
                 "handlers": ["default", "file", "error_file"],
-                "level": "DEBUG",
+                "level": LOG_LEVEL,
                 "propagate": False
             }
         }
@@ -138,6 +158,74 @@ class Config:
     # Request timeout for long-running operations (seconds)
     REQUEST_TIMEOUT = int(os.environ.get("REQUEST_TIMEOUT", 60))  # 60 seconds default
 
+    # Per-request instrumentation (see utils/request_metrics.py): SQL query counts and DB time
+    # per request, Server-Timing response headers and per-endpoint histograms for admins
+    REQUEST_METRICS_ENABLED = os.environ.get("REQUEST_METRICS_ENABLED", "True").lower() in ("true", "1", "yes")
+    SERVER_TIMING_ENABLED = os.environ.get("SERVER_TIMING_ENABLED", "True").lower() in ("true", "1", "yes")
+    # Requests issuing more SQL statements than this are logged as warnings (0 disables)
+    QUERY_BUDGET_PER_REQUEST = int(os.environ.get("QUERY_BUDGET_PER_REQUEST", 25))
+
+    # Scan query parameters and JSON bodies of every request for SQL injection and XSS
+    # patterns (see security/middleware.py). Findings are logged, requests are not blocked
+    SECURITY_SCAN_ENABLED = os.environ.get("SECURITY_SCAN_ENABLED", "False").lower() in ("true", "1", "yes")
+
+    # Prometheus text metrics at /metrics (see utils/metrics.py). Scrapers send METRICS_TOKEN as a
+    # Bearer token; without a token the endpoint is only served with DEBUG on. METRICS_DIR is a
+    # directory shared by all workers of one server for per-worker snapshots, written every
+    # METRICS_FLUSH_SECONDS
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "True").lower() in ("true", "1", "yes")
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN") or None
+    METRICS_DIR = os.environ.get("METRICS_DIR") or None
+    METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", 5))
+
+    # Attachment delivery and background processing
+    # USE_X_SENDFILE lets a fronting Apache/lighttpd stream files; for nginx set
+    # ATTACHMENTS_X_ACCEL_PREFIX to the internal location that maps to ATTACHMENTS_FOLDER
+    USE_X_SENDFILE = os.environ.get("USE_X_SENDFILE", "False").lower() in ("true", "1", "yes")
+    ATTACHMENTS_X_ACCEL_PREFIX = os.environ.get("ATTACHMENTS_X_ACCEL_PREFIX", None)
+    ATTACHMENT_THUMBNAIL_WORKERS = int(os.environ.get("ATTACHMENT_THUMBNAIL_WORKERS", 2))
+    ATTACHMENT_DOWNLOAD_FLUSH_SECONDS = float(os.environ.get("ATTACHMENT_DOWNLOAD_FLUSH_SECONDS", 5))
+    ATTACHMENT_DOWNLOAD_BATCH_SIZE = int(os.environ.get("ATTACHMENT_DOWNLOAD_BATCH_SIZE", 200))
+
+    # Channel read markers are debounced in memory and written in batches
+    CHANNEL_READ_MARKER_FLUSH_SECONDS = float(os.environ.get("CHANNEL_READ_MARKER_FLUSH_SECONDS", 2))
+    CHANNEL_READ_MARKER_BATCH_SIZE = int(os.environ.get("CHANNEL_READ_MARKER_BATCH_SIZE", 500))
+
+    # Audit logging: rows are written by a background batch writer and archived
+    # into compressed segments once they are older than AUDIT_LOG_RETENTION_DAYS
+    AUDIT_LOG_ASYNC = os.environ.get("AUDIT_LOG_ASYNC", "True").lower() in ("true", "1", "yes")
+    AUDIT_LOG_FLUSH_INTERVAL_MS = int(os.environ.get("AUDIT_LOG_FLUSH_INTERVAL_MS", 250))
+    AUDIT_LOG_BATCH_SIZE = int(os.environ.get("AUDIT_LOG_BATCH_SIZE", 500))
+    AUDIT_RECENT_WINDOW_DAYS = int(os.environ.get("AUDIT_RECENT_WINDOW_DAYS", 30))
+
+    # Kit usage analytics are cached per (kit set, day window); ORM writes invalidate them
+    KIT_ANALYTICS_CACHE_SECONDS = int(os.environ.get("KIT_ANALYTICS_CACHE_SECONDS", 300))
+
+    # Procurement dashboard (order and user request) analytics cache; ORM writes clear it
+    PROCUREMENT_ANALYTICS_CACHE_SECONDS = int(os.environ.get("PROCUREMENT_ANALYTICS_CACHE_SECONDS", 30))
+
+    # Per-user unread badge counts; committed ORM writes are recounted and pushed from a
+    # background thread. Pushes only reach users cached in the writing worker, so clients still poll
+    UNREAD_COUNTER_CACHE_SECONDS = int(os.environ.get("UNREAD_COUNTER_CACHE_SECONDS", 300))
+
+    # Active announcement set and read bitmaps; ORM writes and the next expiry clear it
+    ANNOUNCEMENT_CACHE_SECONDS = int(os.environ.get("ANNOUNCEMENT_CACHE_SECONDS", 60))
+
+    # Calibration notification list; also rebuilt when the next tool crosses a due/overdue boundary
+    CALIBRATION_NOTIFICATIONS_CACHE_SECONDS = int(os.environ.get("CALIBRATION_NOTIFICATIONS_CACHE_SECONDS", 300))
+
+    # The background job scheduler runs only in the process holding the leader lock;
+    # the file lock defaults to supplyline-background-services-<database hash>.lock in the temp dir
+    LEADER_LOCK_FILE = os.environ.get("LEADER_LOCK_FILE") or None
+    LEADER_LOCK_RETRY_SECONDS = int(os.environ.get("LEADER_LOCK_RETRY_SECONDS", 30))
+
+    # PostgreSQL elects the leader with an advisory lock, other databases with LEADER_LOCK_FILE;
+    # set to "file" or "database" to force one
+    LEADER_LOCK_BACKEND = os.environ.get("LEADER_LOCK_BACKEND", "auto").lower()
+
+    # Background scheduler job runs (scheduled_job_runs) are pruned after this many days
+    SCHEDULER_HISTORY_RETENTION_DAYS = int(os.environ.get("SCHEDULER_HISTORY_RETENTION_DAYS", 30))
+
     # Public URL for QR codes - should be accessible from external devices
     # Set this to your server's network IP or domain name
     # Example: http://192.168.1.100:5000 or https://yourdomain.com
@@ -15,6 +15,9 @@ BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
 if BACKEND_DIR not in sys.path:
     sys.path.insert(0, BACKEND_DIR)
 
+# SQL statement counting and per-endpoint query budgets (tests/query_budgets.toml)
+pytest_plugins = ["tests.plugins.query_counter"]
+
 # These globals are populated lazily after we configure the environment for tests
 create_app = None
 JWTManager = None
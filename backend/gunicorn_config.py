@@ -0,0 +1,74 @@
+"""
+Gunicorn configuration for the production server.
+
+    gunicorn --config gunicorn_config.py run:app
+
+Runs a single gthread worker, which serves the threading-mode Socket.IO
+server (WebSockets via simple-websocket). Flask-SocketIO supports only one
+gunicorn worker, so the server scales with threads: they are sized by
+utils/server_sizing.py and can be overridden with GUNICORN_THREADS. For
+more capacity, run several instances behind a proxy with sticky sessions.
+
+The app is preloaded in the master and the worker starts its background
+threads after the fork. Only the process holding the leader lock runs the
+scheduled backup, maintenance and resource monitoring services, so
+several instances sharing a database elect one (utils/leader_lock.py).
+A restarted worker takes over the lock from the one it replaces.
+"""
+
+import os
+import tempfile
+
+from config import Config
+from utils.server_sizing import DEFAULT_WEBSOCKET_THREADS, thread_count
+
+
+# create_app() leaves background threads to post_fork when preloading
+os.environ["DEFER_BACKGROUND_SERVICES"] = "true"
+
+# Worker processes share metrics snapshots here so a restarted worker keeps the counters
+if not Config.METRICS_DIR:
+    Config.METRICS_DIR = os.path.join(tempfile.gettempdir(), "supplyline-metrics")
+
+_settings = {name: getattr(Config, name) for name in dir(Config) if name.isupper()}
+_runtime_db_url = os.environ.get("DATABASE_URL")
+if _runtime_db_url:
+    _settings["SQLALCHEMY_DATABASE_URI"] = _runtime_db_url
+
+# nosec B104: the container binds to all interfaces; override with FLASK_HOST
+bind = f"{os.environ.get('FLASK_HOST', '0.0.0.0')}:{os.environ.get('FLASK_PORT', '5000')}"  # nosec B104
+
+worker_class = "gthread"
+# Flask-SocketIO supports a single worker; see utils/server_sizing.py
+workers = 1
+threads = int(os.environ.get("GUNICORN_THREADS") or thread_count(
+    _settings,
+    websocket_threads=int(os.environ.get("GUNICORN_WEBSOCKET_THREADS", DEFAULT_WEBSOCKET_THREADS)),
+))
+preload_app = True
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+
+# Requests are logged by the app (utils/logging_utils.py)
+accesslog = None
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    # Counters from a previous server run must not be added to this one's
+    from utils.metrics import SnapshotStore
+
+    SnapshotStore(Config.METRICS_DIR).clear()
+
+
+def when_ready(server):
+    server.log.info("Serving with %d %s worker(s), %d threads each", workers, worker_class, threads)
+
+
+def post_fork(server, worker):
+    from app import init_worker_services
+
+    init_worker_services(server.app.wsgi(), forked=True)
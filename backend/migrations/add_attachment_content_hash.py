@@ -0,0 +1,55 @@
+"""
+Migration to add content_hash column to message_attachments table
+"""
+import logging
+import os
+import sys
+
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect, text
+
+from app import create_app
+from models import db
+
+
+logger = logging.getLogger(__name__)
+
+
+def run_migration():
+    """Add content_hash column and index to message_attachments table"""
+    app = create_app()
+
+    with app.app_context():
+        inspector = inspect(db.engine)
+
+        if "message_attachments" not in inspector.get_table_names():
+            logger.warning("message_attachments table does not exist yet")
+            return False
+
+        columns = {column["name"] for column in inspector.get_columns("message_attachments")}
+        indexes = {index["name"] for index in inspector.get_indexes("message_attachments")}
+
+        with db.engine.connect() as conn:
+            if "content_hash" not in columns:
+                logger.info("Adding content_hash column to message_attachments table")
+                conn.execute(text("ALTER TABLE message_attachments ADD COLUMN content_hash VARCHAR(64)"))
+            else:
+                logger.info("content_hash column already exists")
+
+            if "ix_message_attachments_content_hash" not in indexes:
+                logger.info("Creating index on message_attachments.content_hash")
+                conn.execute(text(
+                    "CREATE INDEX ix_message_attachments_content_hash ON message_attachments (content_hash)"
+                ))
+            conn.commit()
+
+        return True
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    success = run_migration()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,64 @@
+"""
+Migration to add composite indexes to audit_log and create the
+audit_log_segments archive table
+"""
+import logging
+import os
+import sys
+
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect, text
+
+from app import create_app
+from models import AuditLogSegment, db
+
+
+logger = logging.getLogger(__name__)
+
+AUDIT_LOG_INDEXES = {
+    "ix_audit_log_timestamp": "CREATE INDEX ix_audit_log_timestamp ON audit_log (timestamp)",
+    "ix_audit_log_action_type_timestamp": (
+        "CREATE INDEX ix_audit_log_action_type_timestamp ON audit_log (action_type, timestamp)"
+    ),
+}
+
+
+def run_migration():
+    """Add audit_log indexes and the audit_log_segments table"""
+    app = create_app()
+
+    with app.app_context():
+        inspector = inspect(db.engine)
+        tables = inspector.get_table_names()
+
+        if "audit_log" not in tables:
+            logger.warning("audit_log table does not exist yet")
+            return False
+
+        indexes = {index["name"] for index in inspector.get_indexes("audit_log")}
+
+        with db.engine.connect() as conn:
+            for name, statement in AUDIT_LOG_INDEXES.items():
+                if name in indexes:
+                    logger.info(f"Index {name} already exists")
+                    continue
+                logger.info(f"Creating index {name}")
+                conn.execute(text(statement))
+            conn.commit()
+
+        if "audit_log_segments" not in tables:
+            logger.info("Creating audit_log_segments table")
+            AuditLogSegment.__table__.create(db.engine)
+        else:
+            logger.info("audit_log_segments table already exists")
+
+        return True
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    success = run_migration()
+    sys.exit(0 if success else 1)
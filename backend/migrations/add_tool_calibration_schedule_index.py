@@ -0,0 +1,51 @@
+"""
+Migration to add the (requires_calibration, next_calibration_date) index
+used by the calibration scheduler to the tools table
+"""
+import logging
+import os
+import sys
+
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect, text
+
+from app import create_app
+from models import db
+
+
+logger = logging.getLogger(__name__)
+
+
+def run_migration():
+    """Add the calibration schedule index to the tools table"""
+    app = create_app()
+
+    with app.app_context():
+        inspector = inspect(db.engine)
+
+        if "tools" not in inspector.get_table_names():
+            logger.warning("tools table does not exist yet")
+            return False
+
+        indexes = {index["name"] for index in inspector.get_indexes("tools")}
+
+        with db.engine.connect() as conn:
+            if "ix_tools_calibration_schedule" not in indexes:
+                logger.info("Creating index ix_tools_calibration_schedule")
+                conn.execute(text(
+                    "CREATE INDEX ix_tools_calibration_schedule ON tools (requires_calibration, next_calibration_date)"
+                ))
+            else:
+                logger.info("Index ix_tools_calibration_schedule already exists")
+            conn.commit()
+
+        return True
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    success = run_migration()
+    sys.exit(0 if success else 1)
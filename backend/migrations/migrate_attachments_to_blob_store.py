@@ -0,0 +1,146 @@
+"""
+Migration to move existing message attachments into the content-addressed blob store.
+
+Creates the attachment_blobs table, hashes every stored attachment, keeps one
+copy per distinct file under blobs/, deletes the duplicates and repoints
+message_attachments.file_path (and thumbnails) at the shared blob.
+
+Safe to re-run: attachments already in the blob store are skipped.
+"""
+import logging
+import os
+import shutil
+import sys
+
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect, text
+
+from app import create_app
+from models import db
+from models_messaging import AttachmentBlob, MessageAttachment
+from utils.attachment_storage import THUMBNAILS_FOLDER, UPLOAD_FOLDER, blob_store, hash_file
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 200
+
+
+def _ensure_schema():
+    inspector = inspect(db.engine)
+    tables = inspector.get_table_names()
+
+    if "message_attachments" not in tables:
+        logger.warning("message_attachments table does not exist yet")
+        return False
+
+    if "attachment_blobs" not in tables:
+        logger.info("Creating attachment_blobs table")
+        AttachmentBlob.__table__.create(db.engine)
+
+    columns = {column["name"] for column in inspector.get_columns("message_attachments")}
+    if "content_hash" not in columns:
+        logger.info("Adding content_hash column to message_attachments table")
+        with db.engine.connect() as conn:
+            conn.execute(text("ALTER TABLE message_attachments ADD COLUMN content_hash VARCHAR(64)"))
+            conn.execute(text(
+                "CREATE INDEX ix_message_attachments_content_hash ON message_attachments (content_hash)"
+            ))
+            conn.commit()
+
+    return True
+
+
+def _migrate_thumbnail(attachment, blob):
+    """Share one thumbnail per blob and drop duplicate legacy thumbnails."""
+    if not attachment.thumbnail_path:
+        attachment.thumbnail_path = blob.thumbnail_path
+        return
+
+    if attachment.thumbnail_path == blob.thumbnail_path:
+        return
+
+    legacy_path = os.path.join(UPLOAD_FOLDER, attachment.thumbnail_path)
+    if blob.thumbnail_path is None and os.path.exists(legacy_path):
+        relative_path = f"thumbnails/{blob.content_hash}.jpg"
+        os.makedirs(THUMBNAILS_FOLDER, exist_ok=True)
+        shutil.move(legacy_path, os.path.join(UPLOAD_FOLDER, relative_path))
+        blob.thumbnail_path = relative_path
+    elif os.path.exists(legacy_path):
+        os.remove(legacy_path)
+
+    attachment.thumbnail_path = blob.thumbnail_path
+
+
+def run_migration():
+    """Deduplicate existing attachment files into the blob store"""
+    app = create_app()
+
+    with app.app_context():
+        if not _ensure_schema():
+            return False
+
+        stats = {"migrated": 0, "deduplicated": 0, "missing": 0, "skipped": 0, "bytes_saved": 0}
+        last_id = 0
+
+        while True:
+            attachments = (
+                MessageAttachment.query
+                .filter(MessageAttachment.id > last_id)
+                .order_by(MessageAttachment.id)
+                .limit(BATCH_SIZE)
+                .all()
+            )
+            if not attachments:
+                break
+
+            for attachment in attachments:
+                last_id = attachment.id
+
+                if attachment.file_path.startswith(blob_store.root) and attachment.blob is not None:
+                    stats["skipped"] += 1
+                    continue
+
+                if not os.path.exists(attachment.file_path):
+                    logger.warning("Attachment %s file missing: %s", attachment.id, attachment.file_path)
+                    stats["missing"] += 1
+                    continue
+
+                file_size, content_hash = hash_file(attachment.file_path)
+                existing = db.session.get(AttachmentBlob, content_hash)
+                if existing is not None:
+                    stats["deduplicated"] += 1
+                    stats["bytes_saved"] += file_size
+
+                blob = blob_store.store(attachment.file_path, content_hash, file_size)
+                db.session.flush()
+                db.session.refresh(blob)
+
+                attachment.content_hash = content_hash
+                attachment.file_path = blob.storage_path
+                attachment.file_size = file_size
+                _migrate_thumbnail(attachment, blob)
+                stats["migrated"] += 1
+
+            db.session.commit()
+            logger.info("Processed attachments up to id %s", last_id)
+
+        # Make sure counts match the attachments that now reference each blob
+        blob_store.reconcile_ref_counts()
+        db.session.commit()
+
+        logger.info(
+            "Blob store migration complete: %(migrated)s migrated, %(deduplicated)s duplicates removed "
+            "(%(bytes_saved)s bytes saved), %(skipped)s already migrated, %(missing)s missing files",
+            stats,
+        )
+        return True
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    success = run_migration()
+    sys.exit(0 if success else 1)
@@ -1,3 +1,5 @@
+import gzip
+import json
 from datetime import datetime, timedelta
 
 from flask_sqlalchemy import SQLAlchemy
@@ -5,6 +7,8 @@ from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.orm import object_session
 from werkzeug.security import check_password_hash, generate_password_hash
 
+from utils.sqlite_profile import RoutingSession
+
 
 # Import time utilities for consistent time handling
 try:
@@ -24,7 +28,7 @@ except ImportError:
         """
         return datetime.now()
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 
 class PasswordHistory(db.Model):
@@ -63,6 +67,11 @@ class Tool(db.Model):
     # Relationships
     warehouse = db.relationship("Warehouse", back_populates="tools")
 
+    __table_args__ = (
+        # Serves due/overdue range scans and the calibration scheduler's boundary windows
+        db.Index("ix_tools_calibration_schedule", "requires_calibration", "next_calibration_date"),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -417,6 +426,89 @@ class AuditLog(db.Model):
     action_details = db.Column(db.String)
     timestamp = db.Column(db.DateTime, default=get_current_time)
 
+    __table_args__ = (
+        db.Index("ix_audit_log_timestamp", "timestamp"),
+        db.Index("ix_audit_log_action_type_timestamp", "action_type", "timestamp"),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "action_type": self.action_type,
+            "action_details": self.action_details,
+            "timestamp": self.timestamp.isoformat() if self.timestamp else None
+        }
+
+
+class AuditLogSegment(db.Model):
+    """
+    Compressed archive of audit log rows older than the retention window.
+
+    Each segment holds rows from a single calendar month as gzip-compressed
+    JSON, so old history stays available without bloating ``audit_log``.
+    """
+    __tablename__ = "audit_log_segments"
+    id = db.Column(db.Integer, primary_key=True)
+    period_start = db.Column(db.DateTime, nullable=False, index=True)
+    period_end = db.Column(db.DateTime, nullable=False)
+    first_timestamp = db.Column(db.DateTime, nullable=False)
+    last_timestamp = db.Column(db.DateTime, nullable=False)
+    row_count = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, default=get_current_time)
+
+    def read_rows(self):
+        """Decompress the archived audit log rows."""
+        return json.loads(gzip.decompress(self.payload))
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "period_start": self.period_start.isoformat(),
+            "period_end": self.period_end.isoformat(),
+            "first_timestamp": self.first_timestamp.isoformat(),
+            "last_timestamp": self.last_timestamp.isoformat(),
+            "row_count": self.row_count,
+            "compressed_size": len(self.payload) if self.payload is not None else 0,
+            "created_at": self.created_at.isoformat() if self.created_at else None
+        }
+
+
+class ScheduledJobRun(db.Model):
+    """
+    One run of a background scheduler job (utils/scheduler.py).
+
+    The history tells a newly elected leader when each job last ran, and
+    shows how long periodic work takes.
+    """
+    __tablename__ = "scheduled_job_runs"
+    id = db.Column(db.Integer, primary_key=True)
+    job_name = db.Column(db.String(100), nullable=False)
+    started_at = db.Column(db.DateTime, nullable=False)
+    finished_at = db.Column(db.DateTime)
+    duration_ms = db.Column(db.Integer)
+    status = db.Column(db.String(20), nullable=False)  # success, failed
+    error_message = db.Column(db.Text)
+    result = db.Column(db.Text)  # JSON summary returned by the job
+    worker = db.Column(db.String(255))  # host:pid of the leader that ran it
+
+    __table_args__ = (
+        db.Index("ix_scheduled_job_runs_job_started", "job_name", "started_at"),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "job_name": self.job_name,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error_message": self.error_message,
+            "result": json.loads(self.result) if self.result else None,
+            "worker": self.worker
+        }
+
 
 class UserActivity(db.Model):
     __tablename__ = "user_activity"
@@ -464,6 +556,75 @@ class ToolServiceRecord(db.Model):
         }
 
 
+# Order of due states on the buyer board: most urgent first
+DUE_STATE_ORDER = ("late", "due_soon", "on_track", "unscheduled", "completed")
+
+# Stand-in for a missing due date so due-date sorts have no NULL keys
+NO_DUE_DATE = datetime(9999, 12, 31)
+
+
+def _due_state_rank(model, now):
+    """SQL counterpart of ``_due_state``, as the state's index in DUE_STATE_ORDER."""
+    due = model.expected_due_date
+    return db.case(
+        (due.is_(None), DUE_STATE_ORDER.index("unscheduled")),
+        (model.status.in_(model.CLOSED_STATUSES), DUE_STATE_ORDER.index("completed")),
+        (due < now, DUE_STATE_ORDER.index("late")),
+        (due < now + timedelta(days=4), DUE_STATE_ORDER.index("due_soon")),
+        else_=DUE_STATE_ORDER.index("on_track"),
+    )
+
+
+def _message_summaries(message_model, parent_column, parent_ids):
+    """Message count, unread count and latest message time per parent, in one grouped query."""
+    summaries = {
+        parent_id: {"message_count": 0, "unread_message_count": 0, "latest_message_at": None}
+        for parent_id in parent_ids
+    }
+    if not summaries:
+        return summaries
+
+    rows = db.session.execute(
+        db.select(
+            parent_column,
+            db.func.count().label("total"),
+            db.func.sum(db.case((message_model.is_read.is_(False), 1), else_=0)).label("unread"),
+            db.func.max(message_model.sent_date).label("latest"),
+        )
+        .where(parent_column.in_(list(summaries)))
+        .group_by(parent_column)
+    )
+    for parent_id, total, unread, latest in rows:
+        summaries[parent_id] = {
+            "message_count": total,
+            "unread_message_count": unread or 0,
+            "latest_message_at": latest,
+        }
+    return summaries
+
+
+def _due_fields(record):
+    """Due state, lateness and age fields shared by order and request projections."""
+    due_state = record._due_state()
+    now = get_current_time()
+    data = {
+        "due_status": due_state,
+        "is_late": due_state == "late",
+        "days_overdue": None,
+        "days_open": None,
+    }
+
+    if record.expected_due_date and not record.is_closed():
+        delta = now - record.expected_due_date
+        if delta.days >= 0:
+            data["days_overdue"] = delta.days
+
+    if record.created_at:
+        data["days_open"] = (now - record.created_at).days
+
+    return data
+
+
 class ProcurementOrder(db.Model):
     """Track procurement activity for replacement tools, chemicals, and expendables."""
 
@@ -527,17 +688,75 @@ class ProcurementOrder(db.Model):
 
         return "on_track"
 
-    def to_dict(self, include_messages: bool = False):
-        """Serialize order for API responses."""
+    @classmethod
+    def due_state_rank(cls, now):
+        """SQL expression ranking orders by due state, most urgent first."""
+        return _due_state_rank(cls, now)
+
+    @classmethod
+    def get_message_summaries(cls, order_ids):
+        """Message counts and latest message time for many orders in one query."""
+        return _message_summaries(ProcurementOrderMessage, ProcurementOrderMessage.order_id, order_ids)
 
-        latest_message = None
-        message_count = 0
-        unread_message_count = 0
+    def _message_summary(self):
+        summary = {"message_count": 0, "unread_message_count": 0, "latest_message_at": None}
         if self.messages is not None:
-            message_count = self.messages.count()
-            unread_message_count = self.messages.filter_by(is_read=False).count()
-            if message_count:
+            summary["message_count"] = self.messages.count()
+            summary["unread_message_count"] = self.messages.filter_by(is_read=False).count()
+            if summary["message_count"]:
                 latest_message = self.messages.order_by(ProcurementOrderMessage.sent_date.desc()).first()
+                summary["latest_message_at"] = latest_message.sent_date
+        return summary
+
+    def to_list_dict(self, summary=None):
+        """
+        Slim serialization for order lists and the buyer board.
+
+        Args:
+            summary: Pre-computed message summary from ``get_message_summaries``
+        """
+        if summary is None:
+            summary = self._message_summary()
+        latest_message_at = summary["latest_message_at"]
+
+        data = {
+            "id": self.id,
+            "order_number": self.order_number,
+            "title": self.title,
+            "order_type": self.order_type,
+            "part_number": self.part_number,
+            "priority": self.priority,
+            "status": self.status,
+            "vendor": self.vendor,
+            "tracking_number": self.tracking_number,
+            "expected_due_date": self.expected_due_date.isoformat() if self.expected_due_date else None,
+            "needs_more_info": self.needs_more_info,
+            "kit_id": self.kit_id,
+            "kit_name": self.kit.name if self.kit else None,
+            "requester_id": self.requester_id,
+            "requester_name": self.requester.name if self.requester else None,
+            "buyer_id": self.buyer_id,
+            "buyer_name": self.buyer.name if self.buyer else None,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "message_count": summary["message_count"],
+            "unread_message_count": summary["unread_message_count"],
+            "latest_message_at": latest_message_at.isoformat() if latest_message_at else None,
+        }
+        data.update(_due_fields(self))
+        return data
+
+    def to_dict(self, include_messages: bool = False, summary=None):
+        """
+        Serialize order for API responses.
+
+        Args:
+            include_messages: Include the message thread
+            summary: Pre-computed message summary from ``get_message_summaries``
+        """
+        if summary is None:
+            summary = self._message_summary()
+        latest_message_at = summary["latest_message_at"]
 
         data = {
             "id": self.id,
@@ -568,23 +787,11 @@ class ProcurementOrder(db.Model):
             "buyer_name": self.buyer.name if self.buyer else None,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-            "message_count": message_count,
-            "unread_message_count": unread_message_count,
-            "latest_message_at": latest_message.sent_date.isoformat() if latest_message else None,
-            "due_status": self._due_state(),
-            "is_late": self._due_state() == "late",
-            "days_overdue": None,
-            "days_open": None,
+            "message_count": summary["message_count"],
+            "unread_message_count": summary["unread_message_count"],
+            "latest_message_at": latest_message_at.isoformat() if latest_message_at else None,
         }
-
-        if self.expected_due_date and not self.is_closed():
-            delta = get_current_time() - self.expected_due_date
-            if delta.days >= 0:
-                data["days_overdue"] = delta.days
-
-        if self.created_at:
-            open_delta = get_current_time() - self.created_at
-            data["days_open"] = open_delta.days
+        data.update(_due_fields(self))
 
         if include_messages:
             messages_query = self.messages.order_by(ProcurementOrderMessage.sent_date.desc()) if self.messages is not None else []
@@ -696,6 +903,51 @@ class UserRequest(db.Model):
 
         return "on_track"
 
+    @classmethod
+    def due_state_rank(cls, now):
+        """SQL expression ranking requests by due state, most urgent first."""
+        return _due_state_rank(cls, now)
+
+    @classmethod
+    def get_list_summaries(cls, request_ids):
+        """
+        Message counts, latest message time and item count for many requests.
+
+        Runs one grouped query over messages and one over items.
+        """
+        summaries = _message_summaries(UserRequestMessage, UserRequestMessage.request_id, request_ids)
+        for summary in summaries.values():
+            summary["item_count"] = 0
+        if summaries:
+            rows = db.session.execute(
+                db.select(RequestItem.request_id, db.func.count())
+                .where(RequestItem.request_id.in_(list(summaries)))
+                .group_by(RequestItem.request_id)
+            )
+            for request_id, total in rows:
+                summaries[request_id]["item_count"] = total
+        return summaries
+
+    @classmethod
+    def get_items_by_request(cls, request_ids):
+        """Items of many requests in one query, keyed by request ID."""
+        items = {request_id: [] for request_id in request_ids}
+        if items:
+            for item in RequestItem.query.filter(RequestItem.request_id.in_(list(items))).order_by(RequestItem.id):
+                items[item.request_id].append(item)
+        return items
+
+    def _list_summary(self):
+        summary = {"message_count": 0, "unread_message_count": 0, "latest_message_at": None}
+        if self.messages is not None:
+            summary["message_count"] = self.messages.count()
+            summary["unread_message_count"] = self.messages.filter_by(is_read=False).count()
+            if summary["message_count"]:
+                latest_message = self.messages.order_by(UserRequestMessage.sent_date.desc()).first()
+                summary["latest_message_at"] = latest_message.sent_date
+        summary["item_count"] = self.items.count() if self.items else 0
+        return summary
+
     def update_status_from_items(self):
         """Update request status based on item statuses."""
         if not self.items or self.items.count() == 0:
@@ -735,55 +987,80 @@ class UserRequest(db.Model):
         else:
             self.status = "new"
 
-    def to_dict(self, include_items: bool = True, include_messages: bool = False):
-        """Serialize request for API responses."""
+    def to_list_dict(self, summary=None):
+        """
+        Slim serialization for request lists and the buyer board.
 
-        latest_message = None
-        message_count = 0
-        unread_message_count = 0
-        if self.messages is not None:
-            message_count = self.messages.count()
-            unread_message_count = self.messages.filter_by(is_read=False).count()
-            if message_count:
-                latest_message = self.messages.order_by(UserRequestMessage.sent_date.desc()).first()
+        Args:
+            summary: Pre-computed summary from ``get_list_summaries``
+        """
+        if summary is None:
+            summary = self._list_summary()
+        latest_message_at = summary["latest_message_at"]
 
         data = {
             "id": self.id,
             "request_number": self.request_number,
             "title": self.title,
-            "description": self.description,
             "priority": self.priority,
             "status": self.status,
             "requester_id": self.requester_id,
             "requester_name": self.requester.name if self.requester else None,
             "buyer_id": self.buyer_id,
             "buyer_name": self.buyer.name if self.buyer else None,
-            "notes": self.notes,
             "needs_more_info": self.needs_more_info,
             "expected_due_date": self.expected_due_date.isoformat() if self.expected_due_date else None,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-            "message_count": message_count,
-            "unread_message_count": unread_message_count,
-            "latest_message_at": latest_message.sent_date.isoformat() if latest_message else None,
-            "due_status": self._due_state(),
-            "is_late": self._due_state() == "late",
-            "days_overdue": None,
-            "days_open": None,
-            "item_count": self.items.count() if self.items else 0,
+            "message_count": summary["message_count"],
+            "unread_message_count": summary["unread_message_count"],
+            "latest_message_at": latest_message_at.isoformat() if latest_message_at else None,
+            "item_count": summary["item_count"],
         }
+        data.update(_due_fields(self))
+        return data
+
+    def to_dict(self, include_items: bool = True, include_messages: bool = False, summary=None, items=None):
+        """
+        Serialize request for API responses.
 
-        if self.expected_due_date and not self.is_closed():
-            delta = get_current_time() - self.expected_due_date
-            if delta.days >= 0:
-                data["days_overdue"] = delta.days
+        Args:
+            include_items: Include the request's items
+            include_messages: Include the message thread
+            summary: Pre-computed summary from ``get_list_summaries``
+            items: Pre-loaded items from ``get_items_by_request``
+        """
+        if summary is None:
+            summary = self._list_summary()
+        latest_message_at = summary["latest_message_at"]
 
-        if self.created_at:
-            open_delta = get_current_time() - self.created_at
-            data["days_open"] = open_delta.days
+        data = {
+            "id": self.id,
+            "request_number": self.request_number,
+            "title": self.title,
+            "description": self.description,
+            "priority": self.priority,
+            "status": self.status,
+            "requester_id": self.requester_id,
+            "requester_name": self.requester.name if self.requester else None,
+            "buyer_id": self.buyer_id,
+            "buyer_name": self.buyer.name if self.buyer else None,
+            "notes": self.notes,
+            "needs_more_info": self.needs_more_info,
+            "expected_due_date": self.expected_due_date.isoformat() if self.expected_due_date else None,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "message_count": summary["message_count"],
+            "unread_message_count": summary["unread_message_count"],
+            "latest_message_at": latest_message_at.isoformat() if latest_message_at else None,
+        }
+        data.update(_due_fields(self))
+        data["item_count"] = summary["item_count"]
 
-        if include_items and self.items:
-            data["items"] = [item.to_dict() for item in self.items.all()]
+        if include_items:
+            if items is None:
+                items = self.items.all() if self.items else []
+            data["items"] = [item.to_dict() for item in items]
 
         if include_messages and self.messages:
             messages_query = self.messages.order_by(UserRequestMessage.sent_date.desc())
@@ -1650,8 +1927,50 @@ class Warehouse(db.Model):
     expendables = db.relationship("Expendable", back_populates="warehouse", lazy="dynamic")
     created_by = db.relationship("User", foreign_keys=[created_by_id])
 
-    def to_dict(self, include_counts=False):
-        """Convert warehouse to dictionary representation."""
+    ITEM_COUNT_KEYS = ("tools_count", "chemicals_count", "expendables_count")
+
+    @classmethod
+    def get_item_counts(cls, warehouse_ids):
+        """
+        Count tools, chemicals and expendables for many warehouses in one round trip.
+
+        Args:
+            warehouse_ids: IDs of the warehouses to count
+
+        Returns:
+            dict: Mapping of warehouse ID to a dict of counts (zero when a warehouse has none)
+        """
+        counts = {warehouse_id: dict.fromkeys(cls.ITEM_COUNT_KEYS, 0) for warehouse_id in warehouse_ids}
+        if not counts:
+            return counts
+
+        ids = list(counts)
+
+        def grouped(model, key):
+            return (
+                db.select(model.warehouse_id, db.literal(key).label("count_key"), db.func.count().label("total"))
+                .where(model.warehouse_id.in_(ids))
+                .group_by(model.warehouse_id)
+            )
+
+        statement = db.union_all(
+            grouped(Tool, "tools_count"),
+            grouped(Chemical, "chemicals_count"),
+            grouped(Expendable, "expendables_count"),
+        )
+        for warehouse_id, count_key, total in db.session.execute(statement):
+            counts[warehouse_id][count_key] = total
+
+        return counts
+
+    def to_dict(self, include_counts=False, counts=None):
+        """
+        Convert warehouse to dictionary representation.
+
+        Args:
+            include_counts: Include the creator's name and item counts
+            counts: Precomputed counts from ``get_item_counts``; looked up when omitted
+        """
         result = {
             "id": self.id,
             "name": self.name,
@@ -1673,11 +1992,9 @@ class Warehouse(db.Model):
         if include_counts:
             try:
                 result["created_by"] = self.created_by.name if self.created_by else None
-                # Use direct queries instead of relationships to ensure accurate counts
-                from models import Chemical, Expendable, Tool
-                result["tools_count"] = Tool.query.filter_by(warehouse_id=self.id).count()
-                result["chemicals_count"] = Chemical.query.filter_by(warehouse_id=self.id).count()
-                result["expendables_count"] = Expendable.query.filter_by(warehouse_id=self.id).count()
+                if counts is None:
+                    counts = Warehouse.get_item_counts([self.id])[self.id]
+                result.update(counts)
             except Exception as e:
                 # If queries fail, skip counts
                 print(f"Error getting counts for warehouse {self.id}: {e}")
@@ -62,8 +62,59 @@ class Kit(db.Model):
     reorder_requests = db.relationship("KitReorderRequest", back_populates="kit", lazy="dynamic", cascade="all, delete-orphan")
     messages = db.relationship("KitMessage", back_populates="kit", lazy="dynamic", cascade="all, delete-orphan")
 
-    def to_dict(self, include_details=False):
-        """Convert model to dictionary"""
+    SUMMARY_COUNT_KEYS = ("box_count", "item_count", "expendable_count", "pending_reorders", "unread_messages")
+
+    @classmethod
+    def get_summary_counts(cls, kit_ids):
+        """
+        Count boxes, items, expendables, pending reorders and unread messages
+        for many kits in one round trip.
+
+        Each table is grouped by kit_id and the results are combined with
+        UNION ALL, so the cost does not grow with the number of kits listed.
+
+        Args:
+            kit_ids: IDs of the kits to summarize
+
+        Returns:
+            dict: Mapping of kit ID to a dict of counts (zero when a kit has none)
+        """
+        summaries = {kit_id: dict.fromkeys(cls.SUMMARY_COUNT_KEYS, 0) for kit_id in kit_ids}
+        if not summaries:
+            return summaries
+
+        ids = list(summaries)
+
+        def grouped(model, key, *criteria):
+            return (
+                db.select(model.kit_id, db.literal(key).label("count_key"), db.func.count().label("total"))
+                .where(model.kit_id.in_(ids), *criteria)
+                .group_by(model.kit_id)
+            )
+
+        statement = db.union_all(
+            grouped(KitBox, "box_count"),
+            grouped(KitItem, "item_count"),
+            grouped(KitExpendable, "expendable_count"),
+            grouped(KitReorderRequest, "pending_reorders", KitReorderRequest.status == "pending"),
+            grouped(KitMessage, "unread_messages", KitMessage.is_read.is_(False)),
+        )
+        for kit_id, count_key, total in db.session.execute(statement):
+            summaries[kit_id][count_key] = total
+
+        return summaries
+
+    def to_dict(self, include_details=False, summary=None):
+        """
+        Convert model to dictionary
+
+        Args:
+            include_details: Include the kit's boxes
+            summary: Precomputed counts from ``get_summary_counts``; looked up when omitted
+        """
+        if summary is None:
+            summary = Kit.get_summary_counts([self.id])[self.id]
+
         data = {
             "id": self.id,
             "name": self.name,
@@ -75,14 +126,16 @@ class Kit(db.Model):
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "created_by": self.created_by,
             "creator_name": self.creator.name if self.creator else None,
-            "box_count": self.boxes.count() if self.boxes else 0,
-            "item_count": self.items.count() + self.expendables.count() if self.items and self.expendables else 0
+            "box_count": summary["box_count"],
+            "item_count": summary["item_count"] + summary["expendable_count"],
+            "pending_reorders": summary["pending_reorders"],
+            "unread_messages": summary["unread_messages"]
         }
 
         if include_details:
-            data["boxes"] = [box.to_dict() for box in self.boxes.all()] if self.boxes else []
-            data["pending_reorders"] = self.reorder_requests.filter_by(status="pending").count() if self.reorder_requests else 0
-            data["unread_messages"] = self.messages.filter_by(is_read=False).count() if self.messages else 0
+            boxes = self.boxes.all()
+            item_counts = KitBox.get_item_counts([box.id for box in boxes])
+            data["boxes"] = [box.to_dict(item_count=item_counts[box.id]) for box in boxes]
 
         return data
 
@@ -111,8 +164,43 @@ class KitBox(db.Model):
         db.UniqueConstraint("kit_id", "box_number", name="uix_kit_box_number"),
     )
 
-    def to_dict(self):
-        """Convert model to dictionary"""
+    @classmethod
+    def get_item_counts(cls, box_ids):
+        """
+        Count items and legacy expendables for many boxes in one round trip.
+
+        Args:
+            box_ids: IDs of the boxes to count
+
+        Returns:
+            dict: Mapping of box ID to its combined item count
+        """
+        counts = dict.fromkeys(box_ids, 0)
+        if not counts:
+            return counts
+
+        ids = list(counts)
+        statement = db.union_all(
+            db.select(KitItem.box_id, db.func.count().label("total"))
+            .where(KitItem.box_id.in_(ids)).group_by(KitItem.box_id),
+            db.select(KitExpendable.box_id, db.func.count().label("total"))
+            .where(KitExpendable.box_id.in_(ids)).group_by(KitExpendable.box_id),
+        )
+        for box_id, total in db.session.execute(statement):
+            counts[box_id] += total
+
+        return counts
+
+    def to_dict(self, item_count=None):
+        """
+        Convert model to dictionary
+
+        Args:
+            item_count: Precomputed count from ``get_item_counts``; looked up when omitted
+        """
+        if item_count is None:
+            item_count = KitBox.get_item_counts([self.id])[self.id]
+
         return {
             "id": self.id,
             "kit_id": self.kit_id,
@@ -120,7 +208,7 @@ class KitBox(db.Model):
             "box_type": self.box_type,
             "description": self.description,
             "created_at": self.created_at.isoformat() if self.created_at else None,
-            "item_count": (self.items.count() if self.items else 0) + (self.expendables.count() if self.expendables else 0)
+            "item_count": item_count
         }
 
 
@@ -342,10 +430,50 @@ class KitTransfer(db.Model):
     # Relationships
     transferrer = db.relationship("User", foreign_keys=[transferred_by])
 
-    def to_dict(self):
-        """Convert model to dictionary with item details"""
+    @classmethod
+    def get_related(cls, transfers):
+        """
+        Load the kits, warehouses and items referenced by many transfers at once.
+
+        Args:
+            transfers: KitTransfer instances about to be serialized
+
+        Returns:
+            dict: Mapping of ``(model, id)`` to the loaded instance
+        """
+        from models import Chemical, Tool, Warehouse
+
+        models = {"kit": Kit, "warehouse": Warehouse, "tool": Tool, "chemical": Chemical, "expendable": KitExpendable}
+        wanted = {}
+        for transfer in transfers:
+            for kind, ident in (
+                (transfer.from_location_type, transfer.from_location_id),
+                (transfer.to_location_type, transfer.to_location_id),
+                (transfer.item_type, transfer.item_id),
+            ):
+                if kind in models:
+                    wanted.setdefault(models[kind], set()).add(ident)
+
+        related = {}
+        for model, ids in wanted.items():
+            for instance in db.session.scalars(db.select(model).where(model.id.in_(ids))):
+                related[model, instance.id] = instance
+        return related
+
+    def to_dict(self, related=None):
+        """
+        Convert model to dictionary with item details
+
+        Args:
+            related: Preloaded instances from ``get_related``; looked up one by one when omitted
+        """
         from models import Chemical, Tool
 
+        def get(model, ident):
+            if related is None:
+                return db.session.get(model, ident)
+            return related.get((model, ident))
+
         # Base transfer data
         data = {
             "id": self.id,
@@ -366,38 +494,38 @@ class KitTransfer(db.Model):
 
         # Add location names
         if self.from_location_type == "kit":
-            from_kit = db.session.get(Kit, self.from_location_id)
+            from_kit = get(Kit, self.from_location_id)
             data["from_location_name"] = from_kit.name if from_kit else None
         elif self.from_location_type == "warehouse":
             from models import Warehouse
-            from_warehouse = db.session.get(Warehouse, self.from_location_id)
+            from_warehouse = get(Warehouse, self.from_location_id)
             data["from_location_name"] = from_warehouse.name if from_warehouse else None
 
         if self.to_location_type == "kit":
-            to_kit = db.session.get(Kit, self.to_location_id)
+            to_kit = get(Kit, self.to_location_id)
             data["to_location_name"] = to_kit.name if to_kit else None
         elif self.to_location_type == "warehouse":
             from models import Warehouse
-            to_warehouse = db.session.get(Warehouse, self.to_location_id)
+            to_warehouse = get(Warehouse, self.to_location_id)
             data["to_location_name"] = to_warehouse.name if to_warehouse else None
 
         # Fetch item details based on item_type
         if self.item_type == "tool":
-            tool = db.session.get(Tool, self.item_id)
+            tool = get(Tool, self.item_id)
             if tool:
                 data["tool_number"] = tool.tool_number
                 data["part_number"] = None
                 data["description"] = tool.description
                 data["serial_number"] = tool.serial_number
         elif self.item_type == "chemical":
-            chemical = db.session.get(Chemical, self.item_id)
+            chemical = get(Chemical, self.item_id)
             if chemical:
                 data["part_number"] = chemical.part_number
                 data["tool_number"] = None
                 data["description"] = chemical.description
                 data["lot_number"] = chemical.lot_number
         elif self.item_type == "expendable":
-            expendable = db.session.get(KitExpendable, self.item_id)
+            expendable = get(KitExpendable, self.item_id)
             if expendable:
                 data["part_number"] = expendable.part_number
                 data["tool_number"] = None
@@ -439,14 +567,55 @@ class KitReorderRequest(db.Model):
     approver = db.relationship("User", foreign_keys=[approved_by])
     messages = db.relationship("KitMessage", back_populates="related_request", lazy="dynamic")
 
-    def to_dict(self):
-        """Convert model to dictionary"""
-        # Get linked procurement order status if exists
+    @classmethod
+    def get_summaries(cls, reorder_ids):
+        """
+        Look up linked order status and message count for many reorder requests.
+
+        Args:
+            reorder_ids: IDs of the reorder requests to summarize
+
+        Returns:
+            dict: Mapping of reorder ID to ``{"order_status": ..., "message_count": ...}``
+        """
         from models import ProcurementOrder
-        linked_order = ProcurementOrder.query.filter_by(
-            reference_type="kit_reorder",
-            reference_number=str(self.id)
-        ).first()
+
+        summaries = {reorder_id: {"order_status": None, "message_count": 0} for reorder_id in reorder_ids}
+        if not summaries:
+            return summaries
+
+        references = {str(reorder_id): reorder_id for reorder_id in summaries}
+        orders = db.session.execute(
+            db.select(ProcurementOrder.reference_number, ProcurementOrder.status)
+            .where(
+                ProcurementOrder.reference_type == "kit_reorder",
+                ProcurementOrder.reference_number.in_(references),
+            )
+            .order_by(ProcurementOrder.id.desc())
+        )
+        # Ordered newest first so the oldest linked order wins, as ``first()`` did
+        for reference_number, status in orders:
+            summaries[references[reference_number]]["order_status"] = status
+
+        message_counts = db.session.execute(
+            db.select(KitMessage.related_request_id, db.func.count())
+            .where(KitMessage.related_request_id.in_(list(summaries)))
+            .group_by(KitMessage.related_request_id)
+        )
+        for reorder_id, total in message_counts:
+            summaries[reorder_id]["message_count"] = total
+
+        return summaries
+
+    def to_dict(self, summary=None):
+        """
+        Convert model to dictionary
+
+        Args:
+            summary: Precomputed values from ``get_summaries``; looked up when omitted
+        """
+        if summary is None:
+            summary = KitReorderRequest.get_summaries([self.id])[self.id]
 
         return {
             "id": self.id,
@@ -462,7 +631,7 @@ class KitReorderRequest(db.Model):
             "requester_name": self.requester.name if self.requester else None,
             "requested_date": self.requested_date.isoformat() if self.requested_date else None,
             "status": self.status,
-            "order_status": linked_order.status if linked_order else None,
+            "order_status": summary["order_status"],
             "approved_by": self.approved_by,
             "approver_name": self.approver.name if self.approver else None,
             "approved_date": self.approved_date.isoformat() if self.approved_date else None,
@@ -470,7 +639,7 @@ class KitReorderRequest(db.Model):
             "notes": self.notes,
             "is_automatic": self.is_automatic,
             "image_path": self.image_path,
-            "message_count": self.messages.count() if self.messages else 0
+            "message_count": summary["message_count"]
         }
 
 
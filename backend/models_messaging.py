@@ -114,8 +114,31 @@ class ChannelMessage(db.Model):
     reactions = db.relationship("MessageReaction", back_populates="channel_message", cascade="all, delete-orphan")
     attachments = db.relationship("MessageAttachment", back_populates="channel_message", cascade="all, delete-orphan")
 
-    def to_dict(self, include_reactions=False, include_attachments=False):
-        """Convert model to dictionary"""
+    @classmethod
+    def get_reply_counts(cls, message_ids):
+        """Number of replies to each message, in one grouped query."""
+        counts = dict.fromkeys(message_ids, 0)
+        if counts:
+            rows = db.session.execute(
+                db.select(cls.parent_message_id, db.func.count())
+                .where(cls.parent_message_id.in_(list(counts)))
+                .group_by(cls.parent_message_id)
+            )
+            counts.update(dict(rows.all()))
+        return counts
+
+    def to_dict(self, include_reactions=False, include_attachments=False, reply_count=None):
+        """
+        Convert model to dictionary
+
+        Args:
+            include_reactions: Include the message's reactions
+            include_attachments: Include the message's attachments
+            reply_count: Pre-computed reply count from ``get_reply_counts``
+        """
+        if reply_count is None:
+            reply_count = len(self.replies) if hasattr(self, "replies") else 0
+
         data = {
             "id": self.id,
             "channel_id": self.channel_id,
@@ -127,7 +150,7 @@ class ChannelMessage(db.Model):
             "edited_date": self.edited_date.isoformat() if self.edited_date else None,
             "is_deleted": self.is_deleted,
             "parent_message_id": self.parent_message_id,
-            "reply_count": len(self.replies) if hasattr(self, "replies") else 0
+            "reply_count": reply_count
         }
 
         if include_reactions and hasattr(self, "reactions"):
@@ -193,6 +216,7 @@ class MessageAttachment(db.Model):
     original_filename = db.Column(db.String(255), nullable=False)
     file_path = db.Column(db.String(500), nullable=False)
     file_size = db.Column(db.Integer, nullable=False)  # Size in bytes
+    content_hash = db.Column(db.String(64), index=True)  # SHA-256 of file contents
     mime_type = db.Column(db.String(100), nullable=False)
     file_type = db.Column(db.String(50), nullable=False)  # image, pdf, document, spreadsheet, other
     thumbnail_path = db.Column(db.String(500))  # For image thumbnails
@@ -207,6 +231,11 @@ class MessageAttachment(db.Model):
     channel_message = db.relationship("ChannelMessage", back_populates="attachments")
     uploader = db.relationship("User", back_populates="uploaded_attachments")
     download_history = db.relationship("AttachmentDownload", back_populates="attachment", cascade="all, delete-orphan")
+    blob = db.relationship(
+        "AttachmentBlob",
+        primaryjoin="foreign(MessageAttachment.content_hash) == AttachmentBlob.content_hash",
+        viewonly=True
+    )
 
     # Constraint to ensure attachment belongs to one message type
     __table_args__ = (
@@ -226,6 +255,7 @@ class MessageAttachment(db.Model):
             "filename": self.filename,
             "original_filename": self.original_filename,
             "file_size": self.file_size,
+            "content_hash": self.content_hash,
             "mime_type": self.mime_type,
             "file_type": self.file_type,
             "thumbnail_path": self.thumbnail_path,
@@ -266,6 +296,38 @@ class AttachmentDownload(db.Model):
         }
 
 
+class AttachmentBlob(db.Model):
+    """
+    Content-addressed file stored once on disk and shared by every
+    attachment with the same SHA-256. ``ref_count`` tracks how many
+    MessageAttachment rows point at it; unreferenced blobs are removed by
+    the maintenance garbage-collection pass.
+    """
+    __tablename__ = "attachment_blobs"
+
+    content_hash = db.Column(db.String(64), primary_key=True)  # SHA-256 hex digest
+    file_size = db.Column(db.Integer, nullable=False)  # Size in bytes
+    storage_path = db.Column(db.String(500), nullable=False)
+    thumbnail_path = db.Column(db.String(500))  # Shared thumbnail for image blobs
+    ref_count = db.Column(db.Integer, default=0, nullable=False)
+    created_date = db.Column(db.DateTime, default=get_current_time, nullable=False)
+    last_released_date = db.Column(db.DateTime)  # When ref_count last dropped
+
+    __table_args__ = (
+        db.Index("ix_attachment_blobs_ref_count", "ref_count"),
+    )
+
+    def to_dict(self):
+        """Convert model to dictionary"""
+        return {
+            "content_hash": self.content_hash,
+            "file_size": self.file_size,
+            "ref_count": self.ref_count,
+            "created_date": self.created_date.isoformat() if self.created_date else None,
+            "last_released_date": self.last_released_date.isoformat() if self.last_released_date else None
+        }
+
+
 class UserPresence(db.Model):
     """
     Tracks online/offline status and typing indicators for users.
@@ -9,6 +9,7 @@ from flask import current_app, jsonify, request, session
 import utils as password_utils
 from models import (
     AuditLog,
+    AuditLogSegment,
     Checkout,
     Chemical,
     Tool,
@@ -38,16 +39,21 @@ from routes_kit_reorders import register_kit_reorder_routes
 from routes_kit_transfers import register_kit_transfer_routes
 from routes_kits import register_kit_routes
 from routes_message_search import register_message_search_routes
+from routes_metrics import register_metrics_routes
 from routes_orders import register_order_routes
 from routes_password_reset import register_password_reset_routes
 from routes_rbac import register_rbac_routes
 from routes_reports import register_report_routes
 from routes_scanner import register_scanner_routes
+from routes_scheduler import register_scheduler_routes
 from routes_security import register_security_routes
 from routes_transfers import transfers_bp
+from routes_unread import register_unread_routes
 from routes_user_requests import register_user_request_routes
 from routes_users import register_user_routes
 from routes_warehouses import warehouses_bp
+from utils.audit_writer import get_recent_audit_logs
+from utils.calibration_scheduler import calibration_scheduler
 from utils.error_handler import ValidationError, handle_errors, log_security_event
 from utils.file_validation import FileValidationError, validate_image_upload
 from utils.password_reset_security import get_password_reset_tracker
@@ -216,6 +222,7 @@ def register_routes(app):
     register_channels_routes(app)
     register_attachments_routes(app)
     register_message_search_routes(app)
+    register_unread_routes(app)
 
     # Register inventory tracking routes (lot/serial numbers, transactions)
     register_inventory_routes(app)
@@ -237,6 +244,8 @@ def register_routes(app):
 
     # Register database management routes
     register_database_routes(app)
+    register_scheduler_routes(app)
+    register_metrics_routes(app)
 
     # Add direct routes for chemicals management
     @app.route("/api/chemicals/reorder-needed", methods=["GET"])
@@ -1272,54 +1281,7 @@ def register_routes(app):
     def get_calibration_notifications():
         """Get calibration notifications for tools due for calibration."""
         try:
-            now = datetime.now()
-
-            # Get tools that require calibration
-            tools_requiring_calibration = Tool.query.filter_by(requires_calibration=True).all()
-
-            notifications = []
-
-            for tool in tools_requiring_calibration:
-                # Check calibration status
-                if tool.calibration_status == "overdue":
-                    notifications.append({
-                        "id": tool.id,
-                        "tool_number": tool.tool_number,
-                        "description": tool.description,
-                        "type": "overdue",
-                        "message": f"Tool {tool.tool_number} calibration is overdue",
-                        "priority": "high",
-                        "last_calibration_date": tool.last_calibration_date.isoformat() if tool.last_calibration_date else None,
-                        "next_calibration_date": tool.next_calibration_date.isoformat() if tool.next_calibration_date else None
-                    })
-                elif tool.calibration_status == "due_soon":
-                    # Check if due within 30 days
-                    if tool.next_calibration_date and tool.next_calibration_date <= now + timedelta(days=30):
-                        days_until_due = (tool.next_calibration_date - now).days
-                        notifications.append({
-                            "id": tool.id,
-                            "tool_number": tool.tool_number,
-                            "description": tool.description,
-                            "type": "due_soon",
-                            "message": f"Tool {tool.tool_number} calibration due in {days_until_due} days",
-                            "priority": "medium",
-                            "days_until_due": days_until_due,
-                            "last_calibration_date": tool.last_calibration_date.isoformat() if tool.last_calibration_date else None,
-                            "next_calibration_date": tool.next_calibration_date.isoformat() if tool.next_calibration_date else None
-                        })
-
-            # Sort by priority (overdue first, then by days until due)
-            notifications.sort(key=lambda x: (
-                0 if x["type"] == "overdue" else 1,
-                x.get("days_until_due", 999)
-            ))
-
-            return jsonify({
-                "notifications": notifications,
-                "count": len(notifications),
-                "overdue_count": len([n for n in notifications if n["type"] == "overdue"]),
-                "due_soon_count": len([n for n in notifications if n["type"] == "due_soon"])
-            }), 200
+            return jsonify(calibration_scheduler.get_notifications()), 200
 
         except Exception:
             logger.exception("Error getting calibration notifications")
@@ -1634,13 +1596,27 @@ def register_routes(app):
     @app.route("/api/audit", methods=["GET"])
     @admin_required
     def audit_route():
-        logs = AuditLog.query.order_by(AuditLog.timestamp.desc()).all()
-        return jsonify([{
-            "id": a.id,
-            "action_type": a.action_type,
-            "action_details": a.action_details,
-            "timestamp": a.timestamp.isoformat()
-        } for a in logs])
+        days = request.args.get("days", type=int)
+        limit = request.args.get("limit", type=int)
+        action_type = request.args.get("action_type")
+
+        if days is None:
+            # No window requested: every row, newest first, as this endpoint always returned
+            query = AuditLog.query
+            if action_type:
+                query = query.filter(AuditLog.action_type == action_type)
+            query = query.order_by(AuditLog.timestamp.desc())
+            if limit is not None:
+                query = query.limit(min(limit, 5000))
+            return jsonify([a.to_dict() for a in query.all()])
+
+        # Serve the requested window from the timestamp index instead of the whole table
+        logs = get_recent_audit_logs(
+            days=days,
+            limit=min(limit or 1000, 5000),
+            action_type=action_type
+        )
+        return jsonify([a.to_dict() for a in logs])
 
     @app.route("/api/audit/logs", methods=["GET"])
     def audit_logs_route():
@@ -1651,15 +1627,30 @@ def register_routes(app):
         # Calculate offset
         offset = (page - 1) * limit
 
-        # Get logs with pagination
-        logs = AuditLog.query.order_by(AuditLog.timestamp.desc()).offset(offset).limit(limit).all()
+        # Get logs with pagination, optionally filtered by action type
+        query = AuditLog.query
+        action_type = request.args.get("action_type")
+        if action_type:
+            query = query.filter(AuditLog.action_type == action_type)
+        logs = query.order_by(AuditLog.timestamp.desc()).offset(offset).limit(limit).all()
 
-        return jsonify([{
-            "id": a.id,
-            "action_type": a.action_type,
-            "action_details": a.action_details,
-            "timestamp": a.timestamp.isoformat()
-        } for a in logs])
+        return jsonify([a.to_dict() for a in logs])
+
+    @app.route("/api/audit/archive", methods=["GET"])
+    @admin_required
+    def audit_archive_route():
+        """List compressed audit log archive segments, newest first"""
+        segments = AuditLogSegment.query.order_by(AuditLogSegment.period_start.desc()).all()
+        return jsonify([segment.to_dict() for segment in segments])
+
+    @app.route("/api/audit/archive/<int:segment_id>", methods=["GET"])
+    @admin_required
+    def audit_archive_segment_route(segment_id):
+        """Return the decompressed rows of one archive segment"""
+        segment = db.session.get(AuditLogSegment, segment_id)
+        if segment is None:
+            return jsonify({"error": "Archive segment not found"}), 404
+        return jsonify({**segment.to_dict(), "logs": segment.read_rows()})
 
     @app.route("/api/audit/metrics", methods=["GET"])
     def audit_metrics_route():
@@ -1677,29 +1668,17 @@ def register_routes(app):
         else:
             start_date = now - timedelta(weeks=1)  # Default to week
 
-        # Get counts for different action types
-        checkout_count = AuditLog.query.filter(
-            AuditLog.action_type == "checkout_tool",
-            AuditLog.timestamp >= start_date
-        ).count()
-
-        return_count = AuditLog.query.filter(
-            AuditLog.action_type == "return_tool",
-            AuditLog.timestamp >= start_date
-        ).count()
-
-        login_count = AuditLog.query.filter(
-            AuditLog.action_type == "user_login",
-            AuditLog.timestamp >= start_date
-        ).count()
+        from sqlalchemy import func
 
-        # Get total activity count
-        total_activity = AuditLog.query.filter(
+        # Count every action type in one pass over the (action_type, timestamp) index
+        action_counts = dict(db.session.query(
+            AuditLog.action_type,
+            func.count()
+        ).filter(
             AuditLog.timestamp >= start_date
-        ).count()
-
-        # Get recent activity by day
-        from sqlalchemy import func
+        ).group_by(
+            AuditLog.action_type
+        ).all())
 
         # This query gets counts by day
         daily_activity = db.session.query(
@@ -1719,10 +1698,10 @@ def register_routes(app):
 
         return jsonify({
             "timeframe": timeframe,
-            "total_activity": total_activity,
-            "checkouts": checkout_count,
-            "returns": return_count,
-            "logins": login_count,
+            "total_activity": sum(action_counts.values()),
+            "checkouts": action_counts.get("checkout_tool", 0),
+            "returns": action_counts.get("return_tool", 0),
+            "logins": action_counts.get("user_login", 0),
             "daily_activity": daily_data
         })
 
@@ -1761,12 +1740,7 @@ def register_routes(app):
             AuditLog.timestamp.desc()
         ).offset(offset).limit(limit).all()
 
-        return jsonify([{
-            "id": a.id,
-            "action_type": a.action_type,
-            "action_details": a.action_details,
-            "timestamp": a.timestamp.isoformat()
-        } for a in logs])
+        return jsonify([a.to_dict() for a in logs])
 
     # JWT-based login route is now handled by routes_auth.py
 
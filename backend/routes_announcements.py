@@ -1,10 +1,12 @@
 import logging
-from datetime import UTC, datetime
+from datetime import datetime
 
 from flask import jsonify, request
+from sqlalchemy.orm import joinedload
 
 from auth import JWTManager, admin_required, jwt_required
 from models import Announcement, AnnouncementRead, AuditLog, UserActivity, db
+from utils.announcement_cache import announcement_cache
 
 
 logger = logging.getLogger(__name__)
@@ -26,53 +28,57 @@ def register_announcement_routes(app):
             priority = request.args.get("priority")
             active_only = request.args.get("active_only", "true").lower() == "true"
 
-            # Start with base query
-            query = Announcement.query
-
-            # Apply filters if provided
-            if priority:
-                query = query.filter(Announcement.priority == priority)
-
-            if active_only:
-                # Only show active announcements that haven't expired
-                now = datetime.now(UTC)
-                query = query.filter(Announcement.is_active.is_(True))
-                query = query.filter((Announcement.expiration_date.is_(None)) | (Announcement.expiration_date > now))
-
-            # Order by created_at (newest first)
-            query = query.order_by(Announcement.created_at.desc())
-
-            # Get total count for pagination
-            total = query.count()
-
-            # Apply pagination
-            announcements = query.offset(offset).limit(limit).all()
-
             # Check if user is logged in via JWT to determine read status
             current_user = JWTManager.get_current_user()
             user_id = current_user["user_id"] if current_user else None
 
-            read_map = {}
-            if user_id:
-                read_map = {
-                    r.announcement_id: r for r in
-                    AnnouncementRead.query
-                        .filter_by(user_id=user_id)
-                        .filter(AnnouncementRead.announcement_id.in_([a.id for a in announcements]))
-                        .all()
-                }
-
-            result = []
-            for announcement in announcements:
-                announcement_dict = announcement.to_dict()
-
-                if user_id:
-                    read = read_map.get(announcement.id)
-                    announcement_dict["read"] = read is not None
-                    if read:
-                        announcement_dict["read_at"] = read.read_at.isoformat()
-
-                result.append(announcement_dict)
+            if active_only:
+                # The active set is cached with its read bitmaps, so no queries are needed
+                active = announcement_cache.get_active()
+                matching = [a for a in active.announcements if not priority or a["priority"] == priority]
+                total = len(matching)
+
+                result = []
+                for cached in matching[offset:offset + limit]:
+                    announcement_dict = dict(cached)
+                    if user_id:
+                        announcement_dict["read"] = active.is_read(cached["id"], user_id)
+                    result.append(announcement_dict)
+            else:
+                query = Announcement.query.options(joinedload(Announcement.author))
+                if priority:
+                    query = query.filter(Announcement.priority == priority)
+
+                # Order by created_at (newest first)
+                query = query.order_by(Announcement.created_at.desc())
+
+                # Get total count for pagination
+                total = query.count()
+
+                # Apply pagination
+                announcements = query.offset(offset).limit(limit).all()
+
+                read_map = {}
+                if user_id and announcements:
+                    read_map = {
+                        r.announcement_id: r for r in
+                        AnnouncementRead.query
+                            .filter_by(user_id=user_id)
+                            .filter(AnnouncementRead.announcement_id.in_([a.id for a in announcements]))
+                            .all()
+                    }
+
+                result = []
+                for announcement in announcements:
+                    announcement_dict = announcement.to_dict()
+
+                    if user_id:
+                        read = read_map.get(announcement.id)
+                        announcement_dict["read"] = read is not None
+                        if read:
+                            announcement_dict["read_at"] = read.read_at.isoformat()
+
+                    result.append(announcement_dict)
 
             return jsonify({
                 "announcements": result,
@@ -289,28 +295,47 @@ def register_announcement_routes(app):
             # Get the announcement
             Announcement.query.get_or_404(id)
 
-            # Check if already read
-            existing_read = AnnouncementRead.query.filter_by(
-                announcement_id=id,
-                user_id=request.current_user["user_id"]
-            ).first()
-
-            if existing_read:
+            if not announcement_cache.mark_read(request.current_user["user_id"], [id]):
                 # Already marked as read
                 return jsonify({"message": "Announcement already marked as read"}), 200
 
-            # Create new read record
-            read = AnnouncementRead(
-                announcement_id=id,
-                user_id=request.current_user["user_id"]
-            )
-
-            db.session.add(read)
-            db.session.commit()
-
             return jsonify({"message": "Announcement marked as read"}), 200
 
         except Exception as e:
             db.session.rollback()
             print(f"Error marking announcement as read: {e!s}")
             return jsonify({"error": f"An error occurred: {e!s}"}), 500
+
+    # Mark several announcements as read in one write
+    @app.route("/api/announcements/read", methods=["POST"])
+    @jwt_required
+    def mark_announcements_read():
+        try:
+            data = request.get_json(silent=True) or {}
+            announcement_ids = data.get("announcement_ids")
+
+            if announcement_ids is None:
+                # No IDs means every active announcement
+                announcement_ids = list(announcement_cache.get_active().ids)
+            elif not isinstance(announcement_ids, list) or not all(
+                isinstance(announcement_id, int) and not isinstance(announcement_id, bool)
+                for announcement_id in announcement_ids
+            ):
+                return jsonify({"error": "announcement_ids must be a list of announcement IDs"}), 400
+
+            known = announcement_cache.get_active().ids
+            unknown = set(announcement_ids) - known
+            if unknown:
+                existing = {row[0] for row in db.session.query(Announcement.id).filter(Announcement.id.in_(unknown))}
+                missing = sorted(unknown - existing)
+                if missing:
+                    return jsonify({"error": "Announcements not found", "announcement_ids": missing}), 404
+
+            marked = announcement_cache.mark_read(request.current_user["user_id"], announcement_ids)
+
+            return jsonify({"marked_read": marked, "count": len(marked)}), 200
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error marking announcements as read: {e!s}")
+            return jsonify({"error": f"An error occurred: {e!s}"}), 500
@@ -6,15 +6,16 @@ import os
 import secrets
 from datetime import UTC, datetime
 
-from flask import Blueprint, jsonify, request, send_file
-from PIL import Image
+from flask import Blueprint, current_app, jsonify, request, send_file
 from werkzeug.utils import secure_filename
 
 from auth import jwt_required
 from auth.jwt_manager import JWTManager
 from models import db
 from models_kits import KitMessage
-from models_messaging import AttachmentDownload, MessageAttachment
+from models_messaging import MessageAttachment
+from utils.attachment_storage import THUMBNAILS_FOLDER, UPLOAD_FOLDER, blob_store, stream_upload_to_disk
+from utils.attachment_tasks import create_thumbnail, get_download_tracker, get_thumbnail_pool
 from utils.file_validation import FileValidationError, get_file_type, scan_file_for_malware, validate_file_upload
 
 
@@ -22,10 +23,7 @@ logger = logging.getLogger(__name__)
 
 attachments_bp = Blueprint("attachments", __name__, url_prefix="/api/attachments")
 
-# Configuration
-# nosec B108: /tmp is a safe fallback for development; production should set ATTACHMENTS_FOLDER env var
-UPLOAD_FOLDER = os.environ.get("ATTACHMENTS_FOLDER", "/tmp/supplyline_attachments")  # nosec B108
-THUMBNAILS_FOLDER = os.path.join(UPLOAD_FOLDER, "thumbnails")
+# Configuration (UPLOAD_FOLDER and THUMBNAILS_FOLDER come from utils.attachment_storage)
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 ALLOWED_EXTENSIONS = {
     "images": {"png", "jpg", "jpeg", "gif", "bmp", "webp"},
@@ -33,7 +31,6 @@ ALLOWED_EXTENSIONS = {
     "spreadsheets": {"xls", "xlsx", "csv", "ods"},
     "archives": {"zip", "tar", "gz", "7z"},
 }
-THUMBNAIL_SIZE = (300, 300)
 
 # Ensure upload directories exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -66,32 +63,76 @@ def generate_unique_filename(original_filename):
     return f"{timestamp}_{unique_id}.{ext}" if ext else f"{timestamp}_{unique_id}"
 
 
-def create_thumbnail(image_path, thumbnail_path):
+def queue_thumbnail(attachment_id, image_path, content_hash):
     """
-    Create a thumbnail for an image.
-    Returns True if successful, False otherwise.
+    Generate the shared thumbnail for an image blob.
+    Uses the background worker pool when available, otherwise runs inline.
     """
-    try:
-        with Image.open(image_path) as original_img:
-            # Convert RGBA to RGB if necessary
-            if original_img.mode in ("RGBA", "LA", "P"):
-                background = Image.new("RGB", original_img.size, (255, 255, 255))
-                if original_img.mode == "P":
-                    converted_img = original_img.convert("RGBA")
-                else:
-                    converted_img = original_img
-                background.paste(converted_img, mask=converted_img.split()[-1] if converted_img.mode == "RGBA" else None)
-                thumbnail_img = background
-            else:
-                thumbnail_img = original_img.copy()
-
-            # Create thumbnail
-            thumbnail_img.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
-            thumbnail_img.save(thumbnail_path, "JPEG", quality=85, optimize=True)
-            return True
-    except Exception as e:
-        logger.error(f"Error creating thumbnail: {e!s}", exc_info=True)
-        return False
+    thumbnail_filename = f"{content_hash}.jpg"
+    thumbnail_path = os.path.join(THUMBNAILS_FOLDER, thumbnail_filename)
+    relative_path = f"thumbnails/{thumbnail_filename}"
+
+    pool = get_thumbnail_pool()
+    if pool is not None:
+        pool.submit(attachment_id, image_path, thumbnail_path, relative_path, content_hash)
+        return
+
+    if create_thumbnail(image_path, thumbnail_path):
+        from models_messaging import AttachmentBlob
+        AttachmentBlob.query.filter_by(content_hash=content_hash).update({"thumbnail_path": relative_path})
+        MessageAttachment.query.filter_by(id=attachment_id).update({"thumbnail_path": relative_path})
+        db.session.commit()
+
+
+def track_download(attachment, user_id):
+    """
+    Record an attachment download.
+    Downloads are batched by the background tracker; requests for a later
+    byte range of the same file are not counted as new downloads.
+    """
+    byte_range = request.range
+    if byte_range and byte_range.ranges and byte_range.ranges[0][0] not in (0, None):
+        return
+
+    tracker = get_download_tracker()
+    if tracker is not None:
+        tracker.record(attachment.id, user_id, request.remote_addr)
+        return
+
+    from models_messaging import AttachmentDownload
+    db.session.add(AttachmentDownload(
+        attachment_id=attachment.id,
+        user_id=user_id,
+        ip_address=request.remote_addr
+    ))
+    attachment.download_count += 1
+    db.session.commit()
+
+
+def send_attachment_file(attachment):
+    """
+    Stream an attachment to the client.
+
+    Supports HTTP Range requests (via Werkzeug conditional responses) and
+    offloading the transfer to the fronting web server, either through
+    ``X-Sendfile`` (``USE_X_SENDFILE``) or nginx ``X-Accel-Redirect``
+    (``ATTACHMENTS_X_ACCEL_PREFIX``).
+    """
+    accel_prefix = current_app.config.get("ATTACHMENTS_X_ACCEL_PREFIX")
+    if accel_prefix:
+        response = current_app.response_class(mimetype=attachment.mime_type)
+        relative_path = os.path.relpath(attachment.file_path, UPLOAD_FOLDER).replace(os.sep, "/")
+        response.headers["X-Accel-Redirect"] = f"{accel_prefix.rstrip('/')}/{relative_path}"
+        response.headers.set("Content-Disposition", "attachment", filename=attachment.original_filename)
+        return response
+
+    return send_file(
+        attachment.file_path,
+        as_attachment=True,
+        download_name=attachment.original_filename,
+        mimetype=attachment.mime_type,
+        conditional=True
+    )
 
 
 @attachments_bp.route("/upload", methods=["POST"])
@@ -128,28 +169,23 @@ def upload_attachment():
         if not allowed_file(file.filename):
             return jsonify({"error": "File type not allowed"}), 400
 
-        # Check file size
-        file.seek(0, os.SEEK_END)
-        file_size = file.tell()
-        file.seek(0)
-
-        if file_size > MAX_FILE_SIZE:
-            return jsonify({"error": f"File too large. Maximum size: {MAX_FILE_SIZE // (1024*1024)}MB"}), 400
-
-        # Generate unique filename
+        # Generate unique filename (the staged upload keeps its extension for type detection)
         original_filename = secure_filename(file.filename)
         unique_filename = generate_unique_filename(original_filename)
         file_path = os.path.join(UPLOAD_FOLDER, unique_filename)
 
-        # Save file
-        file.save(file_path)
+        # Stream file to disk in chunks, enforcing the size limit and hashing as we go
+        try:
+            file_size, content_hash = stream_upload_to_disk(file, file_path, MAX_FILE_SIZE)
+        except FileValidationError as e:
+            return jsonify({"error": str(e)}), e.status_code
 
         # Validate file content (magic bytes, MIME type)
         try:
             validate_file_upload(file_path, max_size=MAX_FILE_SIZE)
         except FileValidationError as e:
             os.remove(file_path)
-            return jsonify({"error": str(e)}), 400
+            return jsonify({"error": str(e)}), e.status_code
 
         # Determine file type
         file_type = get_file_type(file_path)
@@ -160,16 +196,6 @@ def upload_attachment():
         if not mime_type:
             mime_type = "application/octet-stream"
 
-        # Create thumbnail for images
-        thumbnail_path = None
-        if file_type == "image":
-            thumbnail_filename = f"thumb_{unique_filename}"
-            thumbnail_path = os.path.join(THUMBNAILS_FOLDER, thumbnail_filename)
-            if create_thumbnail(file_path, thumbnail_path):
-                thumbnail_path = f"thumbnails/{thumbnail_filename}"
-            else:
-                thumbnail_path = None
-
         # Scan file for malware (basic check)
         is_scanned = False
         scan_result = "not_scanned"
@@ -181,8 +207,6 @@ def upload_attachment():
         except FileValidationError as e:
             # File failed malware scan - reject it
             os.remove(file_path)
-            if thumbnail_path and os.path.exists(os.path.join(THUMBNAILS_FOLDER, os.path.basename(thumbnail_path))):
-                os.remove(os.path.join(THUMBNAILS_FOLDER, os.path.basename(thumbnail_path)))
             logger.warning(f"File failed malware scan: {e!s}")
             return jsonify({"error": f"File rejected by security scan: {e!s}"}), 400
         except Exception as e:
@@ -190,17 +214,21 @@ def upload_attachment():
             logger.error(f"Malware scan error: {e!s}", exc_info=True)
             scan_result = "scan_error"
 
+        # Move the file into the content-addressed store (or reference an identical copy)
+        blob = blob_store.store(file_path, content_hash, file_size)
+
         # Create attachment record
         attachment = MessageAttachment(
             kit_message_id=int(message_id) if message_type == "kit" and message_id else None,
             channel_message_id=int(message_id) if message_type == "channel" and message_id else None,
             filename=unique_filename,
             original_filename=original_filename,
-            file_path=file_path,
+            file_path=blob.storage_path,
             file_size=file_size,
+            content_hash=content_hash,
             mime_type=mime_type,
             file_type=file_type,
-            thumbnail_path=thumbnail_path,
+            thumbnail_path=blob.thumbnail_path,
             uploaded_by=current_user_id,
             is_scanned=is_scanned,
             scan_result=scan_result
@@ -208,9 +236,13 @@ def upload_attachment():
         db.session.add(attachment)
         db.session.commit()
 
+        # Create thumbnail for images off the request thread (once per distinct file)
+        if file_type == "image" and not blob.thumbnail_path:
+            queue_thumbnail(attachment.id, blob.storage_path, content_hash)
+
         logger.info("File uploaded successfully", extra={
             "attachment_id": attachment.id,
-            "filename": original_filename,
+            "original_filename": original_filename,
             "file_type": file_type,
             "file_size": file_size,
             "uploaded_by": current_user_id
@@ -232,7 +264,7 @@ def upload_attachment():
 def download_attachment(attachment_id):
     """
     Download an attachment file.
-    Tracks download in the database.
+    Supports HTTP Range requests; downloads are tracked asynchronously.
     """
     try:
         user_payload = JWTManager.get_current_user()
@@ -271,30 +303,15 @@ def download_attachment(attachment_id):
             })
             return jsonify({"error": "File not found on server"}), 404
 
-        # Track download
-        download_record = AttachmentDownload(
-            attachment_id=attachment_id,
-            user_id=current_user_id,
-            ip_address=request.remote_addr
-        )
-        db.session.add(download_record)
-
-        # Increment download count
-        attachment.download_count += 1
-        db.session.commit()
+        # Track download (batched and written asynchronously)
+        track_download(attachment, current_user_id)
 
         logger.info("Attachment downloaded", extra={
             "attachment_id": attachment_id,
-            "user_id": current_user_id,
-            "download_count": attachment.download_count
+            "user_id": current_user_id
         })
 
-        return send_file(
-            attachment.file_path,
-            as_attachment=True,
-            download_name=attachment.original_filename,
-            mimetype=attachment.mime_type
-        )
+        return send_attachment_file(attachment)
 
     except Exception as e:
         logger.error(f"Error downloading attachment: {e!s}", exc_info=True)
@@ -380,16 +397,20 @@ def delete_attachment(attachment_id):
         if not (is_uploader or is_message_sender):
             return jsonify({"error": "Permission denied"}), 403
 
-        # Delete files from disk
-        try:
-            if os.path.exists(attachment.file_path):
-                os.remove(attachment.file_path)
-            if attachment.thumbnail_path:
-                thumbnail_full_path = os.path.join(UPLOAD_FOLDER, attachment.thumbnail_path)
-                if os.path.exists(thumbnail_full_path):
-                    os.remove(thumbnail_full_path)
-        except Exception as e:
-            logger.warning(f"Error deleting files from disk: {e!s}")
+        if attachment.blob is not None:
+            # Shared blob: drop the reference; maintenance garbage-collects unreferenced files
+            blob_store.release(attachment.content_hash)
+        else:
+            # Legacy attachment stored outside the blob store
+            try:
+                if os.path.exists(attachment.file_path):
+                    os.remove(attachment.file_path)
+                if attachment.thumbnail_path:
+                    thumbnail_full_path = os.path.join(UPLOAD_FOLDER, attachment.thumbnail_path)
+                    if os.path.exists(thumbnail_full_path):
+                        os.remove(thumbnail_full_path)
+            except Exception as e:
+                logger.warning(f"Error deleting files from disk: {e!s}")
 
         # Delete database record
         db.session.delete(attachment)
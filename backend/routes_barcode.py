@@ -12,6 +12,11 @@ from sqlalchemy.orm import joinedload
 
 from auth.jwt_manager import jwt_required
 from models import Chemical, Expendable, Tool
+from utils.barcode_service import (
+    THERMAL_PRINTER_DPI,
+    generate_barcode_png_for_label,
+    generate_qr_code_png_for_label,
+)
 from utils.label_pdf_service import (
     generate_chemical_label_pdf,
     generate_expendable_label_pdf,
@@ -243,6 +248,58 @@ def generate_kit_item_barcode_label(kit_id, item_id):
         return jsonify({"error": str(e)}), 500
 
 
+@barcode_bp.route("/api/barcode/raster", methods=["GET"])
+@jwt_required
+def generate_raster_code():
+    """
+    Generate a compact 1-bit PNG barcode or QR code for thermal printers.
+
+    Query Parameters:
+        - data: Data to encode - required
+        - label_size: Label size (4x6, 3x4, 2x4, 2x2) - default: 4x6
+        - code_type: Code type (barcode, qrcode) - default: barcode
+        - barcode_type: 1D symbology (CODE128, CODE39, EAN13, EAN8, UPCA) - default: CODE128
+        - dpi: Printer resolution for 1D barcodes - default: 203
+
+    Returns:
+        PNG image
+    """
+    data = request.args.get("data", "")
+    label_size = request.args.get("label_size", "4x6")
+    code_type = request.args.get("code_type", "barcode")
+    barcode_type = request.args.get("barcode_type", "CODE128").upper()
+    dpi = request.args.get("dpi", THERMAL_PRINTER_DPI, type=int)
+
+    # Validate parameters
+    if not data:
+        return jsonify({"error": "data parameter is required"}), 400
+    if label_size not in ["4x6", "3x4", "2x4", "2x2"]:
+        return jsonify({"error": "Invalid label size"}), 400
+    if code_type not in ["barcode", "qrcode"]:
+        return jsonify({"error": "Invalid code type"}), 400
+    if barcode_type not in ["CODE128", "CODE39", "EAN13", "EAN8", "UPCA"]:
+        return jsonify({"error": "Invalid barcode type"}), 400
+    if dpi is None or not 100 <= dpi <= 600:
+        return jsonify({"error": "dpi must be between 100 and 600"}), 400
+
+    try:
+        if code_type == "qrcode":
+            png_bytes = generate_qr_code_png_for_label(data, label_size)
+        else:
+            png_bytes = generate_barcode_png_for_label(data, label_size, barcode_type, dpi)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    return send_file(
+        io.BytesIO(png_bytes),
+        mimetype="image/png",
+        as_attachment=False,
+        download_name=f"{code_type}-{label_size}.png",
+    )
+
+
 @barcode_bp.route("/api/barcode/label-sizes", methods=["GET"])
 @jwt_required
 def get_label_sizes():
@@ -5,17 +5,43 @@ import logging
 from datetime import datetime
 
 from flask import Blueprint, jsonify, request
+from sqlalchemy.orm import joinedload, selectinload
 
 from auth import jwt_required
 from auth.jwt_manager import JWTManager
 from models import db
-from models_messaging import Channel, ChannelMember, ChannelMessage
+from models_messaging import Channel, ChannelMember, ChannelMessage, MessageAttachment, MessageReaction
+from utils.read_markers import mark_channel_read
 
 
 logger = logging.getLogger(__name__)
 
 channels_bp = Blueprint("channels", __name__, url_prefix="/api/channels")
 
+# Largest page the message feed serves
+MAX_FEED_LIMIT = 200
+
+
+def _channel_messages_query(channel_id):
+    """Visible messages of a channel with senders, reactions and attachments eager-loaded."""
+    return ChannelMessage.query.filter_by(
+        channel_id=channel_id,
+        is_deleted=False
+    ).options(
+        joinedload(ChannelMessage.sender),
+        selectinload(ChannelMessage.reactions).joinedload(MessageReaction.user),
+        selectinload(ChannelMessage.attachments).joinedload(MessageAttachment.uploader),
+    )
+
+
+def _serialize_messages(messages):
+    """Serialize messages with reply counts from one grouped query."""
+    reply_counts = ChannelMessage.get_reply_counts([m.id for m in messages])
+    return [
+        m.to_dict(include_reactions=True, include_attachments=True, reply_count=reply_counts[m.id])
+        for m in messages
+    ]
+
 
 @channels_bp.route("", methods=["GET"])
 @jwt_required
@@ -431,10 +457,7 @@ def get_channel_messages(channel_id):
         offset = int(request.args.get("offset", 0))
         since = request.args.get("since")
 
-        query = ChannelMessage.query.filter_by(
-            channel_id=channel_id,
-            is_deleted=False
-        )
+        query = _channel_messages_query(channel_id)
 
         if since:
             try:
@@ -449,11 +472,11 @@ def get_channel_messages(channel_id):
 
         # Update last read message for user
         if messages:
-            membership.last_read_message_id = messages[0].id
-            db.session.commit()
+            if mark_channel_read(membership, max(m.id for m in messages)):
+                db.session.commit()
 
         return jsonify({
-            "messages": [m.to_dict(include_reactions=True, include_attachments=True) for m in reversed(messages)],
+            "messages": _serialize_messages(list(reversed(messages))),
             "count": len(messages),
             "offset": offset,
             "limit": limit
@@ -464,6 +487,72 @@ def get_channel_messages(channel_id):
         return jsonify({"error": "Failed to fetch messages"}), 500
 
 
+@channels_bp.route("/<int:channel_id>/feed", methods=["GET"])
+@jwt_required
+def get_channel_feed(channel_id):
+    """
+    Get a page of channel messages by message ID cursor.
+    Query params:
+    - limit: Number of messages to return (default 50, max 200)
+    - before_id: Return the messages just older than this message ID
+    - after_id: Return the messages just newer than this message ID (for polling)
+
+    Without a cursor the newest messages are returned. Messages are always
+    returned oldest first.
+    """
+    try:
+        user_payload = JWTManager.get_current_user()
+        current_user_id = user_payload["user_id"]
+
+        membership = ChannelMember.query.filter_by(
+            channel_id=channel_id,
+            user_id=current_user_id
+        ).first()
+
+        if not membership:
+            return jsonify({"error": "Access denied"}), 403
+
+        try:
+            limit = int(request.args.get("limit", 50))
+            before_id = request.args.get("before_id", type=int)
+            after_id = request.args.get("after_id", type=int)
+        except ValueError:
+            return jsonify({"error": "Invalid limit"}), 400
+
+        if limit < 1 or limit > MAX_FEED_LIMIT:
+            return jsonify({"error": f"limit must be between 1 and {MAX_FEED_LIMIT}"}), 400
+        if before_id and after_id:
+            return jsonify({"error": "Use either before_id or after_id, not both"}), 400
+
+        query = _channel_messages_query(channel_id)
+        if after_id:
+            query = query.filter(ChannelMessage.id > after_id).order_by(ChannelMessage.id.asc())
+        else:
+            if before_id:
+                query = query.filter(ChannelMessage.id < before_id)
+            query = query.order_by(ChannelMessage.id.desc())
+
+        messages = query.limit(limit + 1).all()
+        has_more = len(messages) > limit
+        messages = sorted(messages[:limit], key=lambda m: m.id)
+
+        if messages:
+            if mark_channel_read(membership, messages[-1].id):
+                db.session.commit()
+
+        return jsonify({
+            "messages": _serialize_messages(messages),
+            "count": len(messages),
+            "has_more": has_more,
+            "oldest_id": messages[0].id if messages else None,
+            "newest_id": messages[-1].id if messages else None
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Error fetching channel feed: {e!s}", exc_info=True)
+        return jsonify({"error": "Failed to fetch messages"}), 500
+
+
 @channels_bp.route("/<int:channel_id>/messages/<int:message_id>", methods=["DELETE"])
 @jwt_required
 def delete_channel_message(channel_id, message_id):
@@ -14,11 +14,18 @@ from flask import jsonify, request
 from auth import jwt_required
 from models import LotNumberSequence, db
 from utils.error_handler import ValidationError, handle_errors
-from utils.transaction_helper import get_item_detail_with_transactions, get_item_transactions
+from utils.transaction_helper import (
+    get_item_detail_with_transactions,
+    get_item_transactions,
+    record_transactions_bulk,
+)
 
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of transactions accepted by the batch endpoint
+MAX_BATCH_TRANSACTIONS = 5000
+
 
 def register_inventory_routes(app):
     """Register all inventory-related routes"""
@@ -196,7 +203,10 @@ def register_inventory_routes(app):
     def create_batch_transactions():
         """
         Create multiple transaction records in a single request.
-        Useful for bulk operations.
+        Useful for bulk operations such as cycle counts and receiving.
+
+        Lot/serial numbers are resolved with one query per item type and all
+        rows are inserted in bulk, so batches of thousands are cheap.
 
         Request body:
             {
@@ -218,8 +228,6 @@ def register_inventory_routes(app):
                 "message": "Successfully created 5 transactions"
             }
         """
-        from utils.transaction_helper import record_transaction
-
         data = request.get_json()
         if not data or "transactions" not in data:
             raise ValidationError('Request must include "transactions" array')
@@ -231,37 +239,31 @@ def register_inventory_routes(app):
         if len(transactions_data) == 0:
             raise ValidationError("At least one transaction is required")
 
-        if len(transactions_data) > 100:
-            raise ValidationError("Maximum 100 transactions per batch")
+        if len(transactions_data) > MAX_BATCH_TRANSACTIONS:
+            raise ValidationError(f"Maximum {MAX_BATCH_TRANSACTIONS} transactions per batch")
+
+        # Validate required fields before writing anything
+        required_fields = ["item_type", "item_id", "transaction_type"]
+        for trans_data in transactions_data:
+            if not isinstance(trans_data, dict):
+                raise ValidationError("Each transaction must be an object")
+            for field in required_fields:
+                if field not in trans_data:
+                    raise ValidationError(f"Transaction missing required field: {field}")
+            # JSON clients may send ids as strings; lot/serial lookup is keyed by int
+            item_id = trans_data["item_id"]
+            if isinstance(item_id, bool) or not isinstance(item_id, (int, str)):
+                raise ValidationError("Transaction item_id must be an integer")
+            try:
+                trans_data["item_id"] = int(item_id)
+            except ValueError:
+                raise ValidationError("Transaction item_id must be an integer") from None
 
         # Get current user
         user_id = request.current_user["user_id"]
 
-        created_count = 0
         try:
-            for trans_data in transactions_data:
-                # Validate required fields
-                required_fields = ["item_type", "item_id", "transaction_type"]
-                for field in required_fields:
-                    if field not in trans_data:
-                        raise ValidationError(f"Transaction missing required field: {field}")
-
-                # Create transaction
-                record_transaction(
-                    item_type=trans_data["item_type"],
-                    item_id=trans_data["item_id"],
-                    transaction_type=trans_data["transaction_type"],
-                    user_id=user_id,
-                    quantity_change=trans_data.get("quantity_change"),
-                    location_from=trans_data.get("location_from"),
-                    location_to=trans_data.get("location_to"),
-                    reference_number=trans_data.get("reference_number"),
-                    notes=trans_data.get("notes"),
-                    lot_number=trans_data.get("lot_number"),
-                    serial_number=trans_data.get("serial_number")
-                )
-                created_count += 1
-
+            created_count = record_transactions_bulk(transactions_data, user_id)
             db.session.commit()
 
             logger.info(f"Created {created_count} transactions in batch")
@@ -9,6 +9,7 @@ import os
 from datetime import datetime
 
 from flask import current_app, jsonify, request
+from sqlalchemy.orm import joinedload
 
 from auth import department_required, jwt_required
 from models import AuditLog, ProcurementOrder, db
@@ -138,12 +139,17 @@ def register_kit_reorder_routes(app):
         if is_automatic is not None:
             query = query.filter_by(is_automatic=is_automatic.lower() == "true")
 
-        reorders = query.order_by(
+        reorders = query.options(
+            joinedload(KitReorderRequest.kit),
+            joinedload(KitReorderRequest.requester),
+            joinedload(KitReorderRequest.approver),
+        ).order_by(
             KitReorderRequest.priority.desc(),
             KitReorderRequest.requested_date.desc()
         ).all()
+        summaries = KitReorderRequest.get_summaries([reorder.id for reorder in reorders])
 
-        return jsonify([reorder.to_dict() for reorder in reorders]), 200
+        return jsonify([reorder.to_dict(summary=summaries[reorder.id]) for reorder in reorders]), 200
 
     @app.route("/api/reorder-requests/<int:id>", methods=["GET"])
     @jwt_required
@@ -8,6 +8,7 @@ import logging
 from datetime import datetime
 
 from flask import jsonify, request
+from sqlalchemy.orm import joinedload
 
 from auth import department_required, jwt_required
 from models import AuditLog, Chemical, Tool, Warehouse, db
@@ -492,9 +493,12 @@ def register_kit_transfer_routes(app):
             if to_kit_id:
                 query = query.filter_by(to_location_type="kit", to_location_id=to_kit_id)
 
-        transfers = query.order_by(KitTransfer.transfer_date.desc()).all()
+        transfers = query.options(
+            joinedload(KitTransfer.transferrer)
+        ).order_by(KitTransfer.transfer_date.desc()).all()
+        related = KitTransfer.get_related(transfers)
 
-        return jsonify([transfer.to_dict() for transfer in transfers]), 200
+        return jsonify([transfer.to_dict(related=related) for transfer in transfers]), 200
 
     @app.route("/api/transfers/<int:id>", methods=["GET"])
     @jwt_required
@@ -5,15 +5,17 @@ This module provides API endpoints for managing kits, aircraft types, boxes, and
 """
 
 import logging
-from datetime import datetime, timedelta
 
 from flask import jsonify, request
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, func, literal, or_, select, union_all
+from sqlalchemy.orm import joinedload
 
 from auth import admin_required, department_required, jwt_required
-from models import AuditLog, Chemical, Tool, Warehouse, WarehouseTransfer, db
+from models import AuditLog, Chemical, Expendable, Tool, Warehouse, WarehouseTransfer, db
 from models_kits import AircraftType, Kit, KitBox, KitExpendable, KitIssuance, KitItem, KitReorderRequest, KitTransfer
 from utils.error_handler import ValidationError, handle_errors
+from utils.kit_analytics import kit_analytics
+from utils.kit_templates import MAX_CLONES_PER_CALL, clone_kit, create_kit_boxes
 
 
 logger = logging.getLogger(__name__)
@@ -22,6 +24,35 @@ logger = logging.getLogger(__name__)
 materials_required = department_required("Materials")
 
 
+def _kit_item_expendable_dict(kit_item, expendable):
+    """Merge a KitItem with its Expendable record into the kit expendable shape."""
+    return {
+        "id": kit_item.id,  # Use KitItem.id for frontend operations
+        "kit_item_id": kit_item.id,  # Explicit KitItem ID
+        "expendable_id": expendable.id,  # Explicit Expendable ID
+        "item_id": expendable.id,  # For frontend compatibility (same as expendable_id)
+        "kit_id": kit_item.kit_id,
+        "box_id": kit_item.box_id,
+        "box_number": kit_item.box.box_number if kit_item.box else None,
+        "part_number": expendable.part_number,
+        "serial_number": expendable.serial_number,
+        "lot_number": expendable.lot_number,
+        "description": expendable.description,
+        "manufacturer": expendable.manufacturer,
+        "quantity": kit_item.quantity,  # Use KitItem quantity
+        "unit": expendable.unit,
+        "location": kit_item.location or expendable.location,
+        "category": expendable.category,
+        "status": kit_item.status,
+        "minimum_stock_level": expendable.minimum_stock_level,
+        "tracking_type": "serial" if expendable.serial_number else "lot",
+        "added_date": kit_item.added_date.isoformat() if kit_item.added_date else None,
+        "last_updated": kit_item.last_updated.isoformat() if kit_item.last_updated else None,
+        "source": "item",  # Mark as coming from KitItem
+        "item_type": "expendable"
+    }
+
+
 def register_kit_routes(app):
     """Register all kit-related routes"""
 
@@ -146,20 +177,55 @@ def register_kit_routes(app):
     @jwt_required
     @handle_errors
     def get_kits():
-        """Get all kits with optional filtering"""
+        """
+        Get all kits with optional filtering.
+
+        Counts for every listed kit come from one grouped query and the
+        aircraft type and creator are joined eagerly. Passing ``page`` or
+        ``per_page`` returns a paginated ``{"kits": [...], "pagination": {...}}``
+        response; otherwise the full list is returned.
+        """
         status = request.args.get("status")
         aircraft_type_id = request.args.get("aircraft_type_id", type=int)
 
-        query = Kit.query
+        query = Kit.query.options(joinedload(Kit.aircraft_type), joinedload(Kit.creator))
 
         if status:
             query = query.filter_by(status=status)
         if aircraft_type_id:
             query = query.filter_by(aircraft_type_id=aircraft_type_id)
 
-        kits = query.order_by(Kit.name).all()
+        query = query.order_by(Kit.name)
+
+        if "page" not in request.args and "per_page" not in request.args:
+            kits = query.all()
+            summaries = Kit.get_summary_counts([kit.id for kit in kits])
+            return jsonify([kit.to_dict(summary=summaries[kit.id]) for kit in kits]), 200
+
+        page = request.args.get("page", 1, type=int)
+        per_page = request.args.get("per_page", 50, type=int)
 
-        return jsonify([kit.to_dict() for kit in kits]), 200
+        # Validate pagination parameters
+        if page < 1:
+            raise ValidationError("Page must be >= 1")
+        if per_page < 1 or per_page > 500:
+            raise ValidationError("Per page must be between 1 and 500")
+
+        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+        kits = pagination.items
+        summaries = Kit.get_summary_counts([kit.id for kit in kits])
+
+        return jsonify({
+            "kits": [kit.to_dict(summary=summaries[kit.id]) for kit in kits],
+            "pagination": {
+                "page": page,
+                "per_page": per_page,
+                "total": pagination.total,
+                "pages": pagination.pages,
+                "has_next": pagination.has_next,
+                "has_prev": pagination.has_prev
+            }
+        }), 200
 
     @app.route("/api/kits/<int:id>", methods=["GET"])
     @jwt_required
@@ -304,29 +370,14 @@ def register_kit_routes(app):
         if existing:
             raise ValidationError(f'Kit "{data["name"]}" already exists')
 
-        # Create new kit
-        new_kit = Kit(
-            name=data["name"],
-            aircraft_type_id=source_kit.aircraft_type_id,
+        new_kits, _ = clone_kit(
+            source_kit,
+            [data["name"]],
+            created_by=request.current_user["user_id"],
             description=data.get("description", source_kit.description),
-            status="active",
-            created_by=request.current_user["user_id"]
+            include_slots=bool(data.get("include_slots", False))
         )
-
-        db.session.add(new_kit)
-        db.session.flush()
-
-        # Duplicate boxes
-        for source_box in source_kit.boxes.all():
-            new_box = KitBox(
-                kit_id=new_kit.id,
-                box_number=source_box.box_number,
-                box_type=source_box.box_type,
-                description=source_box.description
-            )
-            db.session.add(new_box)
-
-        db.session.commit()
+        new_kit = new_kits[0]
 
         # Log action
         log = AuditLog(
@@ -339,6 +390,72 @@ def register_kit_routes(app):
         logger.info(f"Kit duplicated: {source_kit.name} -> {new_kit.name}")
         return jsonify(new_kit.to_dict(include_details=True)), 201
 
+    @app.route("/api/kits/<int:id>/clone", methods=["POST"])
+    @materials_required
+    @handle_errors
+    def clone_kit_template(id):
+        """
+        Instantiate one or more kits from a template kit.
+
+        Request body:
+            {
+                "names": ["Q400 N401", "Q400 N402"],
+                "description": "Optional description for the new kits",
+                "include_slots": true
+            }
+
+        Boxes and expendable item slots (with minimum stock levels) are
+        copied for every new kit in a single transaction.
+        """
+        source_kit = Kit.query.get_or_404(id)
+        data = request.get_json() or {}
+
+        names = data.get("names")
+        if not isinstance(names, list) or not names:
+            raise ValidationError('"names" must be a non-empty array of kit names')
+        if len(names) > MAX_CLONES_PER_CALL:
+            raise ValidationError(f"Maximum {MAX_CLONES_PER_CALL} kits per call")
+        if not all(isinstance(name, str) and name.strip() for name in names):
+            raise ValidationError("Kit names must be non-empty strings")
+
+        names = [name.strip() for name in names]
+        if len(set(names)) != len(names):
+            raise ValidationError("Kit names must be unique")
+
+        existing = [name for (name,) in db.session.query(Kit.name).filter(Kit.name.in_(names))]
+        if existing:
+            raise ValidationError(f"Kits already exist: {', '.join(sorted(existing))}")
+
+        try:
+            new_kits, stats = clone_kit(
+                source_kit,
+                names,
+                created_by=request.current_user["user_id"],
+                description=data.get("description"),
+                include_slots=bool(data.get("include_slots", True))
+            )
+            kit_ids = [kit.id for kit in new_kits]
+
+            log = AuditLog(
+                action_type="kit_cloned",
+                action_details=f"Cloned kit {source_kit.name} into {len(new_kits)} kits: {', '.join(names)}"
+            )
+            db.session.add(log)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        # Reload the committed kits in one query instead of refreshing each
+        kits = {kit.id: kit for kit in Kit.query.options(
+            joinedload(Kit.aircraft_type), joinedload(Kit.creator)
+        ).filter(Kit.id.in_(kit_ids)).populate_existing()}
+        summaries = Kit.get_summary_counts(kit_ids)
+        return jsonify({
+            "kits": [kits[kit_id].to_dict(summary=summaries[kit_id]) for kit_id in kit_ids],
+            "stats": stats
+        }), 201
+
     # ==================== Kit Wizard ====================
 
     @app.route("/api/kits/wizard", methods=["POST"])
@@ -411,17 +528,7 @@ def register_kit_routes(app):
             db.session.flush()
 
             # Create boxes
-            boxes = data.get("boxes", [])
-            for box_data in boxes:
-                box = KitBox(
-                    kit_id=kit.id,
-                    box_number=box_data["box_number"],
-                    box_type=box_data["box_type"],
-                    description=box_data.get("description", "")
-                )
-                db.session.add(box)
-
-            db.session.commit()
+            create_kit_boxes(kit.id, data.get("boxes", []))
 
             # Log action
             log = AuditLog(
@@ -448,7 +555,8 @@ def register_kit_routes(app):
         """Get all boxes for a kit"""
         kit = Kit.query.get_or_404(kit_id)
         boxes = kit.boxes.order_by(KitBox.box_number).all()
-        return jsonify([box.to_dict() for box in boxes]), 200
+        item_counts = KitBox.get_item_counts([box.id for box in boxes])
+        return jsonify([box.to_dict(item_count=item_counts[box.id]) for box in boxes]), 200
 
     @app.route("/api/kits/<int:kit_id>/boxes", methods=["POST"])
     @materials_required
@@ -539,73 +647,106 @@ def register_kit_routes(app):
     @jwt_required
     @handle_errors
     def get_kit_items(kit_id):
-        """Get all items in a kit with optional filtering"""
-        from models import Expendable
-
-        kit = Kit.query.get_or_404(kit_id)
+        """
+        Get all items in a kit with optional filtering.
+
+        KitItems are loaded together with their box and, for expendables, the
+        Expendable record in one joined query; legacy KitExpendable rows come
+        from a second query and share the same response shape. Pass
+        ``box_id`` to expand a single box, and ``page``/``per_page`` to page
+        through both sources together (ordered by box, then item).
+        """
+        Kit.query.get_or_404(kit_id)
 
         box_id = request.args.get("box_id", type=int)
         item_type = request.args.get("item_type")
         status = request.args.get("status")
+        paginate = "page" in request.args or "per_page" in request.args
 
-        # Get all kit items (filter out items with quantity 0)
-        items_query = kit.items.filter(KitItem.quantity > 0)
+        # Only items with stock are listed; expendable items need their Expendable record
+        item_filters = [
+            KitItem.kit_id == kit_id,
+            KitItem.quantity > 0,
+            or_(KitItem.item_type != "expendable", Expendable.id.isnot(None)),
+        ]
+        legacy_filters = [KitExpendable.kit_id == kit_id, KitExpendable.quantity > 0]
         if box_id:
-            items_query = items_query.filter_by(box_id=box_id)
+            item_filters.append(KitItem.box_id == box_id)
+            legacy_filters.append(KitExpendable.box_id == box_id)
         if item_type:
-            items_query = items_query.filter_by(item_type=item_type)
+            item_filters.append(KitItem.item_type == item_type)
         if status:
-            items_query = items_query.filter_by(status=status)
-
-        kit_items = items_query.all()
+            item_filters.append(KitItem.status == status)
+            legacy_filters.append(KitExpendable.status == status)
+
+        expendable_join = and_(KitItem.item_type == "expendable", Expendable.id == KitItem.item_id)
+
+        pagination = None
+        if paginate:
+            page = request.args.get("page", 1, type=int)
+            per_page = request.args.get("per_page", 100, type=int)
+            if page < 1:
+                raise ValidationError("Page must be >= 1")
+            if per_page < 1 or per_page > 500:
+                raise ValidationError("Per page must be between 1 and 500")
+
+            # Page over the keys of both sources, then hydrate only that page
+            keys = union_all(
+                select(KitItem.box_id, literal(0).label("source"), KitItem.id.label("row_id"))
+                .outerjoin(Expendable, expendable_join)
+                .where(*item_filters),
+                select(KitExpendable.box_id, literal(1).label("source"), KitExpendable.id.label("row_id"))
+                .where(*legacy_filters),
+            ).subquery()
+            total = db.session.scalar(select(func.count()).select_from(keys))
+            page_keys = db.session.execute(
+                select(keys.c.source, keys.c.row_id)
+                .order_by(keys.c.box_id, keys.c.source, keys.c.row_id)
+                .offset((page - 1) * per_page)
+                .limit(per_page)
+            ).all()
+
+            item_ids = [row_id for source, row_id in page_keys if source == 0]
+            legacy_ids = [row_id for source, row_id in page_keys if source == 1]
+            item_filters = [KitItem.id.in_(item_ids), *item_filters]
+            legacy_filters = [KitExpendable.id.in_(legacy_ids), *legacy_filters]
+
+            pages = (total + per_page - 1) // per_page
+            pagination = {
+                "page": page,
+                "per_page": per_page,
+                "total": total,
+                "pages": pages,
+                "has_next": page < pages,
+                "has_prev": page > 1
+            }
 
-        # Separate items by type and enrich expendables with full data
         regular_items = []
         expendables = []
 
-        for kit_item in kit_items:
+        # KitItem + Expendable + KitBox in one round trip
+        rows = (
+            db.session.query(KitItem, Expendable)
+            .outerjoin(Expendable, expendable_join)
+            .options(joinedload(KitItem.box))
+            .filter(*item_filters)
+            .order_by(KitItem.box_id, KitItem.id)
+            .all()
+        )
+        for kit_item, expendable in rows:
             if kit_item.item_type == "expendable":
-                # Get the full Expendable record
-                expendable = db.session.get(Expendable, kit_item.item_id)
-                if expendable:
-                    # Merge KitItem data with Expendable data
-                    exp_dict = {
-                        "id": kit_item.id,  # Use KitItem.id for frontend operations
-                        "kit_item_id": kit_item.id,  # Explicit KitItem ID
-                        "expendable_id": expendable.id,  # Explicit Expendable ID
-                        "item_id": expendable.id,  # For frontend compatibility (same as expendable_id)
-                        "kit_id": kit_item.kit_id,
-                        "box_id": kit_item.box_id,
-                        "box_number": kit_item.box.box_number if kit_item.box else None,
-                        "part_number": expendable.part_number,
-                        "serial_number": expendable.serial_number,
-                        "lot_number": expendable.lot_number,
-                        "description": expendable.description,
-                        "manufacturer": expendable.manufacturer,
-                        "quantity": kit_item.quantity,  # Use KitItem quantity
-                        "unit": expendable.unit,
-                        "location": kit_item.location or expendable.location,
-                        "category": expendable.category,
-                        "status": kit_item.status,
-                        "minimum_stock_level": expendable.minimum_stock_level,
-                        "tracking_type": "serial" if expendable.serial_number else "lot",
-                        "added_date": kit_item.added_date.isoformat() if kit_item.added_date else None,
-                        "last_updated": kit_item.last_updated.isoformat() if kit_item.last_updated else None,
-                        "source": "item",  # Mark as coming from KitItem
-                        "item_type": "expendable"
-                    }
-                    expendables.append(exp_dict)
+                expendables.append(_kit_item_expendable_dict(kit_item, expendable))
             else:
                 regular_items.append(kit_item.to_dict())
 
         # Also get old KitExpendable records for backward compatibility
-        old_expendables_query = kit.expendables.filter(KitExpendable.quantity > 0)
-        if box_id:
-            old_expendables_query = old_expendables_query.filter_by(box_id=box_id)
-        if status:
-            old_expendables_query = old_expendables_query.filter_by(status=status)
-
-        old_expendables = old_expendables_query.all()
+        old_expendables = (
+            KitExpendable.query
+            .options(joinedload(KitExpendable.box))
+            .filter(*legacy_filters)
+            .order_by(KitExpendable.box_id, KitExpendable.id)
+            .all()
+        )
         for old_exp in old_expendables:
             exp_dict = old_exp.to_dict()
             exp_dict["source"] = "expendable"  # Mark as coming from old KitExpendable
@@ -617,6 +758,8 @@ def register_kit_routes(app):
             "expendables": expendables,
             "total_count": len(regular_items) + len(expendables)
         }
+        if pagination:
+            result["pagination"] = pagination
 
         return jsonify(result), 200
 
@@ -1184,51 +1327,21 @@ def register_kit_routes(app):
     @handle_errors
     def get_kit_analytics(kit_id):
         """Get usage analytics for a kit"""
-        from models_kits import KitIssuance, KitReorderRequest, KitTransfer
-
         kit = Kit.query.get_or_404(kit_id)
 
         # Get date range from query params
         days = request.args.get("days", 30, type=int)
-        start_date = datetime.now() - timedelta(days=days)
 
-        # Issuance statistics
-        issuance_count = KitIssuance.query.filter(
-            KitIssuance.kit_id == kit_id,
-            KitIssuance.issued_date >= start_date
-        ).count()
-
-        # Transfer statistics
-        transfers_in = KitTransfer.query.filter(
-            KitTransfer.to_location_type == "kit",
-            KitTransfer.to_location_id == kit_id,
-            KitTransfer.transfer_date >= start_date
-        ).count()
-
-        transfers_out = KitTransfer.query.filter(
-            KitTransfer.from_location_type == "kit",
-            KitTransfer.from_location_id == kit_id,
-            KitTransfer.transfer_date >= start_date
-        ).count()
-
-        # Reorder statistics
-        pending_reorders = KitReorderRequest.query.filter_by(
-            kit_id=kit_id,
-            status="pending"
-        ).count()
-
-        fulfilled_reorders = KitReorderRequest.query.filter(
-            KitReorderRequest.kit_id == kit_id,
-            KitReorderRequest.status == "fulfilled",
-            KitReorderRequest.fulfillment_date >= start_date
-        ).count()
+        metrics = kit_analytics.get_metrics([kit_id], days)["kits"][kit_id]
 
         # Item counts
-        total_items = kit.items.count() + kit.expendables.count()
+        summary = Kit.get_summary_counts([kit_id])[kit_id]
+        total_items = summary["item_count"] + summary["expendable_count"]
         low_stock_items = kit.expendables.filter(
             KitExpendable.quantity <= KitExpendable.minimum_stock_level
         ).count()
 
+        issuance_count = metrics["issuances"]
         analytics = {
             "kit_id": kit_id,
             "kit_name": kit.name,
@@ -1238,13 +1351,13 @@ def register_kit_routes(app):
                 "average_per_day": round(issuance_count / days, 2) if days > 0 else 0
             },
             "transfers": {
-                "incoming": transfers_in,
-                "outgoing": transfers_out,
-                "net": transfers_in - transfers_out
+                "incoming": metrics["transfers_in"],
+                "outgoing": metrics["transfers_out"],
+                "net": metrics["transfers_in"] - metrics["transfers_out"]
             },
             "reorders": {
-                "pending": pending_reorders,
-                "fulfilled": fulfilled_reorders
+                "pending": metrics["pending_reorders"],
+                "fulfilled": metrics["fulfilled_reorders"]
             },
             "inventory": {
                 "total_items": total_items,
@@ -1333,12 +1446,17 @@ def register_kit_routes(app):
             KitReorderRequest.requested_date.desc()
         )
 
-        results = query.all()
+        results = query.options(
+            joinedload(KitReorderRequest.kit),
+            joinedload(KitReorderRequest.requester),
+            joinedload(KitReorderRequest.approver),
+        ).all()
+        summaries = KitReorderRequest.get_summaries([reorder.id for reorder, _, _ in results])
 
         # Format report data
         report = []
         for reorder, kit_name, requested_by_name in results:
-            reorder_dict = reorder.to_dict()
+            reorder_dict = reorder.to_dict(summary=summaries[reorder.id])
             reorder_dict["kit_name"] = kit_name
             reorder_dict["requested_by_name"] = requested_by_name
             report.append(reorder_dict)
@@ -1350,140 +1468,44 @@ def register_kit_routes(app):
     @handle_errors
     def get_kit_utilization_analytics():
         """Get kit utilization analytics across all kits"""
-        from sqlalchemy import func
-
-        from models_kits import KitIssuance, KitTransfer
-
         days = request.args.get("days", 30, type=int)
         aircraft_type_id = request.args.get("aircraft_type_id", type=int)
         kit_id = request.args.get("kit_id", type=int)
-        start_date = datetime.now() - timedelta(days=days)
 
         # Get kits based on filters
-        query = Kit.query.filter(Kit.status != "inactive")
+        query = db.session.query(Kit.id, Kit.name).filter(Kit.status != "inactive")
         if aircraft_type_id:
-            query = query.filter_by(aircraft_type_id=aircraft_type_id)
+            query = query.filter(Kit.aircraft_type_id == aircraft_type_id)
         if kit_id:
-            query = query.filter_by(id=kit_id)
+            query = query.filter(Kit.id == kit_id)
 
-        kits = query.all()
-        kit_ids = [kit.id for kit in kits]
-
-        # Issuances by kit (filtered by kit_ids)
-        issuances_query = db.session.query(
-            Kit.name,
-            func.count(KitIssuance.id).label("count")
-        ).join(KitIssuance, Kit.id == KitIssuance.kit_id).filter(
-            KitIssuance.issued_date >= start_date
-        )
-        if kit_ids:
-            issuances_query = issuances_query.filter(Kit.id.in_(kit_ids))
+        kit_names = dict(query.all())
+        metrics = kit_analytics.get_metrics(kit_names, days)
 
-        issuances_by_kit = issuances_query.group_by(Kit.name).all()
-        issuances_data = [{"name": name, "value": count} for name, count in issuances_by_kit]
-
-        # Transfers by type (filtered by kit_ids)
-        kit_to_kit_query = KitTransfer.query.filter(
-            KitTransfer.from_location_type == "kit",
-            KitTransfer.to_location_type == "kit",
-            KitTransfer.transfer_date >= start_date
-        )
-        if kit_ids:
-            kit_to_kit_query = kit_to_kit_query.filter(
-                or_(
-                    KitTransfer.from_location_id.in_(kit_ids),
-                    KitTransfer.to_location_id.in_(kit_ids)
-                )
-            )
-        kit_to_kit = kit_to_kit_query.count()
-
-        kit_to_warehouse_query = KitTransfer.query.filter(
-            KitTransfer.from_location_type == "kit",
-            KitTransfer.to_location_type == "warehouse",
-            KitTransfer.transfer_date >= start_date
-        )
-        if kit_ids:
-            kit_to_warehouse_query = kit_to_warehouse_query.filter(KitTransfer.from_location_id.in_(kit_ids))
-        kit_to_warehouse = kit_to_warehouse_query.count()
-
-        warehouse_to_kit_query = KitTransfer.query.filter(
-            KitTransfer.from_location_type == "warehouse",
-            KitTransfer.to_location_type == "kit",
-            KitTransfer.transfer_date >= start_date
-        )
-        if kit_ids:
-            warehouse_to_kit_query = warehouse_to_kit_query.filter(KitTransfer.to_location_id.in_(kit_ids))
-        warehouse_to_kit = warehouse_to_kit_query.count()
+        issuances_data = [
+            {"name": kit_names[id_], "value": kit_metrics["issuances"]}
+            for id_, kit_metrics in sorted(metrics["kits"].items(), key=lambda item: kit_names[item[0]])
+            if kit_metrics["issuances"]
+        ]
 
+        transfers = metrics["transfers"]
         transfers_data = [
-            {"name": "Kit to Kit", "value": kit_to_kit},
-            {"name": "Kit to Warehouse", "value": kit_to_warehouse},
-            {"name": "Warehouse to Kit", "value": warehouse_to_kit}
+            {"name": "Kit to Kit", "value": transfers["kit_to_kit"]},
+            {"name": "Kit to Warehouse", "value": transfers["kit_to_warehouse"]},
+            {"name": "Warehouse to Kit", "value": transfers["warehouse_to_kit"]}
         ]
 
         # Activity over time (weekly breakdown)
-        weeks = []
-        for i in range(4):
-            week_start = datetime.now() - timedelta(days=(4-i)*7)
-            week_end = week_start + timedelta(days=7)
-
-            week_issuances_query = KitIssuance.query.filter(
-                KitIssuance.issued_date >= week_start,
-                KitIssuance.issued_date < week_end
-            )
-            if kit_ids:
-                week_issuances_query = week_issuances_query.filter(KitIssuance.kit_id.in_(kit_ids))
-            week_issuances = week_issuances_query.count()
-
-            week_transfers_query = KitTransfer.query.filter(
-                KitTransfer.transfer_date >= week_start,
-                KitTransfer.transfer_date < week_end
-            )
-            if kit_ids:
-                week_transfers_query = week_transfers_query.filter(
-                    or_(
-                        and_(KitTransfer.from_location_type == "kit", KitTransfer.from_location_id.in_(kit_ids)),
-                        and_(KitTransfer.to_location_type == "kit", KitTransfer.to_location_id.in_(kit_ids))
-                    )
-                )
-            week_transfers = week_transfers_query.count()
-
-            weeks.append({
-                "date": f"Week {i+1}",
-                "issuances": week_issuances,
-                "transfers": week_transfers
-            })
-
-        # Summary stats
-        total_issuances_query = KitIssuance.query.filter(
-            KitIssuance.issued_date >= start_date
-        )
-        if kit_ids:
-            total_issuances_query = total_issuances_query.filter(KitIssuance.kit_id.in_(kit_ids))
-        total_issuances = total_issuances_query.count()
-
-        total_transfers_query = KitTransfer.query.filter(
-            KitTransfer.transfer_date >= start_date
-        )
-        if kit_ids:
-            total_transfers_query = total_transfers_query.filter(
-                or_(
-                    and_(KitTransfer.from_location_type == "kit", KitTransfer.from_location_id.in_(kit_ids)),
-                    and_(KitTransfer.to_location_type == "kit", KitTransfer.to_location_id.in_(kit_ids))
-                )
-            )
-        total_transfers = total_transfers_query.count()
+        weeks = [
+            {"date": f"Week {i + 1}", "issuances": week["issuances"], "transfers": week["transfers"]}
+            for i, week in enumerate(metrics["activity"])
+        ]
 
-        active_kits = len(kits)
+        active_kits = len(kit_names)
+        total_issuances = sum(kit_metrics["issuances"] for kit_metrics in metrics["kits"].values())
 
         # Calculate average utilization (percentage of kits with activity)
-        kits_with_activity_query = db.session.query(KitIssuance.kit_id).filter(
-            KitIssuance.issued_date >= start_date
-        )
-        if kit_ids:
-            kits_with_activity_query = kits_with_activity_query.filter(KitIssuance.kit_id.in_(kit_ids))
-        kits_with_activity = kits_with_activity_query.distinct().count()
-
+        kits_with_activity = sum(1 for kit_metrics in metrics["kits"].values() if kit_metrics["issuances"])
         avg_utilization = round((kits_with_activity / active_kits * 100) if active_kits > 0 else 0, 1)
 
         return jsonify({
@@ -1492,7 +1514,7 @@ def register_kit_routes(app):
             "activityOverTime": weeks,
             "summary": {
                 "totalIssuances": total_issuances,
-                "totalTransfers": total_transfers,
+                "totalTransfers": transfers["total"],
                 "activeKits": active_kits,
                 "avgUtilization": avg_utilization
             }
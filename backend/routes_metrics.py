@@ -0,0 +1,85 @@
+"""
+Routes for performance metrics
+
+Admins can see, per endpoint, how many requests this worker served, their
+latency and SQL query count histograms, and how often they went over the
+query budget. Statistics are per process, so each gunicorn worker answers
+with its own since it started (or since the last reset).
+
+``/metrics`` serves all workers' metrics in the Prometheus text format for
+scrapers (see utils/metrics.py). It answers 404 until ``METRICS_TOKEN`` is
+set, unless the app runs with DEBUG on.
+"""
+
+import hmac
+import os
+from datetime import UTC, datetime
+
+from flask import Response, current_app, jsonify, request
+
+from auth import admin_required, jwt_required
+from utils.error_handler import ValidationError, handle_errors
+from utils.metrics import collect_metrics, render_prometheus
+from utils.request_metrics import get_request_metrics
+
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+SORT_KEYS = {
+    "total_time": lambda item: item["duration_histogram"]["sum"],
+    "count": lambda item: item["count"],
+    "avg_queries": lambda item: item["avg_queries"] or 0,
+    "max_queries": lambda item: item["max_queries"],
+    "over_budget": lambda item: item["over_budget"],
+}
+
+
+def register_metrics_routes(app):
+    """Register request metrics routes"""
+
+    @app.route("/api/admin/metrics/requests", methods=["GET"])
+    @jwt_required
+    @admin_required
+    @handle_errors
+    def get_request_metrics_route():
+        """Per-endpoint request metrics, sorted by ``sort`` (default total_time) and capped at ``limit``"""
+        sort = request.args.get("sort", "total_time")
+        if sort not in SORT_KEYS:
+            raise ValidationError(f"sort must be one of: {', '.join(SORT_KEYS)}")
+        limit = request.args.get("limit", 100, type=int)
+
+        metrics = get_request_metrics()
+        endpoints = sorted(metrics.snapshot(), key=SORT_KEYS[sort], reverse=True)
+        return jsonify({
+            "worker_pid": os.getpid(),
+            "since": datetime.fromtimestamp(metrics.started_at, UTC).isoformat(),
+            "query_budget": current_app.config.get("QUERY_BUDGET_PER_REQUEST", 25),
+            "endpoints": endpoints[:limit] if limit and limit > 0 else endpoints,
+        }), 200
+
+    @app.route("/api/admin/metrics/requests", methods=["DELETE"])
+    @jwt_required
+    @admin_required
+    @handle_errors
+    def reset_request_metrics():
+        """Clear this worker's request metrics"""
+        get_request_metrics().reset()
+        return jsonify({"message": "Request metrics reset"}), 200
+
+    @app.route("/metrics", methods=["GET"])
+    def prometheus_metrics():
+        """Prometheus scrape endpoint; needs METRICS_TOKEN, except with DEBUG on"""
+        if not app.config.get("METRICS_ENABLED", True):
+            return jsonify({"error": "Not found"}), 404
+
+        token = app.config.get("METRICS_TOKEN")
+        if not token and not app.config.get("DEBUG"):
+            # Without a token the endpoint inventory and traffic would be public
+            return jsonify({"error": "Not found"}), 404
+        if token:
+            supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+            if not hmac.compare_digest(supplied.encode(), token.encode()):
+                return jsonify({"error": "Invalid metrics token"}), 401
+
+        return Response(render_prometheus(collect_metrics()), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -3,15 +3,16 @@
 import logging
 import os
 import secrets
-from collections import Counter
 from datetime import datetime, timezone
 
 from flask import current_app, jsonify, request
 from sqlalchemy import or_, text
+from sqlalchemy.orm import selectinload
 from werkzeug.utils import secure_filename
 
 from auth import jwt_required, permission_required, permission_required_any
 from models import (
+    NO_DUE_DATE,
     AuditLog,
     ProcurementOrder,
     ProcurementOrderMessage,
@@ -28,6 +29,8 @@ from utils.file_validation import (
     scan_file_for_malware,
     validate_file_upload,
 )
+from utils.keyset_pagination import keyset_page, order_by_keys, parse_keyset_args
+from utils.procurement_analytics import procurement_analytics
 
 
 logger = logging.getLogger(__name__)
@@ -46,7 +49,7 @@ VALID_STATUSES = {
     "received",
     "cancelled",
 }
-CLOSED_STATUSES = {"received", "cancelled"}
+CLOSED_STATUSES = ProcurementOrder.CLOSED_STATUSES
 OPEN_STATUSES = VALID_STATUSES - CLOSED_STATUSES
 
 
@@ -103,6 +106,24 @@ def _generate_order_number():
     return f"ORD-{next_number:05d}"
 
 
+def _order_sort_keys(sort):
+    """
+    Keyset sort for order lists.
+
+    ``due_state`` ranks late, due soon, on track, unscheduled and completed
+    orders in that order for the buyer board; ``created`` lists newest first;
+    anything else sorts by due date with undated orders last.
+    """
+    if sort == "created":
+        return "created", [(ProcurementOrder.created_at, "desc"), (ProcurementOrder.id, "desc")]
+
+    due_date = db.func.coalesce(ProcurementOrder.expected_due_date, NO_DUE_DATE)
+    tie_breakers = [(due_date, "asc"), (ProcurementOrder.created_at, "desc"), (ProcurementOrder.id, "desc")]
+    if sort == "due_state":
+        return "due_state", [(ProcurementOrder.due_state_rank(get_current_time()), "asc"), *tie_breakers]
+    return "due_date", tie_breakers
+
+
 def register_order_routes(app):
     """Register procurement order endpoints."""
 
@@ -176,16 +197,6 @@ def register_order_routes(app):
                 ProcurementOrder.status.notin_(list(CLOSED_STATUSES)),
             )
 
-        sort = request.args.get("sort", "due_date")
-        if sort == "created":
-            query = query.order_by(ProcurementOrder.created_at.desc())
-        else:
-            query = query.order_by(ProcurementOrder.expected_due_date.is_(None), ProcurementOrder.expected_due_date.asc())
-
-        limit = request.args.get("limit", type=int)
-        if limit:
-            query = query.limit(limit)
-
         if has_orders_permission:
             if requester_filter:
                 query = query.filter(ProcurementOrder.requester_id == requester_filter)
@@ -196,8 +207,32 @@ def register_order_routes(app):
             else:
                 return jsonify({"error": "Unable to determine requesting user"}), 403
 
+        query = query.options(
+            selectinload(ProcurementOrder.requester),
+            selectinload(ProcurementOrder.buyer),
+            selectinload(ProcurementOrder.kit),
+        )
+        sort, sort_keys = _order_sort_keys(request.args.get("sort", "due_date"))
+
+        # Keyset pagination is opt-in so existing clients keep receiving a plain array
+        paging = parse_keyset_args(request.args)
+        if paging:
+            per_page, cursor = paging
+            orders, pagination = keyset_page(query, sort, sort_keys, per_page, cursor)
+            summaries = ProcurementOrder.get_message_summaries([order.id for order in orders])
+            return jsonify({
+                "orders": [order.to_list_dict(summaries[order.id]) for order in orders],
+                "pagination": pagination,
+            })
+
+        query = order_by_keys(query, sort_keys)
+        limit = request.args.get("limit", type=int)
+        if limit:
+            query = query.limit(limit)
+
         orders = query.all()
-        return jsonify([order.to_dict() for order in orders])
+        summaries = ProcurementOrder.get_message_summaries([order.id for order in orders])
+        return jsonify([order.to_dict(summary=summaries[order.id]) for order in orders])
 
     @app.route("/api/orders", methods=["POST"])
     @orders_or_requests_permission
@@ -449,60 +484,7 @@ def register_order_routes(app):
     def order_analytics():
         """Return aggregated analytics for procurement orders."""
 
-        orders = ProcurementOrder.query.all()
-        now = get_current_time()
-
-        status_counter = Counter(order.status or "unknown" for order in orders)
-        type_counter = Counter(order.order_type or "unspecified" for order in orders)
-        priority_counter = Counter(order.priority or "normal" for order in orders)
-
-        late_orders = [
-            order for order in orders
-            if order.expected_due_date and order.expected_due_date < now and order.status not in CLOSED_STATUSES
-        ]
-
-        due_soon_orders = [
-            order for order in orders
-            if order.expected_due_date and 0 <= (order.expected_due_date - now).days <= 3 and order.status not in CLOSED_STATUSES
-        ]
-
-        month_counter = Counter()
-        total_open_days = 0
-        open_count = 0
-
-        for order in orders:
-            if order.expected_due_date:
-                month_counter[order.expected_due_date.strftime("%Y-%m")] += 1
-            if order.status not in CLOSED_STATUSES and order.created_at:
-                open_count += 1
-                total_open_days += (now - order.created_at).days
-
-        analytics_payload = {
-            "status_breakdown": [
-                {"status": status, "count": count}
-                for status, count in sorted(status_counter.items())
-            ],
-            "type_breakdown": [
-                {"type": order_type, "count": count}
-                for order_type, count in sorted(type_counter.items())
-            ],
-            "priority_breakdown": [
-                {"priority": priority, "count": count}
-                for priority, count in sorted(priority_counter.items())
-            ],
-            "late_count": len(late_orders),
-            "due_soon_count": len(due_soon_orders),
-            "total_open": sum(
-                1 for order in orders if order.status not in CLOSED_STATUSES
-            ),
-            "orders_per_month": [
-                {"month": month, "count": count}
-                for month, count in sorted(month_counter.items())
-            ],
-            "average_open_days": (total_open_days / open_count) if open_count else 0,
-        }
-
-        return jsonify(analytics_payload)
+        return jsonify(procurement_analytics.get_order_analytics())
 
     @app.route("/api/orders/late-alerts", methods=["GET"])
     @orders_permission
@@ -0,0 +1,57 @@
+"""
+Routes for background job scheduler history
+
+Admins can see every scheduled job with its schedule, run counts, failure
+counts and durations, and page through the recorded runs. The data comes
+from ``scheduled_job_runs``, so any worker can answer, not just the leader
+running the scheduler.
+"""
+
+from datetime import timedelta
+
+from flask import jsonify, request
+
+from auth import admin_required, jwt_required
+from models import ScheduledJobRun, get_current_time
+from utils.error_handler import ValidationError, handle_errors
+from utils.scheduler import build_jobs, job_statistics
+
+
+def register_scheduler_routes(app):
+    """Register background job scheduler routes"""
+
+    @app.route("/api/admin/scheduler/jobs", methods=["GET"])
+    @jwt_required
+    @admin_required
+    @handle_errors
+    def list_scheduled_jobs():
+        """List scheduled jobs with run statistics for the last ``days`` days (default 7)"""
+        days = request.args.get("days", 7, type=int)
+        if days is None or days <= 0:
+            raise ValidationError("days must be a positive integer")
+
+        since = get_current_time() - timedelta(days=days)
+        return jsonify({"jobs": job_statistics(build_jobs(app), since), "days": days}), 200
+
+    @app.route("/api/admin/scheduler/runs", methods=["GET"])
+    @jwt_required
+    @admin_required
+    @handle_errors
+    def list_scheduled_job_runs():
+        """List recorded job runs, newest first, optionally filtered by job and status"""
+        limit = min(request.args.get("limit", 50, type=int) or 50, 200)
+        before_id = request.args.get("before_id", type=int)
+
+        query = ScheduledJobRun.query
+        if request.args.get("job"):
+            query = query.filter(ScheduledJobRun.job_name == request.args["job"])
+        if request.args.get("status"):
+            query = query.filter(ScheduledJobRun.status == request.args["status"])
+        if before_id:
+            query = query.filter(ScheduledJobRun.id < before_id)
+
+        runs = query.order_by(ScheduledJobRun.id.desc()).limit(limit + 1).all()
+        return jsonify({
+            "runs": [run.to_dict() for run in runs[:limit]],
+            "has_more": len(runs) > limit,
+        }), 200
@@ -0,0 +1,24 @@
+"""
+Routes for unread badge counts
+
+One endpoint returns every unread count the navigation badges need, backed
+by the unread counter service. Connected clients also receive the counts as
+``unread_counts`` Socket.IO events whenever they change.
+"""
+
+from flask import jsonify, request
+
+from auth import jwt_required
+from utils.error_handler import handle_errors
+from utils.unread_counters import unread_counters
+
+
+def register_unread_routes(app):
+    """Register unread count routes"""
+
+    @app.route("/api/me/unread", methods=["GET"])
+    @jwt_required
+    @handle_errors
+    def get_my_unread_counts():
+        """Get unread channel, kit message, announcement and request counts for the current user"""
+        return jsonify(unread_counters.get_counts(request.current_user["user_id"])), 200
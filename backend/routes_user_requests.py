@@ -6,9 +6,11 @@ from datetime import datetime, timezone
 
 from flask import jsonify, request
 from sqlalchemy import or_, text
+from sqlalchemy.orm import selectinload
 
 from auth import jwt_required, permission_required_any
 from models import (
+    NO_DUE_DATE,
     AuditLog,
     Chemical,
     ProcurementOrder,
@@ -21,6 +23,8 @@ from models import (
     get_current_time,
 )
 from utils.error_handler import ValidationError, handle_errors
+from utils.keyset_pagination import keyset_page, order_by_keys, parse_keyset_args
+from utils.procurement_analytics import procurement_analytics
 
 
 logger = logging.getLogger(__name__)
@@ -116,6 +120,24 @@ def _load_user(user_id, field_name):
     return user
 
 
+def _request_sort_keys(sort):
+    """
+    Keyset sort for request lists.
+
+    ``due_state`` ranks late, due soon, on track, unscheduled and completed
+    requests in that order for the buyer board; ``due_date`` sorts by due
+    date with undated requests last; anything else lists newest first.
+    """
+    newest_first = [(UserRequest.created_at, "desc"), (UserRequest.id, "desc")]
+    if sort not in ("due_date", "due_state"):
+        return "created", newest_first
+
+    keys = [(db.func.coalesce(UserRequest.expected_due_date, NO_DUE_DATE), "asc"), *newest_first]
+    if sort == "due_state":
+        return "due_state", [(UserRequest.due_state_rank(get_current_time()), "asc"), *keys]
+    return "due_date", keys
+
+
 def register_user_request_routes(app):
     """Register user request endpoints."""
 
@@ -198,18 +220,6 @@ def register_user_request_routes(app):
                 UserRequest.status.notin_(list(CLOSED_STATUSES)),
             )
 
-        # Sorting
-        sort = request.args.get("sort", "created")
-        if sort == "due_date":
-            query = query.order_by(UserRequest.expected_due_date.is_(None), UserRequest.expected_due_date.asc())
-        else:
-            query = query.order_by(UserRequest.created_at.desc())
-
-        # Limit
-        limit = request.args.get("limit", type=int)
-        if limit:
-            query = query.limit(limit)
-
         # Access control
         if has_orders_permission:
             if requester_filter:
@@ -221,8 +231,34 @@ def register_user_request_routes(app):
             else:
                 return jsonify({"error": "Unable to determine requesting user"}), 403
 
+        query = query.options(selectinload(UserRequest.requester), selectinload(UserRequest.buyer))
+        sort, sort_keys = _request_sort_keys(request.args.get("sort", "created"))
+
+        # Keyset pagination is opt-in so existing clients keep receiving a plain array
+        paging = parse_keyset_args(request.args)
+        if paging:
+            per_page, cursor = paging
+            requests_list, pagination = keyset_page(query, sort, sort_keys, per_page, cursor)
+            summaries = UserRequest.get_list_summaries([req.id for req in requests_list])
+            return jsonify({
+                "requests": [req.to_list_dict(summaries[req.id]) for req in requests_list],
+                "pagination": pagination,
+            })
+
+        # Sorting and limit
+        query = order_by_keys(query, sort_keys)
+        limit = request.args.get("limit", type=int)
+        if limit:
+            query = query.limit(limit)
+
         requests_list = query.all()
-        return jsonify([req.to_dict(include_items=True) for req in requests_list])
+        request_ids = [req.id for req in requests_list]
+        summaries = UserRequest.get_list_summaries(request_ids)
+        items = UserRequest.get_items_by_request(request_ids)
+        return jsonify([
+            req.to_dict(include_items=True, summary=summaries[req.id], items=items[req.id])
+            for req in requests_list
+        ])
 
     @app.route("/api/user-requests", methods=["POST"])
     @requests_permission
@@ -976,33 +1012,5 @@ def register_user_request_routes(app):
         permission_set = set(current_user.get("permissions", []))
         has_orders_permission = bool(current_user.get("is_admin")) or "page.orders" in permission_set
 
-        query = UserRequest.query
-
-        if not has_orders_permission:
-            requester_id = current_user.get("user_id")
-            if requester_id:
-                query = query.filter(UserRequest.requester_id == requester_id)
-
-        requests_list = query.all()
-
-        # Calculate statistics
-        status_counts = {}
-        priority_counts = {}
-        total_items = 0
-        items_by_status = {}
-
-        for req in requests_list:
-            status_counts[req.status] = status_counts.get(req.status, 0) + 1
-            priority_counts[req.priority] = priority_counts.get(req.priority, 0) + 1
-
-            for item in req.items.all():
-                total_items += 1
-                items_by_status[item.status] = items_by_status.get(item.status, 0) + 1
-
-        return jsonify({
-            "total_requests": len(requests_list),
-            "total_items": total_items,
-            "by_status": status_counts,
-            "by_priority": priority_counts,
-            "items_by_status": items_by_status,
-        })
+        requester_id = None if has_orders_permission else current_user.get("user_id")
+        return jsonify(procurement_analytics.get_request_analytics(requester_id))
@@ -7,6 +7,7 @@ from datetime import datetime
 
 from flask import Blueprint, jsonify, request
 from sqlalchemy import or_
+from sqlalchemy.orm import joinedload
 
 from auth.jwt_manager import jwt_required
 from models import Chemical, Tool, User, Warehouse, db
@@ -49,7 +50,7 @@ def get_warehouses():
         if per_page < 1 or per_page > 200:
             return jsonify({"error": "Per page must be between 1 and 200"}), 400
 
-        query = Warehouse.query
+        query = Warehouse.query.options(joinedload(Warehouse.created_by))
 
         # Filter by active status
         if not include_inactive:
@@ -68,10 +69,11 @@ def get_warehouses():
         # Apply pagination
         pagination = query.paginate(page=page, per_page=per_page, error_out=False)
         warehouses = pagination.items
+        counts = Warehouse.get_item_counts([w.id for w in warehouses])
 
         # Return paginated response
         response = {
-            "warehouses": [w.to_dict(include_counts=True) for w in warehouses],
+            "warehouses": [w.to_dict(include_counts=True, counts=counts[w.id]) for w in warehouses],
             "pagination": {
                 "page": page,
                 "per_page": per_page,
@@ -10,7 +10,15 @@ This module provides comprehensive security features including:
 """
 
 from .input_validation import VALIDATION_SCHEMAS, InputValidator, ValidationError, validate_request_data
-from .middleware import SecurityMonitor, log_security_event, rate_limit, security_scan_request, setup_security_middleware
+from .middleware import (
+    SecurityMonitor,
+    init_security_scan,
+    log_security_event,
+    rate_limit,
+    scan_json,
+    security_scan_request,
+    setup_security_middleware,
+)
 
 
 __all__ = [
@@ -18,8 +26,10 @@ __all__ = [
     "InputValidator",
     "SecurityMonitor",
     "ValidationError",
+    "init_security_scan",
     "log_security_event",
     "rate_limit",
+    "scan_json",
     "security_scan_request",
     "setup_security_middleware",
     "validate_request_data"
@@ -265,6 +265,36 @@ def log_security_event(event_type: str, details: dict):
     security_monitor.log_security_event(event_type, details, ip_address)
 
 
+# Threat patterns, each class combined into one alternation so a value is
+# scanned once per class instead of once per pattern. The SQL pattern is
+# matched against the upper-cased value; its leading lookahead on the first
+# characters of the alternatives lets the engine skip most positions.
+SQL_INJECTION_PATTERN = re.compile(
+    r"(?=[SIUDCEAO#/*-])(?:"
+    + "|".join((
+        r"\b(?:SELECT|INSERT|UPDATE|DELETE|DROP|CREATE|ALTER|EXEC|UNION)\b",
+        r"\b(?:OR|AND)\s+(?:\d+\s*=\s*\d+|['\"].*['\"])",
+        r"\bINTO\s+OUTFILE\b",
+        r"--|#|/\*|\*/",
+    ))
+    + ")"
+)
+XSS_PATTERN = re.compile(
+    "|".join((
+        r"<script[^>]*>.*?</script>",
+        r"javascript:",
+        r"on\w+\s*=",
+        r"<(?:iframe|object|embed|link|meta)[^>]*>",
+    )),
+    re.IGNORECASE,
+)
+
+# Limits for scanning JSON bodies; whatever lies beyond them is not scanned
+SCAN_MAX_DEPTH = 20
+SCAN_MAX_VALUES = 5000
+SCAN_MAX_STRING_LENGTH = 10000
+
+
 def detect_sql_injection(query_string: str) -> bool:
     """
     Detect potential SQL injection attempts
@@ -275,17 +305,7 @@ def detect_sql_injection(query_string: str) -> bool:
     Returns:
         True if potential SQL injection detected
     """
-    sql_patterns = [
-        r"(\b(SELECT|INSERT|UPDATE|DELETE|DROP|CREATE|ALTER|EXEC|UNION)\b)",
-        r"(\b(OR|AND)\s+\d+\s*=\s*\d+)",
-        r"(\b(OR|AND)\s+['\"].*['\"])",
-        r"(--|#|/\*|\*/)",
-        r"(\bUNION\s+SELECT\b)",
-        r"(\bINTO\s+OUTFILE\b)",
-    ]
-
-    query_upper = query_string.upper()
-    return any(re.search(pattern, query_upper, re.IGNORECASE) for pattern in sql_patterns)
+    return SQL_INJECTION_PATTERN.search(query_string.upper()) is not None
 
 
 def detect_xss_attempt(input_string: str) -> bool:
@@ -298,18 +318,74 @@ def detect_xss_attempt(input_string: str) -> bool:
     Returns:
         True if potential XSS detected
     """
-    xss_patterns = [
-        r"<script[^>]*>.*?</script>",
-        r"javascript:",
-        r"on\w+\s*=",
-        r"<iframe[^>]*>",
-        r"<object[^>]*>",
-        r"<embed[^>]*>",
-        r"<link[^>]*>",
-        r"<meta[^>]*>",
-    ]
+    # Every XSS pattern needs one of these characters
+    if "<" not in input_string and ":" not in input_string and "=" not in input_string:
+        return False
+    return XSS_PATTERN.search(input_string) is not None
+
+
+def scan_value(value: str) -> list:
+    """
+    Scan a single string for threats
+
+    Args:
+        value: String to scan; only the first SCAN_MAX_STRING_LENGTH characters are checked
+
+    Returns:
+        List of threat kinds found ("SQL injection", "XSS attempt")
+    """
+    if len(value) > SCAN_MAX_STRING_LENGTH:
+        value = value[:SCAN_MAX_STRING_LENGTH]
+    threats = []
+    if detect_sql_injection(value):
+        threats.append("SQL injection")
+    if detect_xss_attempt(value):
+        threats.append("XSS attempt")
+    return threats
+
 
-    return any(re.search(pattern, input_string, re.IGNORECASE) for pattern in xss_patterns)
+def scan_json(data) -> tuple:
+    """
+    Scan every string in a decoded JSON document for threats
+
+    Walks nested objects and arrays iteratively, so deep documents cannot
+    exhaust the stack, and stops at SCAN_MAX_DEPTH levels or after
+    SCAN_MAX_VALUES values.
+
+    Args:
+        data: Decoded JSON (dict, list or scalar)
+
+    Returns:
+        Tuple of (list of (path, threat kind) pairs, whether a limit was hit).
+        Paths look like ``items[2].notes``.
+    """
+    findings = []
+    truncated = False
+    remaining = SCAN_MAX_VALUES
+    stack = [("", data, 0)]
+
+    while stack:
+        path, value, depth = stack.pop()
+        remaining -= 1
+        if remaining < 0:
+            truncated = True
+            break
+
+        if isinstance(value, str):
+            for threat in scan_value(value):
+                findings.append((path or "<body>", threat))
+        elif isinstance(value, (dict, list)):
+            if depth >= SCAN_MAX_DEPTH:
+                truncated = True
+                continue
+            if isinstance(value, dict):
+                children = [(f"{path}.{key}" if path else str(key), child) for key, child in value.items()]
+            else:
+                children = [(f"{path}[{index}]", child) for index, child in enumerate(value)]
+            # Reversed so findings come out in document order
+            stack.extend((child_path, child, depth + 1) for child_path, child in reversed(children))
+
+    return findings, truncated
 
 
 def security_scan_request():
@@ -317,24 +393,41 @@ def security_scan_request():
     threats_detected = []
 
     # Check query parameters
-    for key, value in request.args.items():
-        if detect_sql_injection(value):
-            threats_detected.append(f"SQL injection in parameter: {key}")
-        if detect_xss_attempt(value):
-            threats_detected.append(f"XSS attempt in parameter: {key}")
+    for key, value in request.args.items(multi=True):
+        threats_detected.extend(f"{threat} in parameter: {key}" for threat in scan_value(value))
 
-    # Check JSON data
+    # Check JSON data, including nested objects and arrays
     if request.is_json:
-        json_data = request.get_json() or {}
-        for key, value in json_data.items():
-            if isinstance(value, str):
-                if detect_sql_injection(value):
-                    threats_detected.append(f"SQL injection in JSON field: {key}")
-                if detect_xss_attempt(value):
-                    threats_detected.append(f"XSS attempt in JSON field: {key}")
+        json_data = request.get_json(silent=True)
+        if json_data is not None:
+            findings, truncated = scan_json(json_data)
+            threats_detected.extend(f"{threat} in JSON field: {path}" for path, threat in findings)
+            if truncated:
+                logger.info(f"Security scan stopped at size limits for {request.method} {request.path}")
 
     # Log threats
     for threat in threats_detected:
         log_security_event("security_threat", {"threat": threat})
 
     return threats_detected
+
+
+def _scan_request():
+    g.security_threats = security_scan_request()
+
+
+def init_security_scan(app):
+    """
+    Scan every request's query parameters and JSON body for threats.
+
+    Findings are logged as security events and kept on
+    ``g.security_threats``; requests are not blocked.
+
+    Args:
+        app: Flask application instance
+    """
+    if not app.config.get("SECURITY_SCAN_ENABLED", False):
+        return
+
+    app.before_request(_scan_request)
+    logger.info("Request threat scanning enabled")
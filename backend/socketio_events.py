@@ -15,6 +15,8 @@ from models import db
 from models_kits import KitMessage
 from models_messaging import ChannelMember, ChannelMessage, MessageReaction, UserPresence
 from socketio_config import socketio
+from utils.metrics import socketio_connections
+from utils.unread_counters import unread_counters
 
 
 logger = logging.getLogger(__name__)
@@ -92,11 +94,16 @@ def handle_connect():
         for membership in memberships:
             join_room(f"channel_{membership.channel_id}")
 
+        # Send the current badge counts; later changes arrive as unread_counts events
+        emit("unread_counts", {"counts": unread_counters.get_counts(int(user_id)), "changes": {}})
+
         logger.info(f"User {user_id} connected via WebSocket", extra={
             "user_id": user_id,
             "socket_id": request.sid
         })
 
+        socketio_connections.inc()
+
         # Broadcast presence update to all users
         emit("user_online", {
             "user_id": user_id,
@@ -116,6 +123,8 @@ def handle_disconnect():
     Handle client disconnection.
     Set user as offline.
     """
+    socketio_connections.dec()
+
     token = request.args.get("token")
     if not token:
         return
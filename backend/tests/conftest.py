@@ -110,6 +110,10 @@ def app():
 
         os.close(db_fd)
         os.unlink(db_path)
+        # WAL mode leaves a write-ahead log and shared-memory file next to the database
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.unlink(db_path + suffix)
 
 @pytest.fixture(scope="session")
 def _db(app):
@@ -129,6 +133,22 @@ def db_session(app, _db):
             # Ensure the session itself is in a clean state before truncation.
             _db.session.rollback()
 
+            # Write queued audit rows and read markers, and apply unread recounts, before the wipe.
+            from utils.background_batcher import flush_all
+            flush_all()
+
+            # Table wipes bypass the ORM, so drop cached analytics explicitly.
+            from utils.announcement_cache import announcement_cache
+            from utils.calibration_scheduler import calibration_scheduler
+            from utils.kit_analytics import kit_analytics
+            from utils.procurement_analytics import procurement_analytics
+            from utils.unread_counters import unread_counters
+            announcement_cache.invalidate()
+            calibration_scheduler.reset()
+            kit_analytics.invalidate()
+            procurement_analytics.invalidate()
+            unread_counters.invalidate()
+
             # Use a dedicated transaction to wipe all tables so that data
             # created in one test never bleeds into the next one.
             engine = _db.engine
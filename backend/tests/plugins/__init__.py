@@ -0,0 +1 @@
+# Pytest plugins for the SupplyLine MRO Suite test suite
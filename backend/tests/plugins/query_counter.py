@@ -0,0 +1,184 @@
+"""
+Pytest plugin recording the SQL statements issued per request
+
+Provides the ``query_counter`` fixture, which captures every statement run
+on any of the app's engines (the SQLite read engine included), and the
+``query_budgets`` fixture, which loads the declarative budget file
+(tests/query_budgets.toml by default, ``--query-budgets`` to override).
+
+Each budget entry gives an endpoint's maximum statement count with 1 and
+with 100 seeded rows; ``check_query_budget`` also fails an entry whose count
+grows with the row count, which is how N+1 queries show up.
+
+``--query-report`` prints the measured counts after the run.
+"""
+
+import os
+import re
+import tomllib
+from collections import Counter
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+
+DEFAULT_BUDGET_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "query_budgets.toml")
+
+_measurements_key = pytest.StashKey[list]()
+
+# Literal values are replaced so repeated statements group together
+_LITERALS = re.compile(r"'[^']*'|\b\d+\b")
+
+
+class QueryBudget:
+    """One endpoint's entry in the budget file."""
+
+    def __init__(self, name, path, seed, one, hundred, method="GET", json=None, growth=0):
+        self.name = name
+        self.path = path
+        self.seed = seed
+        self.one = one
+        self.hundred = hundred
+        self.method = method
+        self.json = json
+        self.growth = growth
+
+    def __repr__(self):
+        return f"QueryBudget({self.name!r})"
+
+
+def load_query_budgets(path=DEFAULT_BUDGET_FILE):
+    """
+    Load the budget file.
+
+    Args:
+        path: TOML file with one ``[endpoints."<name>"]`` table per endpoint
+
+    Returns:
+        list of QueryBudget
+    """
+    with open(path, "rb") as f:
+        data = tomllib.load(f)
+    return [QueryBudget(name, **entry) for name, entry in data.get("endpoints", {}).items()]
+
+
+def repeated_statements(statements, limit=3):
+    """The most repeated statements (literals masked), for failure messages."""
+    counts = Counter(_LITERALS.sub("?", " ".join(statement.split())) for statement in statements)
+    return [f"{count}x {statement[:200]}" for statement, count in counts.most_common(limit) if count > 1]
+
+
+def check_query_budget(budget, one, hundred):
+    """
+    Compare measured statement lists against a budget entry.
+
+    Args:
+        budget: QueryBudget
+        one: Statements issued with 1 seeded row
+        hundred: Statements issued with 100 seeded rows
+
+    Returns:
+        list of failure messages (empty when within budget)
+    """
+    failures = []
+    if len(one) > budget.one:
+        failures.append(f"{budget.name}: {len(one)} queries with 1 row, budget {budget.one}")
+    if len(hundred) > budget.hundred:
+        failures.append(f"{budget.name}: {len(hundred)} queries with 100 rows, budget {budget.hundred}")
+    if len(hundred) - len(one) > budget.growth:
+        failures.append(
+            f"{budget.name}: query count scales with rows ({len(one)} -> {len(hundred)}); most repeated:\n  "
+            + "\n  ".join(repeated_statements(hundred))
+        )
+    return failures
+
+
+class QueryCounter:
+    """Captures the statements executed on a set of engines."""
+
+    def __init__(self, engines, measurements=None):
+        self.engines = list(engines)
+        self.measurements = measurements if measurements is not None else []
+
+    @contextmanager
+    def capture(self):
+        """Yield a list that collects the statements executed inside the block."""
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            for engine in self.engines:
+                event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    def call(self, func):
+        """
+        Run func and capture its statements.
+
+        Returns:
+            (result, statements)
+        """
+        with self.capture() as statements:
+            result = func()
+        return result, statements
+
+    def request(self, client, method, path, **kwargs):
+        """
+        Issue a test client request and capture its statements.
+
+        Returns:
+            (response, statements)
+        """
+        with self.capture() as statements:
+            response = client.open(path, method=method, **kwargs)
+        return response, statements
+
+    def record(self, budget, one, hundred):
+        """Keep a measurement for the ``--query-report`` summary."""
+        self.measurements.append((budget, len(one), len(hundred)))
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("query-counter", "SQL query budgets")
+    group.addoption("--query-budgets", default=DEFAULT_BUDGET_FILE, help="Query budget file (TOML)")
+    group.addoption("--query-report", action="store_true", help="Print measured query counts per endpoint")
+
+
+def pytest_configure(config):
+    config.stash[_measurements_key] = []
+
+
+@pytest.fixture
+def query_counter(app, request):
+    """QueryCounter over all of the app's engines."""
+    from models import db
+
+    with app.app_context():
+        engines = db.engines.values()
+    return QueryCounter(engines, request.config.stash[_measurements_key])
+
+
+@pytest.fixture(scope="session")
+def query_budgets(pytestconfig):
+    """Budget entries keyed by name."""
+    return {budget.name: budget for budget in load_query_budgets(pytestconfig.getoption("query_budgets"))}
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    measurements = config.stash.get(_measurements_key, [])
+    if not config.getoption("query_report") or not measurements:
+        return
+
+    terminalreporter.section("SQL queries per request")
+    width = max(len(budget.name) for budget, _one, _hundred in measurements)
+    terminalreporter.write_line(f"{'endpoint'.ljust(width)}  1 row  100 rows  budget")
+    for budget, one, hundred in measurements:
+        terminalreporter.write_line(
+            f"{budget.name.ljust(width)}  {one:>5}  {hundred:>8}  {budget.one}/{budget.hundred}"
+        )
@@ -0,0 +1,158 @@
+"""
+Tests for the asynchronous audit log writer, the recent-window read path
+and compressed archive segments.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import AuditLog, AuditLogSegment
+from utils.audit_writer import archive_audit_logs, get_audit_writer
+
+
+def _insert_logs(db_session, rows):
+    """Insert audit rows directly, bypassing the async writer"""
+    db_session.bulk_insert_mappings(AuditLog, rows, render_nulls=True)
+    db_session.commit()
+
+
+class TestAuditLogWriter:
+    """Tests for the session hook and background batch writer"""
+
+    def test_committed_logs_are_written_by_writer(self, db_session):
+        writer = get_audit_writer()
+        assert writer is not None
+
+        log = AuditLog(action_type="kit_created", action_details="Created kit: Kit-A")
+        db_session.add(log)
+        db_session.commit()
+
+        # The row left the request transaction and went to the writer queue
+        assert log.id is None
+        writer.flush()
+
+        rows = AuditLog.query.all()
+        assert [(row.action_type, row.action_details) for row in rows] == [("kit_created", "Created kit: Kit-A")]
+        assert rows[0].timestamp is not None
+
+    def test_rolled_back_logs_are_discarded(self, db_session):
+        db_session.add(AuditLog(action_type="kit_deleted", action_details="Deleted kit: Kit-B"))
+        db_session.flush()
+        db_session.rollback()
+
+        get_audit_writer().flush()
+
+        assert AuditLog.query.count() == 0
+
+    def test_batch_written_in_one_flush(self, db_session):
+        writer = get_audit_writer()
+        for index in range(50):
+            db_session.add(AuditLog(action_type="tool_updated", action_details=f"Updated tool {index}"))
+        db_session.commit()
+
+        writer.flush()
+
+        assert writer.pending_count() == 0
+        assert AuditLog.query.filter_by(action_type="tool_updated").count() == 50
+
+
+class TestAuditReadPath:
+    """Tests for the audit endpoints"""
+
+    def test_recent_window(self, client, db_session, auth_headers):
+        now = datetime.now()
+        _insert_logs(db_session, [
+            {"action_type": "checkout_tool", "action_details": "recent", "timestamp": now - timedelta(hours=1)},
+            {"action_type": "return_tool", "action_details": "last week", "timestamp": now - timedelta(days=6)},
+            {"action_type": "checkout_tool", "action_details": "old", "timestamp": now - timedelta(days=90)},
+        ])
+
+        response = client.get("/api/audit", query_string={"days": 7}, headers=auth_headers)
+
+        assert response.status_code == 200
+        assert [log["action_details"] for log in response.get_json()] == ["recent", "last week"]
+
+        response = client.get(
+            "/api/audit", query_string={"days": 7, "action_type": "return_tool"}, headers=auth_headers
+        )
+        assert [log["action_details"] for log in response.get_json()] == ["last week"]
+
+    def test_no_window_returns_all_rows(self, client, db_session, auth_headers):
+        now = datetime.now()
+        _insert_logs(db_session, [
+            {"action_type": "checkout_tool", "action_details": "recent", "timestamp": now - timedelta(hours=1)},
+            {"action_type": "checkout_tool", "action_details": "old", "timestamp": now - timedelta(days=400)},
+        ])
+
+        response = client.get("/api/audit", headers=auth_headers)
+        assert [log["action_details"] for log in response.get_json()] == ["recent", "old"]
+
+        response = client.get("/api/audit", query_string={"limit": 1}, headers=auth_headers)
+        assert [log["action_details"] for log in response.get_json()] == ["recent"]
+
+    def test_metrics_grouped_counts(self, client, db_session, auth_headers):
+        now = datetime.now()
+        _insert_logs(db_session, [
+            {"action_type": "checkout_tool", "action_details": None, "timestamp": now},
+            {"action_type": "checkout_tool", "action_details": None, "timestamp": now},
+            {"action_type": "user_login", "action_details": None, "timestamp": now},
+            {"action_type": "kit_created", "action_details": None, "timestamp": now},
+            {"action_type": "return_tool", "action_details": None, "timestamp": now - timedelta(days=20)},
+        ])
+
+        response = client.get("/api/audit/metrics", query_string={"timeframe": "week"}, headers=auth_headers)
+
+        data = response.get_json()
+        assert data["total_activity"] == 4
+        assert data["checkouts"] == 2
+        assert data["returns"] == 0
+        assert data["logins"] == 1
+
+
+class TestAuditArchive:
+    """Tests for archiving old audit rows into compressed segments"""
+
+    @pytest.fixture
+    def old_logs(self, db_session):
+        old = datetime.now() - timedelta(days=500)
+        month_start = old.replace(day=1, hour=12, minute=0, second=0, microsecond=0)
+        previous_month = (month_start - timedelta(days=1)).replace(day=1)
+        _insert_logs(db_session, [
+            {"action_type": "tool_retired", "action_details": f"Retired tool {index}",
+             "timestamp": month_start + timedelta(hours=index)}
+            for index in range(30)
+        ] + [
+            {"action_type": "user_login", "action_details": "Old login", "timestamp": previous_month},
+            {"action_type": "user_login", "action_details": "Current login", "timestamp": datetime.now()},
+        ])
+
+    def test_archives_old_rows_by_month(self, db_session, old_logs):
+        results = archive_audit_logs(retention_days=365)
+
+        assert results == {"segments_created": 2, "rows_archived": 31}
+        assert [log.action_details for log in AuditLog.query.all()] == ["Current login"]
+
+        segments = AuditLogSegment.query.order_by(AuditLogSegment.period_start).all()
+        assert [segment.row_count for segment in segments] == [1, 30]
+        rows = segments[1].read_rows()
+        assert rows[0]["action_details"] == "Retired tool 0"
+        assert len(segments[1].payload) < sum(len(row["action_details"]) for row in rows) * 2
+
+    def test_archive_batches_large_months(self, db_session, old_logs):
+        results = archive_audit_logs(retention_days=365, batch_size=20)
+
+        assert results == {"segments_created": 3, "rows_archived": 31}
+
+    def test_archive_endpoints(self, client, db_session, auth_headers, old_logs):
+        archive_audit_logs(retention_days=365)
+
+        response = client.get("/api/audit/archive", headers=auth_headers)
+        assert response.status_code == 200
+        segments = response.get_json()
+        assert [segment["row_count"] for segment in segments] == [30, 1]
+
+        response = client.get(f"/api/audit/archive/{segments[0]['id']}", headers=auth_headers)
+        assert len(response.get_json()["logs"]) == 30
+
+        assert client.get("/api/audit/archive/999999", headers=auth_headers).status_code == 404
@@ -0,0 +1,70 @@
+"""
+Tests for the shared background batcher in utils/background_batcher.py
+"""
+
+import threading
+
+from utils.background_batcher import BackgroundBatcher, flush_all
+
+
+class ListBatcher(BackgroundBatcher):
+    thread_name = "TestListBatcher"
+
+    def __init__(self, flush_interval=3600, batch_size=3):
+        super().__init__(flush_interval, batch_size)
+        self.items = []
+        self.flushed = []
+        self.flushed_event = threading.Event()
+
+    def add(self, item):
+        with self._lock:
+            self.items.append(item)
+            pending = len(self.items)
+        self._queued(pending)
+
+    def pending_count(self):
+        with self._lock:
+            return len(self.items)
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                items, self.items = self.items, []
+            if items:
+                self.flushed.append(items)
+                self.flushed_event.set()
+            return len(items)
+
+
+class TestBackgroundBatcher:
+    """The thread starts lazily, wakes at the batch size and flushes on stop"""
+
+    def test_batch_size_wakes_the_thread(self):
+        batcher = ListBatcher()
+        try:
+            batcher.add(1)
+            batcher.add(2)
+            assert batcher._thread.name == "TestListBatcher"
+            assert not batcher.flushed_event.wait(timeout=0.1)
+
+            batcher.add(3)
+
+            assert batcher.flushed_event.wait(timeout=2)
+            assert batcher.flushed == [[1, 2, 3]]
+        finally:
+            batcher.stop()
+
+    def test_stop_and_flush_all_apply_queued_items(self):
+        first, second = ListBatcher(), ListBatcher()
+        first.add("a")
+        second.add("b")
+
+        assert flush_all() >= 2
+        assert (first.flushed, second.flushed) == ([["a"]], [["b"]])
+
+        first.add("c")
+        first.stop()
+        second.stop()
+
+        assert first.flushed[-1] == ["c"]
+        assert not first._thread.is_alive()
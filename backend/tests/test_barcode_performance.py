@@ -0,0 +1,162 @@
+"""
+Barcode service microbenchmarks for SupplyLine MRO Suite
+
+Covers every label size and symbology:
+- Cold (first render) vs warm (cached) SVG generation
+- Compact PNG raster generation for thermal printers
+- Immutability of the per-size configuration table
+"""
+
+import time
+
+import pytest
+
+from utils.barcode_service import (
+    BARCODE_CONFIGS,
+    clear_barcode_cache,
+    generate_barcode_for_label,
+    generate_barcode_png_for_label,
+    generate_qr_code_for_label,
+    generate_qr_code_png_for_label,
+    get_barcode_cache_info,
+    get_barcode_config_for_size,
+)
+
+
+LABEL_SIZES = ["4x6", "3x4", "2x4", "2x2"]
+
+# Representative payloads that are valid for each symbology
+SYMBOLOGY_DATA = {
+    "CODE128": "T-1001-SN-884422",
+    "CODE39": "T1001-SN884422",
+    "EAN13": "400638133393",
+    "EAN8": "6583713",
+    "UPCA": "03600029145",
+}
+
+QR_DATA = "https://supplyline.example.com/tool-view/1001"
+
+ITERATIONS = 200
+
+
+def _time_calls(func, *args):
+    """Return average seconds per call over ITERATIONS calls."""
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        func(*args)
+    return (time.perf_counter() - start) / ITERATIONS
+
+
+@pytest.mark.performance
+class TestBarcodeGenerationBenchmarks:
+    """Microbenchmarks for cached barcode and QR code generation"""
+
+    def setup_method(self):
+        clear_barcode_cache()
+
+    @pytest.mark.parametrize("label_size", LABEL_SIZES)
+    @pytest.mark.parametrize("barcode_type", list(SYMBOLOGY_DATA))
+    def test_1d_barcode_svg_cached(self, label_size, barcode_type):
+        """Repeated 1D renders should be served from the cache"""
+        data = SYMBOLOGY_DATA[barcode_type]
+
+        start = time.perf_counter()
+        svg = generate_barcode_for_label(data, label_size, barcode_type)
+        cold = time.perf_counter() - start
+
+        warm = _time_calls(generate_barcode_for_label, data, label_size, barcode_type)
+
+        assert svg.lstrip().startswith("<?xml") or "<svg" in svg
+        assert generate_barcode_for_label(data, label_size, barcode_type) is svg
+        assert warm < cold, f"{barcode_type}/{label_size}: cached {warm * 1e6:.1f}us vs cold {cold * 1e6:.1f}us"
+
+    @pytest.mark.parametrize("label_size", LABEL_SIZES)
+    def test_qr_code_svg_cached(self, label_size):
+        """Repeated QR renders should be served from the cache"""
+        start = time.perf_counter()
+        svg = generate_qr_code_for_label(QR_DATA, label_size)
+        cold = time.perf_counter() - start
+
+        warm = _time_calls(generate_qr_code_for_label, QR_DATA, label_size)
+
+        assert "<svg" in svg
+        assert warm < cold, f"QR/{label_size}: cached {warm * 1e6:.1f}us vs cold {cold * 1e6:.1f}us"
+
+    @pytest.mark.parametrize("label_size", LABEL_SIZES)
+    @pytest.mark.parametrize("barcode_type", list(SYMBOLOGY_DATA))
+    def test_1d_barcode_png_raster(self, label_size, barcode_type):
+        """Raster output should be a compact PNG"""
+        pytest.importorskip("PIL")
+        data = SYMBOLOGY_DATA[barcode_type]
+
+        png = generate_barcode_png_for_label(data, label_size, barcode_type)
+        warm = _time_calls(generate_barcode_png_for_label, data, label_size, barcode_type)
+
+        assert png.startswith(b"\x89PNG")
+        assert len(png) < 8 * 1024
+        assert warm < 0.001
+
+    @pytest.mark.parametrize("label_size", LABEL_SIZES)
+    def test_qr_code_png_raster(self, label_size):
+        """QR raster output should be a compact PNG"""
+        png = generate_qr_code_png_for_label(QR_DATA, label_size)
+
+        assert png.startswith(b"\x89PNG")
+        assert len(png) < 8 * 1024
+
+    def test_qr_matrix_shared_between_formats(self):
+        """SVG and PNG output for the same data should encode the QR matrix once"""
+        generate_qr_code_for_label(QR_DATA, "4x6")
+        generate_qr_code_png_for_label(QR_DATA, "4x6")
+
+        info = get_barcode_cache_info()["make_qr_code"]
+        assert info["misses"] == 1
+        assert info["hits"] == 1
+
+
+class TestBarcodeConfigTable:
+    """Tests for the immutable per-size configuration table"""
+
+    @pytest.mark.parametrize("label_size", LABEL_SIZES)
+    def test_config_is_read_only(self, label_size):
+        config = get_barcode_config_for_size(label_size)
+
+        assert config is BARCODE_CONFIGS[label_size]
+        with pytest.raises(TypeError):
+            config["1d"]["module_width"] = 1.0
+
+    def test_unknown_size_falls_back_to_default(self):
+        assert get_barcode_config_for_size("9x9") is BARCODE_CONFIGS["4x6"]
+
+    def test_invalid_data_raises_value_error(self):
+        with pytest.raises(ValueError, match="EAN13"):
+            generate_barcode_for_label("not-numeric", "4x6", "EAN13")
+
+
+class TestRasterEndpoint:
+    """Tests for the thermal printer raster endpoint"""
+
+    def test_qr_raster(self, client, auth_headers):
+        response = client.get(
+            "/api/barcode/raster",
+            query_string={"data": QR_DATA, "code_type": "qrcode", "label_size": "2x2"},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 200
+        assert response.mimetype == "image/png"
+        assert response.data.startswith(b"\x89PNG")
+
+    def test_invalid_barcode_data(self, client, auth_headers):
+        response = client.get(
+            "/api/barcode/raster",
+            query_string={"data": "abc", "barcode_type": "EAN13"},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 400
+
+    def test_missing_data(self, client, auth_headers):
+        response = client.get("/api/barcode/raster", headers=auth_headers)
+
+        assert response.status_code == 400
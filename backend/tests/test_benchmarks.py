@@ -0,0 +1,107 @@
+"""
+Tests for the synthetic data generator and benchmark runner
+"""
+
+from benchmarks import (
+    FlaskClientTransport,
+    Scale,
+    Step,
+    compare_reports,
+    format_report,
+    generate_dataset,
+    run_scenario,
+)
+from benchmarks.runner import percentile, summarize
+from models import Chemical, InventoryTransaction, Tool
+from models_kits import Kit, KitItem
+
+
+TINY = Scale(tools=30, chemicals=40, transactions=100, kits=4)
+
+
+class TestDataGenerator:
+    """Tests for bulk synthetic data generation"""
+
+    def test_generates_linked_rows(self, db_session):
+        counts = generate_dataset(TINY)
+
+        assert counts["tools"] == 30
+        assert counts["inventory_transactions"] == 100
+        assert counts["kit_items"] == TINY.kits * TINY.items_per_kit
+        assert Chemical.query.filter(Chemical.lot_number.like("BENCH-%")).count() == 40
+
+        tool_ids = {tool_id for (tool_id,) in db_session.query(Tool.id)}
+        item_ids = {item_id for (item_id,) in db_session.query(KitItem.item_id)}
+        assert item_ids <= tool_ids
+        assert db_session.query(Kit).filter(Kit.name.like("BENCH-%")).count() == 4
+
+    def test_same_seed_same_data(self, db_session):
+        generate_dataset(TINY, seed=7, prefix="A-")
+        generate_dataset(TINY, seed=7, prefix="B-")
+
+        def descriptions(prefix):
+            return [d for (d,) in db_session.query(Tool.description)
+                    .filter(Tool.tool_number.like(f"{prefix}%")).order_by(Tool.id)]
+
+        assert descriptions("A-") == descriptions("B-")
+        assert InventoryTransaction.query.count() == 200
+
+
+class TestStatistics:
+    """Tests for percentile and regression arithmetic"""
+
+    def test_percentiles(self):
+        values = list(range(1, 101))
+        assert (percentile(values, 50), percentile(values, 95), percentile(values, 99)) == (50, 95, 99)
+        assert percentile([], 50) is None
+
+        summary = summarize([4.0, 1.0, 2.0, 3.0], errors=1, elapsed=2.0)
+        assert (summary["count"], summary["throughput"], summary["p50_ms"], summary["p99_ms"]) == (4, 2.0, 2.0, 4.0)
+
+    def test_compare_reports(self):
+        def report(p95, throughput, count=100):
+            return {"endpoints": {"tools.list": {"count": count, "p95_ms": p95, "p99_ms": p95,
+                                                 "throughput": throughput}}}
+
+        assert compare_reports(report(11.0, 95.0), report(10.0, 100.0)) == []
+        regressions = compare_reports(report(20.0, 50.0), report(10.0, 100.0))
+        assert {item["metric"] for item in regressions} == {"p95_ms", "p99_ms", "throughput"}
+        # A large ratio on a tiny latency is noise
+        assert compare_reports(report(0.5, 100.0), report(0.1, 100.0)) == []
+        assert compare_reports(report(20.0, 100.0), {"endpoints": {}}) == []
+        assert compare_reports(report(20.0, 50.0, count=5), report(10.0, 100.0)) == []
+
+
+class TestRunner:
+    """Tests for running scenarios through the test client"""
+
+    def test_runs_scenario_concurrently(self, app, db_session, admin_user, auth_headers):
+        generate_dataset(TINY)
+        scenario = (
+            Step("tools.list", "/api/tools?page={page}&per_page=50", weight=2),
+            Step("tools.detail", "/api/tools/{tool_id}"),
+            Step("kits.detail", "/api/kits/{kit_id}"),
+        )
+
+        report = run_scenario(FlaskClientTransport(app, auth_headers), scenario,
+                              workers=3, requests_per_worker=10, warmup=1)
+
+        assert report["total"]["count"] == 30
+        assert report["total"]["errors"] == 0
+        assert report["targets"]["tools"] == 30
+        for stats in report["endpoints"].values():
+            assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+        assert "No regressions" in format_report(report, compare_reports(report, report))
+
+    def test_failed_requests_are_errors(self, app, db_session, auth_headers):
+        report = run_scenario(FlaskClientTransport(app, auth_headers), [Step("missing", "/api/tools/999999")],
+                              workers=1, requests_per_worker=3, warmup=0)
+
+        assert report["endpoints"]["missing"]["errors"] == 3
+
+    def test_duration_bound_run(self, app, db_session, auth_headers):
+        report = run_scenario(FlaskClientTransport(app, auth_headers), [Step("health", "/api/health")],
+                              workers=2, duration=0.2, warmup=0)
+
+        assert report["total"]["count"] > 0
+        assert report["duration_seconds"] >= 0.2
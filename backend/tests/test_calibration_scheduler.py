@@ -0,0 +1,136 @@
+"""
+Tests for the calibration scheduler and the cached calibration notifications
+"""
+
+from datetime import timedelta
+
+import pytest
+
+from models import Tool, get_current_time
+from utils.calibration_scheduler import CalibrationScheduler, calibration_scheduler
+
+
+@pytest.fixture
+def calibrated_tools(db_session):
+    """Tools a year, 40 days, 10 days and -5 days from their next calibration"""
+    now = get_current_time()
+
+    def tool(number, due_in_days, status="current", requires=True):
+        return Tool(
+            tool_number=number, serial_number=f"SN-{number}", description=f"Tool {number}",
+            requires_calibration=requires, calibration_status=status,
+            next_calibration_date=now + timedelta(days=due_in_days),
+        )
+
+    tools = {
+        "year": tool("CAL-1", 365),
+        "forty": tool("CAL-2", 40),
+        "ten": tool("CAL-3", 10),
+        "late": tool("CAL-4", -5),
+        "exempt": tool("CAL-5", -5, status="not_applicable", requires=False),
+    }
+    db_session.add_all(tools.values())
+    db_session.commit()
+    return now, {name: t.id for name, t in tools.items()}
+
+
+def _statuses(tool_ids):
+    return {name: Tool.query.get(tool_id).calibration_status for name, tool_id in tool_ids.items()}
+
+
+class TestCalibrationScheduler:
+    """Tests for boundary-driven status transitions"""
+
+    def test_first_run_reconciles_every_tool(self, app, db_session, calibrated_tools):
+        now, tool_ids = calibrated_tools
+        scheduler = CalibrationScheduler()
+
+        with app.test_request_context():
+            results = scheduler.run(now)
+
+        assert results["full_reconcile"] is True
+        assert (results["overdue"], results["due_soon"]) == (1, 1)
+        db_session.expire_all()
+        assert _statuses(tool_ids) == {
+            "year": "current", "forty": "current", "ten": "due_soon", "late": "overdue", "exempt": "not_applicable",
+        }
+
+    def test_later_runs_only_touch_crossing_tools(self, app, db_session, calibrated_tools, query_counter):
+        now, tool_ids = calibrated_tools
+        scheduler = CalibrationScheduler()
+
+        with app.test_request_context():
+            scheduler.run(now)
+            results, statements = query_counter.call(lambda: scheduler.run(now + timedelta(days=11)))
+
+        assert results["full_reconcile"] is False
+        assert (results["overdue"], results["due_soon"]) == (1, 1)
+        updates = [s for s in statements if s.startswith("UPDATE tools")]
+        assert len(updates) == 2
+        assert all("next_calibration_date >=" in s for s in updates)
+        db_session.expire_all()
+        assert _statuses(tool_ids)["forty"] == "due_soon"
+        assert _statuses(tool_ids)["ten"] == "overdue"
+
+    def test_quiet_run_changes_nothing(self, app, calibrated_tools):
+        now, _ = calibrated_tools
+        scheduler = CalibrationScheduler()
+
+        with app.test_request_context():
+            scheduler.run(now)
+            results = scheduler.run(now + timedelta(hours=1))
+
+        assert (results["overdue"], results["due_soon"], results["current"]) == (0, 0, 0)
+
+    def test_next_boundary(self, app, calibrated_tools):
+        now, _ = calibrated_tools
+
+        with app.test_request_context():
+            boundary = CalibrationScheduler().next_boundary(now)
+
+        # The 40-day tool enters the due-soon window in 10 days, before the 10-day tool is overdue
+        assert boundary == now + timedelta(days=10)
+
+
+class TestCalibrationNotifications:
+    """Tests for /api/calibrations/notifications"""
+
+    def test_overdue_first(self, client, auth_headers, app, calibrated_tools):
+        now, _ = calibrated_tools
+        with app.test_request_context():
+            CalibrationScheduler().run(now)
+
+        data = client.get("/api/calibrations/notifications", headers=auth_headers).get_json()
+
+        assert [n["tool_number"] for n in data["notifications"]] == ["CAL-4", "CAL-3"]
+        assert (data["count"], data["overdue_count"], data["due_soon_count"]) == (2, 1, 1)
+        assert data["notifications"][1]["days_until_due"] in (9, 10)
+        assert data["notifications"][0]["priority"] == "high"
+
+    def test_cached_until_a_tool_changes(self, client, auth_headers, db_session, calibrated_tools, query_counter):
+        _, tool_ids = calibrated_tools
+        client.get("/api/calibrations/notifications", headers=auth_headers)
+
+        response, statements = query_counter.call(
+            lambda: client.get("/api/calibrations/notifications", headers=auth_headers)
+        )
+        # Statuses have not been reconciled yet, so nothing is flagged
+        assert response.get_json()["count"] == 0
+        assert not [s for s in statements if "FROM tools" in s]
+
+        tool = db_session.get(Tool, tool_ids["ten"])
+        tool.calibration_status = "due_soon"
+        db_session.commit()
+
+        assert client.get("/api/calibrations/notifications", headers=auth_headers).get_json()["count"] == 1
+
+    def test_unrelated_tool_update_keeps_cache(self, app, db_session, calibrated_tools):
+        _, tool_ids = calibrated_tools
+        with app.test_request_context():
+            calibration_scheduler.get_notifications()
+
+            tool = db_session.get(Tool, tool_ids["year"])
+            tool.location = "Hangar 2"
+            db_session.commit()
+
+            assert calibration_scheduler.invalidate() is True
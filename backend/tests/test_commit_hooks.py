@@ -0,0 +1,67 @@
+"""
+Tests for the shared commit hook in utils/commit_hooks.py
+"""
+
+import pytest
+
+from models import Tool
+from utils.commit_hooks import CHANGED, CommitHook
+
+
+@pytest.fixture
+def committed():
+    return []
+
+
+@pytest.fixture
+def make_hook(committed):
+    hooks = []
+
+    def make(key):
+        hook = CommitHook(key, committed.append)
+        hooks.append(hook)
+        return hook
+
+    yield make
+    for hook in hooks:
+        hook.remove()
+
+
+class TestCommitHook:
+    """Changes reach the callback only when their transaction commits"""
+
+    def test_commit_hands_over_the_record(self, db_session, make_hook, committed):
+        hook = make_hook("test_commit_hooks_keys")
+        hook.watch((Tool,), keys=lambda tool: {tool.tool_number})
+
+        db_session.add(Tool(tool_number="CH-1", serial_number="S1", description="Wrench"))
+        db_session.add(Tool(tool_number="CH-2", serial_number="S2", description="Driver"))
+        db_session.commit()
+
+        assert committed == [{"CH-1", "CH-2"}]
+
+    def test_rollback_drops_the_record(self, db_session, make_hook, committed):
+        hook = make_hook("test_commit_hooks_rollback")
+        hook.watch((Tool,))
+
+        db_session.add(Tool(tool_number="CH-3", serial_number="S3", description="Wrench"))
+        db_session.flush()
+        db_session.rollback()
+        db_session.commit()
+
+        assert committed == []
+        assert "test_commit_hooks_rollback" not in db_session.info
+
+    def test_updates_filtered_by_column(self, db_session, make_hook, committed):
+        tool = Tool(tool_number="CH-4", serial_number="S4", description="Wrench")
+        db_session.add(tool)
+        db_session.commit()
+        hook = make_hook("test_commit_hooks_columns")
+        hook.watch((Tool,), changed_columns=("next_calibration_date",))
+
+        tool.description = "Torque wrench"
+        db_session.commit()
+        tool.next_calibration_date = tool.created_at
+        db_session.commit()
+
+        assert committed == [{CHANGED}]
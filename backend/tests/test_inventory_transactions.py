@@ -0,0 +1,143 @@
+"""
+Tests for batched inventory transaction recording
+"""
+
+import pytest
+
+from models import InventoryTransaction, Tool, db
+from routes_inventory import MAX_BATCH_TRANSACTIONS
+from utils.transaction_helper import record_transactions_bulk
+
+
+@pytest.fixture
+def many_tools(db_session, test_warehouse):
+    """Create a set of tools with serial numbers"""
+    tools = [
+        Tool(
+            tool_number=f"CC{index:04d}",
+            serial_number=f"SN{index:04d}",
+            description="Cycle count tool",
+            condition="Good",
+            location="Crib A",
+            category="Testing",
+            warehouse_id=test_warehouse.id,
+            status="available",
+        )
+        for index in range(250)
+    ]
+    db_session.add_all(tools)
+    db_session.commit()
+    return tools
+
+
+class TestRecordTransactionsBulk:
+    """Tests for the vectorized transaction helper"""
+
+    def test_auto_detects_lot_and_serial_numbers(self, db_session, admin_user, sample_tool, sample_chemical):
+        created = record_transactions_bulk([
+            {"item_type": "tool", "item_id": sample_tool.id, "transaction_type": "adjustment"},
+            {"item_type": "chemical", "item_id": sample_chemical.id, "transaction_type": "adjustment",
+             "quantity_change": -2.0},
+            {"item_type": "tool", "item_id": sample_tool.id, "transaction_type": "adjustment",
+             "serial_number": "OVERRIDE"},
+        ], admin_user.id)
+        db_session.commit()
+
+        assert created == 3
+        rows = InventoryTransaction.query.order_by(InventoryTransaction.id).all()
+        assert [(row.lot_number, row.serial_number) for row in rows] == [
+            (None, "S001"),
+            ("L001", None),
+            (None, "OVERRIDE"),
+        ]
+        assert rows[1].quantity_change == -2.0
+        assert all(row.user_id == admin_user.id and row.timestamp is not None for row in rows)
+
+    def test_one_lookup_per_item_type(self, db_session, admin_user, many_tools, sample_chemical, query_counter):
+        transactions = [
+            {"item_type": "tool", "item_id": tool.id, "transaction_type": "adjustment"}
+            for tool in many_tools
+        ]
+        transactions.append({"item_type": "chemical", "item_id": sample_chemical.id, "transaction_type": "adjustment"})
+        user_id = admin_user.id
+
+        with query_counter.capture() as statements:
+            record_transactions_bulk(transactions, user_id)
+            db_session.flush()
+
+        selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+        inserts = [s for s in statements if s.lstrip().upper().startswith("INSERT")]
+        assert len(selects) == 2
+        assert len(inserts) == 1
+        assert InventoryTransaction.query.filter_by(serial_number="SN0249").count() == 1
+
+    def test_empty_input(self, admin_user):
+        assert record_transactions_bulk([], admin_user.id) == 0
+
+
+class TestBatchTransactionEndpoint:
+    """Tests for POST /api/inventory/transactions/batch"""
+
+    def test_creates_large_batch(self, client, auth_headers, many_tools):
+        transactions = [
+            {"item_type": "tool", "item_id": tool.id, "transaction_type": "adjustment", "notes": "Cycle count"}
+            for tool in many_tools
+        ] * 4
+
+        response = client.post(
+            "/api/inventory/transactions/batch",
+            json={"transactions": transactions},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 201
+        assert response.get_json()["created_count"] == 1000
+        assert InventoryTransaction.query.count() == 1000
+
+    def test_rejects_batches_over_cap(self, client, auth_headers):
+        transactions = [{"item_type": "tool", "item_id": 1, "transaction_type": "adjustment"}]
+        response = client.post(
+            "/api/inventory/transactions/batch",
+            json={"transactions": transactions * (MAX_BATCH_TRANSACTIONS + 1)},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 400
+
+    def test_missing_field_writes_nothing(self, client, auth_headers, sample_tool):
+        response = client.post(
+            "/api/inventory/transactions/batch",
+            json={"transactions": [
+                {"item_type": "tool", "item_id": sample_tool.id, "transaction_type": "adjustment"},
+                {"item_type": "tool", "item_id": sample_tool.id},
+            ]},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 400
+        assert InventoryTransaction.query.count() == 0
+
+    def test_string_item_ids_get_serial_numbers(self, client, auth_headers, sample_tool):
+        response = client.post(
+            "/api/inventory/transactions/batch",
+            json={"transactions": [
+                {"item_type": "tool", "item_id": str(sample_tool.id), "transaction_type": "adjustment"},
+            ]},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 201
+        transaction = InventoryTransaction.query.one()
+        assert transaction.item_id == sample_tool.id
+        assert transaction.serial_number == sample_tool.serial_number
+
+    @pytest.mark.parametrize("item_id", ["abc", 1.5, True, None])
+    def test_rejects_non_integer_item_ids(self, client, auth_headers, item_id):
+        response = client.post(
+            "/api/inventory/transactions/batch",
+            json={"transactions": [{"item_type": "tool", "item_id": item_id, "transaction_type": "adjustment"}]},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 400
+        assert InventoryTransaction.query.count() == 0
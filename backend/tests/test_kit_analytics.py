@@ -0,0 +1,163 @@
+"""
+Tests for the grouped, cached kit analytics service
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from models_kits import AircraftType, Kit, KitIssuance, KitReorderRequest, KitTransfer
+from utils import kit_analytics as kit_analytics_module
+from utils.kit_analytics import KitAnalyticsService, kit_analytics
+
+
+@pytest.fixture
+def fleet(db_session, admin_user):
+    """Three kits with issuances, transfers and reorders"""
+    aircraft_type = AircraftType(name="CRJ700", description="Analytics type")
+    db_session.add(aircraft_type)
+    db_session.flush()
+
+    kits = [
+        Kit(name=f"Analytics Kit {n}", aircraft_type_id=aircraft_type.id, created_by=admin_user.id)
+        for n in range(3)
+    ]
+    db_session.add_all(kits)
+    db_session.flush()
+    a, b, _ = kits
+    now = datetime.now()
+
+    def issuance(kit, days_ago):
+        return KitIssuance(kit_id=kit.id, item_type="expendable", item_id=1, issued_by=admin_user.id,
+                           quantity=1, issued_date=now - timedelta(days=days_ago))
+
+    def transfer(from_type, from_id, to_type, to_id, days_ago=1):
+        return KitTransfer(item_type="expendable", item_id=1, from_location_type=from_type,
+                           from_location_id=from_id, to_location_type=to_type, to_location_id=to_id,
+                           quantity=1, transferred_by=admin_user.id, transfer_date=now - timedelta(days=days_ago))
+
+    db_session.add_all([
+        issuance(a, 1), issuance(a, 2), issuance(a, 20), issuance(a, 60),
+        issuance(b, 3),
+        transfer("kit", a.id, "kit", b.id),
+        transfer("kit", a.id, "warehouse", 1),
+        transfer("warehouse", 1, "kit", b.id, days_ago=10),
+        transfer("warehouse", 1, "kit", b.id, days_ago=45),
+        KitReorderRequest(kit_id=a.id, item_type="expendable", part_number="P1", description="Pin",
+                          quantity_requested=1, requested_by=admin_user.id, status="pending"),
+        KitReorderRequest(kit_id=a.id, item_type="expendable", part_number="P2", description="Pin",
+                          quantity_requested=1, requested_by=admin_user.id, status="fulfilled",
+                          fulfillment_date=now - timedelta(days=2)),
+    ])
+    db_session.commit()
+    return kits
+
+
+class TestKitAnalyticsService:
+    """Tests for one-pass kit metrics"""
+
+    def test_metrics_per_kit(self, db_session, fleet):
+        a, b, c = fleet
+
+        metrics = kit_analytics.get_metrics([a.id, b.id, c.id], 30)
+
+        assert metrics["kits"][a.id] == {
+            "issuances": 3,
+            "transfers_in": 0,
+            "transfers_out": 2,
+            "pending_reorders": 1,
+            "fulfilled_reorders": 1,
+        }
+        assert metrics["kits"][b.id]["transfers_in"] == 2
+        assert metrics["kits"][c.id]["issuances"] == 0
+        assert metrics["transfers"] == {"kit_to_kit": 1, "kit_to_warehouse": 1, "warehouse_to_kit": 1, "total": 3}
+        assert [week["issuances"] for week in metrics["activity"]] == [0, 1, 0, 3]
+
+    def test_one_query_per_fact_table_and_cached(self, db_session, fleet, query_counter):
+        kit_ids = [kit.id for kit in fleet]
+
+        first, statements = query_counter.call(lambda: kit_analytics.get_metrics(kit_ids, 30))
+        assert len(statements) == 3
+
+        second, statements = query_counter.call(lambda: kit_analytics.get_metrics(kit_ids, 30))
+        assert statements == []
+        assert second is first
+
+    def test_committed_write_invalidates(self, db_session, admin_user, fleet):
+        a = fleet[0]
+        kit_id = a.id
+        assert kit_analytics.get_metrics([kit_id], 30)["kits"][kit_id]["issuances"] == 3
+
+        db_session.add(KitIssuance(kit_id=kit_id, item_type="tool", item_id=1,
+                                   issued_by=admin_user.id, quantity=1))
+        db_session.commit()
+
+        assert kit_analytics.get_metrics([kit_id], 30)["kits"][kit_id]["issuances"] == 4
+
+    def test_rolled_back_write_keeps_cache(self, db_session, admin_user, fleet):
+        kit_ids = [kit.id for kit in fleet]
+        first = kit_analytics.get_metrics(kit_ids, 30)
+
+        db_session.add(KitIssuance(kit_id=kit_ids[0], item_type="tool", item_id=1,
+                                   issued_by=admin_user.id, quantity=1))
+        db_session.flush()
+        db_session.rollback()
+
+        assert kit_analytics.get_metrics(kit_ids, 30) is first
+
+    def test_cache_is_bounded_lru_and_prunes_expired(self, db_session, fleet, monkeypatch):
+        monkeypatch.setattr(kit_analytics_module, "MAX_CACHE_ENTRIES", 2)
+        service = KitAnalyticsService()
+        a, b, c = (kit.id for kit in fleet)
+
+        service.get_metrics([a], 30)
+        service.get_metrics([b], 30)
+        service.get_metrics([a], 30)
+        service.get_metrics([c], 30)
+
+        assert list(service._cache) == [(frozenset([a]), 30), (frozenset([c]), 30)]
+
+        _, metrics = service._cache[(frozenset([a]), 30)]
+        service._cache[(frozenset([a]), 30)] = (0, metrics)
+        service.get_metrics([b], 7)
+
+        assert list(service._cache) == [(frozenset([c]), 30), (frozenset([b]), 7)]
+
+
+class TestKitAnalyticsRoutes:
+    """Tests for the analytics endpoints backed by the service"""
+
+    def test_kit_analytics(self, client, auth_headers, fleet):
+        response = client.get(f"/api/kits/{fleet[0].id}/analytics?days=30", headers=auth_headers)
+
+        data = response.get_json()
+        assert data["issuances"]["total"] == 3
+        assert data["transfers"] == {"incoming": 0, "outgoing": 2, "net": -2}
+        assert data["reorders"] == {"pending": 1, "fulfilled": 1}
+
+    def test_fleet_utilization(self, client, auth_headers, fleet):
+        response = client.get("/api/kits/analytics/utilization?days=30", headers=auth_headers)
+
+        data = response.get_json()
+        assert data["issuancesByKit"] == [
+            {"name": "Analytics Kit 0", "value": 3},
+            {"name": "Analytics Kit 1", "value": 1},
+        ]
+        assert [entry["value"] for entry in data["transfersByType"]] == [1, 1, 1]
+        assert data["summary"] == {
+            "totalIssuances": 4,
+            "totalTransfers": 3,
+            "activeKits": 3,
+            "avgUtilization": 66.7,
+        }
+
+    def test_fleet_utilization_query_count(self, client, auth_headers, fleet, query_counter):
+        client.get("/api/kits/analytics/utilization", headers=auth_headers)
+
+        response, statements = query_counter.call(
+            lambda: client.get("/api/kits/analytics/utilization", headers=auth_headers)
+        )
+
+        assert response.status_code == 200
+        kit_queries = [s for s in statements if "kit_issuances" in s or "kit_transfers" in s or "FROM kits" in s]
+        assert len(kit_queries) == 1
@@ -0,0 +1,88 @@
+"""
+Tests for the background service leader lock and gunicorn sizing
+"""
+
+import tempfile
+import threading
+
+import pytest
+
+from utils import leader_lock
+from utils.leader_lock import LeaderElection, LeaderLock, create_leader_lock
+from utils.server_sizing import thread_count
+
+
+pytestmark = pytest.mark.skipif(leader_lock.fcntl is None, reason="flock is not available on this platform")
+
+
+class TestLeaderLock:
+    """Tests for the exclusive file lock"""
+
+    def test_only_one_holder(self, tmp_path):
+        path = str(tmp_path / "leader.lock")
+        first, second = LeaderLock(path), LeaderLock(path)
+
+        assert first.try_acquire() is True
+        assert second.try_acquire() is False
+
+        first.release()
+        assert second.try_acquire() is True
+        second.release()
+
+    def test_default_file_is_outside_the_source_tree(self, app, monkeypatch):
+        monkeypatch.setitem(app.config, "LEADER_LOCK_FILE", None)
+        monkeypatch.setitem(app.config, "LEADER_LOCK_BACKEND", "file")
+
+        path = create_leader_lock(app).path
+
+        assert path.startswith(tempfile.gettempdir())
+        assert not path.startswith(app.instance_path)
+        monkeypatch.setitem(app.config, "SQLALCHEMY_DATABASE_URI", "sqlite:///other.db")
+        assert create_leader_lock(app).path != path
+
+
+class TestLeaderElection:
+    """Tests for starting singleton services in one process"""
+
+    def test_services_start_once_and_move_to_next_leader(self, app, tmp_path):
+        path = str(tmp_path / "leader.lock")
+        started = []
+        took_over = threading.Event()
+
+        def start_services(name):
+            def start(_app):
+                started.append(name)
+                if name == "second":
+                    took_over.set()
+            return start
+
+        first = LeaderElection(app, start_services("first"), LeaderLock(path), retry_seconds=0.05)
+        second = LeaderElection(app, start_services("second"), LeaderLock(path), retry_seconds=0.05)
+        first.start()
+        second.start()
+        try:
+            assert (first.is_leader, second.is_leader) == (True, False)
+            assert started == ["first"]
+
+            first.stop()
+
+            assert took_over.wait(timeout=2)
+            assert second.is_leader
+            assert started == ["first", "second"]
+        finally:
+            first.stop()
+            second.stop()
+
+
+class TestServerSizing:
+    """Tests for gunicorn thread counts"""
+
+    def test_threads_follow_database_pool(self):
+        postgres = {
+            "SQLALCHEMY_DATABASE_URI": "postgresql://db/supplyline",
+            "SQLALCHEMY_ENGINE_OPTIONS": {"pool_size": 10, "max_overflow": 20},
+        }
+        sqlite = {"SQLALCHEMY_DATABASE_URI": "sqlite:////database/tools.db", "SQLITE_WRITER_POOL_SIZE": 1}
+
+        assert thread_count(postgres, websocket_threads=50) == 80
+        assert thread_count(sqlite, websocket_threads=50) == 66
@@ -0,0 +1,150 @@
+"""
+Tests for the asynchronous logging pipeline
+"""
+
+import json
+import logging
+import queue
+import sys
+
+import pytest
+from flask import Flask
+
+from config import Config
+from utils.log_pipeline import (
+    AsyncQueueHandler,
+    FastJsonFormatter,
+    SamplingFilter,
+    init_logging,
+    parse_sample_rules,
+)
+
+
+JSON_FORMAT = "%(asctime)s %(name)s %(levelname)s %(message)s %(pathname)s %(lineno)d"
+
+
+def _record(msg="Request %s", args=("completed",), level=logging.INFO, **extra):
+    record = logging.LogRecord("requests", level, "/app/routes.py", 42, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestFastJsonFormatter:
+    """Tests for the pre-serialized JSON formatter"""
+
+    def test_fields_and_extras(self):
+        line = FastJsonFormatter(JSON_FORMAT).format(_record(status_code=200, user_id=None, path=object()))
+        data = json.loads(line)
+
+        assert data["message"] == "Request completed"
+        assert (data["name"], data["levelname"], data["lineno"]) == ("requests", "INFO", 42)
+        assert data["status_code"] == 200
+        assert data["user_id"] is None
+        assert data["path"].startswith("<object object")
+        assert len(data["asctime"]) == len("2026-10-18 12:00:00,000")
+
+    def test_exception(self):
+        try:
+            raise ValueError("bad row")
+        except ValueError:
+            record = logging.LogRecord("x", logging.ERROR, "", 0, "failed", None, sys.exc_info())
+
+        data = json.loads(FastJsonFormatter(JSON_FORMAT).format(record))
+
+        assert "ValueError: bad row" in data["exc_info"]
+
+
+class TestSampling:
+    """Tests for per-request sampling on hot routes"""
+
+    def test_parse_rules(self):
+        assert parse_sample_rules("/api/health=0.01, /api/me/unread=0.5,") == {
+            "/api/health": 0.01,
+            "/api/me/unread": 0.5,
+        }
+        with pytest.raises(ValueError, match="between 0 and 1"):
+            parse_sample_rules("/api/health=2")
+        with pytest.raises(ValueError, match="Invalid"):
+            parse_sample_rules("health=0.5")
+
+    def test_decision_is_per_request(self):
+        app = Flask(__name__)
+        decisions = iter([0.9, 0.05])
+        sampling = SamplingFilter({"/api/health": 0.1}, rng=lambda: next(decisions))
+
+        with app.test_request_context("/api/health"):
+            assert [sampling.filter(_record()) for _ in range(2)] == [False, False]
+            assert sampling.filter(_record(level=logging.WARNING)) is True
+        with app.test_request_context("/api/health"):
+            record = _record()
+            assert sampling.filter(record) is True
+            assert record.sample_rate == 0.1
+        with app.test_request_context("/api/tools"):
+            assert sampling.filter(_record()) is True
+
+    def test_outside_requests_pass(self):
+        assert SamplingFilter({"/": 0.0}).filter(_record()) is True
+
+
+class TestAsyncQueueHandler:
+    """Tests for handing records to the listener"""
+
+    def test_prepare_merges_message(self):
+        args = {"count": 1}
+        handler = AsyncQueueHandler(queue.Queue())
+        handler.handle(_record("counted %(count)s", (args,)))
+        args["count"] = 2
+
+        record = handler.queue.get_nowait()
+        assert record.getMessage() == "counted 1"
+
+    def test_full_queue_drops_low_level_records(self):
+        handler = AsyncQueueHandler(queue.Queue(maxsize=1))
+        handler.handle(_record())
+        handler.handle(_record())
+
+        assert handler.dropped == 1
+
+
+class TestLogPipeline:
+    """Tests for moving the root handlers behind a listener"""
+
+    @pytest.fixture
+    def log_file(self, tmp_path):
+        path = tmp_path / "app.log"
+        config = {
+            "LOGGING_CONFIG": {
+                "version": 1,
+                "disable_existing_loggers": False,
+                "formatters": {"json": {"class": "utils.log_pipeline.FastJsonFormatter", "format": JSON_FORMAT}},
+                "handlers": {"file": {"class": "logging.FileHandler", "formatter": "json", "filename": str(path)}},
+                "loggers": {"": {"handlers": ["file"], "level": "INFO"}},
+            },
+            "LOG_ASYNC": True,
+            "LOG_SAMPLE_RULES": "/api/health=0",
+        }
+        yield path, config
+        init_logging(Config)
+
+    def test_records_are_written_by_listener(self, log_file):
+        path, config = log_file
+        pipeline = init_logging(config)
+
+        assert logging.getLogger().handlers == [pipeline.handler]
+        logging.getLogger("requests").info("Request completed", extra={"status_code": 201})
+        pipeline.stop()
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert lines[-1]["status_code"] == 201
+
+    def test_sampled_route_is_not_written(self, log_file):
+        path, config = log_file
+        pipeline = init_logging(config)
+
+        with Flask(__name__).test_request_context("/api/health"):
+            logging.getLogger("requests").info("health check")
+            logging.getLogger("requests").error("health check failed")
+        pipeline.stop()
+
+        messages = [json.loads(line)["message"] for line in path.read_text().splitlines()]
+        assert messages == ["health check failed"]
@@ -0,0 +1,145 @@
+"""
+Tests for the metrics registry, cross-worker aggregation and /metrics
+"""
+
+import os
+
+import pytest
+
+from utils.metrics import (
+    AGGREGATE_MAX,
+    AGGREGATE_PER_WORKER,
+    Histogram,
+    MetricsExporter,
+    MetricsRegistry,
+    SnapshotStore,
+    merge_snapshots,
+    metrics_registry,
+    render_prometheus,
+)
+from utils.scheduler import IntervalSchedule, Job, JobScheduler
+
+
+def _registry():
+    registry = MetricsRegistry()
+    registry.counter("jobs_total", "Jobs", ("status",)).inc("ok", amount=2)
+    registry.gauge("queue_depth", "Depth").set(3)
+    registry.gauge("peak", "Peak", aggregate=AGGREGATE_MAX).set(7)
+    registry.gauge("rss", "RSS", aggregate=AGGREGATE_PER_WORKER).set(100)
+    histogram = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "a")
+    histogram.observe(0.5, "a")
+    return registry
+
+
+def _samples(snapshot, name):
+    return {tuple(labels): value for labels, value in snapshot[name]["samples"]}
+
+
+class TestRegistry:
+    """Tests for metric types and the text format"""
+
+    def test_histogram_quantiles_and_summary(self):
+        histogram = Histogram("duration_ms", "Duration", buckets=(10, 100))
+        for value in (1, 10, 50, 500):
+            histogram.observe(value)
+
+        assert [bucket["count"] for bucket in histogram.summary()["buckets"]] == [2, 3, 4]
+        assert histogram.summary()["sum"] == 561
+        assert histogram.quantile(0.5) == 10
+        assert histogram.quantile(0.75) == 100
+        assert histogram.quantile(1.0) == float("inf")
+        assert Histogram("empty", "Empty", buckets=(10,)).quantile(0.5) is None
+
+    def test_render_prometheus(self):
+        text = render_prometheus(_registry().snapshot())
+
+        assert '# TYPE jobs_total counter\njobs_total{status="ok"} 2\n' in text
+        assert "queue_depth 3\n" in text
+        assert 'latency_seconds_bucket{route="a",le="0.1"} 1\n' in text
+        assert 'latency_seconds_bucket{route="a",le="1.0"} 2\n' in text
+        assert 'latency_seconds_bucket{route="a",le="+Inf"} 2\n' in text
+        assert 'latency_seconds_count{route="a"} 2\n' in text
+
+    def test_labels_are_checked_and_escaped(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("errors_total", "Errors", ("message",))
+        counter.inc('bad "quote"\n')
+
+        with pytest.raises(ValueError, match="expects labels"):
+            counter.inc()
+        assert 'errors_total{message="bad \\"quote\\"\\n"} 1' in render_prometheus(registry.snapshot())
+
+    def test_kind_conflict(self):
+        registry = MetricsRegistry()
+        registry.counter("things", "Things")
+
+        with pytest.raises(ValueError, match="already registered"):
+            registry.gauge("things", "Things")
+
+
+class TestCrossWorkerAggregation:
+    """Tests for merging worker snapshots"""
+
+    def test_merge(self):
+        live, other, dead = (_registry().snapshot() for _ in range(3))
+        merged = merge_snapshots([(1, live), (2, other), (3, dead)], alive=lambda pid: pid != 3)
+
+        assert _samples(merged, "jobs_total") == {("ok",): 6}
+        assert _samples(merged, "latency_seconds") == {("a",): [[3, 3, 0], pytest.approx(1.65)]}
+        assert _samples(merged, "queue_depth") == {(): 6}
+        assert _samples(merged, "peak") == {(): 7}
+        assert _samples(merged, "rss") == {("1",): 100, ("2",): 100}
+        assert merged["rss"]["labels"] == ["pid"]
+
+    def test_exporter_writes_snapshots(self, tmp_path):
+        store = SnapshotStore(str(tmp_path))
+        MetricsExporter(_registry(), store).flush()
+        store.write({"stale": {}}, pid=99999)
+
+        ((pid, snapshot),) = store.read_all(exclude_pid=99999)
+        assert pid == os.getpid()
+        assert snapshot["jobs_total"]["samples"] == [[["ok"], 2]]
+
+        store.clear()
+        assert store.read_all() == []
+
+
+class TestMetricsEndpoint:
+    """Tests for the Prometheus scrape endpoint"""
+
+    def test_request_and_pool_metrics(self, app, client, auth_headers, monkeypatch):
+        monkeypatch.setitem(app.config, "METRICS_TOKEN", "scrape-secret")
+        client.get("/api/tools", headers=auth_headers)
+
+        response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+
+        assert response.status_code == 200
+        assert response.content_type.startswith("text/plain; version=0.0.4")
+        text = response.get_data(as_text=True)
+        assert 'http_requests_total{method="GET",endpoint="tools_route",status="200"}' in text
+        assert 'http_request_db_queries_bucket{method="GET",endpoint="tools_route",le="+Inf"}' in text
+        assert 'db_pool_connections{bind="default",state="checked_out"}' in text
+        assert 'process_stats{stat="resident_memory_bytes",pid="' in text
+
+    def test_token(self, app, client, monkeypatch):
+        monkeypatch.setitem(app.config, "METRICS_TOKEN", "scrape-secret")
+
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
+
+    def test_hidden_without_token(self, app, client, monkeypatch):
+        monkeypatch.setitem(app.config, "METRICS_TOKEN", None)
+
+        assert client.get("/metrics").status_code == 404
+        monkeypatch.setitem(app.config, "DEBUG", True)
+        assert client.get("/metrics").status_code == 200
+
+    def test_job_runs(self, app, db_session):
+        scheduler = JobScheduler(app)
+        scheduler.add_job(Job("metrics_probe", lambda: {"errors": {"step": "failed"}}, IntervalSchedule(60)))
+
+        scheduler.run_job("metrics_probe")
+
+        durations = _samples(metrics_registry.snapshot(), "scheduled_job_duration_seconds")
+        assert sum(durations[("metrics_probe", "failed")][0]) == 1
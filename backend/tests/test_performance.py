@@ -9,13 +9,24 @@ Tests critical performance aspects including:
 - Response time benchmarks
 """
 
+import logging
+import os
+import queue
+import tempfile
+import threading
 import time
 from datetime import datetime, timedelta
+from logging.handlers import QueueListener, RotatingFileHandler
 
 import pytest
+from pythonjsonlogger.jsonlogger import JsonFormatter
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
 
-from models import AuditLog, Chemical, InventoryTransaction, Tool, User
-from models_kits import AircraftType, Kit, KitExpendable, KitItem
+from models import AuditLog, Chemical, Expendable, InventoryTransaction, Tool, User, db
+from models_kits import AircraftType, Kit, KitBox, KitExpendable, KitItem, KitReorderRequest
+from utils.log_pipeline import AsyncQueueHandler, FastJsonFormatter
+from utils.sqlite_profile import install_pragmas, sqlite_pragmas
 
 
 @pytest.mark.performance
@@ -282,6 +293,169 @@ class TestQueryOptimization:
         assert elapsed < 0.5, f"Late pagination query took {elapsed:.2f}s, expected < 0.5s"
 
 
+@pytest.mark.performance
+@pytest.mark.api
+class TestKitListingPerformance:
+    """Benchmark the kit list endpoint with a large fleet"""
+
+    KIT_COUNT = 1000
+
+    @pytest.fixture
+    def fleet(self, db_session, admin_user):
+        aircraft_type = AircraftType(name="Q400 Fleet", description="Benchmark type")
+        db_session.add(aircraft_type)
+        db_session.flush()
+
+        db_session.bulk_insert_mappings(Kit, [
+            {
+                "name": f"Fleet Kit {i:04d}",
+                "aircraft_type_id": aircraft_type.id,
+                "status": "active",
+                "created_by": admin_user.id,
+            }
+            for i in range(self.KIT_COUNT)
+        ])
+        kit_ids = [kit_id for (kit_id,) in db_session.query(Kit.id).order_by(Kit.name)]
+
+        db_session.bulk_insert_mappings(KitBox, [
+            {"kit_id": kit_id, "box_number": f"Box{b}", "box_type": "expendable"}
+            for kit_id in kit_ids for b in range(3)
+        ])
+        db_session.bulk_insert_mappings(KitReorderRequest, [
+            {
+                "kit_id": kit_id,
+                "item_type": "expendable",
+                "part_number": "MS20995C32",
+                "description": "Safety wire",
+                "quantity_requested": 1,
+                "requested_by": admin_user.id,
+                "status": "pending",
+            }
+            for kit_id in kit_ids[::10]
+        ])
+        db_session.commit()
+        return kit_ids
+
+    def test_full_kit_list(self, client, auth_headers, fleet, query_counter):
+        """Listing 1k kits should take a constant number of queries"""
+        start_time = time.time()
+        response, statements = query_counter.call(lambda: client.get("/api/kits", headers=auth_headers))
+        elapsed = time.time() - start_time
+
+        assert response.status_code == 200
+        kits = response.get_json()
+        assert len(kits) == self.KIT_COUNT
+        assert kits[0]["box_count"] == 3
+        assert kits[0]["pending_reorders"] == 1
+        assert kits[0]["aircraft_type_name"] == "Q400 Fleet"
+        # Auth lookups plus the kit query and one grouped count query
+        assert len(statements) < 10, f"{len(statements)} queries for {self.KIT_COUNT} kits"
+        assert elapsed < 2.0, f"Kit list took {elapsed:.2f}s for {self.KIT_COUNT} kits"
+
+    def test_paginated_kit_list(self, client, auth_headers, fleet):
+        """A page of kits should be served quickly"""
+        start_time = time.time()
+        response = client.get("/api/kits", query_string={"page": 3, "per_page": 50}, headers=auth_headers)
+        elapsed = time.time() - start_time
+
+        data = response.get_json()
+        assert response.status_code == 200
+        assert len(data["kits"]) == 50
+        assert data["kits"][0]["name"] == "Fleet Kit 0100"
+        assert data["pagination"]["total"] == self.KIT_COUNT
+        assert elapsed < 0.5, f"Kit page took {elapsed:.2f}s"
+
+
+@pytest.mark.performance
+@pytest.mark.api
+class TestKitDetailPerformance:
+    """Benchmark opening a large kit"""
+
+    BOX_COUNT = 200
+    ITEMS_PER_BOX = 10
+
+    @pytest.fixture
+    def large_kit(self, db_session, admin_user):
+        aircraft_type = AircraftType(name="Q400 Detail", description="Benchmark type")
+        db_session.add(aircraft_type)
+        db_session.flush()
+        kit = Kit(name="Large Kit", aircraft_type_id=aircraft_type.id, created_by=admin_user.id)
+        db_session.add(kit)
+        db_session.flush()
+
+        db_session.bulk_insert_mappings(KitBox, [
+            {"kit_id": kit.id, "box_number": f"Box{b:03d}", "box_type": "expendable"}
+            for b in range(self.BOX_COUNT)
+        ])
+        box_ids = [box_id for (box_id,) in db_session.query(KitBox.id).filter_by(kit_id=kit.id)]
+
+        db_session.bulk_insert_mappings(Expendable, [
+            {"part_number": f"EXP-{i:05d}", "lot_number": f"LOT{i:05d}", "description": "Fastener",
+             "quantity": 0, "unit": "each", "status": "available"}
+            for i in range(self.BOX_COUNT * self.ITEMS_PER_BOX)
+        ])
+        expendable_ids = [exp_id for (exp_id,) in db_session.query(Expendable.id).order_by(Expendable.id)]
+
+        db_session.bulk_insert_mappings(KitItem, [
+            {"kit_id": kit.id, "box_id": box_ids[i % self.BOX_COUNT], "item_type": "expendable",
+             "item_id": expendable_id, "quantity": 10, "status": "available"}
+            for i, expendable_id in enumerate(expendable_ids)
+        ])
+        db_session.commit()
+        return kit.id, box_ids
+
+    def test_open_large_kit(self, client, auth_headers, large_kit, query_counter):
+        """All items of a 2k-item kit load in a constant number of queries"""
+        kit_id, _ = large_kit
+
+        start_time = time.time()
+        response, statements = query_counter.call(
+            lambda: client.get(f"/api/kits/{kit_id}/items", headers=auth_headers)
+        )
+        elapsed = time.time() - start_time
+
+        assert response.status_code == 200
+        assert response.get_json()["total_count"] == self.BOX_COUNT * self.ITEMS_PER_BOX
+        assert len(statements) < 10, f"{len(statements)} queries to open kit"
+        assert elapsed < 3.0, f"Opening kit took {elapsed:.2f}s"
+
+    def test_box_scoped_expansion(self, client, auth_headers, large_kit):
+        """Box list and a single box expand quickly"""
+        kit_id, box_ids = large_kit
+
+        start_time = time.time()
+        boxes = client.get(f"/api/kits/{kit_id}/boxes", headers=auth_headers).get_json()
+        items = client.get(f"/api/kits/{kit_id}/items?box_id={box_ids[0]}", headers=auth_headers).get_json()
+        elapsed = time.time() - start_time
+
+        assert len(boxes) == self.BOX_COUNT
+        assert all(box["item_count"] == self.ITEMS_PER_BOX for box in boxes)
+        assert items["total_count"] == self.ITEMS_PER_BOX
+        assert elapsed < 1.0, f"Box expansion took {elapsed:.2f}s"
+
+    def test_clone_large_kit(self, client, auth_headers, large_kit, query_counter):
+        """Cloning a 200-box kit into 10 kits runs one INSERT per table"""
+        kit_id, _ = large_kit
+        names = [f"Clone {n}" for n in range(10)]
+
+        start_time = time.time()
+        response, statements = query_counter.call(
+            lambda: client.post(f"/api/kits/{kit_id}/clone", json={"names": names}, headers=auth_headers)
+        )
+        elapsed = time.time() - start_time
+
+        assert response.status_code == 201
+        stats = response.get_json()["stats"]
+        assert stats["boxes_created"] == self.BOX_COUNT * len(names)
+        assert stats["slots_created"] == self.BOX_COUNT * self.ITEMS_PER_BOX * len(names)
+        # Audit rows are written by a background thread and may land in the window
+        inserts = [statement for statement in statements
+                   if statement.startswith("INSERT") and "audit_log" not in statement]
+        assert len(inserts) == 4, inserts
+        assert len(statements) < 15, f"{len(statements)} queries to clone kit"
+        assert elapsed < 5.0, f"Cloning kit took {elapsed:.2f}s"
+
+
 @pytest.mark.performance
 @pytest.mark.api
 class TestAPIResponseTimes:
@@ -448,3 +622,244 @@ class TestMemoryUsage:
             InventoryTransaction.notes == "Bulk issuance test"
         ).count()
         assert transaction_count == 50
+
+
+def _run_sqlite_workload(profile, writers=2, readers=4, writes_per_writer=150):
+    """Concurrent writer and reader threads against a fresh SQLite file under a profile."""
+    config = {"SQLITE_PROFILE": profile}
+    db_fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(db_fd)
+    url = f"sqlite:///{db_path}"
+    connect_args = {"check_same_thread": False}
+
+    if profile == "tuned":
+        writer = create_engine(url, connect_args=connect_args, pool_size=1, max_overflow=0, pool_timeout=30)
+        reader = create_engine(url, connect_args=connect_args)
+        install_pragmas(writer, sqlite_pragmas(config))
+        install_pragmas(reader, sqlite_pragmas(config, read_only=True))
+    else:
+        writer = reader = create_engine(url, connect_args=connect_args)
+
+    with writer.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, quantity INTEGER)"))
+        conn.execute(text("INSERT INTO items (name, quantity) VALUES ('seed', 0)"))
+
+    errors = []
+    reads = [0]
+    done = threading.Event()
+    lock = threading.Lock()
+
+    def write(worker):
+        for i in range(writes_per_writer):
+            try:
+                with writer.begin() as conn:
+                    conn.execute(text("INSERT INTO items (name, quantity) VALUES (:name, :quantity)"),
+                                 {"name": f"w{worker}-{i}", "quantity": i})
+                    conn.execute(text("UPDATE items SET quantity = quantity + 1 WHERE id = 1"))
+            except OperationalError as e:
+                with lock:
+                    errors.append(str(e.orig))
+
+    def read():
+        while not done.is_set():
+            try:
+                with reader.connect() as conn:
+                    conn.execute(text("SELECT COUNT(*), SUM(quantity) FROM items")).one()
+                with lock:
+                    reads[0] += 1
+            except OperationalError as e:
+                with lock:
+                    errors.append(str(e.orig))
+
+    reader_threads = [threading.Thread(target=read) for _ in range(readers)]
+    writer_threads = [threading.Thread(target=write, args=(n,)) for n in range(writers)]
+    start = time.perf_counter()
+    for thread in reader_threads + writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    for thread in reader_threads:
+        thread.join()
+
+    writer.dispose()
+    reader.dispose()
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(db_path + suffix):
+            os.unlink(db_path + suffix)
+
+    return {
+        "elapsed": elapsed,
+        "writes_per_second": writers * writes_per_writer / elapsed,
+        "reads_per_second": reads[0] / elapsed,
+        "locked_errors": sum(1 for error in errors if "locked" in error),
+        "errors": len(errors),
+    }
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestSQLiteProfileConcurrency:
+    """Benchmark the default SQLite settings against the tuned engine profile"""
+
+    def test_tuned_profile_under_concurrent_reads_and_writes(self):
+        default = _run_sqlite_workload("default")
+        tuned = _run_sqlite_workload("tuned")
+
+        for name, result in (("default", default), ("tuned", tuned)):
+            print(
+                f"\nSQLite {name}: {result['writes_per_second']:.0f} writes/s, "
+                f"{result['reads_per_second']:.0f} reads/s, {result['locked_errors']} locked errors"
+            )
+
+        assert tuned["errors"] == 0
+        assert tuned["reads_per_second"] > 0
+
+
+def _per_request_logging_overhead(handler, formatter, requests=2000, debug_lines=5):
+    """Mean microseconds a request thread spends logging a request's records through a handler."""
+    handler.setFormatter(formatter)
+    request_logger = logging.getLogger(f"benchmark.{id(handler)}")
+    request_logger.propagate = False
+    request_logger.setLevel(logging.DEBUG)
+    request_logger.addHandler(handler)
+
+    start = time.perf_counter()
+    for i in range(requests):
+        request_logger.info("Request started", extra={"correlation_id": f"req-{i}", "method": "GET",
+                                                      "path": "/api/tools", "user_id": 1})
+        for item in range(debug_lines):
+            request_logger.debug("Serialized tool %s", item, extra={"tool_id": item})
+        request_logger.info("Request completed", extra={"correlation_id": f"req-{i}", "status_code": 200,
+                                                        "duration_ms": 12.5})
+    elapsed = time.perf_counter() - start
+
+    request_logger.removeHandler(handler)
+    return elapsed / requests * 1_000_000
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestLoggingOverhead:
+    """Benchmark request-thread logging cost: synchronous JSON file handler against the queue pipeline"""
+
+    def test_queue_pipeline_takes_io_off_request_thread(self, tmp_path):
+        json_format = "%(asctime)s %(name)s %(levelname)s %(message)s %(pathname)s %(lineno)d"
+
+        sync_handler = RotatingFileHandler(tmp_path / "sync.log", maxBytes=10485760, backupCount=1)
+        sync = _per_request_logging_overhead(sync_handler, JsonFormatter(json_format))
+        sync_handler.close()
+
+        file_handler = RotatingFileHandler(tmp_path / "async.log", maxBytes=10485760, backupCount=1)
+        file_handler.setFormatter(FastJsonFormatter(json_format))
+        queue_handler = AsyncQueueHandler(queue.Queue(100000))
+        listener = QueueListener(queue_handler.queue, file_handler, respect_handler_level=True)
+        listener.start()
+        queued = _per_request_logging_overhead(queue_handler, None)
+        listener.stop()
+        file_handler.close()
+
+        print(f"\nPer-request logging: synchronous {sync:.0f}us, queued {queued:.0f}us")
+
+        assert queue_handler.dropped == 0
+        assert len((tmp_path / "async.log").read_text().splitlines()) == 2000 * 7
+        assert queued < sync
+
+
+def _rows_per_second(validate, rows, schema_name, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for row in rows:
+            validate(row, schema_name)
+    return len(rows) * repeat / (time.perf_counter() - start)
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestValidationThroughput:
+    """Benchmark bulk-import validation: interpreted schema passes against the compiled validators"""
+
+    def test_compiled_schemas_validate_rows_faster(self):
+        from tests.test_schema_compiler import interpret_schema
+        from utils.validation import validate_schema
+
+        tools = [{"tool_number": f"T-{i}", "serial_number": f"SN{i}", "description": f"Torque wrench & case {i}",
+                  "condition": "good", "location": "Bay 4", "category": "Hand"} for i in range(2000)]
+        chemicals = [{"part_number": f"P-{i}", "lot_number": f"L{i}", "quantity": i % 50 + 1, "unit": "each",
+                      "description": "Sealant <class B>", "manufacturer": "Acme", "location": "Cage 2",
+                      "expiration_date": "2030-06-01T00:00:00Z", "notes": "Keep cool"} for i in range(2000)]
+
+        for name, rows in (("tool", tools), ("chemical", chemicals)):
+            interpreted = _rows_per_second(interpret_schema, rows, name)
+            compiled = _rows_per_second(validate_schema, rows, name)
+            print(f"\n{name} rows/sec: interpreted {interpreted:,.0f}, compiled {compiled:,.0f}")
+
+            assert compiled > interpreted
+
+
+_LEGACY_SQL_PATTERNS = [
+    r"(\b(SELECT|INSERT|UPDATE|DELETE|DROP|CREATE|ALTER|EXEC|UNION)\b)",
+    r"(\b(OR|AND)\s+\d+\s*=\s*\d+)",
+    r"(\b(OR|AND)\s+['\"].*['\"])",
+    r"(--|#|/\*|\*/)",
+    r"(\bUNION\s+SELECT\b)",
+    r"(\bINTO\s+OUTFILE\b)",
+]
+_LEGACY_XSS_PATTERNS = [
+    r"<script[^>]*>.*?</script>", r"javascript:", r"on\w+\s*=", r"<iframe[^>]*>",
+    r"<object[^>]*>", r"<embed[^>]*>", r"<link[^>]*>", r"<meta[^>]*>",
+]
+
+
+def _legacy_scan(value, path="", findings=None):
+    """The per-pattern detectors, applied to every string of a payload"""
+    import re
+
+    findings = [] if findings is None else findings
+    if isinstance(value, dict):
+        for key, child in value.items():
+            _legacy_scan(child, f"{path}.{key}" if path else key, findings)
+    elif isinstance(value, list):
+        for index, child in enumerate(value):
+            _legacy_scan(child, f"{path}[{index}]", findings)
+    elif isinstance(value, str):
+        upper = value.upper()
+        if any(re.search(pattern, upper, re.IGNORECASE) for pattern in _LEGACY_SQL_PATTERNS):
+            findings.append((path, "SQL injection"))
+        if any(re.search(pattern, value, re.IGNORECASE) for pattern in _LEGACY_XSS_PATTERNS):
+            findings.append((path, "XSS attempt"))
+    return findings
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestThreatScanOverhead:
+    """Benchmark request threat scanning: per-pattern searches against the combined patterns"""
+
+    def test_compiled_scanner_is_cheaper(self):
+        from security.middleware import scan_json
+
+        payloads = {
+            "chemical": {"part_number": "PR-1422", "lot_number": "L-2291", "quantity": 12, "unit": "each",
+                         "description": "Sealant, two-part, 3.5 oz cartridge", "manufacturer": "PPG Aerospace",
+                         "location": "Cage 2, shelf B", "expiration_date": "2027-03-01T00:00:00Z"},
+            "order": {"title": "Restock hangar 3", "priority": "high", "notes": "Deliver to receiving dock",
+                      "items": [{"part_number": f"AN{i}-4", "description": f"Bolt, hex head {i}/16",
+                                 "quantity": i, "unit": "each", "notes": "Replace worn stock"} for i in range(50)]},
+            "attack": {"employee_number": "admin' OR '1'='1' --", "password": "<script>alert(1)</script>",
+                       "profile": {"bio": "<img src=x onerror=alert(1)>", "tags": ["1; DROP TABLE users"]}},
+        }
+
+        for name, payload in payloads.items():
+            assert scan_json(payload)[0] == _legacy_scan(payload)
+
+            timings = {}
+            for label, scan in (("legacy", _legacy_scan), ("compiled", lambda p: scan_json(p)[0])):
+                start = time.perf_counter()
+                for _ in range(200):
+                    scan(payload)
+                timings[label] = (time.perf_counter() - start) / 200 * 1_000_000
+            print(f"\n{name} payload scan: legacy {timings['legacy']:.0f}us, compiled {timings['compiled']:.0f}us")
+
+            assert timings["compiled"] < timings["legacy"]
@@ -0,0 +1,119 @@
+"""
+Tests for the grouped, cached order and user request analytics
+"""
+
+from datetime import timedelta
+
+import pytest
+
+from models import ProcurementOrder, RequestItem, UserRequest, get_current_time
+
+
+@pytest.fixture
+def orders(db_session, admin_user):
+    """Open, late, due-soon and closed orders spread over two months"""
+    now = get_current_time()
+
+    def order(title, status="new", order_type="tool", priority="normal", due_in=None, age_days=0):
+        return ProcurementOrder(
+            title=title, status=status, order_type=order_type, priority=priority,
+            requester_id=admin_user.id, created_at=now - timedelta(days=age_days, hours=1),
+            expected_due_date=now + timedelta(days=due_in) if due_in is not None else None,
+        )
+
+    db_session.add_all([
+        order("Late pump", status="ordered", due_in=-2, age_days=10),
+        order("Due soon seals", due_in=2, age_days=4, priority="high"),
+        order("Later wrench", status="shipped", due_in=40, order_type="chemical", age_days=1),
+        order("No due date"),
+        order("Received late", status="received", due_in=-5, age_days=30),
+        order("Cancelled", status="cancelled", due_in=1, age_days=50),
+    ])
+    db_session.commit()
+    return now
+
+
+@pytest.fixture
+def user_requests(db_session, admin_user, test_user):
+    """Requests from two users with items in several statuses"""
+    mine = UserRequest(title="Shop supplies", priority="high", status="new", requester_id=test_user.id)
+    other = UserRequest(title="Hangar supplies", status="ordered", requester_id=admin_user.id)
+    db_session.add_all([mine, other])
+    db_session.flush()
+    db_session.add_all([
+        RequestItem(request_id=mine.id, description="Gloves", status="pending"),
+        RequestItem(request_id=mine.id, description="Rags", status="ordered"),
+        RequestItem(request_id=other.id, description="Sealant", status="ordered"),
+    ])
+    db_session.commit()
+
+
+class TestOrderAnalytics:
+    """Tests for /api/orders/analytics"""
+
+    def test_grouped_counts(self, client, auth_headers, orders):
+        response = client.get("/api/orders/analytics", headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["status_breakdown"] == [
+            {"status": "cancelled", "count": 1},
+            {"status": "new", "count": 2},
+            {"status": "ordered", "count": 1},
+            {"status": "received", "count": 1},
+            {"status": "shipped", "count": 1},
+        ]
+        assert data["type_breakdown"] == [{"type": "chemical", "count": 1}, {"type": "tool", "count": 5}]
+        assert data["priority_breakdown"] == [{"priority": "high", "count": 1}, {"priority": "normal", "count": 5}]
+        assert data["total_open"] == 4
+        assert data["late_count"] == 1
+        assert data["due_soon_count"] == 1
+        assert data["average_open_days"] == (10 + 4 + 1 + 0) / 4
+        assert sum(month["count"] for month in data["orders_per_month"]) == 5
+        assert data["orders_per_month"][-1]["month"] == (orders + timedelta(days=40)).strftime("%Y-%m")
+
+    def test_query_count_independent_of_rows(self, client, auth_headers, orders, query_counter):
+        response, statements = query_counter.call(
+            lambda: client.get("/api/orders/analytics", headers=auth_headers)
+        )
+        analytics = [statement for statement in statements if "procurement_orders" in statement]
+
+        assert response.status_code == 200
+        assert len(analytics) == 2
+
+    def test_cache_cleared_by_commit(self, client, auth_headers, db_session, orders, admin_user, query_counter):
+        assert client.get("/api/orders/analytics", headers=auth_headers).get_json()["total_open"] == 4
+
+        # Cached: the repeat request does not touch procurement_orders
+        _, statements = query_counter.call(lambda: client.get("/api/orders/analytics", headers=auth_headers))
+        assert not [statement for statement in statements if "procurement_orders" in statement]
+
+        db_session.add(ProcurementOrder(title="New order", requester_id=admin_user.id))
+        db_session.commit()
+
+        assert client.get("/api/orders/analytics", headers=auth_headers).get_json()["total_open"] == 5
+
+
+class TestUserRequestAnalytics:
+    """Tests for /api/user-requests/analytics"""
+
+    def test_all_requests(self, client, auth_headers, user_requests):
+        response = client.get("/api/user-requests/analytics", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.get_json() == {
+            "total_requests": 2,
+            "total_items": 3,
+            "by_status": {"new": 1, "ordered": 1},
+            "by_priority": {"high": 1, "normal": 1},
+            "items_by_status": {"pending": 1, "ordered": 2},
+        }
+
+    def test_own_requests_only(self, app, user_requests, test_user):
+        from utils.procurement_analytics import procurement_analytics
+
+        with app.test_request_context():
+            data = procurement_analytics.get_request_analytics(test_user.id)
+
+        assert data["total_requests"] == 1
+        assert data["items_by_status"] == {"pending": 1, "ordered": 1}
@@ -0,0 +1,159 @@
+"""
+N+1 query regression tests for list endpoints
+
+Each entry in tests/query_budgets.toml is requested with 1 and then 100
+seeded rows; the statement counts must stay within the entry's budgets and
+must not grow with the row count. Run with ``--query-report`` to see the
+measured counts.
+"""
+
+import pytest
+
+from models import (
+    Announcement,
+    Chemical,
+    InventoryTransaction,
+    ProcurementOrder,
+    Tool,
+    UserRequest,
+    Warehouse,
+)
+from models_kits import AircraftType, Kit, KitReorderRequest, KitTransfer
+from tests.plugins.query_counter import check_query_budget, load_query_budgets
+
+
+HISTORY_TOOL_NUMBER = "QB-HIST"
+HISTORY_SERIAL_NUMBER = "QB-HIST-SN"
+
+
+class SeedContext:
+    """Parent rows shared by the seeders of one test."""
+
+    def __init__(self, db_session, user, warehouse):
+        self.session = db_session
+        self.user = user
+        self.warehouse = warehouse
+        self._kit = None
+        self._tool = None
+
+    @property
+    def kit(self):
+        if self._kit is None:
+            aircraft_type = AircraftType(name="Query Budget Type", description="Query budget tests")
+            self.session.add(aircraft_type)
+            self.session.flush()
+            self._kit = Kit(name="Query Budget Kit", aircraft_type_id=aircraft_type.id,
+                            created_by=self.user.id, status="active")
+            self.session.add(self._kit)
+            self.session.flush()
+        return self._kit
+
+    @property
+    def tool(self):
+        if self._tool is None:
+            self._tool = Tool(tool_number=HISTORY_TOOL_NUMBER, serial_number=HISTORY_SERIAL_NUMBER,
+                              description="History tool", condition="Good", location="Bin H",
+                              category="Testing", status="available", warehouse_id=self.warehouse.id)
+            self.session.add(self._tool)
+            self.session.flush()
+        return self._tool
+
+
+def _seed_tools(ctx, rows):
+    return [Tool(tool_number=f"QB{i:04d}", serial_number=f"QBS{i:04d}", description=f"Budget tool {i}",
+                 condition="Good", location=f"Bin {i % 10}", category="Testing", status="available",
+                 warehouse_id=ctx.warehouse.id) for i in rows]
+
+
+def _seed_chemicals(ctx, rows):
+    return [Chemical(part_number=f"QC{i:04d}", lot_number=f"QL{i:04d}", description=f"Budget chemical {i}",
+                     manufacturer="Budget Co", quantity=10, unit="ml", location=f"Shelf {i % 10}",
+                     category="Testing", status="available", warehouse_id=ctx.warehouse.id) for i in rows]
+
+
+def _seed_kits(ctx, rows):
+    aircraft_type_id = ctx.kit.aircraft_type_id
+    return [Kit(name=f"Budget Kit {i:04d}", aircraft_type_id=aircraft_type_id, created_by=ctx.user.id,
+                status="active") for i in rows]
+
+
+def _seed_warehouses(ctx, rows):
+    return [Warehouse(name=f"Budget Warehouse {i:04d}", created_by_id=ctx.user.id) for i in rows]
+
+
+def _seed_orders(ctx, rows):
+    return [ProcurementOrder(title=f"Budget order {i}", order_type="tool", requester_id=ctx.user.id,
+                             buyer_id=ctx.user.id, kit_id=ctx.kit.id) for i in rows]
+
+
+def _seed_user_requests(ctx, rows):
+    return [UserRequest(title=f"Budget request {i}", requester_id=ctx.user.id, buyer_id=ctx.user.id)
+            for i in rows]
+
+
+def _seed_reorders(ctx, rows):
+    return [KitReorderRequest(kit_id=ctx.kit.id, item_type="expendable", part_number=f"QR{i:04d}",
+                              description=f"Budget reorder {i}", quantity_requested=1,
+                              requested_by=ctx.user.id) for i in rows]
+
+
+def _seed_kit_transfers(ctx, rows):
+    return [KitTransfer(item_type="tool", item_id=i, from_location_type="warehouse",
+                        from_location_id=ctx.warehouse.id, to_location_type="kit", to_location_id=ctx.kit.id,
+                        quantity=1, transferred_by=ctx.user.id) for i in rows]
+
+
+def _seed_announcements(ctx, rows):
+    return [Announcement(title=f"Budget announcement {i}", content="Body", created_by=ctx.user.id)
+            for i in rows]
+
+
+def _seed_history(ctx, rows):
+    return [InventoryTransaction(item_type="tool", item_id=ctx.tool.id, transaction_type="adjustment",
+                                 user_id=ctx.user.id, notes=f"Budget event {i}") for i in rows]
+
+
+SEEDERS = {
+    "tools": _seed_tools,
+    "chemicals": _seed_chemicals,
+    "kits": _seed_kits,
+    "warehouses": _seed_warehouses,
+    "orders": _seed_orders,
+    "user_requests": _seed_user_requests,
+    "reorders": _seed_reorders,
+    "kit_transfers": _seed_kit_transfers,
+    "announcements": _seed_announcements,
+    "history": _seed_history,
+}
+
+BUDGETS = load_query_budgets()
+
+
+def test_every_budget_has_a_seeder():
+    assert {budget.seed for budget in BUDGETS} <= set(SEEDERS)
+
+
+@pytest.mark.performance
+@pytest.mark.api
+@pytest.mark.parametrize("budget", BUDGETS, ids=[budget.name for budget in BUDGETS])
+def test_query_count_does_not_scale_with_rows(budget, client, db_session, admin_user, auth_headers,
+                                              test_warehouse, query_counter):
+    ctx = SeedContext(db_session, admin_user, test_warehouse)
+    seed = SEEDERS[budget.seed]
+
+    def measure(rows):
+        db_session.add_all(seed(ctx, rows))
+        db_session.commit()
+        # Start each request from an empty identity map, as a real request would
+        db_session.expire_all()
+        response, statements = query_counter.request(client, budget.method, budget.path,
+                                                     headers=auth_headers, json=budget.json)
+        assert response.status_code == 200, response.get_data(as_text=True)
+        return statements
+
+    one = measure(range(1))
+    hundred = measure(range(1, 100))
+    query_counter.record(budget, one, hundred)
+
+    failures = check_query_budget(budget, one, hundred)
+    assert not failures, "\n".join(failures)
@@ -0,0 +1,81 @@
+"""
+Tests for per-request query counting, Server-Timing headers and request metrics
+"""
+
+import re
+
+import pytest
+
+from utils import request_metrics as request_metrics_module
+from utils.request_metrics import get_request_metrics
+
+
+SERVER_TIMING = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries", app;dur=[\d.]+')
+
+
+@pytest.fixture
+def metrics():
+    registry = get_request_metrics()
+    registry.reset()
+    yield registry
+    registry.reset()
+
+
+class TestRequestInstrumentation:
+    """Tests for the per-request hooks"""
+
+    def test_server_timing_counts_queries(self, client, auth_headers, metrics):
+        response = client.get("/api/tools", headers=auth_headers)
+
+        assert response.status_code == 200
+        match = SERVER_TIMING.fullmatch(response.headers["Server-Timing"])
+        assert match and int(match.group(1)) > 0
+
+        (stats,) = [item for item in metrics.snapshot() if item["endpoint"] == "tools_route"]
+        assert stats["count"] == 1
+        assert stats["max_queries"] == int(match.group(1))
+
+    def test_over_budget_is_logged_and_counted(self, app, client, auth_headers, metrics, monkeypatch):
+        warnings = []
+        monkeypatch.setattr(request_metrics_module.logger, "warning",
+                            lambda *_args, **kwargs: warnings.append(kwargs["extra"]))
+        monkeypatch.setitem(app.config, "QUERY_BUDGET_PER_REQUEST", 1)
+
+        client.get("/api/tools", headers=auth_headers)
+
+        assert warnings and warnings[0]["query_budget"] == 1
+        (stats,) = [item for item in metrics.snapshot() if item["endpoint"] == "tools_route"]
+        assert stats["over_budget"] == 1
+
+    def test_unmatched_routes_share_one_entry(self, client, metrics):
+        client.get("/api/no-such-route-1")
+        client.get("/api/no-such-route-2")
+
+        (stats,) = metrics.snapshot()
+        assert (stats["endpoint"], stats["count"]) == ("<unmatched>", 2)
+
+
+class TestMetricsRoutes:
+    """Tests for the admin request metrics endpoint"""
+
+    def test_admin_sees_endpoint_stats(self, client, auth_headers, metrics):
+        client.get("/api/tools", headers=auth_headers)
+
+        data = client.get("/api/admin/metrics/requests?sort=max_queries", headers=auth_headers).get_json()
+
+        endpoints = {item["endpoint"]: item for item in data["endpoints"]}
+        assert endpoints["tools_route"]["query_histogram"]["count"] == 1
+        assert data["query_budget"] == 25
+
+    def test_reset(self, client, auth_headers, metrics):
+        client.get("/api/tools", headers=auth_headers)
+
+        assert client.delete("/api/admin/metrics/requests", headers=auth_headers).status_code == 200
+        assert [item["endpoint"] for item in metrics.snapshot()] == ["reset_request_metrics"]
+
+    def test_invalid_sort(self, client, auth_headers):
+        response = client.get("/api/admin/metrics/requests?sort=nope", headers=auth_headers)
+        assert response.status_code == 400
+
+    def test_admin_only(self, client, user_auth_headers):
+        assert client.get("/api/admin/metrics/requests", headers=user_auth_headers).status_code == 403
@@ -0,0 +1,137 @@
+"""
+Tests for announcement listing and read state
+"""
+
+import time
+from datetime import timedelta
+
+import pytest
+
+from models import Announcement, AnnouncementRead, get_current_time
+from utils.announcement_cache import announcement_cache
+from utils.unread_counters import unread_counters
+
+
+@pytest.fixture
+def announcements(db_session, admin_user):
+    """Five active announcements, one expired and one inactive"""
+    now = get_current_time()
+    rows = [
+        Announcement(title=f"Notice {i}", content="Details", priority="high" if i % 2 else "low",
+                     created_by=admin_user.id, created_at=now - timedelta(hours=i))
+        for i in range(5)
+    ]
+    rows += [
+        Announcement(title="Expired", content="Old", created_by=admin_user.id,
+                     expiration_date=now - timedelta(days=1)),
+        Announcement(title="Inactive", content="Hidden", created_by=admin_user.id, is_active=False),
+    ]
+    db_session.add_all(rows)
+    db_session.commit()
+    return [row.id for row in rows]
+
+
+class TestAnnouncementList:
+    """Tests for GET /api/announcements"""
+
+    def test_active_page(self, client, auth_headers, announcements):
+        response = client.get("/api/announcements?limit=2&page=2", headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["total"] == 5
+        assert data["pages"] == 3
+        assert [a["title"] for a in data["announcements"]] == ["Notice 2", "Notice 3"]
+        assert all(a["read"] is False and a["author_name"] for a in data["announcements"])
+
+    def test_priority_filter(self, client, auth_headers, announcements):
+        data = client.get("/api/announcements?priority=high", headers=auth_headers).get_json()
+
+        assert [a["title"] for a in data["announcements"]] == ["Notice 1", "Notice 3"]
+
+    def test_inactive_listed_on_request(self, client, auth_headers, announcements):
+        data = client.get("/api/announcements?active_only=false", headers=auth_headers).get_json()
+
+        assert data["total"] == 7
+
+    def test_active_set_is_cached(self, client, auth_headers, announcements, query_counter):
+        client.get("/api/announcements", headers=auth_headers)
+
+        response, statements = query_counter.call(lambda: client.get("/api/announcements", headers=auth_headers))
+
+        assert response.status_code == 200
+        assert not [s for s in statements if "announcement" in s]
+
+    def test_cache_cleared_by_new_announcement(self, client, auth_headers, db_session, announcements, admin_user):
+        client.get("/api/announcements", headers=auth_headers)
+
+        db_session.add(Announcement(title="Breaking", content="News", created_by=admin_user.id))
+        db_session.commit()
+
+        data = client.get("/api/announcements", headers=auth_headers).get_json()
+        assert data["total"] == 6
+        assert data["announcements"][0]["title"] == "Breaking"
+
+    def test_expired_announcement_drops_out(self, app, db_session, admin_user):
+        db_session.add(Announcement(title="Soon gone", content="Hurry", created_by=admin_user.id,
+                                    expiration_date=get_current_time() + timedelta(milliseconds=300)))
+        db_session.commit()
+
+        with app.test_request_context():
+            assert len(announcement_cache.get_active().ids) == 1
+            time.sleep(0.4)
+            assert not announcement_cache.get_active().ids
+
+
+class TestMarkRead:
+    """Tests for marking announcements read"""
+
+    def test_mark_one_is_idempotent(self, client, auth_headers, announcements, admin_user):
+        url = f"/api/announcements/{announcements[0]}/read"
+
+        assert client.post(url, headers=auth_headers).get_json()["message"] == "Announcement marked as read"
+        assert client.post(url, headers=auth_headers).get_json()["message"] == (
+            "Announcement already marked as read"
+        )
+        assert AnnouncementRead.query.filter_by(user_id=admin_user.id).count() == 1
+
+        listed = client.get("/api/announcements", headers=auth_headers).get_json()["announcements"]
+        assert [a["read"] for a in listed] == [True, False, False, False, False]
+
+    def test_mark_batch(self, client, auth_headers, announcements, admin_user, query_counter):
+        client.post(f"/api/announcements/{announcements[1]}/read", headers=auth_headers)
+
+        response, statements = query_counter.call(lambda: client.post(
+            "/api/announcements/read", json={"announcement_ids": announcements[:3]}, headers=auth_headers
+        ))
+
+        assert response.status_code == 200
+        assert response.get_json() == {"marked_read": [announcements[0], announcements[2]], "count": 2}
+        assert len([s for s in statements if s.startswith("INSERT INTO announcement_reads")]) == 1
+        assert AnnouncementRead.query.filter_by(user_id=admin_user.id).count() == 3
+
+    def test_mark_all_active(self, client, auth_headers, announcements):
+        response = client.post("/api/announcements/read", headers=auth_headers)
+
+        assert response.get_json()["count"] == 5
+        assert client.post("/api/announcements/read", headers=auth_headers).get_json()["count"] == 0
+
+    def test_mark_batch_unknown_id(self, client, auth_headers, announcements):
+        response = client.post("/api/announcements/read", json={"announcement_ids": [999999]},
+                               headers=auth_headers)
+
+        assert response.status_code == 404
+        assert response.get_json()["announcement_ids"] == [999999]
+
+    def test_mark_batch_rejects_bad_ids(self, client, auth_headers):
+        response = client.post("/api/announcements/read", json={"announcement_ids": "1,2"}, headers=auth_headers)
+
+        assert response.status_code == 400
+
+    def test_read_updates_unread_counter(self, client, auth_headers, announcements):
+        assert client.get("/api/me/unread", headers=auth_headers).get_json()["announcements"] == 5
+
+        client.post("/api/announcements/read", json={"announcement_ids": announcements[:2]}, headers=auth_headers)
+        unread_counters.flush()
+
+        assert client.get("/api/me/unread", headers=auth_headers).get_json()["announcements"] == 3
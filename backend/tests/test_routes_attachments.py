@@ -0,0 +1,285 @@
+"""
+Tests for message attachment routes: streaming upload, background
+thumbnails, range downloads, batched download tracking and the
+content-addressed blob store.
+"""
+
+import hashlib
+import io
+import os
+import time
+from datetime import timedelta
+
+import pytest
+from PIL import Image
+from sqlalchemy import delete
+
+from auth import JWTManager
+from models_messaging import AttachmentBlob, AttachmentDownload, ChannelMember, ChannelMessage, MessageAttachment
+from utils.attachment_storage import blob_store
+from utils.attachment_tasks import get_download_tracker, get_thumbnail_pool
+
+
+@pytest.fixture(autouse=True)
+def flush_pending_downloads(db_session):
+    """Write queued download records before the tables are wiped"""
+    yield
+    get_download_tracker().flush()
+
+
+@pytest.fixture
+def channel_message(db_session, test_user, test_channel):
+    """Create a channel message the test user can access"""
+    db_session.add(ChannelMember(channel_id=test_channel.id, user_id=test_user.id))
+    message = ChannelMessage(
+        channel_id=test_channel.id,
+        sender_id=test_user.id,
+        message="Message with attachment"
+    )
+    db_session.add(message)
+    db_session.commit()
+    return message
+
+
+@pytest.fixture
+def member_headers(app, test_user):
+    with app.app_context():
+        tokens = JWTManager.generate_tokens(test_user)
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+def _png_bytes():
+    buffer = io.BytesIO()
+    Image.new("RGB", (640, 480), (200, 30, 30)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def _upload(client, headers, message, content, filename):
+    return client.post(
+        "/api/attachments/upload",
+        headers=headers,
+        data={
+            "file": (io.BytesIO(content), filename),
+            "message_type": "channel",
+            "message_id": str(message.id),
+        },
+        content_type="multipart/form-data"
+    )
+
+
+@pytest.mark.files
+@pytest.mark.messaging
+class TestAttachmentUpload:
+    """Tests for streaming attachment upload"""
+
+    def test_upload_records_sha256(self, client, member_headers, channel_message):
+        content = b"Torque values for the main gear axle nut.\n" * 2000
+
+        response = _upload(client, member_headers, channel_message, content, "manual.txt")
+
+        assert response.status_code == 201
+        attachment = response.get_json()["attachment"]
+        assert attachment["file_size"] == len(content)
+        assert attachment["content_hash"] == hashlib.sha256(content).hexdigest()
+
+    def test_oversized_upload_returns_413(self, client, member_headers, channel_message, monkeypatch):
+        monkeypatch.setattr("routes_attachments.MAX_FILE_SIZE", 1024)
+
+        response = _upload(client, member_headers, channel_message, b"x" * 2048, "big.txt")
+
+        assert response.status_code == 413
+        assert "File too large" in response.get_json()["error"]
+
+    def test_image_thumbnail_generated_in_background(self, client, member_headers, channel_message):
+        response = _upload(client, member_headers, channel_message, _png_bytes(), "photo.png")
+        assert response.status_code == 201
+        attachment_id = response.get_json()["attachment"]["id"]
+
+        get_thumbnail_pool().wait(timeout=10)
+
+        response = client.get(f"/api/attachments/{attachment_id}/thumbnail", headers=member_headers)
+        assert response.status_code == 200
+        assert response.mimetype == "image/jpeg"
+
+
+@pytest.mark.files
+@pytest.mark.messaging
+class TestAttachmentDownload:
+    """Tests for range-capable downloads and batched tracking"""
+
+    def test_range_request_returns_partial_content(self, client, member_headers, channel_message):
+        content = bytes(range(256)) * 64
+        response = _upload(client, member_headers, channel_message, content, "data.csv")
+        attachment_id = response.get_json()["attachment"]["id"]
+
+        response = client.get(
+            f"/api/attachments/{attachment_id}/download",
+            headers={**member_headers, "Range": "bytes=100-199"}
+        )
+
+        assert response.status_code == 206
+        assert response.data == content[100:200]
+        assert response.headers["Accept-Ranges"] == "bytes"
+
+    def test_downloads_are_batched(self, client, db_session, member_headers, channel_message):
+        response = _upload(client, member_headers, channel_message, b"a,b,c\n1,2,3\n", "data.csv")
+        attachment_id = response.get_json()["attachment"]["id"]
+        tracker = get_download_tracker()
+        tracker.flush()
+
+        for _ in range(3):
+            response = client.get(f"/api/attachments/{attachment_id}/download", headers=member_headers)
+            assert response.status_code == 200
+
+        # Continuation range requests are not counted as new downloads
+        client.get(
+            f"/api/attachments/{attachment_id}/download",
+            headers={**member_headers, "Range": "bytes=5-"}
+        )
+
+        assert tracker.flush() == 3
+        db_session.expire_all()
+        assert db_session.get(MessageAttachment, attachment_id).download_count == 3
+        assert AttachmentDownload.query.filter_by(attachment_id=attachment_id).count() == 3
+
+    def test_failed_flush_keeps_downloads(self, client, db_session, member_headers, channel_message, monkeypatch):
+        response = _upload(client, member_headers, channel_message, b"a,b,c\n", "data.csv")
+        attachment_id = response.get_json()["attachment"]["id"]
+        tracker = get_download_tracker()
+        tracker.flush()
+        client.get(f"/api/attachments/{attachment_id}/download", headers=member_headers)
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("database is locked")
+
+        with monkeypatch.context() as patch:
+            patch.setattr(db_session, "bulk_insert_mappings", fail)
+            assert tracker.flush() == 0
+        assert tracker.pending_count() == 1
+
+        assert tracker.flush() == 1
+        assert AttachmentDownload.query.filter_by(attachment_id=attachment_id).count() == 1
+
+    def test_x_accel_redirect(self, app, client, member_headers, channel_message):
+        response = _upload(client, member_headers, channel_message, b"a,b,c\n", "data.csv")
+        attachment = response.get_json()["attachment"]
+
+        app.config["ATTACHMENTS_X_ACCEL_PREFIX"] = "/protected-attachments"
+        try:
+            response = client.get(f"/api/attachments/{attachment['id']}/download", headers=member_headers)
+        finally:
+            app.config["ATTACHMENTS_X_ACCEL_PREFIX"] = None
+
+        assert response.status_code == 200
+        assert response.data == b""
+        hash_ = attachment["content_hash"]
+        assert response.headers["X-Accel-Redirect"] == f"/protected-attachments/blobs/{hash_[:2]}/{hash_[2:4]}/{hash_}"
+
+
+@pytest.mark.files
+@pytest.mark.messaging
+class TestAttachmentBlobStore:
+    """Tests for content-addressed attachment storage"""
+
+    def test_identical_uploads_share_one_blob(self, client, db_session, member_headers, channel_message):
+        content = b"%PDF-1.4 MSDS sheet for Skydrol LD-4" * 100
+
+        first = _upload(client, member_headers, channel_message, content, "msds.txt").get_json()["attachment"]
+        second = _upload(client, member_headers, channel_message, content, "msds-copy.txt").get_json()["attachment"]
+
+        assert first["content_hash"] == second["content_hash"]
+        attachments = [db_session.get(MessageAttachment, item["id"]) for item in (first, second)]
+        assert attachments[0].file_path == attachments[1].file_path
+        assert attachments[0].file_path == blob_store.path_for(first["content_hash"])
+        assert db_session.get(AttachmentBlob, first["content_hash"]).ref_count == 2
+
+    def test_image_thumbnail_shared_between_duplicates(self, client, db_session, member_headers, channel_message):
+        image = _png_bytes()
+        first = _upload(client, member_headers, channel_message, image, "a.png").get_json()["attachment"]
+        get_thumbnail_pool().wait(timeout=10)
+
+        second = _upload(client, member_headers, channel_message, image, "b.png").get_json()["attachment"]
+
+        assert second["thumbnail_path"] == f"thumbnails/{first['content_hash']}.jpg"
+
+    def test_delete_releases_and_gc_removes_blob(self, client, db_session, member_headers, channel_message):
+        content = b"Component maintenance manual rev C\n" * 50
+        first = _upload(client, member_headers, channel_message, content, "cmm.txt").get_json()["attachment"]
+        second = _upload(client, member_headers, channel_message, content, "cmm.txt").get_json()["attachment"]
+        blob_path = blob_store.path_for(first["content_hash"])
+
+        assert client.delete(f"/api/attachments/{first['id']}", headers=member_headers).status_code == 200
+        blob_store.collect_garbage(grace_period=timedelta(0))
+        assert os.path.exists(blob_path)
+
+        assert client.delete(f"/api/attachments/{second['id']}", headers=member_headers).status_code == 200
+        results = blob_store.collect_garbage(grace_period=timedelta(0))
+
+        assert results["blobs_removed"] == 1
+        assert results["bytes_freed"] >= len(content)
+        assert not os.path.exists(blob_path)
+        assert db_session.get(AttachmentBlob, first["content_hash"]) is None
+
+    def test_gc_respects_grace_period(self, client, db_session, member_headers, channel_message):
+        attachment = _upload(client, member_headers, channel_message, b"x,y\n1,2\n", "d.csv").get_json()["attachment"]
+        client.delete(f"/api/attachments/{attachment['id']}", headers=member_headers)
+
+        results = blob_store.collect_garbage(grace_period=timedelta(hours=1))
+
+        assert results["blobs_removed"] == 0
+        assert os.path.exists(blob_store.path_for(attachment["content_hash"]))
+
+    def test_gc_reconciles_cascade_deletes(self, client, db_session, member_headers, channel_message):
+        attachment = _upload(client, member_headers, channel_message, b"p,q\n3,4\n", "e.csv").get_json()["attachment"]
+
+        # Remove the row without going through the delete route
+        MessageAttachment.query.filter_by(id=attachment["id"]).delete()
+        db_session.commit()
+
+        results = blob_store.collect_garbage(grace_period=timedelta(0))
+
+        assert results["refs_corrected"] == 1
+        assert results["blobs_removed"] == 1
+
+    def test_upload_racing_gc_stores_content_again(self, client, db_session, member_headers, channel_message,
+                                                   monkeypatch):
+        content = b"Service bulletin 32-114\n" * 40
+        first = _upload(client, member_headers, channel_message, content, "sb.txt").get_json()["attachment"]
+        client.delete(f"/api/attachments/{first['id']}", headers=member_headers)
+        content_hash = first["content_hash"]
+        increment = blob_store._increment
+
+        def collect_then_increment(hash_):
+            # Garbage collection deletes the row between the lookup and the increment
+            db_session.execute(delete(AttachmentBlob).where(AttachmentBlob.content_hash == hash_))
+            return increment(hash_)
+
+        monkeypatch.setattr(blob_store, "_increment", collect_then_increment)
+        response = _upload(client, member_headers, channel_message, content, "sb.txt")
+
+        assert response.status_code == 201
+        db_session.expire_all()
+        assert db_session.get(AttachmentBlob, content_hash).ref_count == 1
+        assert os.path.exists(blob_store.path_for(content_hash))
+
+    def test_gc_keeps_file_rewritten_during_collection(self, client, db_session, member_headers, channel_message):
+        attachment = _upload(client, member_headers, channel_message, b"r,s\n5,6\n", "f.csv").get_json()["attachment"]
+        client.delete(f"/api/attachments/{attachment['id']}", headers=member_headers)
+        blob = db_session.get(AttachmentBlob, attachment["content_hash"])
+        blob.last_released_date -= timedelta(hours=2)
+        db_session.commit()
+        blob_path = blob_store.path_for(attachment["content_hash"])
+
+        # The file was written just now, as by an upload racing this collection
+        results = blob_store.collect_garbage(grace_period=timedelta(hours=1))
+
+        assert results["blobs_removed"] == 1
+        assert results["bytes_freed"] == 0
+        assert os.path.exists(blob_path)
+
+        stale = time.time() - 7200
+        os.utime(blob_path, (stale, stale))
+        results = blob_store.collect_garbage(grace_period=timedelta(hours=1))
+
+        assert results["orphans_removed"] == 1
+        assert not os.path.exists(blob_path)
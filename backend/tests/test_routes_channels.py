@@ -4,8 +4,11 @@ Tests /api/channels endpoints for CRUD operations, members, and messages.
 """
 import json
 
+import pytest
+
 from models import db
-from models_messaging import ChannelMember, ChannelMessage
+from models_messaging import ChannelMember, ChannelMessage, MessageReaction
+from utils.read_markers import ReadMarkerBuffer
 
 
 class TestChannelRoutes:
@@ -466,3 +469,112 @@ class TestChannelMessageRoutes:
         )
 
         assert response.status_code == 403
+
+
+class TestChannelFeedRoutes:
+    """Test the cursor-paged channel message feed"""
+
+    @pytest.fixture
+    def busy_channel(self, db_session, test_channel, admin_user, test_user_2):
+        """Channel with 30 messages, replies and reactions"""
+        db_session.add(ChannelMember(channel_id=test_channel.id, user_id=admin_user.id))
+        messages = [
+            ChannelMessage(channel_id=test_channel.id, sender_id=admin_user.id, message=f"Message {i}")
+            for i in range(30)
+        ]
+        db_session.add_all(messages)
+        db_session.flush()
+        for message in messages[:10]:
+            db_session.add_all([
+                ChannelMessage(channel_id=test_channel.id, sender_id=test_user_2.id,
+                               message="Reply", parent_message_id=message.id),
+                MessageReaction(channel_message_id=message.id, user_id=test_user_2.id,
+                                reaction_type="thumbs_up"),
+            ])
+        db_session.commit()
+        return test_channel, [m.id for m in messages]
+
+    def test_feed_pages_backwards(self, client, auth_headers, busy_channel):
+        """before_id walks history without gaps or duplicates"""
+        channel, _ = busy_channel
+        seen, before_id = [], None
+        while True:
+            url = f"/api/channels/{channel.id}/feed?limit=15"
+            if before_id:
+                url += f"&before_id={before_id}"
+            data = client.get(url, headers=auth_headers).get_json()
+            ids = [m["id"] for m in data["messages"]]
+            assert ids == sorted(ids)
+            seen = ids + seen
+            before_id = data["oldest_id"]
+            if not data["has_more"]:
+                break
+
+        assert len(seen) == 40
+        assert seen == sorted(set(seen))
+
+    def test_feed_after_id_polling(self, client, auth_headers, busy_channel):
+        """after_id only returns newer messages"""
+        channel, message_ids = busy_channel
+        response = client.get(f"/api/channels/{channel.id}/feed?after_id={message_ids[-1]}",
+                              headers=auth_headers)
+
+        data = response.get_json()
+        assert data["count"] == 10
+        assert all(m["id"] > message_ids[-1] for m in data["messages"])
+
+    def test_feed_batches_related_rows(self, client, auth_headers, busy_channel, query_counter):
+        """Reactions, attachments and reply counts do not add per-message queries"""
+        channel, message_ids = busy_channel
+
+        response, statements = query_counter.call(
+            lambda: client.get(f"/api/channels/{channel.id}/feed?before_id={message_ids[10]}",
+                               headers=auth_headers)
+        )
+
+        data = response.get_json()
+        assert data["count"] == 10
+        assert all(m["reply_count"] == 1 and len(m["reactions"]) == 1 for m in data["messages"])
+        assert data["messages"][0]["reactions"][0]["user_name"]
+        assert len(statements) < 12, f"{len(statements)} queries for the feed"
+
+    @pytest.fixture
+    def read_markers(self, app, monkeypatch):
+        """Read marker buffer that only writes when flushed explicitly"""
+        buffer = ReadMarkerBuffer(app, flush_interval=3600)
+        monkeypatch.setattr("utils.read_markers._read_markers", buffer)
+        yield buffer
+        buffer.stop()
+
+    def test_feed_read_marker_is_batched(self, client, auth_headers, busy_channel, admin_user, read_markers, query_counter):
+        """Reads queue the read marker instead of committing it"""
+        channel, _ = busy_channel
+        markers = read_markers
+
+        _, statements = query_counter.call(
+            lambda: client.get(f"/api/channels/{channel.id}/feed", headers=auth_headers)
+        )
+        client.get(f"/api/channels/{channel.id}/feed?limit=5&before_id=20", headers=auth_headers)
+
+        assert not [s for s in statements if s.startswith("UPDATE channel_members")]
+        newest_id = db.session.query(db.func.max(ChannelMessage.id)).scalar()
+        assert markers.pending_marker(channel.id, admin_user.id) == newest_id
+
+        assert markers.flush() == 1
+        member = ChannelMember.query.filter_by(channel_id=channel.id, user_id=admin_user.id).one()
+        db.session.refresh(member)
+        assert member.last_read_message_id == newest_id
+
+    def test_feed_invalid_cursor_combination(self, client, auth_headers, busy_channel):
+        """before_id and after_id cannot be combined; limit is bounded"""
+        channel, _ = busy_channel
+
+        assert client.get(f"/api/channels/{channel.id}/feed?before_id=5&after_id=2",
+                          headers=auth_headers).status_code == 400
+        assert client.get(f"/api/channels/{channel.id}/feed?limit=1000",
+                          headers=auth_headers).status_code == 400
+
+    def test_feed_not_member(self, client, auth_headers, test_channel):
+        """Non-members cannot read the feed"""
+        response = client.get(f"/api/channels/{test_channel.id}/feed", headers=auth_headers)
+        assert response.status_code == 403
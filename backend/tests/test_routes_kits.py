@@ -16,8 +16,8 @@ import json
 
 import pytest
 
-from models import User
-from models_kits import AircraftType, Kit, KitBox, KitExpendable, KitIssuance
+from models import Expendable, User
+from models_kits import AircraftType, Kit, KitBox, KitExpendable, KitIssuance, KitItem
 
 
 @pytest.fixture
@@ -270,6 +270,35 @@ class TestKitCRUDEndpoints:
         assert isinstance(data, list)
         assert len(data) >= 1
 
+    def test_get_kits_summary_counts(self, client, auth_headers_user, test_kit, test_kit_box, db_session):
+        """Test kit list includes counts from the summary projection"""
+        db_session.add(KitBox(kit_id=test_kit.id, box_number="2", box_type="tooling"))
+        db_session.commit()
+
+        response = client.get("/api/kits", headers=auth_headers_user)
+
+        kit = next(k for k in response.get_json() if k["id"] == test_kit.id)
+        assert kit["box_count"] == 2
+        assert kit["item_count"] == 0
+        assert kit["pending_reorders"] == 0
+        assert kit["unread_messages"] == 0
+
+    def test_get_kits_paginated(self, client, auth_headers_user, test_kit):
+        """Test kit list pagination"""
+        response = client.get("/api/kits?page=1&per_page=1", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert len(data["kits"]) == 1
+        assert data["pagination"]["per_page"] == 1
+        assert data["pagination"]["total"] >= 1
+
+    def test_get_kits_invalid_page_size(self, client, auth_headers_user):
+        """Test kit list rejects invalid page sizes"""
+        response = client.get("/api/kits?per_page=1000", headers=auth_headers_user)
+
+        assert response.status_code == 400
+
     def test_get_kits_unauthenticated(self, client):
         """Test getting kits without authentication"""
         response = client.get("/api/kits")
@@ -413,6 +442,105 @@ class TestKitCRUDEndpoints:
         duplicated_kit = Kit.query.filter_by(name="Duplicated Kit").first()
         assert duplicated_kit is not None
 
+    def test_duplicate_kit_copies_boxes(self, client, auth_headers_materials, test_kit, test_kit_box):
+        """Duplicated kits get the template's boxes"""
+        response = client.post(f"/api/kits/{test_kit.id}/duplicate",
+                               json={"name": "Duplicated Kit"},
+                               headers=auth_headers_materials)
+
+        assert response.status_code == 201
+        boxes = response.get_json()["boxes"]
+        assert [(box["box_number"], box["box_type"]) for box in boxes] == [
+            (test_kit_box.box_number, test_kit_box.box_type)
+        ]
+
+
+class TestKitCloneEndpoints:
+    """Test instantiating kits from a template kit"""
+
+    @pytest.fixture
+    def template_kit(self, db_session, test_kit):
+        """Kit with two boxes configured with expendable slots"""
+        boxes = [KitBox(kit_id=test_kit.id, box_number=f"Box{n}", box_type="expendable", description=f"Box {n}")
+                 for n in (1, 2)]
+        db_session.add_all(boxes)
+        db_session.flush()
+
+        expendable = Expendable(part_number="MS24665-132", lot_number="L1", description="Cotter pin",
+                                unit="each", location="Bin 4", minimum_stock_level=25)
+        db_session.add(expendable)
+        db_session.flush()
+        db_session.add(KitItem(kit_id=test_kit.id, box_id=boxes[0].id, item_type="expendable",
+                               item_id=expendable.id, quantity=40, location="Drawer 2"))
+        db_session.add(KitItem(kit_id=test_kit.id, box_id=boxes[0].id, item_type="tool", item_id=1,
+                               part_number="TW-1", description="Torque wrench", quantity=1))
+        db_session.add(KitExpendable(kit_id=test_kit.id, box_id=boxes[1].id, part_number="AN960-10",
+                                     description="Washer", quantity=100, unit="each",
+                                     minimum_stock_level=50, lot_number="LOT-9"))
+        db_session.commit()
+        return test_kit
+
+    def test_clone_kits(self, client, auth_headers_materials, template_kit, db_session):
+        """Each new kit gets the template's boxes and empty slots with minimum stock levels"""
+        response = client.post(f"/api/kits/{template_kit.id}/clone",
+                               json={"names": ["Clone A", "Clone B", "Clone C"]},
+                               headers=auth_headers_materials)
+
+        assert response.status_code == 201
+        data = response.get_json()
+        assert [kit["name"] for kit in data["kits"]] == ["Clone A", "Clone B", "Clone C"]
+        assert all(kit["box_count"] == 2 and kit["item_count"] == 2 for kit in data["kits"])
+        assert data["stats"]["kits_created"] == 3
+        assert data["stats"]["boxes_created"] == 6
+        assert data["stats"]["slots_created"] == 6
+        assert "elapsed_ms" in data["stats"]
+
+        clone = Kit.query.filter_by(name="Clone B").one()
+        assert clone.aircraft_type_id == template_kit.aircraft_type_id
+        slots = {slot.part_number: slot for slot in KitExpendable.query.filter_by(kit_id=clone.id)}
+        assert set(slots) == {"MS24665-132", "AN960-10"}
+        assert slots["MS24665-132"].box.box_number == "Box1"
+        assert slots["MS24665-132"].location == "Drawer 2"
+        assert slots["MS24665-132"].minimum_stock_level == 25
+        assert slots["AN960-10"].box.box_number == "Box2"
+        assert slots["AN960-10"].minimum_stock_level == 50
+        assert all(slot.quantity == 0 and slot.lot_number is None for slot in slots.values())
+        assert KitItem.query.filter_by(kit_id=clone.id).count() == 0
+
+    def test_clone_kits_without_slots(self, client, auth_headers_materials, template_kit):
+        """include_slots=false copies only the boxes"""
+        response = client.post(f"/api/kits/{template_kit.id}/clone",
+                               json={"names": ["Boxes Only"], "include_slots": False},
+                               headers=auth_headers_materials)
+
+        assert response.status_code == 201
+        assert response.get_json()["kits"][0]["item_count"] == 0
+
+    @pytest.mark.parametrize("names", [[], ["Dup", "Dup"], [""], "Clone A"])
+    def test_clone_kits_invalid_names(self, client, auth_headers_materials, template_kit, names):
+        """Empty, repeated or blank names are rejected without creating kits"""
+        response = client.post(f"/api/kits/{template_kit.id}/clone",
+                               json={"names": names}, headers=auth_headers_materials)
+
+        assert response.status_code == 400
+        assert Kit.query.count() == 1
+
+    def test_clone_kits_existing_name(self, client, auth_headers_materials, template_kit):
+        """Names already in use are rejected without creating any kit"""
+        response = client.post(f"/api/kits/{template_kit.id}/clone",
+                               json={"names": ["Clone A", template_kit.name]},
+                               headers=auth_headers_materials)
+
+        assert response.status_code == 400
+        assert Kit.query.count() == 1
+
+    def test_clone_kits_regular_user(self, client, auth_headers_user, template_kit):
+        """Test cloning kits as regular user (should fail)"""
+        response = client.post(f"/api/kits/{template_kit.id}/clone",
+                               json={"names": ["Clone A"]}, headers=auth_headers_user)
+
+        assert response.status_code == 403
+
 
 class TestKitWizardEndpoint:
     """Test kit wizard endpoint"""
@@ -553,6 +681,73 @@ class TestKitItemEndpoints:
         assert "items" in data
         assert "expendables" in data
 
+    @pytest.fixture
+    def stocked_kit(self, db_session, test_kit):
+        """Kit with two boxes holding tools, expendables and legacy expendables"""
+        boxes = [KitBox(kit_id=test_kit.id, box_number=str(n), box_type="expendable") for n in (1, 2)]
+        db_session.add_all(boxes)
+        db_session.flush()
+
+        for box in boxes:
+            for n in range(3):
+                expendable = Expendable(part_number=f"MS{box.id}-{n}", lot_number=f"L{n}",
+                                        description="Cotter pin", unit="each")
+                db_session.add(expendable)
+                db_session.flush()
+                db_session.add(KitItem(kit_id=test_kit.id, box_id=box.id, item_type="expendable",
+                                       item_id=expendable.id, quantity=5))
+            db_session.add(KitItem(kit_id=test_kit.id, box_id=box.id, item_type="tool", item_id=1,
+                                   part_number="TW-1", description="Torque wrench", quantity=1))
+            db_session.add(KitExpendable(kit_id=test_kit.id, box_id=box.id, part_number="AN960-10",
+                                         description="Washer", quantity=100))
+
+        # Expendable item whose record was removed is not listed
+        db_session.add(KitItem(kit_id=test_kit.id, box_id=boxes[0].id, item_type="expendable",
+                               item_id=999999, quantity=1))
+        db_session.commit()
+        return boxes
+
+    def test_get_kit_items_joined(self, client, auth_headers_user, test_kit, stocked_kit):
+        """Items, expendables and legacy expendables are returned with box numbers"""
+        response = client.get(f"/api/kits/{test_kit.id}/items", headers=auth_headers_user)
+
+        data = response.get_json()
+        assert data["total_count"] == 10
+        assert len(data["items"]) == 2
+        assert {exp["source"] for exp in data["expendables"]} == {"item", "expendable"}
+        assert all(exp["box_number"] in ("1", "2") for exp in data["expendables"])
+        assert next(exp for exp in data["expendables"] if exp["source"] == "item")["description"] == "Cotter pin"
+
+    def test_get_kit_items_box_scoped(self, client, auth_headers_user, test_kit, stocked_kit):
+        """box_id expands a single box"""
+        box = stocked_kit[1]
+        response = client.get(f"/api/kits/{test_kit.id}/items?box_id={box.id}", headers=auth_headers_user)
+
+        data = response.get_json()
+        assert data["total_count"] == 5
+        assert {item["box_id"] for item in data["items"] + data["expendables"]} == {box.id}
+
+    def test_get_kit_items_paginated(self, client, auth_headers_user, test_kit, stocked_kit):
+        """Pages span items and legacy expendables in box order"""
+        seen = []
+        for page in (1, 2, 3):
+            response = client.get(f"/api/kits/{test_kit.id}/items?page={page}&per_page=4",
+                                  headers=auth_headers_user)
+            data = response.get_json()
+            assert data["pagination"]["total"] == 10
+            seen.extend((row["box_id"], row.get("source", "item"), row["id"])
+                        for row in data["items"] + data["expendables"])
+
+        assert len(seen) == 10
+        assert len(set(seen)) == 10
+        assert data["pagination"]["has_next"] is False
+
+    def test_get_kit_boxes_item_counts(self, client, auth_headers_user, test_kit, stocked_kit):
+        """Box list reports combined item counts"""
+        response = client.get(f"/api/kits/{test_kit.id}/boxes", headers=auth_headers_user)
+
+        assert [box["item_count"] for box in response.get_json()] == [6, 5]
+
     def test_add_kit_item_materials_user(self, client, auth_headers_materials, test_kit, test_kit_box, test_tool, test_warehouse, db_session):
         """Test adding item to kit as Materials user"""
         # The API now requires that tools originate from an active warehouse.
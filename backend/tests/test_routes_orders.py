@@ -278,3 +278,87 @@ class TestOrderFilters:
         assert results
         assert all(item["status"] == "awaiting_info" for item in results)
         assert all(item["priority"] == "critical" for item in results)
+
+
+class TestOrderListPagination:
+    @pytest.fixture
+    def board(self, db_session, admin_user):
+        from models import ProcurementOrder, ProcurementOrderMessage
+
+        now = get_current_time()
+        due_offsets = {"Late": -1, "Due soon": 2, "On track": 20, "Unscheduled": None, "Done": -3}
+        orders = []
+        for index in range(25):
+            title = list(due_offsets)[index % 5]
+            offset = due_offsets[title]
+            orders.append(ProcurementOrder(
+                title=f"{title} {index}",
+                status="received" if title == "Done" else "ordered",
+                requester_id=admin_user.id,
+                buyer_id=admin_user.id,
+                created_at=now - timedelta(hours=index % 7),
+                expected_due_date=now + timedelta(days=offset) if offset is not None else None,
+            ))
+        db_session.add_all(orders)
+        db_session.flush()
+        db_session.add(ProcurementOrderMessage(order_id=orders[0].id, sender_id=admin_user.id,
+                                               subject="ETA", message="When?"))
+        db_session.commit()
+        return orders
+
+    def _all_pages(self, client, auth_headers, **params):
+        rows, cursor = [], None
+        while True:
+            query = {"per_page": 4, **params}
+            if cursor:
+                query["cursor"] = cursor
+            response = client.get("/api/orders", query_string=query, headers=auth_headers)
+            assert response.status_code == 200
+            data = response.get_json()
+            rows.extend(data["orders"])
+            cursor = data["pagination"]["next_cursor"]
+            if not data["pagination"]["has_next"]:
+                return rows
+
+    def test_keyset_pages_cover_every_order_once(self, client, auth_headers, board):
+        rows = self._all_pages(client, auth_headers, sort="created")
+
+        assert len(rows) == 25
+        assert len({row["id"] for row in rows}) == 25
+        created = [(row["created_at"], row["id"]) for row in rows]
+        assert created == sorted(created, reverse=True)
+
+    def test_due_state_sort(self, client, auth_headers, board):
+        rows = self._all_pages(client, auth_headers, sort="due_state")
+
+        states = [row["due_status"] for row in rows]
+        assert states == [state for state in ("late", "due_soon", "on_track", "unscheduled", "completed")
+                          for _ in range(5)]
+
+    def test_slim_projection(self, client, auth_headers, board):
+        response = client.get("/api/orders", query_string={"per_page": 50, "sort": "created"}, headers=auth_headers)
+
+        rows = response.get_json()["orders"]
+        first = next(row for row in rows if row["id"] == board[0].id)
+        assert first["message_count"] == 1
+        assert first["requester_name"] and first["buyer_name"]
+        assert "description" not in first and "notes" not in first
+
+    def test_invalid_cursor(self, client, auth_headers, board):
+        response = client.get("/api/orders", query_string={"cursor": "not-a-cursor"}, headers=auth_headers)
+        assert response.status_code == 400
+
+        cursor = client.get(
+            "/api/orders", query_string={"per_page": 2, "sort": "created"}, headers=auth_headers
+        ).get_json()["pagination"]["next_cursor"]
+        response = client.get("/api/orders", query_string={"cursor": cursor, "sort": "due_state"},
+                              headers=auth_headers)
+        assert response.status_code == 400
+
+    def test_unpaginated_list_query_count(self, client, auth_headers, board, query_counter):
+
+        response, statements = query_counter.call(lambda: client.get("/api/orders", headers=auth_headers))
+
+        assert response.status_code == 200
+        assert len(response.get_json()) == 25
+        assert len(statements) < 10, f"{len(statements)} queries to list orders"
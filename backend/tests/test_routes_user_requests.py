@@ -0,0 +1,64 @@
+"""Tests for user request listing."""
+
+from datetime import timedelta
+
+import pytest
+
+from models import RequestItem, UserRequest, UserRequestMessage, get_current_time
+
+
+@pytest.fixture
+def requests_board(db_session, admin_user, test_user):
+    now = get_current_time()
+    requests_list = []
+    for index in range(12):
+        requests_list.append(UserRequest(
+            title=f"Request {index}",
+            requester_id=test_user.id if index % 2 else admin_user.id,
+            buyer_id=admin_user.id,
+            created_at=now - timedelta(minutes=index),
+            expected_due_date=now - timedelta(days=1) if index % 3 == 0 else None,
+        ))
+    db_session.add_all(requests_list)
+    db_session.flush()
+    for req in requests_list:
+        db_session.add_all([
+            RequestItem(request_id=req.id, description="Gloves"),
+            RequestItem(request_id=req.id, description="Rags", status="ordered"),
+        ])
+    db_session.add(UserRequestMessage(request_id=requests_list[0].id, sender_id=admin_user.id,
+                                      subject="Update", message="Ordered"))
+    db_session.commit()
+    return requests_list
+
+
+class TestUserRequestList:
+    def test_unpaginated_list_batches_items(self, client, auth_headers, requests_board, query_counter):
+        response, statements = query_counter.call(lambda: client.get("/api/user-requests", headers=auth_headers))
+
+        assert response.status_code == 200
+        rows = response.get_json()
+        assert [row["title"] for row in rows] == [f"Request {index}" for index in range(12)]
+        assert all(row["item_count"] == 2 and len(row["items"]) == 2 for row in rows)
+        assert rows[0]["message_count"] == 1
+        assert len(statements) < 10, f"{len(statements)} queries to list requests"
+
+    def test_keyset_pages(self, client, auth_headers, requests_board):
+        seen, cursor = [], None
+        while True:
+            query = {"per_page": 5, "sort": "due_state"}
+            if cursor:
+                query["cursor"] = cursor
+            data = client.get("/api/user-requests", query_string=query, headers=auth_headers).get_json()
+            seen.extend(data["requests"])
+            cursor = data["pagination"]["next_cursor"]
+            if not cursor:
+                break
+
+        assert len({row["id"] for row in seen}) == 12
+        assert [row["due_status"] for row in seen[:4]] == ["late"] * 4
+        assert "items" not in seen[0] and seen[0]["item_count"] == 2
+
+    def test_invalid_page_size(self, client, auth_headers):
+        response = client.get("/api/user-requests", query_string={"per_page": 0}, headers=auth_headers)
+        assert response.status_code == 400
@@ -0,0 +1,185 @@
+"""
+Tests for the background job scheduler and its run history
+"""
+
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import ScheduledJobRun, get_current_time
+from utils.scheduler import (
+    CronSchedule,
+    IntervalSchedule,
+    Job,
+    JobScheduler,
+    first_run_time,
+    prune_job_history,
+)
+
+
+class TestCronSchedule:
+    """Tests for cron expression parsing and next run times"""
+
+    def test_daily(self):
+        # 2026-10-18 is a Sunday
+        assert CronSchedule("30 2 * * *").next_after(datetime(2026, 10, 18, 3, 0)) == datetime(2026, 10, 19, 2, 30)
+
+    def test_steps_and_lists(self):
+        schedule = CronSchedule("*/15 8,17 * * *")
+
+        assert schedule.next_after(datetime(2026, 10, 18, 8, 20)) == datetime(2026, 10, 18, 8, 30)
+        assert schedule.next_after(datetime(2026, 10, 18, 8, 45)) == datetime(2026, 10, 18, 17, 0)
+
+    def test_weekdays_skip_weekend(self):
+        assert CronSchedule("0 9 * * 1-5").next_after(datetime(2026, 10, 16, 10, 0)) == datetime(2026, 10, 19, 9, 0)
+
+    def test_day_of_month_or_day_of_week(self):
+        # Restricting both day fields runs on either: the 1st or any Sunday
+        assert CronSchedule("0 0 1 * 0").next_after(datetime(2026, 10, 19, 0, 0)) == datetime(2026, 10, 25, 0, 0)
+
+    @pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "*/0 * * * *", "0 0 31 2 *"])
+    def test_invalid_expressions(self, expression):
+        with pytest.raises(ValueError, match=r"[Cc]ron"):
+            CronSchedule(expression).next_after(datetime(2026, 10, 18))
+
+
+class TestFirstRunTime:
+    """Tests for scheduling a new leader's first run from history"""
+
+    def test_never_run(self):
+        now = datetime(2026, 10, 18, 12, 0)
+        job = Job("job", lambda: None, IntervalSchedule(3600))
+
+        assert first_run_time(job, None, now) == now
+        job.run_on_start = False
+        assert first_run_time(job, None, now) == now + timedelta(hours=1)
+
+    def test_recent_run_is_not_repeated(self):
+        now = datetime(2026, 10, 18, 12, 0)
+        job = Job("job", lambda: None, IntervalSchedule(3600))
+
+        assert first_run_time(job, now - timedelta(minutes=20), now) == now + timedelta(minutes=40)
+
+    def test_missed_run_catches_up(self):
+        now = datetime(2026, 10, 18, 12, 0)
+        job = Job("job", lambda: None, IntervalSchedule(3600))
+
+        assert first_run_time(job, now - timedelta(hours=3), now) == now
+
+
+class TestJobScheduler:
+    """Tests for running jobs and recording their history"""
+
+    def test_run_is_recorded(self, app, db_session):
+        scheduler = JobScheduler(app)
+        scheduler.add_job(Job("count", lambda: {"counted": 3}, IntervalSchedule(60)))
+
+        run = scheduler.run_job("count")
+
+        assert run["status"] == "success"
+        assert run["result"] == {"counted": 3}
+        assert run["duration_ms"] >= 0
+        stored = ScheduledJobRun.query.filter_by(job_name="count").one()
+        assert stored.worker == scheduler.worker
+
+    def test_failures_are_recorded(self, app, db_session):
+        def explode():
+            raise RuntimeError("disk full")
+
+        scheduler = JobScheduler(app)
+        scheduler.add_job(Job("explode", explode, IntervalSchedule(60)))
+        scheduler.add_job(Job("partial", lambda: {"errors": {"blobs": "missing"}}, IntervalSchedule(60)))
+
+        assert scheduler.run_job("explode")["error_message"] == "disk full"
+        assert scheduler.run_job("partial")["error_message"] == "blobs: missing"
+        assert ScheduledJobRun.query.filter_by(status="failed").count() == 2
+
+    def test_thread_runs_due_jobs(self, app, db_session):
+        ran = threading.Event()
+        scheduler = JobScheduler(app)
+        scheduler.add_job(Job("tick", ran.set, IntervalSchedule(3600)))
+
+        scheduler.start()
+        try:
+            assert ran.wait(timeout=5)
+        finally:
+            scheduler.stop()
+
+        assert scheduler.next_runs["tick"] > get_current_time() + timedelta(minutes=59)
+
+    def test_stops_after_losing_leadership(self, app, db_session):
+        class LostLeadership:
+            def confirm(self):
+                return False
+
+        ran = threading.Event()
+        scheduler = JobScheduler(app, leadership=LostLeadership())
+        scheduler.add_job(Job("tick", ran.set, IntervalSchedule(3600)))
+
+        scheduler.start()
+        scheduler._thread.join(timeout=5)
+
+        assert not scheduler.running
+        assert not ran.is_set()
+
+    def test_prune_history(self, db_session):
+        now = get_current_time()
+        db_session.add_all([
+            ScheduledJobRun(job_name="old", started_at=now - timedelta(days=40), status="success"),
+            ScheduledJobRun(job_name="new", started_at=now, status="success"),
+        ])
+        db_session.commit()
+
+        assert prune_job_history(retention_days=30) == {"deleted_runs": 1}
+        assert [run.job_name for run in ScheduledJobRun.query.all()] == ["new"]
+
+
+class TestSchedulerRoutes:
+    """Tests for the admin scheduler endpoints"""
+
+    @pytest.fixture
+    def runs(self, db_session):
+        now = get_current_time()
+        db_session.add_all([
+            ScheduledJobRun(job_name="maintenance", started_at=now - timedelta(hours=2), status="success",
+                            duration_ms=100),
+            ScheduledJobRun(job_name="maintenance", started_at=now - timedelta(hours=1), status="failed",
+                            duration_ms=300, error_message="chemicals: locked"),
+            ScheduledJobRun(job_name="resource_check", started_at=now, status="success", duration_ms=5),
+        ])
+        db_session.commit()
+
+    def test_job_statistics(self, client, auth_headers, runs):
+        response = client.get("/api/admin/scheduler/jobs", headers=auth_headers)
+
+        assert response.status_code == 200
+        jobs = {job["name"]: job for job in response.get_json()["jobs"]}
+        maintenance = jobs["maintenance"]
+        assert (maintenance["runs"], maintenance["failures"]) == (2, 1)
+        assert (maintenance["avg_duration_ms"], maintenance["max_duration_ms"]) == (200.0, 300)
+        assert maintenance["last_run"]["status"] == "failed"
+        assert maintenance["schedule"] == "every 3600s"
+
+    def test_listing_does_not_start_services(self, client, auth_headers, monkeypatch):
+        from utils import resource_monitor, scheduled_backup, scheduled_maintenance
+
+        monkeypatch.setattr(scheduled_maintenance, "_maintenance_service", None)
+        monkeypatch.setattr(scheduled_backup, "_backup_service", None)
+        monkeypatch.setattr(resource_monitor, "_resource_monitor", None)
+
+        response = client.get("/api/admin/scheduler/jobs", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert scheduled_maintenance.get_maintenance_service() is None
+        assert scheduled_backup.get_backup_service() is None
+        assert resource_monitor.get_resource_monitor() is None
+
+    def test_runs_filtered_by_job(self, client, auth_headers, runs):
+        data = client.get("/api/admin/scheduler/runs?job=maintenance&limit=1", headers=auth_headers).get_json()
+
+        assert [run["status"] for run in data["runs"]] == ["failed"]
+        assert data["has_more"] is True
+
+    def test_admin_only(self, client, user_auth_headers, runs):
+        assert client.get("/api/admin/scheduler/runs", headers=user_auth_headers).status_code == 403
@@ -0,0 +1,164 @@
+"""
+Tests for compiled validation schemas
+"""
+
+import html
+import re
+from datetime import datetime, timezone
+
+import pytest
+
+from security.input_validation import (
+    COMPILED_VALIDATION_SCHEMAS,
+    VALIDATION_SCHEMAS,
+    InputValidator,
+)
+from security.input_validation import ValidationError as FieldValidationError
+from utils.error_handler import validate_input
+from utils.schema_compiler import compile_schema, escape_text, strip_html
+from utils.validation import (
+    SCHEMAS,
+    ValidationError,
+    validate_constraints,
+    validate_dates,
+    validate_schema,
+    validate_types,
+)
+
+
+def interpret_schema(data, schema_name):
+    """The multi-pass validate_schema the compiled validators replace"""
+    schema = SCHEMAS[schema_name]
+    data = dict(data)
+    validate_input(data, schema["required"], schema.get("optional", []))
+    validate_types(data, schema["types"])
+    validate_constraints(data, schema.get("constraints", {}))
+    validate_dates(data, schema.get("date_fields", []))
+    result = {}
+    for key, value in data.items():
+        if isinstance(value, str):
+            max_length = schema.get("constraints", {}).get(key, {}).get("max_length")
+            escaped = html.escape(re.sub(r'[<>\"\'\\]', "", value))
+            result[key] = (escaped[:max_length] if max_length and len(escaped) > max_length else escaped).strip()
+        else:
+            result[key] = value
+    return result
+
+
+def outcome(validate, *args):
+    try:
+        return validate(*args)
+    except (ValidationError, FieldValidationError) as e:
+        return ("error", str(e))
+
+
+TOOL_ROWS = [
+    {"tool_number": "T-100", "serial_number": "SN <1>", "description": " Torque & wrench ", "condition": "good"},
+    {"tool_number": "t-100", "serial_number": "SN1", "description": "lowercase number"},
+    {"tool_number": "T-1", "serial_number": "SN1", "description": "x" * 501},
+    {"tool_number": "T-1", "serial_number": "SN1", "description": "bad", "condition": "mint"},
+    {"tool_number": "T-1", "serial_number": "", "description": "missing serial"},
+    {"tool_number": "T-1", "serial_number": "SN1", "description": "extra", "notes": "it's <b>", "bin": 4},
+    {"tool_number": 42, "serial_number": "SN1", "description": "wrong type"},
+    {"tool_number": "T-1", "serial_number": "SN1", "description": "list choice", "status": ["available"]},
+]
+
+CHEMICAL_ROWS = [
+    {"part_number": "P-1", "lot_number": "L1", "quantity": 5, "unit": "each", "expiration_date": "2030-01-01T00:00:00Z"},
+    {"part_number": "P-1", "lot_number": "L1", "quantity": 2.5, "unit": "ml", "expiration_date": "2030-01-01"},
+    {"part_number": "P-1", "lot_number": "L1", "quantity": -1, "unit": "each"},
+    {"part_number": "P-1", "lot_number": "L1", "quantity": "5", "unit": "each"},
+    {"part_number": "P-1", "lot_number": "L1", "quantity": 5, "unit": "each", "expiration_date": "soon"},
+    {"part_number": "P-1", "lot_number": "L1", "quantity": 5, "unit": "each", "expiration_date": ""},
+    {"part_number": "P-1", "lot_number": "L1", "quantity": 5, "unit": "each", "warehouse_id": 3, "notes": None},
+]
+
+
+class TestCompiledSchema:
+    """Compiled validators against the multi-pass interpretation"""
+
+    @pytest.mark.parametrize(("schema_name", "row"), [("tool", row) for row in TOOL_ROWS]
+                             + [("chemical", row) for row in CHEMICAL_ROWS])
+    def test_matches_interpreted_schema(self, schema_name, row):
+        assert outcome(validate_schema, row, schema_name) == outcome(interpret_schema, row, schema_name)
+
+    def test_converts_dates_without_mutating_input(self):
+        row = dict(CHEMICAL_ROWS[0])
+        validated = validate_schema(row, "chemical")
+
+        assert validated["expiration_date"] == datetime(2030, 1, 1, tzinfo=timezone.utc)
+        assert row["expiration_date"] == "2030-01-01T00:00:00Z"
+
+    def test_errors(self):
+        with pytest.raises(ValidationError, match="Unknown schema: nope"):
+            validate_schema({}, "nope")
+        with pytest.raises(ValidationError, match="Invalid input format"):
+            validate_schema(["T-1"], "tool")
+        with pytest.raises(ValidationError, match="quantity must be of type int or float"):
+            validate_schema({**CHEMICAL_ROWS[0], "quantity": "5"}, "chemical")
+
+    def test_cross_field_rule(self):
+        def check_range(data):
+            if data["low"] > data["high"]:
+                raise ValidationError("low must not exceed high")
+
+        compiled = compile_schema("range", {"required": ["low", "high"], "types": {"low": int, "high": int}},
+                                  cross_field=check_range)
+
+        assert compiled({"low": 1, "high": 2}) == {"low": 1, "high": 2}
+        with pytest.raises(ValidationError, match="low must not exceed high"):
+            compiled({"low": 3, "high": 2})
+
+
+class TestSanitizers:
+    """translate-based sanitizers against the regex versions"""
+
+    SAMPLES = ["plain", "  <script>alert('x')</script>  ", 'a "quoted" \\ path & more', "tab\there\x00\x07\x1f\x7f",
+               "ünïcödé & <i>", "x" * 300]
+
+    @pytest.mark.parametrize("value", SAMPLES)
+    def test_strip_html(self, value):
+        expected = html.escape(re.sub(r'[<>\"\'\\]', "", value))
+        assert strip_html(value, 100) == (expected[:100] if len(expected) > 100 else expected).strip()
+
+    @pytest.mark.parametrize("value", SAMPLES)
+    def test_escape_text(self, value):
+        expected = html.escape(re.sub(r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]", "", value)).strip()
+        assert escape_text(value) == expected[:255]
+
+
+class TestCompiledFieldRules:
+    """Security front-end schemas compiled per field"""
+
+    def test_validates_schema(self):
+        data = {"tool_number": "T-1", "serial_number": "SN.1", "description": "<b>wrench</b>", "condition": "Good",
+                "location": "Bay 1", "category": "Hand", "requires_calibration": "yes",
+                "calibration_frequency_days": "90", "ignored": "x"}
+
+        validated = InputValidator.validate_json_data(data, VALIDATION_SCHEMAS["tool_create"])
+
+        assert validated == {"tool_number": "T-1", "serial_number": "SN.1",
+                             "description": "&lt;b&gt;wrench&lt;/b&gt;", "condition": "Good", "location": "Bay 1",
+                             "category": "Hand", "requires_calibration": True, "calibration_frequency_days": 90}
+        assert COMPILED_VALIDATION_SCHEMAS["tool_create"](data) == validated
+
+    @pytest.mark.parametrize(("field", "value", "message"), [
+        ("employee_number", "", "This field is required"),
+        ("employee_number", "ab", "Invalid format for employee_number"),
+        ("department", "Sales", "Value must be one of"),
+        ("warehouse_id", "x", "Must be a valid integer"),
+        ("quantity", "-2", "Must be a positive number"),
+        ("quantity", "many", "Must be a valid number"),
+        ("failed_login_attempts", "-1", "Must be a positive integer"),
+        ("is_admin", "maybe", "Must be a boolean value"),
+    ])
+    def test_field_errors(self, field, value, message):
+        with pytest.raises(FieldValidationError, match=message) as excinfo:
+            InputValidator.validate_field(field, value)
+        assert excinfo.value.field == field
+
+    def test_ad_hoc_schema(self):
+        schema = {"warehouse_id": {"required": True}, "quantity": {"required": False}}
+
+        assert InputValidator.validate_json_data({"warehouse_id": "7"}, schema) == {"warehouse_id": 7}
+        assert InputValidator.validate_field("optional_note", None, required=False) is None
@@ -0,0 +1,79 @@
+"""
+Tests for the SQLite engine profile and read/write routing
+"""
+
+from flask import Flask
+from sqlalchemy import text
+
+from models import Announcement, db
+from tests.plugins.query_counter import QueryCounter
+from utils.sqlite_profile import READ_BIND_KEY, configure_sqlite_engines, sqlite_pragmas
+
+
+def _capture(bind_key):
+    """Capture the statements run on one engine."""
+    return QueryCounter([db.engines[bind_key]]).capture()
+
+
+class TestSQLiteProfile:
+    """Tests for engine configuration and connection pragmas"""
+
+    def test_pragmas_applied(self, db_session):
+        with db.engines[None].connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+            assert conn.execute(text("PRAGMA query_only")).scalar() == 0
+
+        with db.engines[READ_BIND_KEY].connect() as conn:
+            assert conn.execute(text("PRAGMA query_only")).scalar() == 1
+
+    def test_default_profile_keeps_sqlite_settings(self):
+        assert sqlite_pragmas({"SQLITE_PROFILE": "default"}) == []
+        assert ("query_only", "ON") in sqlite_pragmas({}, read_only=True)
+
+    def test_single_writer_outside_tests(self, tmp_path):
+        app = Flask(__name__)
+        app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'app.db'}"
+
+        configure_sqlite_engines(app)
+
+        assert app.config["SQLALCHEMY_ENGINE_OPTIONS"]["pool_size"] == 1
+        assert app.config["SQLALCHEMY_BINDS"][READ_BIND_KEY]["url"] == app.config["SQLALCHEMY_DATABASE_URI"]
+
+    def test_in_memory_database_has_no_read_engine(self):
+        app = Flask(__name__)
+        app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+
+        configure_sqlite_engines(app)
+
+        assert "pool_size" not in app.config["SQLALCHEMY_ENGINE_OPTIONS"]
+        assert not app.config.get("SQLALCHEMY_BINDS")
+
+
+class TestReadWriteRouting:
+    """Tests for sending GET route reads to the read-only engine"""
+
+    def test_get_reads_from_read_engine(self, client, auth_headers, db_session, admin_user):
+        db_session.add(Announcement(title="Routed", content="Read", created_by=admin_user.id))
+        db_session.commit()
+
+        with _capture(READ_BIND_KEY) as read, _capture(None) as written:
+            response = client.get("/api/announcements?active_only=false", headers=auth_headers)
+
+        assert response.get_json()["total"] == 1
+        assert [s for s in read if "FROM announcements" in s]
+        assert not [s for s in written if "FROM announcements" in s]
+
+    def test_writes_stay_on_writer(self, client, auth_headers, db_session, admin_user):
+        announcement = Announcement(title="Routed", content="Read", created_by=admin_user.id)
+        db_session.add(announcement)
+        db_session.commit()
+        url = f"/api/announcements/{announcement.id}/read"
+
+        with _capture(READ_BIND_KEY) as read, _capture(None) as written:
+            response = client.post(url, headers=auth_headers)
+
+        assert response.status_code == 200
+        assert [s for s in written if s.startswith("INSERT INTO announcement_reads")]
+        assert not read
@@ -0,0 +1,106 @@
+"""
+Tests for the request threat scanner in security/middleware.py
+"""
+
+import pytest
+from flask import Flask, g, jsonify
+
+from security import middleware
+from security.middleware import detect_sql_injection, detect_xss_attempt, init_security_scan, scan_json
+
+
+class TestDetectors:
+    """Combined patterns flag what the individual ones did"""
+
+    @pytest.mark.parametrize("value", [
+        "admin' OR '1'='1",
+        "1 or 1=1",
+        "x'; DROP TABLE users; --",
+        "a UNION SELECT password FROM users",
+        "1 into outfile '/tmp/x'",
+        "name /* comment */",
+    ])
+    def test_sql_injection(self, value):
+        assert detect_sql_injection(value)
+
+    @pytest.mark.parametrize("value", [
+        "<script>alert(1)</script>",
+        "<SCRIPT src=x>steal()</SCRIPT>",
+        "JavaScript:alert(1)",
+        "<img src=x onerror = alert(1)>",
+        "<iframe src='https://evil'>",
+        '<meta http-equiv="refresh">',
+    ])
+    def test_xss(self, value):
+        assert detect_xss_attempt(value)
+
+    @pytest.mark.parametrize("value", ["Torque wrench 3/8 drive", "P/N 1234-56, qty: 4", "O'Brien", ""])
+    def test_clean_values(self, value):
+        assert not detect_sql_injection(value)
+        assert not detect_xss_attempt(value)
+
+
+class TestScanJson:
+    """Nested JSON bodies are walked with size limits"""
+
+    def test_reports_nested_paths_in_order(self):
+        body = {
+            "name": "kit",
+            "items": [{"notes": "fine"}, {"notes": "<script>x</script>"}],
+            "meta": {"filter": {"q": "1 OR 1=1"}},
+        }
+
+        findings, truncated = scan_json(body)
+
+        assert findings == [("items[1].notes", "XSS attempt"), ("meta.filter.q", "SQL injection")]
+        assert not truncated
+        assert scan_json("<script>x</script>")[0] == [("<body>", "XSS attempt")]
+
+    def test_depth_limit(self, monkeypatch):
+        monkeypatch.setattr(middleware, "SCAN_MAX_DEPTH", 3)
+        body = {"q": "DROP TABLE x"}
+        for _ in range(5):
+            body = {"nested": body}
+
+        assert scan_json(body) == ([], True)
+        # Deeply nested input does not hit the recursion limit
+        deep = "1 OR 1=1"
+        for _ in range(5000):
+            deep = [deep]
+        assert scan_json(deep)[1]
+
+    def test_value_and_string_limits(self, monkeypatch):
+        monkeypatch.setattr(middleware, "SCAN_MAX_VALUES", 10)
+        monkeypatch.setattr(middleware, "SCAN_MAX_STRING_LENGTH", 20)
+
+        findings, truncated = scan_json(["ok"] * 20 + ["DROP TABLE x"])
+        assert (findings, truncated) == ([], True)
+        assert scan_json(["x" * 30 + "<script>x</script>"]) == ([], False)
+
+
+class TestRequestScan:
+    """init_security_scan wires the scanner into every request"""
+
+    @staticmethod
+    def make_app(enabled):
+        app = Flask(__name__)
+        app.config["SECURITY_SCAN_ENABLED"] = enabled
+        init_security_scan(app)
+
+        @app.route("/echo", methods=["GET", "POST"])
+        def echo():
+            return jsonify(getattr(g, "security_threats", None))
+
+        return app
+
+    def test_scans_args_and_nested_json(self):
+        client = self.make_app(True).test_client()
+
+        response = client.post("/echo?q=1%20OR%201%3D1&page=2",
+                               json={"items": [{"notes": "<iframe src=x>"}], "name": "ok"})
+
+        assert response.get_json() == ["SQL injection in parameter: q", "XSS attempt in JSON field: items[0].notes"]
+        assert client.post("/echo", data="{not json", content_type="application/json").get_json() == []
+
+    def test_disabled_by_default(self):
+        assert self.make_app(False).test_client().get("/echo?q=DROP%20TABLE").get_json() is None
@@ -0,0 +1,230 @@
+"""
+Tests for the unread counter service and /api/me/unread
+"""
+
+import pytest
+from flask import Flask
+
+from models import Announcement, AnnouncementRead, UserRequest, UserRequestMessage, db
+from models_kits import KitMessage
+from models_messaging import ChannelMember, ChannelMessage
+from utils.read_markers import ReadMarkerBuffer
+from utils.sqlite_profile import configure_sqlite_engines
+from utils.unread_counters import unread_counters
+
+
+@pytest.fixture
+def inbox(db_session, admin_user, test_user, test_channel, test_kit):
+    """Unread items for the admin user in every category"""
+    db_session.add(ChannelMember(channel_id=test_channel.id, user_id=admin_user.id))
+    messages = [
+        ChannelMessage(channel_id=test_channel.id, sender_id=test_user.id, message=f"Message {i}")
+        for i in range(3)
+    ]
+    # The admin's own message is never unread for them
+    messages.append(ChannelMessage(channel_id=test_channel.id, sender_id=admin_user.id, message="Mine"))
+    db_session.add_all(messages)
+
+    db_session.add_all([
+        KitMessage(kit_id=test_kit.id, sender_id=test_user.id, recipient_id=admin_user.id,
+                   subject="Low stock", message="Reorder"),
+        KitMessage(kit_id=test_kit.id, sender_id=test_user.id, subject="Broadcast", message="All"),
+        KitMessage(kit_id=test_kit.id, sender_id=test_user.id, recipient_id=test_user.id,
+                   subject="Other", message="Not for admin"),
+    ])
+
+    announcements = [
+        Announcement(title=f"Notice {i}", content="Read me", created_by=test_user.id) for i in range(2)
+    ]
+    announcements.append(Announcement(title="Retired", content="Old", created_by=test_user.id, is_active=False))
+    db_session.add_all(announcements)
+
+    user_request = UserRequest(title="Gloves", requester_id=admin_user.id)
+    db_session.add(user_request)
+    db_session.flush()
+    db_session.add(UserRequestMessage(request_id=user_request.id, sender_id=test_user.id,
+                                      recipient_id=admin_user.id, subject="Ordered", message="ETA Friday"))
+    db_session.commit()
+    return {"channel": test_channel, "kit": test_kit, "announcements": announcements}
+
+
+@pytest.fixture
+def pushed(monkeypatch):
+    """Socket.IO unread_counts events, captured instead of sent"""
+    from socketio_config import socketio
+
+    events = []
+    monkeypatch.setattr(socketio, "emit", lambda event, data, to=None, **_: events.append((event, data, to)))
+    return events
+
+
+class TestUnreadEndpoint:
+    """Tests for /api/me/unread"""
+
+    def test_counts_every_category(self, client, auth_headers, inbox):
+        response = client.get("/api/me/unread", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.get_json() == {
+            "channels": 3,
+            "kit_messages": 2,
+            "announcements": 2,
+            "requests": 1,
+            "total": 8,
+        }
+
+    def test_requires_login(self, client):
+        assert client.get("/api/me/unread").status_code == 401
+
+    def test_repeat_reads_are_cached(self, client, auth_headers, inbox, query_counter):
+        client.get("/api/me/unread", headers=auth_headers)
+
+        response, statements = query_counter.call(lambda: client.get("/api/me/unread", headers=auth_headers))
+
+        assert response.get_json()["total"] == 8
+        assert not [s for s in statements if "kit_messages" in s or "channel_messages" in s]
+
+
+class TestCountersMaintainedOnWrite:
+    """Committed writes recount cached users and push the new counts"""
+
+    def test_new_kit_message_is_pushed(self, client, auth_headers, db_session, inbox, admin_user, test_user,
+                                       pushed):
+        client.get("/api/me/unread", headers=auth_headers)
+
+        db_session.add(KitMessage(kit_id=inbox["kit"].id, sender_id=test_user.id, recipient_id=admin_user.id,
+                                  subject="Another", message="Reorder"))
+        db_session.commit()
+        unread_counters.flush()
+
+        assert pushed == [("unread_counts", {
+            "counts": {"channels": 3, "kit_messages": 3, "announcements": 2, "requests": 1, "total": 9},
+            "changes": {"kit_messages": 1},
+        }, f"user_{admin_user.id}")]
+        assert client.get("/api/me/unread", headers=auth_headers).get_json()["kit_messages"] == 3
+
+    def test_uncached_users_are_not_recounted(self, db_session, inbox, admin_user, test_user, pushed, query_counter):
+        message = ChannelMessage(channel_id=inbox["channel"].id, sender_id=test_user.id, message="Nobody is watching")
+
+        _, statements = query_counter.call(lambda: (db_session.add(message), db_session.commit(),
+                                                unread_counters.flush()))
+
+        assert not pushed
+        assert not [s for s in statements if "channel_members" in s]
+
+    def test_channel_message_reaches_members(self, client, auth_headers, db_session, inbox, admin_user,
+                                             test_user, pushed):
+        client.get("/api/me/unread", headers=auth_headers)
+
+        db_session.add(ChannelMessage(channel_id=inbox["channel"].id, sender_id=test_user.id, message="Hello"))
+        db_session.commit()
+        unread_counters.flush()
+
+        assert pushed[-1][1]["changes"] == {"channels": 1}
+        assert unread_counters.get_counts(admin_user.id)["channels"] == 4
+
+    def test_announcement_read(self, client, auth_headers, db_session, inbox, admin_user, pushed):
+        client.get("/api/me/unread", headers=auth_headers)
+
+        db_session.add(AnnouncementRead(announcement_id=inbox["announcements"][0].id, user_id=admin_user.id))
+        db_session.commit()
+        unread_counters.flush()
+
+        assert pushed[-1][1]["changes"] == {"announcements": -1}
+        assert client.get("/api/me/unread", headers=auth_headers).get_json()["announcements"] == 1
+
+    def test_rolled_back_changes_are_ignored(self, client, auth_headers, db_session, inbox, admin_user,
+                                             test_user, pushed):
+        client.get("/api/me/unread", headers=auth_headers)
+
+        db_session.add(KitMessage(kit_id=inbox["kit"].id, sender_id=test_user.id, recipient_id=admin_user.id,
+                                  subject="Draft", message="Never sent"))
+        db_session.flush()
+        db_session.rollback()
+
+        assert unread_counters.pending_count() == 0
+        assert not pushed
+
+    def test_commit_only_queues_and_commits_are_merged(self, client, auth_headers, db_session, inbox, admin_user,
+                                                      test_user, pushed, monkeypatch, query_counter):
+        client.get("/api/me/unread", headers=auth_headers)
+        # Keep the recount thread from picking the changes up first
+        unread_counters.stop()
+        monkeypatch.setattr(unread_counters, "_ensure_started", lambda: None)
+
+        for subject in ("First", "Second"):
+            db_session.add(KitMessage(kit_id=inbox["kit"].id, sender_id=test_user.id, recipient_id=admin_user.id,
+                                      subject=subject, message="Reorder"))
+            db_session.commit()
+
+        assert unread_counters.pending_count() == 2
+        assert not pushed
+
+        _, statements = query_counter.call(unread_counters.flush)
+
+        assert [data["changes"] for _, data, _ in pushed] == [{"kit_messages": 2}]
+        assert len([s for s in statements if "kit_messages" in s]) == 2
+
+    def test_buffered_read_marker(self, app, client, auth_headers, inbox, monkeypatch, pushed, query_counter):
+        """Reading a channel clears its count before the marker is written"""
+        buffer = ReadMarkerBuffer(app, flush_interval=3600)
+        monkeypatch.setattr("utils.read_markers._read_markers", buffer)
+        client.get("/api/me/unread", headers=auth_headers)
+
+        client.get(f"/api/channels/{inbox['channel'].id}/feed", headers=auth_headers)
+        _, statements = query_counter.call(unread_counters.flush)
+
+        assert buffer.pending_count() == 1
+        # Buffered markers are subtracted in Python, not expanded into the SQL
+        assert not [s for s in statements if "CASE" in s]
+        assert pushed[-1][1]["changes"] == {"channels": -3}
+        assert client.get("/api/me/unread", headers=auth_headers).get_json()["channels"] == 0
+        buffer.stop()
+
+    def test_partially_read_buffered_marker(self, app, client, auth_headers, inbox, admin_user, monkeypatch,
+                                            pushed):
+        buffer = ReadMarkerBuffer(app, flush_interval=3600)
+        monkeypatch.setattr("utils.read_markers._read_markers", buffer)
+        client.get("/api/me/unread", headers=auth_headers)
+        second = sorted(
+            message.id for message in ChannelMessage.query.filter_by(channel_id=inbox["channel"].id)
+        )[1]
+
+        buffer.mark(inbox["channel"].id, admin_user.id, second)
+        unread_counters.refresh(admin_user.id, "channels")
+        unread_counters.flush()
+
+        assert pushed[-1][1]["changes"] == {"channels": -2}
+        assert unread_counters.get_counts(admin_user.id)["channels"] == 1
+        buffer.stop()
+
+
+class TestCappedWriterPool:
+    """Commits with the single-connection writer pool of the tuned SQLite profile"""
+
+    def test_recount_does_not_wait_for_a_second_writer_connection(self, app, inbox, admin_user, test_user,
+                                                                  pushed):
+        kit_id, admin_id, sender_id = inbox["kit"].id, admin_user.id, test_user.id
+        capped = Flask(__name__)
+        capped.config.update(
+            SQLALCHEMY_DATABASE_URI=app.config["SQLALCHEMY_DATABASE_URI"],
+            SQLITE_READ_ENGINE=False,
+            SQLITE_POOL_TIMEOUT=2,
+        )
+        configure_sqlite_engines(capped, is_testing=False)
+        assert capped.config["SQLALCHEMY_ENGINE_OPTIONS"]["pool_size"] == 1
+        db.init_app(capped)
+
+        with capped.app_context():
+            try:
+                unread_counters.get_counts(admin_id)
+                db.session.add(KitMessage(kit_id=kit_id, sender_id=sender_id, recipient_id=admin_id,
+                                          subject="Capped", message="Reorder"))
+                db.session.commit()
+                unread_counters.flush()
+
+                assert pushed[-1][1]["changes"] == {"kit_messages": 1}
+                assert unread_counters.get_counts(admin_id)["kit_messages"] == 3
+            finally:
+                db.session.remove()
+                db.engine.dispose()
@@ -0,0 +1,208 @@
+"""
+Active Announcement Cache
+
+The set of active, unexpired announcements is small and changes rarely,
+but every page load used to count, page and re-filter it in SQL and then
+look up the caller's read rows. The set is now loaded once with its
+authors and kept in memory together with each announcement's read state
+as a bitmap of user IDs (bit ``n`` set means user ``n`` has read it), so
+listing announcements and checking read flags needs no queries at all.
+
+``announcement_reads`` rows stay the durable record (with ``read_at`` for
+the admin read statistics); the bitmaps are rebuilt from them whenever
+the cache is reloaded. Marking announcements read is an idempotent
+batched insert that also sets the bits in place.
+
+The cache is cleared when announcements or read rows change through the
+ORM, after ``ANNOUNCEMENT_CACHE_SECONDS`` and as soon as the next active
+announcement expires.
+"""
+
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from sqlalchemy import insert, or_, select
+
+from utils.commit_hooks import CommitHook
+
+
+logger = logging.getLogger(__name__)
+
+CHANGED_KEY = "announcement_cache_changed"
+
+DEFAULT_CACHE_SECONDS = 60
+
+
+class ActiveAnnouncements:
+    """One loaded copy of the active announcement set and its read bitmaps."""
+
+    def __init__(self, announcements, readers, expires_at):
+        self.announcements = announcements
+        self.readers = readers
+        self.expires_at = expires_at
+        self.ids = {announcement["id"] for announcement in announcements}
+
+    def is_read(self, announcement_id, user_id):
+        return bool(self.readers.get(announcement_id, 0) >> user_id & 1)
+
+
+class AnnouncementCache:
+    """In-memory active announcement set with per-user read bitmaps."""
+
+    def __init__(self):
+        self._active = None
+        self._lock = threading.Lock()
+
+    def get_active(self):
+        """
+        The active, unexpired announcements, newest first.
+
+        Returns:
+            ActiveAnnouncements whose ``announcements`` are serialized dicts
+            that callers must copy before changing
+        """
+        with self._lock:
+            active = self._active
+        if active is not None and active.expires_at > time.monotonic():
+            return active
+
+        active = self._load()
+        with self._lock:
+            self._active = active
+        return active
+
+    def mark_read(self, user_id, announcement_ids):
+        """
+        Mark announcements read for a user, skipping any already read.
+
+        Args:
+            user_id: ID of the reading user
+            announcement_ids: IDs of the announcements to mark
+
+        Returns:
+            List of the announcement IDs that were newly marked read
+        """
+        from models import AnnouncementRead, db, get_current_time
+
+        active = self.get_active()
+        candidates = sorted(set(announcement_ids))
+        unread = [announcement_id for announcement_id in candidates
+                  if announcement_id not in active.ids or not active.is_read(announcement_id, user_id)]
+        if not unread:
+            return []
+
+        # Announcements outside the cached set are checked against the table
+        inactive = [announcement_id for announcement_id in unread if announcement_id not in active.ids]
+        if inactive:
+            already_read = set(db.session.execute(
+                select(AnnouncementRead.announcement_id).where(
+                    AnnouncementRead.user_id == user_id,
+                    AnnouncementRead.announcement_id.in_(inactive),
+                )
+            ).scalars())
+            unread = [announcement_id for announcement_id in unread if announcement_id not in already_read]
+            if not unread:
+                return []
+
+        now = get_current_time()
+        db.session.execute(_insert_ignoring_duplicates(AnnouncementRead.__table__), [
+            {"announcement_id": announcement_id, "user_id": user_id, "read_at": now}
+            for announcement_id in unread
+        ])
+        db.session.commit()
+
+        with self._lock:
+            if self._active is active:
+                for announcement_id in unread:
+                    if announcement_id in active.ids:
+                        active.readers[announcement_id] = active.readers.get(announcement_id, 0) | (1 << user_id)
+
+        # Core inserts do not fire the ORM hooks the unread counters listen to
+        from utils.unread_counters import unread_counters
+        unread_counters.refresh(user_id, "announcements")
+
+        return unread
+
+    def invalidate(self):
+        """
+        Drop the cached announcement set.
+
+        Returns:
+            True if a cached set was dropped
+        """
+        with self._lock:
+            dropped = self._active is not None
+            self._active = None
+            return dropped
+
+    def _load(self):
+        from sqlalchemy.orm import joinedload
+
+        from models import Announcement, AnnouncementRead, db, get_current_time
+
+        now = get_current_time()
+        announcements = (
+            Announcement.query
+            .options(joinedload(Announcement.author))
+            .filter(Announcement.is_active.is_(True))
+            .filter(or_(Announcement.expiration_date.is_(None), Announcement.expiration_date > now))
+            .order_by(Announcement.created_at.desc(), Announcement.id.desc())
+            .all()
+        )
+
+        readers = {}
+        if announcements:
+            rows = db.session.execute(
+                select(AnnouncementRead.announcement_id, AnnouncementRead.user_id)
+                .where(AnnouncementRead.announcement_id.in_([a.id for a in announcements]))
+            )
+            for announcement_id, user_id in rows:
+                readers[announcement_id] = readers.get(announcement_id, 0) | (1 << user_id)
+
+        expires_in = self._ttl()
+        expirations = [a.expiration_date for a in announcements if a.expiration_date is not None]
+        if expirations:
+            # Drop the set as soon as the next announcement expires
+            expires_in = min(expires_in, (min(expirations) - now) / timedelta(seconds=1))
+
+        return ActiveAnnouncements(
+            [announcement.to_dict() for announcement in announcements],
+            readers,
+            time.monotonic() + expires_in,
+        )
+
+    def _ttl(self):
+        from flask import current_app
+
+        return current_app.config.get("ANNOUNCEMENT_CACHE_SECONDS", DEFAULT_CACHE_SECONDS)
+
+
+def _insert_ignoring_duplicates(table):
+    """INSERT that skips rows already present (read rows are unique per announcement and user)."""
+    from models import db
+
+    dialect = db.engine.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return insert(table)
+    return dialect_insert(table).on_conflict_do_nothing()
+
+
+announcement_cache = AnnouncementCache()
+
+
+_invalidation_hook = CommitHook(CHANGED_KEY, lambda _changes: announcement_cache.invalidate())
+
+
+def _install_invalidation_hooks():
+    from models import Announcement, AnnouncementRead
+
+    _invalidation_hook.watch((Announcement, AnnouncementRead))
+
+
+_install_invalidation_hooks()
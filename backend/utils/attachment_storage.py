@@ -0,0 +1,327 @@
+"""
+Attachment Storage Utilities
+
+Streams uploaded files to disk in fixed-size chunks while computing a
+SHA-256 digest, so large manuals and PDFs are never held in memory in full.
+
+Files are kept in a content-addressed blob store: each distinct file is
+stored once under its SHA-256 and shared by every MessageAttachment with the
+same content. Blobs are reference counted and removed by a garbage-collection
+pass run from the scheduled maintenance service.
+"""
+
+import hashlib
+import logging
+import os
+import secrets
+import time
+from datetime import timedelta
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from .file_validation import FileValidationError
+
+
+logger = logging.getLogger(__name__)
+
+# nosec B108: /tmp is a safe fallback for development; production should set ATTACHMENTS_FOLDER env var
+UPLOAD_FOLDER = os.environ.get("ATTACHMENTS_FOLDER", "/tmp/supplyline_attachments")  # nosec B108
+BLOBS_FOLDER = os.path.join(UPLOAD_FOLDER, "blobs")
+THUMBNAILS_FOLDER = os.path.join(UPLOAD_FOLDER, "thumbnails")
+
+# Size of each chunk copied from the request stream to disk
+UPLOAD_CHUNK_SIZE = 256 * 1024  # 256KB
+
+# Unreferenced blobs are kept this long before garbage collection
+DEFAULT_GC_GRACE_PERIOD = timedelta(hours=24)
+
+
+def stream_upload_to_disk(file_storage, destination_path, max_size, chunk_size=UPLOAD_CHUNK_SIZE):
+    """
+    Copy an uploaded file to disk chunk by chunk, hashing it on the way.
+
+    The data is written to a temporary ``.part`` file next to the destination
+    and atomically renamed once complete, so a partially written upload is
+    never visible under its final name.
+
+    Args:
+        file_storage: Werkzeug ``FileStorage`` from ``request.files``
+        destination_path: Final path for the stored file
+        max_size: Maximum allowed size in bytes
+        chunk_size: Number of bytes read per chunk
+
+    Returns:
+        Tuple of (file size in bytes, hex SHA-256 digest)
+
+    Raises:
+        FileValidationError: If the upload is empty or exceeds ``max_size``
+    """
+    digest = hashlib.sha256()
+    size = 0
+    temp_path = f"{destination_path}.{secrets.token_hex(4)}.part"
+    stream = file_storage.stream
+
+    try:
+        with open(temp_path, "wb") as output:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise FileValidationError(
+                        f"File too large. Maximum size: {max_size // (1024 * 1024)}MB",
+                        status_code=413,
+                    )
+                digest.update(chunk)
+                output.write(chunk)
+
+        if size == 0:
+            raise FileValidationError("File is empty")
+
+        os.replace(temp_path, destination_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return size, digest.hexdigest()
+
+
+def hash_file(file_path, chunk_size=UPLOAD_CHUNK_SIZE):
+    """
+    Compute the SHA-256 of a file on disk without loading it into memory.
+
+    Returns:
+        Tuple of (file size in bytes, hex SHA-256 digest)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(file_path, "rb") as source:
+        while chunk := source.read(chunk_size):
+            size += len(chunk)
+            digest.update(chunk)
+    return size, digest.hexdigest()
+
+
+class BlobStore:
+    """Content-addressed, reference-counted file store for attachments."""
+
+    def __init__(self, root):
+        """
+        Initialize the blob store.
+
+        Args:
+            root: Directory that holds blob files
+        """
+        self.root = root
+
+    def path_for(self, content_hash):
+        """Return the on-disk path for a blob, fanned out by hash prefix."""
+        return os.path.join(self.root, content_hash[:2], content_hash[2:4], content_hash)
+
+    def store(self, source_path, content_hash, file_size):
+        """
+        Add a file to the store, or reference the existing copy.
+
+        ``source_path`` is consumed: it is moved into the store when the
+        content is new and deleted when an identical blob already exists.
+        The blob's ``ref_count`` is incremented; the caller commits.
+
+        The source is only deleted once the increment has hit the row. The
+        increment holds the row against ``collect_garbage``, whose DELETE
+        re-checks ``ref_count``. If collection removed the row first, the
+        upload is stored as new content.
+
+        Args:
+            source_path: Path of the uploaded file
+            content_hash: SHA-256 hex digest of the file
+            file_size: Size of the file in bytes
+
+        Returns:
+            The AttachmentBlob referenced by the new attachment
+        """
+        from models import db
+        from models_messaging import AttachmentBlob
+
+        blob = db.session.get(AttachmentBlob, content_hash)
+        if blob is not None and os.path.exists(blob.storage_path):
+            if self._increment(content_hash):
+                os.remove(source_path)
+                return blob
+            # Collected between the lookup and the increment
+            db.session.expunge(blob)
+            blob = None
+
+        blob_path = self.path_for(content_hash)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        os.replace(source_path, blob_path)
+
+        if blob is not None:
+            # Row survived but the file was lost; the new upload restores it
+            blob.storage_path = blob_path
+            self._increment(content_hash)
+            return blob
+
+        blob = AttachmentBlob(
+            content_hash=content_hash,
+            file_size=file_size,
+            storage_path=blob_path,
+            ref_count=1,
+        )
+        try:
+            with db.session.begin_nested():
+                db.session.add(blob)
+        except IntegrityError:
+            # A concurrent upload of the same content created the row first
+            blob = db.session.get(AttachmentBlob, content_hash)
+            self._increment(content_hash)
+        return blob
+
+    def _increment(self, content_hash):
+        from models import db
+        from models_messaging import AttachmentBlob
+
+        return db.session.execute(
+            update(AttachmentBlob)
+            .where(AttachmentBlob.content_hash == content_hash)
+            .values(ref_count=AttachmentBlob.ref_count + 1)
+        ).rowcount
+
+    def release(self, content_hash):
+        """
+        Drop one reference to a blob; the caller commits.
+        Files are only removed later by ``collect_garbage``.
+        """
+        from models import db
+        from models_messaging import AttachmentBlob, get_current_time
+
+        db.session.execute(
+            update(AttachmentBlob)
+            .where(AttachmentBlob.content_hash == content_hash, AttachmentBlob.ref_count > 0)
+            .values(ref_count=AttachmentBlob.ref_count - 1, last_released_date=get_current_time())
+        )
+
+    def reconcile_ref_counts(self):
+        """
+        Reset ``ref_count`` to the number of attachments that reference each blob.
+
+        Attachments removed indirectly (e.g. by message cascades) never call
+        ``release``, so this keeps the counts honest before collection.
+
+        Returns:
+            Number of blobs whose count was corrected
+        """
+        from models import db
+        from models_messaging import AttachmentBlob, MessageAttachment, get_current_time
+
+        actual = (
+            select(func.count(MessageAttachment.id))
+            .where(MessageAttachment.content_hash == AttachmentBlob.content_hash)
+            .scalar_subquery()
+        )
+        result = db.session.execute(
+            update(AttachmentBlob)
+            .where(AttachmentBlob.ref_count != actual)
+            .values(ref_count=actual, last_released_date=get_current_time())
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    def collect_garbage(self, grace_period=DEFAULT_GC_GRACE_PERIOD, batch_size=500):
+        """
+        Delete blobs that no attachment references.
+
+        Blobs must have been unreferenced for at least ``grace_period``.
+        Stray files in the blob directory with no row (left behind by
+        failed uploads) are removed under the same grace period.
+
+        Returns:
+            Dictionary with blobs_removed, orphans_removed, bytes_freed and refs_corrected
+        """
+        from models import db
+        from models_messaging import AttachmentBlob, get_current_time
+
+        results = {"blobs_removed": 0, "orphans_removed": 0, "bytes_freed": 0, "refs_corrected": 0}
+
+        results["refs_corrected"] = self.reconcile_ref_counts()
+        db.session.commit()
+
+        cutoff = get_current_time() - grace_period
+        candidates = AttachmentBlob.query.filter(
+            AttachmentBlob.ref_count <= 0,
+            or_(
+                AttachmentBlob.last_released_date < cutoff,
+                and_(AttachmentBlob.last_released_date.is_(None), AttachmentBlob.created_date < cutoff),
+            ),
+        ).limit(batch_size).all()
+
+        files_to_remove = []
+        for blob in candidates:
+            # Re-check the count in the DELETE so a concurrent upload wins the race
+            deleted = db.session.execute(
+                delete(AttachmentBlob)
+                .where(AttachmentBlob.content_hash == blob.content_hash, AttachmentBlob.ref_count <= 0)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if deleted:
+                files_to_remove.append((blob.storage_path, blob.thumbnail_path, blob.file_size))
+        db.session.commit()
+
+        file_cutoff = time.time() - grace_period.total_seconds()
+        for storage_path, thumbnail_path, file_size in files_to_remove:
+            results["blobs_removed"] += 1
+            if self._written_since(storage_path, file_cutoff):
+                # Re-uploaded while this collection ran; the new row owns the file,
+                # otherwise the orphan sweep removes it once it is old enough
+                continue
+            for path in (storage_path, os.path.join(UPLOAD_FOLDER, thumbnail_path) if thumbnail_path else None):
+                if path and os.path.exists(path):
+                    os.remove(path)
+            results["bytes_freed"] += file_size
+
+        orphans_removed, orphan_bytes = self._remove_orphan_files(grace_period)
+        results["orphans_removed"] = orphans_removed
+        results["bytes_freed"] += orphan_bytes
+
+        return results
+
+    @staticmethod
+    def _written_since(path, cutoff):
+        try:
+            return os.stat(path).st_mtime >= cutoff
+        except OSError:
+            return False
+
+    def _remove_orphan_files(self, grace_period):
+        from models import db
+        from models_messaging import AttachmentBlob
+
+        if not os.path.isdir(self.root):
+            return 0, 0
+
+        known_hashes = set(db.session.scalars(select(AttachmentBlob.content_hash)))
+        cutoff = time.time() - grace_period.total_seconds()
+        removed = 0
+        freed = 0
+
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename in known_hashes:
+                    continue
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                    if stat.st_mtime >= cutoff:
+                        continue
+                    os.remove(path)
+                except OSError:
+                    continue
+                removed += 1
+                freed += stat.st_size
+
+        return removed, freed
+
+
+blob_store = BlobStore(BLOBS_FOLDER)
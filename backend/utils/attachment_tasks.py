@@ -0,0 +1,303 @@
+"""
+Attachment Background Tasks
+
+Moves attachment work that does not need to block a request off the
+request thread:
+
+- Thumbnail generation runs on a small worker pool after the upload has
+  been committed; the attachment's ``thumbnail_path`` is filled in when the
+  thumbnail is ready.
+- Download tracking is queued in memory and flushed in batches by a
+  background thread, so a download never waits on a database write lock.
+  ``download_count`` is therefore eventually consistent (by at most one
+  flush interval).
+"""
+
+import logging
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from PIL import Image
+from sqlalchemy import bindparam
+
+from utils.background_batcher import BackgroundBatcher
+
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = (300, 300)
+
+# Downloads kept in memory while the database is unavailable; older ones are dropped past this
+MAX_PENDING_DOWNLOADS = 50000
+
+
+def create_thumbnail(image_path, thumbnail_path):
+    """
+    Create a thumbnail for an image.
+    Returns True if successful, False otherwise.
+    """
+    try:
+        with Image.open(image_path) as original_img:
+            # Convert RGBA to RGB if necessary
+            if original_img.mode in ("RGBA", "LA", "P"):
+                background = Image.new("RGB", original_img.size, (255, 255, 255))
+                if original_img.mode == "P":
+                    converted_img = original_img.convert("RGBA")
+                else:
+                    converted_img = original_img
+                background.paste(converted_img, mask=converted_img.split()[-1] if converted_img.mode == "RGBA" else None)
+                thumbnail_img = background
+            else:
+                thumbnail_img = original_img.copy()
+
+            # Create thumbnail
+            thumbnail_img.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+            thumbnail_img.save(thumbnail_path, "JPEG", quality=85, optimize=True)
+            return True
+    except Exception as e:
+        logger.error(f"Error creating thumbnail: {e!s}", exc_info=True)
+        return False
+
+
+class ThumbnailWorkerPool:
+    """Generates attachment thumbnails on a bounded thread pool."""
+
+    def __init__(self, app, max_workers=2):
+        """
+        Initialize the thumbnail worker pool.
+
+        Args:
+            app: Flask application instance
+            max_workers: Number of worker threads
+        """
+        self.app = app
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ThumbnailWorker")
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def submit(self, attachment_id, image_path, thumbnail_path, relative_path, content_hash=None):
+        """
+        Queue thumbnail generation for a committed attachment.
+
+        Args:
+            attachment_id: ID of the MessageAttachment to update
+            image_path: Absolute path of the uploaded image
+            thumbnail_path: Absolute path to write the thumbnail to
+            relative_path: Value stored in ``MessageAttachment.thumbnail_path``
+            content_hash: Blob whose shared thumbnail should also be recorded
+
+        Returns:
+            Future for the queued job
+        """
+        future = self.executor.submit(
+            self._generate, attachment_id, image_path, thumbnail_path, relative_path, content_hash
+        )
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._discard)
+        return future
+
+    def _discard(self, future):
+        with self._lock:
+            self._pending.discard(future)
+
+    def _generate(self, attachment_id, image_path, thumbnail_path, relative_path, content_hash=None):
+        if not create_thumbnail(image_path, thumbnail_path):
+            return False
+
+        from models import db
+        from models_messaging import AttachmentBlob, MessageAttachment
+
+        with self.app.app_context():
+            try:
+                updated = db.session.query(MessageAttachment).filter_by(id=attachment_id).update(
+                    {"thumbnail_path": relative_path}, synchronize_session=False
+                )
+                if content_hash:
+                    # Every attachment sharing this blob gets the same thumbnail
+                    updated += db.session.query(AttachmentBlob).filter_by(content_hash=content_hash).update(
+                        {"thumbnail_path": relative_path}, synchronize_session=False
+                    )
+                    db.session.query(MessageAttachment).filter(
+                        MessageAttachment.content_hash == content_hash,
+                        MessageAttachment.thumbnail_path.is_(None)
+                    ).update({"thumbnail_path": relative_path}, synchronize_session=False)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error("Error saving thumbnail path", exc_info=True, extra={
+                    "attachment_id": attachment_id,
+                    "error_message": str(e)
+                })
+                return False
+            finally:
+                db.session.remove()
+
+        if not updated and os.path.exists(thumbnail_path):
+            # Attachment was deleted while the thumbnail was being generated
+            os.remove(thumbnail_path)
+        return bool(updated)
+
+    def wait(self, timeout=None):
+        """Block until all queued thumbnails are generated (used by tests and shutdown)."""
+        with self._lock:
+            pending = list(self._pending)
+        if pending:
+            wait(pending, timeout=timeout)
+
+    def shutdown(self):
+        """Stop accepting work and wait for queued thumbnails to finish."""
+        self.executor.shutdown(wait=True)
+
+
+class DownloadTracker(BackgroundBatcher):
+    """
+    Batches attachment download records and writes them asynchronously.
+
+    Downloads are appended to an in-memory buffer. A background thread
+    flushes the buffer every ``flush_interval`` seconds, or as soon as
+    ``batch_size`` downloads are waiting, with one bulk INSERT into
+    ``attachment_downloads`` and one grouped ``download_count`` UPDATE.
+    """
+
+    thread_name = "AttachmentDownloadTracker"
+
+    def __init__(self, app, flush_interval=5.0, batch_size=200):
+        """
+        Initialize the download tracker.
+
+        Args:
+            app: Flask application instance
+            flush_interval: Maximum seconds a download waits before being written
+            batch_size: Number of buffered downloads that triggers an early flush
+        """
+        super().__init__(flush_interval, batch_size)
+        self.app = app
+        self._buffer = []
+
+    def record(self, attachment_id, user_id, ip_address=None):
+        """Queue a download for the next flush."""
+        from models_messaging import get_current_time
+
+        with self._lock:
+            self._buffer.append({
+                "attachment_id": attachment_id,
+                "user_id": user_id,
+                "ip_address": ip_address,
+                "download_date": get_current_time(),
+            })
+            pending = len(self._buffer)
+
+        self._queued(pending)
+
+    def pending_count(self):
+        """Number of downloads waiting to be written."""
+        with self._lock:
+            return len(self._buffer)
+
+    def flush(self):
+        """
+        Write all buffered downloads to the database.
+
+        Returns:
+            Number of download records written
+        """
+        from models import db
+        from models_messaging import AttachmentDownload, MessageAttachment
+
+        with self._flush_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return 0
+
+            increments = Counter(row["attachment_id"] for row in rows)
+            attachments = MessageAttachment.__table__
+            increment_stmt = (
+                attachments.update()
+                .where(attachments.c.id == bindparam("b_attachment_id"))
+                .values(download_count=attachments.c.download_count + bindparam("b_increment"))
+            )
+
+            with self.app.app_context():
+                try:
+                    db.session.bulk_insert_mappings(AttachmentDownload, rows)
+                    db.session.execute(increment_stmt, [
+                        {"b_attachment_id": attachment_id, "b_increment": count}
+                        for attachment_id, count in increments.items()
+                    ])
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    self._requeue(rows)
+                    logger.error("Error flushing attachment downloads", exc_info=True, extra={
+                        "download_count": len(rows),
+                        "error_message": str(e)
+                    })
+                    return 0
+                finally:
+                    db.session.remove()
+
+        logger.debug("Flushed attachment downloads", extra={
+            "download_count": len(rows),
+            "attachment_count": len(increments)
+        })
+        return len(rows)
+
+    def _requeue(self, rows):
+        with self._lock:
+            self._buffer = rows + self._buffer
+            overflow = len(self._buffer) - MAX_PENDING_DOWNLOADS
+            if overflow > 0:
+                del self._buffer[:overflow]
+                logger.warning("Dropped oldest queued attachment downloads", extra={"dropped_count": overflow})
+
+
+# Global instances
+_thumbnail_pool = None
+_download_tracker = None
+
+
+def init_attachment_tasks(app):
+    """
+    Initialize the thumbnail worker pool and download tracker.
+
+    Args:
+        app: Flask application instance
+    """
+    global _thumbnail_pool, _download_tracker
+
+    if _thumbnail_pool is None:
+        _thumbnail_pool = ThumbnailWorkerPool(
+            app, max_workers=app.config.get("ATTACHMENT_THUMBNAIL_WORKERS", 2)
+        )
+    if _download_tracker is None:
+        _download_tracker = DownloadTracker(
+            app,
+            flush_interval=app.config.get("ATTACHMENT_DOWNLOAD_FLUSH_SECONDS", 5.0),
+            batch_size=app.config.get("ATTACHMENT_DOWNLOAD_BATCH_SIZE", 200),
+        )
+
+
+def shutdown_attachment_tasks():
+    """Finish queued thumbnails and flush pending download records."""
+    global _thumbnail_pool, _download_tracker
+
+    if _thumbnail_pool:
+        _thumbnail_pool.shutdown()
+        _thumbnail_pool = None
+    if _download_tracker:
+        _download_tracker.stop()
+        _download_tracker = None
+
+
+def get_thumbnail_pool():
+    """Get the global thumbnail worker pool."""
+    return _thumbnail_pool
+
+
+def get_download_tracker():
+    """Get the global download tracker."""
+    return _download_tracker
@@ -0,0 +1,299 @@
+"""
+Asynchronous Audit Log Writer
+
+Takes audit log inserts off the request path. Routes keep creating
+``AuditLog`` objects and adding them to the session as before; a session
+hook diverts them into an in-process queue instead of flushing them with
+the request's transaction:
+
+- ``before_flush`` removes pending AuditLog objects from the session and
+  stashes their values on the session.
+- ``after_commit`` hands the stash to the writer, so an audit entry is only
+  recorded when the change it describes was committed. A rollback discards
+  it, exactly as a synchronous insert would have been rolled back.
+- A background thread writes the queue with one bulk INSERT every
+  ``flush_interval`` milliseconds, or as soon as ``batch_size`` rows wait.
+
+Audit history is therefore eventually consistent, by at most one flush
+interval. Rows older than the retention window are moved into compressed
+``AuditLogSegment`` archives by the scheduled maintenance service.
+"""
+
+import gzip
+import json
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, event, func, select
+
+from utils.background_batcher import BackgroundBatcher
+from utils.commit_hooks import CommitHook
+
+
+logger = logging.getLogger(__name__)
+
+PENDING_AUDIT_LOGS_KEY = "pending_audit_logs"
+
+# Rows kept in memory while the database is unavailable; older rows are dropped past this
+MAX_PENDING_AUDIT_LOGS = 50000
+
+
+class AuditLogWriter(BackgroundBatcher):
+    """
+    Batches audit log rows and writes them from a background thread.
+    """
+
+    thread_name = "AuditLogWriter"
+
+    def __init__(self, app, flush_interval_ms=250, batch_size=500):
+        """
+        Initialize the audit log writer.
+
+        Args:
+            app: Flask application instance
+            flush_interval_ms: Maximum milliseconds a row waits before being written
+            batch_size: Number of queued rows that triggers an early flush
+        """
+        super().__init__(flush_interval_ms / 1000.0, batch_size)
+        self.app = app
+        self._buffer = []
+
+    def enqueue(self, rows):
+        """Queue audit log rows (``AuditLog`` column mappings) for the next flush."""
+        if not rows:
+            return
+
+        with self._lock:
+            self._buffer.extend(rows)
+            pending = len(self._buffer)
+
+        self._queued(pending)
+
+    def pending_count(self):
+        """Number of audit log rows waiting to be written."""
+        with self._lock:
+            return len(self._buffer)
+
+    def flush(self):
+        """
+        Write all queued audit log rows to the database.
+
+        Rows are put back on the queue if the write fails, so a brief
+        database outage delays audit entries instead of losing them.
+
+        Returns:
+            Number of audit log rows written
+        """
+        from models import AuditLog, db
+
+        with self._flush_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return 0
+
+            with self.app.app_context():
+                try:
+                    db.session.bulk_insert_mappings(AuditLog, rows, render_nulls=True)
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    self._requeue(rows)
+                    logger.error("Error flushing audit log rows", exc_info=True, extra={
+                        "row_count": len(rows),
+                        "error_message": str(e)
+                    })
+                    return 0
+                finally:
+                    db.session.remove()
+
+        logger.debug("Flushed audit log rows", extra={"row_count": len(rows)})
+        return len(rows)
+
+    def _requeue(self, rows):
+        with self._lock:
+            self._buffer = rows + self._buffer
+            overflow = len(self._buffer) - MAX_PENDING_AUDIT_LOGS
+            if overflow > 0:
+                del self._buffer[:overflow]
+                logger.warning("Dropped oldest queued audit log rows", extra={"dropped_count": overflow})
+
+
+def _stash_pending_audit_logs(session, flush_context, instances):
+    """Move new AuditLog objects out of the flush and onto the session."""
+    from models import AuditLog, get_current_time
+
+    if _audit_writer is None:
+        return
+
+    pending = [obj for obj in session.new if isinstance(obj, AuditLog)]
+    if not pending:
+        return
+
+    stash = _commit_hook.pending(session)
+    for audit_log in pending:
+        session.expunge(audit_log)
+        stash.append({
+            "action_type": audit_log.action_type,
+            "action_details": audit_log.action_details,
+            "timestamp": audit_log.timestamp or get_current_time(),
+        })
+
+
+def _enqueue_committed_audit_logs(rows):
+    if _audit_writer is not None:
+        _audit_writer.enqueue(rows)
+
+
+_commit_hook = CommitHook(PENDING_AUDIT_LOGS_KEY, _enqueue_committed_audit_logs, factory=list)
+
+
+def _install_session_hooks():
+    from sqlalchemy.orm import Session
+
+    if not event.contains(Session, "before_flush", _stash_pending_audit_logs):
+        event.listen(Session, "before_flush", _stash_pending_audit_logs)
+
+
+def get_recent_audit_logs(days=None, limit=100, offset=0, action_type=None):
+    """
+    Read audit logs from the recent window, newest first.
+
+    Bounding the query by timestamp lets it walk the ``timestamp`` (or
+    ``action_type, timestamp``) index instead of sorting the whole table.
+
+    Args:
+        days: Size of the window in days (``AUDIT_RECENT_WINDOW_DAYS`` by default)
+        limit: Maximum number of rows to return
+        offset: Number of rows to skip
+        action_type: Optional action type filter
+
+    Returns:
+        List of AuditLog objects
+    """
+    from flask import current_app
+
+    from models import AuditLog
+
+    if days is None:
+        days = current_app.config.get("AUDIT_RECENT_WINDOW_DAYS", 30)
+
+    query = AuditLog.query.filter(AuditLog.timestamp >= datetime.now() - timedelta(days=days))
+    if action_type:
+        query = query.filter(AuditLog.action_type == action_type)
+
+    return query.order_by(AuditLog.timestamp.desc()).offset(offset).limit(limit).all()
+
+
+def _month_bounds(timestamp):
+    start = timestamp.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start, end
+
+
+def archive_audit_logs(retention_days=365, batch_size=5000):
+    """
+    Move audit log rows older than the retention window into compressed segments.
+
+    Rows are archived oldest first, one calendar month per segment (a busy
+    month may span several segments). Each segment is written and its rows
+    deleted in the same transaction.
+
+    Args:
+        retention_days: Rows older than this many days are archived
+        batch_size: Maximum rows per segment
+
+    Returns:
+        Dictionary with segments_created and rows_archived
+    """
+    from models import AuditLog, AuditLogSegment, db
+
+    results = {"segments_created": 0, "rows_archived": 0}
+    cutoff = datetime.now() - timedelta(days=retention_days)
+
+    while True:
+        oldest = db.session.scalar(select(func.min(AuditLog.timestamp)).where(AuditLog.timestamp < cutoff))
+        if oldest is None:
+            break
+
+        period_start, period_end = _month_bounds(oldest)
+        rows = db.session.execute(
+            select(AuditLog.id, AuditLog.action_type, AuditLog.action_details, AuditLog.timestamp)
+            .where(AuditLog.timestamp >= period_start, AuditLog.timestamp < min(period_end, cutoff))
+            .order_by(AuditLog.timestamp, AuditLog.id)
+            .limit(batch_size)
+        ).all()
+
+        payload = gzip.compress(json.dumps([
+            {
+                "id": row.id,
+                "action_type": row.action_type,
+                "action_details": row.action_details,
+                "timestamp": row.timestamp.isoformat(),
+            }
+            for row in rows
+        ]).encode("utf-8"))
+
+        db.session.add(AuditLogSegment(
+            period_start=period_start,
+            period_end=period_end,
+            first_timestamp=rows[0].timestamp,
+            last_timestamp=rows[-1].timestamp,
+            row_count=len(rows),
+            payload=payload,
+        ))
+        db.session.execute(
+            delete(AuditLog)
+            .where(AuditLog.id.in_([row.id for row in rows]))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+        results["segments_created"] += 1
+        results["rows_archived"] += len(rows)
+
+    return results
+
+
+# Global instance
+_audit_writer = None
+
+
+def init_audit_writer(app):
+    """
+    Initialize the audit log writer and divert AuditLog inserts to it.
+
+    Set ``AUDIT_LOG_ASYNC`` to False to keep writing audit logs
+    synchronously with each request.
+
+    Args:
+        app: Flask application instance
+    """
+    global _audit_writer
+
+    if not app.config.get("AUDIT_LOG_ASYNC", True):
+        return None
+
+    if _audit_writer is None:
+        _audit_writer = AuditLogWriter(
+            app,
+            flush_interval_ms=app.config.get("AUDIT_LOG_FLUSH_INTERVAL_MS", 250),
+            batch_size=app.config.get("AUDIT_LOG_BATCH_SIZE", 500),
+        )
+        _install_session_hooks()
+
+    return _audit_writer
+
+
+def shutdown_audit_writer():
+    """Flush pending audit log rows and stop the writer."""
+    global _audit_writer
+
+    if _audit_writer:
+        writer, _audit_writer = _audit_writer, None
+        writer.stop()
+
+
+def get_audit_writer():
+    """Get the global audit log writer."""
+    return _audit_writer
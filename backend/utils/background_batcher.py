@@ -0,0 +1,106 @@
+"""
+Background Batchers
+
+Several services keep work in memory and apply it from a background
+thread: attachment download records, audit log rows, channel read markers
+and unread counter recounts. ``BackgroundBatcher`` holds what they share:
+the buffer lock, the wake and stop events, the lazily started daemon
+thread, and a final flush on stop.
+
+Every batcher is tracked so ``flush_all`` can apply all queued work at
+once, as the tests do before wiping tables.
+"""
+
+import threading
+import weakref
+
+
+_batchers = weakref.WeakSet()
+
+
+class BackgroundBatcher:
+    """
+    Base class for in-memory buffers flushed by a background thread.
+
+    Subclasses guard their buffer with ``self._lock``, implement ``flush``
+    and ``pending_count``, and call ``_queued`` after adding to the buffer.
+    ``flush`` should hold ``self._flush_lock`` so the thread and direct
+    callers never flush at the same time.
+    """
+
+    # Name of the flush thread
+    thread_name = "BackgroundBatcher"
+
+    def __init__(self, flush_interval, batch_size=1):
+        """
+        Initialize the batcher; the thread starts on the first queued item.
+
+        Args:
+            flush_interval: Maximum seconds queued work waits before being flushed
+            batch_size: Number of queued items that wakes the thread early
+        """
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        _batchers.add(self)
+
+    def flush(self):
+        """
+        Apply all queued work now.
+
+        Returns:
+            Number of items handled
+        """
+        raise NotImplementedError
+
+    def pending_count(self):
+        """Number of items waiting to be flushed."""
+        raise NotImplementedError
+
+    def stop(self):
+        """Stop the flush thread and flush whatever is still queued."""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=10)
+        self.flush()
+
+    def _queued(self, pending):
+        """Start the thread if needed and wake it once ``pending`` reaches the batch size."""
+        self._ensure_started()
+        if pending >= self.batch_size:
+            self._wake_event.set()
+
+    def _ensure_started(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._flush_loop,
+                daemon=True,
+                name=self.thread_name
+            )
+            self._thread.start()
+
+    def _flush_loop(self):
+        while not self._stop_event.is_set():
+            self._wake_event.wait(timeout=self.flush_interval)
+            self._wake_event.clear()
+            self.flush()
+
+
+def flush_all():
+    """
+    Flush every batcher in this process.
+
+    Returns:
+        Number of items handled
+    """
+    return sum(batcher.flush() for batcher in list(_batchers))
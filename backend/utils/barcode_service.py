@@ -6,9 +6,16 @@ Supports both 1D barcodes (CODE128, EAN, etc.) and 2D codes (QR codes).
 
 All barcodes are generated as SVG for crisp, scalable vector graphics suitable
 for professional printing on standard printers and future Zebra printer compatibility.
+A compact 1-bit PNG raster path is also available for direct thermal printers.
+
+Rendered codes are memoized in bounded LRU caches keyed on the data and the
+rendering options, so re-opening the same tool or chemical label does not
+re-encode its barcode. Per-size configurations are stored in an immutable table.
 """
 
 import io
+from functools import cache, lru_cache
+from types import MappingProxyType
 from typing import Literal
 
 import barcode
@@ -18,6 +25,208 @@ from barcode.writer import SVGWriter
 
 # Barcode type definitions
 BarcodeType = Literal["CODE128", "CODE39", "EAN13", "EAN8", "UPCA"]
+ErrorCorrection = Literal["L", "M", "Q", "H"]
+
+# Maximum number of rendered codes kept per cache (SVG and PNG caches are separate)
+BARCODE_CACHE_SIZE = 1024
+
+# Default resolution for raster output; 203 dpi is the native resolution of
+# most direct thermal label printers (Zebra, Dymo, Brother QL)
+THERMAL_PRINTER_DPI = 203
+
+
+def _freeze(config: dict) -> MappingProxyType:
+    """Recursively wrap a nested configuration dict in read-only proxies."""
+    return MappingProxyType({
+        key: _freeze(value) if isinstance(value, dict) else value
+        for key, value in config.items()
+    })
+
+
+# Barcode configuration parameters optimized for each label size.
+# The table is immutable so it can be shared safely between requests.
+BARCODE_CONFIGS = _freeze({
+    "4x6": {
+        "1d": {
+            "module_width": 0.35,
+            "module_height": 18.0,
+            "font_size": 12,
+            "text_distance": 5.0,
+            "quiet_zone": 8.0,
+        },
+        "qr": {
+            "scale": 12,
+            "border": 4,
+            "error_correction": "M",
+        },
+    },
+    "3x4": {
+        "1d": {
+            "module_width": 0.3,
+            "module_height": 14.0,
+            "font_size": 10,
+            "text_distance": 4.0,
+            "quiet_zone": 6.5,
+        },
+        "qr": {
+            "scale": 10,
+            "border": 3,
+            "error_correction": "M",
+        },
+    },
+    "2x4": {
+        "1d": {
+            "module_width": 0.25,
+            "module_height": 12.0,
+            "font_size": 8,
+            "text_distance": 3.0,
+            "quiet_zone": 5.0,
+        },
+        "qr": {
+            "scale": 8,
+            "border": 2,
+            "error_correction": "M",
+        },
+    },
+    "2x2": {
+        "1d": {
+            "module_width": 0.2,
+            "module_height": 8.0,
+            "font_size": 7,
+            "text_distance": 2.0,
+            "quiet_zone": 4.0,
+        },
+        "qr": {
+            "scale": 10,
+            "border": 2,
+            "error_correction": "H",  # Higher error correction for small labels
+        },
+    },
+})
+
+DEFAULT_LABEL_SIZE = "4x6"
+
+
+@cache
+def _get_barcode_class(barcode_type: str):
+    """Resolve (and memoize) the python-barcode class for a symbology."""
+    return barcode.get_barcode_class(barcode_type.lower())
+
+
+def _get_image_writer_class():
+    """Lazy import the Pillow-backed raster writer used for 1D PNG output."""
+    from barcode.writer import ImageWriter
+
+    if ImageWriter is None:
+        raise RuntimeError(
+            "Pillow is not available. Raster (PNG) barcode output requires Pillow to be installed."
+        )
+    return ImageWriter
+
+
+@lru_cache(maxsize=BARCODE_CACHE_SIZE)
+def _render_1d_barcode_svg(
+    data: str,
+    barcode_type: str,
+    module_width: float,
+    module_height: float,
+    font_size: int,
+    text_distance: float,
+    quiet_zone: float,
+) -> str:
+    # Configure SVG writer with professional settings
+    writer = SVGWriter()
+    writer.set_options({
+        "module_width": module_width,
+        "module_height": module_height,
+        "font_size": font_size,
+        "text_distance": text_distance,
+        "quiet_zone": quiet_zone,
+        "write_text": True,  # Include human-readable text
+    })
+
+    # Generate barcode and render to SVG
+    barcode_instance = _get_barcode_class(barcode_type)(data, writer=writer)
+    output = io.BytesIO()
+    barcode_instance.write(output)
+
+    return output.getvalue().decode("utf-8")
+
+
+@lru_cache(maxsize=BARCODE_CACHE_SIZE)
+def _render_1d_barcode_png(
+    data: str,
+    barcode_type: str,
+    module_width: float,
+    module_height: float,
+    font_size: int,
+    text_distance: float,
+    quiet_zone: float,
+    dpi: int,
+) -> bytes:
+    # 1-bit monochrome keeps the raster small and matches thermal print heads
+    writer = _get_image_writer_class()(format="PNG", mode="1")
+    barcode_instance = _get_barcode_class(barcode_type)(data, writer=writer)
+    output = io.BytesIO()
+    barcode_instance.write(output, options={
+        "module_width": module_width,
+        "module_height": module_height,
+        "font_size": font_size,
+        "text_distance": text_distance,
+        "quiet_zone": quiet_zone,
+        "write_text": True,
+        "dpi": dpi,
+    })
+
+    return output.getvalue()
+
+
+@lru_cache(maxsize=BARCODE_CACHE_SIZE)
+def _make_qr_code(data: str, error_correction: str) -> segno.QRCode:
+    # Encoding is the expensive part; the resulting matrix is reused for SVG and PNG output
+    return segno.make(data, error=error_correction.lower(), boost_error=False)
+
+
+@lru_cache(maxsize=BARCODE_CACHE_SIZE)
+def _render_qr_code_svg(
+    data: str,
+    scale: int,
+    border: int,
+    error_correction: str,
+    dark_color: str,
+    light_color: str,
+) -> str:
+    output = io.BytesIO()
+    _make_qr_code(data, error_correction).save(
+        output,
+        kind="svg",
+        scale=scale,
+        border=border,
+        dark=dark_color,
+        light=light_color,
+        xmldecl=False,  # Don't include XML declaration
+        svgns=True,  # Include SVG namespace
+        svgclass="qr-code",  # Add CSS class for styling
+        lineclass="qr-line",  # Add CSS class for lines
+    )
+
+    return output.getvalue().decode("utf-8")
+
+
+@lru_cache(maxsize=BARCODE_CACHE_SIZE)
+def _render_qr_code_png(data: str, scale: int, border: int, error_correction: str) -> bytes:
+    # segno writes black/white PNGs as 1-bit greyscale without needing Pillow
+    output = io.BytesIO()
+    _make_qr_code(data, error_correction).save(
+        output,
+        kind="png",
+        scale=scale,
+        border=border,
+        dark="#000000",
+        light="#FFFFFF",
+    )
+
+    return output.getvalue()
 
 
 def generate_1d_barcode_svg(
@@ -48,30 +257,48 @@ def generate_1d_barcode_svg(
         ValueError: If the data is invalid for the specified barcode type
     """
     try:
-        # Create barcode instance
-        barcode_class = barcode.get_barcode_class(barcode_type.lower())
-
-        # Configure SVG writer with professional settings
-        writer = SVGWriter()
-        writer.set_options({
-            "module_width": module_width,
-            "module_height": module_height,
-            "font_size": font_size,
-            "text_distance": text_distance,
-            "quiet_zone": quiet_zone,
-            "write_text": True,  # Include human-readable text
-        })
-
-        # Generate barcode
-        barcode_instance = barcode_class(data, writer=writer)
-
-        # Render to SVG
-        output = io.BytesIO()
-        barcode_instance.write(output)
-
-        # Return SVG as string
-        return output.getvalue().decode("utf-8")
+        return _render_1d_barcode_svg(
+            data, barcode_type, module_width, module_height, font_size, text_distance, quiet_zone
+        )
+    except Exception as e:
+        raise ValueError(f"Failed to generate {barcode_type} barcode: {e!s}") from e
+
+
+def generate_1d_barcode_png(
+    data: str,
+    barcode_type: BarcodeType = "CODE128",
+    module_width: float = 0.3,
+    module_height: float = 15.0,
+    font_size: int = 10,
+    text_distance: float = 5.0,
+    quiet_zone: float = 6.5,
+    dpi: int = THERMAL_PRINTER_DPI,
+) -> bytes:
+    """
+    Generate a 1D barcode as a compact 1-bit PNG for thermal printers.
 
+    Args:
+        data: The data to encode in the barcode
+        barcode_type: Type of barcode (CODE128, CODE39, EAN13, etc.)
+        module_width: Width of the narrowest bar in mm
+        module_height: Height of the barcode in mm
+        font_size: Font size for the human-readable text
+        text_distance: Distance between barcode and text in mm
+        quiet_zone: Size of the quiet zone (margin) in mm
+        dpi: Printer resolution in dots per inch
+
+    Returns:
+        PNG image as bytes
+
+    Raises:
+        ValueError: If the data is invalid for the specified barcode type
+        RuntimeError: If Pillow is not installed
+    """
+    _get_image_writer_class()
+    try:
+        return _render_1d_barcode_png(
+            data, barcode_type, module_width, module_height, font_size, text_distance, quiet_zone, dpi
+        )
     except Exception as e:
         raise ValueError(f"Failed to generate {barcode_type} barcode: {e!s}") from e
 
@@ -80,7 +307,7 @@ def generate_qr_code_svg(
     data: str,
     scale: int = 10,
     border: int = 4,
-    error_correction: Literal["L", "M", "Q", "H"] = "M",
+    error_correction: ErrorCorrection = "M",
     dark_color: str = "#000000",
     light_color: str = "#FFFFFF",
 ) -> str:
@@ -106,32 +333,39 @@ def generate_qr_code_svg(
         ValueError: If the data is too large or invalid
     """
     try:
-        # Create QR code with specified error correction
-        qr = segno.make(data, error=error_correction.lower(), boost_error=False)
-
-        # Render to SVG
-        output = io.BytesIO()
-        qr.save(
-            output,
-            kind="svg",
-            scale=scale,
-            border=border,
-            dark=dark_color,
-            light=light_color,
-            xmldecl=False,  # Don't include XML declaration
-            svgns=True,  # Include SVG namespace
-            svgclass="qr-code",  # Add CSS class for styling
-            lineclass="qr-line",  # Add CSS class for lines
-        )
+        return _render_qr_code_svg(data, scale, border, error_correction, dark_color, light_color)
+    except Exception as e:
+        raise ValueError(f"Failed to generate QR code: {e!s}") from e
 
-        # Return SVG as string
-        return output.getvalue().decode("utf-8")
 
+def generate_qr_code_png(
+    data: str,
+    scale: int = 10,
+    border: int = 4,
+    error_correction: ErrorCorrection = "M",
+) -> bytes:
+    """
+    Generate a QR code as a compact 1-bit PNG for thermal printers.
+
+    Args:
+        data: The data to encode in the QR code (URL, text, etc.)
+        scale: Size of each QR code module in printer dots
+        border: Size of the quiet zone border (in modules)
+        error_correction: Error correction level (L, M, Q, H)
+
+    Returns:
+        PNG image as bytes
+
+    Raises:
+        ValueError: If the data is too large or invalid
+    """
+    try:
+        return _render_qr_code_png(data, scale, border, error_correction)
     except Exception as e:
         raise ValueError(f"Failed to generate QR code: {e!s}") from e
 
 
-def get_barcode_config_for_size(label_size: str) -> dict:
+def get_barcode_config_for_size(label_size: str) -> MappingProxyType:
     """
     Get barcode configuration parameters optimized for a specific label size.
 
@@ -139,68 +373,9 @@ def get_barcode_config_for_size(label_size: str) -> dict:
         label_size: Label size identifier (4x6, 3x4, 2x4, 2x2)
 
     Returns:
-        Dictionary with barcode configuration parameters
-    """
-    configs = {
-        "4x6": {
-            "1d": {
-                "module_width": 0.35,
-                "module_height": 18.0,
-                "font_size": 12,
-                "text_distance": 5.0,
-                "quiet_zone": 8.0,
-            },
-            "qr": {
-                "scale": 12,
-                "border": 4,
-                "error_correction": "M",
-            },
-        },
-        "3x4": {
-            "1d": {
-                "module_width": 0.3,
-                "module_height": 14.0,
-                "font_size": 10,
-                "text_distance": 4.0,
-                "quiet_zone": 6.5,
-            },
-            "qr": {
-                "scale": 10,
-                "border": 3,
-                "error_correction": "M",
-            },
-        },
-        "2x4": {
-            "1d": {
-                "module_width": 0.25,
-                "module_height": 12.0,
-                "font_size": 8,
-                "text_distance": 3.0,
-                "quiet_zone": 5.0,
-            },
-            "qr": {
-                "scale": 8,
-                "border": 2,
-                "error_correction": "M",
-            },
-        },
-        "2x2": {
-            "1d": {
-                "module_width": 0.2,
-                "module_height": 8.0,
-                "font_size": 7,
-                "text_distance": 2.0,
-                "quiet_zone": 4.0,
-            },
-            "qr": {
-                "scale": 10,
-                "border": 2,
-                "error_correction": "H",  # Higher error correction for small labels
-            },
-        },
-    }
-
-    return configs.get(label_size, configs["4x6"])
+        Read-only mapping with "1d" and "qr" configuration parameters
+    """
+    return BARCODE_CONFIGS.get(label_size, BARCODE_CONFIGS[DEFAULT_LABEL_SIZE])
 
 
 def generate_barcode_for_label(
@@ -240,3 +415,70 @@ def generate_qr_code_for_label(
     config = get_barcode_config_for_size(label_size)
     return generate_qr_code_svg(data, **config["qr"])
 
+
+def generate_barcode_png_for_label(
+    data: str,
+    label_size: str = "4x6",
+    barcode_type: BarcodeType = "CODE128",
+    dpi: int = THERMAL_PRINTER_DPI,
+) -> bytes:
+    """
+    Generate a 1D barcode raster optimized for a specific label size.
+
+    Args:
+        data: The data to encode
+        label_size: Label size (4x6, 3x4, 2x4, 2x2)
+        barcode_type: Type of barcode to generate
+        dpi: Printer resolution in dots per inch
+
+    Returns:
+        PNG image as bytes
+    """
+    config = get_barcode_config_for_size(label_size)
+    return generate_1d_barcode_png(data, barcode_type, dpi=dpi, **config["1d"])
+
+
+def generate_qr_code_png_for_label(
+    data: str,
+    label_size: str = "4x6",
+) -> bytes:
+    """
+    Generate a QR code raster optimized for a specific label size.
+
+    Args:
+        data: The data to encode (typically a URL)
+        label_size: Label size (4x6, 3x4, 2x4, 2x2)
+
+    Returns:
+        PNG image as bytes
+    """
+    config = get_barcode_config_for_size(label_size)
+    return generate_qr_code_png(data, **config["qr"])
+
+
+_CACHED_RENDERERS = (
+    _render_1d_barcode_svg,
+    _render_1d_barcode_png,
+    _make_qr_code,
+    _render_qr_code_svg,
+    _render_qr_code_png,
+)
+
+
+def get_barcode_cache_info() -> dict:
+    """
+    Get hit/miss statistics for the barcode render caches.
+
+    Returns:
+        Dictionary keyed by cache name with hits, misses, maxsize and currsize
+    """
+    return {
+        renderer.__name__.lstrip("_"): renderer.cache_info()._asdict()
+        for renderer in _CACHED_RENDERERS
+    }
+
+
+def clear_barcode_cache() -> None:
+    """Discard all memoized barcode and QR code renderings."""
+    for renderer in _CACHED_RENDERERS:
+        renderer.cache_clear()
@@ -11,7 +11,7 @@ from datetime import datetime, timedelta
 from sqlalchemy import and_, func
 from sqlalchemy.orm import joinedload
 
-from models import AuditLog, Chemical, Tool, UserActivity, db
+from models import AuditLog, Chemical, Tool, UserActivity, db, get_current_time
 
 
 logger = logging.getLogger(__name__)
@@ -74,19 +74,25 @@ def bulk_log_audit_events(audit_logs):
         raise
 
 
-def bulk_update_tool_calibration_status():
+def bulk_update_tool_calibration_status(now=None):
     """
     Update calibration status for all tools in a single operation
     instead of individual updates
+
+    Args:
+        now: Reference time (defaults to the current time)
     """
     try:
-        now = datetime.utcnow()
+        now = now or get_current_time()
+        scheduled = and_(Tool.requires_calibration.is_(True), Tool.next_calibration_date.isnot(None))
+        status = func.coalesce(Tool.calibration_status, "")
 
         # Update overdue calibrations
         overdue_count = db.session.query(Tool).filter(
             and_(
+                scheduled,
                 Tool.next_calibration_date < now,
-                Tool.calibration_status != "overdue"
+                status != "overdue"
             )
         ).update(
             {Tool.calibration_status: "overdue"},
@@ -97,8 +103,9 @@ def bulk_update_tool_calibration_status():
         due_soon_date = now + timedelta(days=30)
         due_soon_count = db.session.query(Tool).filter(
             and_(
+                scheduled,
                 Tool.next_calibration_date.between(now, due_soon_date),
-                Tool.calibration_status != "due_soon"
+                status != "due_soon"
             )
         ).update(
             {Tool.calibration_status: "due_soon"},
@@ -108,8 +115,9 @@ def bulk_update_tool_calibration_status():
         # Update current calibrations
         current_count = db.session.query(Tool).filter(
             and_(
+                scheduled,
                 Tool.next_calibration_date > due_soon_date,
-                Tool.calibration_status != "current"
+                status != "current"
             )
         ).update(
             {Tool.calibration_status: "current"},
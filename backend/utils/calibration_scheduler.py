@@ -0,0 +1,273 @@
+"""
+Calibration Scheduler
+
+Keeps ``Tool.calibration_status`` in step with ``next_calibration_date``
+without recomputing every tool on each maintenance tick. A tool only
+changes status when the clock crosses one of two boundaries: 30 days
+before its next calibration date (current -> due_soon) and the date itself
+(due_soon -> overdue). Each run therefore only touches tools whose
+boundary falls between the previous run and now, found with range scans
+on the ``(requires_calibration, next_calibration_date)`` index. The first
+run after startup (or after the clock moves backwards) reconciles every
+tool with ``bulk_update_tool_calibration_status``.
+
+Writes that change a tool's calibration fields set its status directly
+(``Tool.update_calibration_status``), so the scheduler only has to handle
+the passage of time.
+
+The calibration notification list is built from the same index and cached
+until the next boundary or ``CALIBRATION_NOTIFICATIONS_CACHE_SECONDS``,
+whichever comes first. Committed ORM changes to a tool's calibration
+fields clear it.
+"""
+
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from sqlalchemy import and_, func, select
+
+from utils.commit_hooks import CommitHook
+
+
+logger = logging.getLogger(__name__)
+
+CHANGED_KEY = "calibration_schedule_changed"
+
+DEFAULT_NOTIFICATIONS_CACHE_SECONDS = 300
+
+# Tools are due soon this many days before their next calibration date
+DUE_SOON_DAYS = 30
+
+# Tool columns whose changes affect calibration status or notifications
+CALIBRATION_FIELDS = (
+    "requires_calibration",
+    "next_calibration_date",
+    "last_calibration_date",
+    "calibration_status",
+    "tool_number",
+    "description",
+)
+
+
+class CalibrationScheduler:
+    """Boundary-driven calibration status transitions and cached notifications."""
+
+    def __init__(self):
+        self._last_run = None
+        self._notifications = None
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+
+    def run(self, now=None):
+        """
+        Transition tools whose calibration boundaries passed since the last run.
+
+        Commits its own work.
+
+        Args:
+            now: Reference time (defaults to the current time)
+
+        Returns:
+            dict with overdue, due_soon and current transition counts, whether
+            this was a full reconcile and the next boundary time
+        """
+        from models import db, get_current_time
+        from utils.bulk_operations import bulk_update_tool_calibration_status
+
+        now = now or get_current_time()
+        with self._run_lock:
+            since = self._last_run
+            try:
+                if since is None or now < since:
+                    results = bulk_update_tool_calibration_status(now)
+                    results["full_reconcile"] = True
+                else:
+                    results = self._transition(since, now)
+                    results["full_reconcile"] = False
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            self._last_run = now
+
+        if results["overdue"] or results["due_soon"] or results["current"]:
+            self.invalidate()
+
+        next_boundary = self.next_boundary(now)
+        results["next_boundary"] = next_boundary.isoformat() if next_boundary else None
+        return results
+
+    def next_boundary(self, now=None):
+        """
+        Earliest time after ``now`` at which some tool changes calibration status.
+
+        Returns:
+            datetime, or None when no scheduled tool has a future boundary
+        """
+        from models import Tool, db, get_current_time
+
+        now = now or get_current_time()
+        due_soon_window = timedelta(days=DUE_SOON_DAYS)
+        next_overdue, next_due_soon = db.session.execute(
+            select(
+                select(func.min(Tool.next_calibration_date))
+                .where(_scheduled(Tool), Tool.next_calibration_date >= now)
+                .scalar_subquery(),
+                select(func.min(Tool.next_calibration_date))
+                .where(_scheduled(Tool), Tool.next_calibration_date > now + due_soon_window)
+                .scalar_subquery(),
+            )
+        ).one()
+
+        candidates = [next_overdue] if next_overdue else []
+        if next_due_soon:
+            candidates.append(next_due_soon - due_soon_window)
+        return min(candidates) if candidates else None
+
+    def get_notifications(self):
+        """
+        Overdue and due-soon calibration notifications, overdue first.
+
+        Returns:
+            dict with notifications, count, overdue_count and due_soon_count
+        """
+        from models import get_current_time
+
+        now = get_current_time()
+        with self._lock:
+            entry = self._notifications
+        if entry and entry[0] > time.monotonic() and (entry[1] is None or entry[1] > now):
+            return entry[2]
+
+        payload = self._build_notifications(now)
+
+        # The list changes when the next tool crosses a boundary
+        valid_until = self.next_boundary(now)
+        with self._lock:
+            self._notifications = (time.monotonic() + self._ttl(), valid_until, payload)
+        return payload
+
+    def invalidate(self):
+        """
+        Drop the cached notification list.
+
+        Returns:
+            True if a cached list was dropped
+        """
+        with self._lock:
+            dropped = self._notifications is not None
+            self._notifications = None
+            return dropped
+
+    def reset(self):
+        """Forget the last run so the next one reconciles every tool."""
+        with self._run_lock:
+            self._last_run = None
+        self.invalidate()
+
+    def _transition(self, since, now):
+        from models import Tool, db
+
+        due_soon_window = timedelta(days=DUE_SOON_DAYS)
+        status = func.coalesce(Tool.calibration_status, "")
+
+        # Next calibration date passed since the last run
+        overdue_count = db.session.query(Tool).filter(
+            _scheduled(Tool),
+            Tool.next_calibration_date >= since,
+            Tool.next_calibration_date < now,
+            status != "overdue",
+        ).update({Tool.calibration_status: "overdue"}, synchronize_session=False)
+
+        # Next calibration date entered the due-soon window since the last run
+        due_soon_count = db.session.query(Tool).filter(
+            _scheduled(Tool),
+            Tool.next_calibration_date > since + due_soon_window,
+            Tool.next_calibration_date <= now + due_soon_window,
+            Tool.next_calibration_date >= now,
+            status != "due_soon",
+        ).update({Tool.calibration_status: "due_soon"}, synchronize_session=False)
+
+        if overdue_count or due_soon_count:
+            logger.info("Calibration status transitions", extra={
+                "overdue_count": overdue_count,
+                "due_soon_count": due_soon_count,
+            })
+
+        return {"overdue": overdue_count, "due_soon": due_soon_count, "current": 0}
+
+    def _build_notifications(self, now):
+        from models import Tool
+
+        tools = (
+            Tool.query
+            .filter(
+                _scheduled(Tool),
+                Tool.next_calibration_date <= now + timedelta(days=DUE_SOON_DAYS),
+                Tool.calibration_status.in_(("overdue", "due_soon")),
+            )
+            .order_by(Tool.next_calibration_date.asc(), Tool.id.asc())
+            .all()
+        )
+
+        notifications = []
+        for tool in tools:
+            entry = {
+                "id": tool.id,
+                "tool_number": tool.tool_number,
+                "description": tool.description,
+                "last_calibration_date": tool.last_calibration_date.isoformat() if tool.last_calibration_date else None,
+                "next_calibration_date": tool.next_calibration_date.isoformat(),
+            }
+            if tool.calibration_status == "overdue":
+                entry.update({
+                    "type": "overdue",
+                    "message": f"Tool {tool.tool_number} calibration is overdue",
+                    "priority": "high",
+                })
+            else:
+                days_until_due = (tool.next_calibration_date - now).days
+                entry.update({
+                    "type": "due_soon",
+                    "message": f"Tool {tool.tool_number} calibration due in {days_until_due} days",
+                    "priority": "medium",
+                    "days_until_due": days_until_due,
+                })
+            notifications.append(entry)
+
+        # Overdue first, then by days until due
+        notifications.sort(key=lambda x: (0 if x["type"] == "overdue" else 1, x.get("days_until_due", 999)))
+
+        overdue_count = sum(1 for n in notifications if n["type"] == "overdue")
+        return {
+            "notifications": notifications,
+            "count": len(notifications),
+            "overdue_count": overdue_count,
+            "due_soon_count": len(notifications) - overdue_count,
+        }
+
+    def _ttl(self):
+        from flask import current_app
+
+        return current_app.config.get("CALIBRATION_NOTIFICATIONS_CACHE_SECONDS", DEFAULT_NOTIFICATIONS_CACHE_SECONDS)
+
+
+def _scheduled(tool_model):
+    return and_(tool_model.requires_calibration.is_(True), tool_model.next_calibration_date.isnot(None))
+
+
+calibration_scheduler = CalibrationScheduler()
+
+
+_invalidation_hook = CommitHook(CHANGED_KEY, lambda _changes: calibration_scheduler.invalidate())
+
+
+def _install_invalidation_hooks():
+    from models import Tool
+
+    _invalidation_hook.watch((Tool,), changed_columns=CALIBRATION_FIELDS)
+
+
+_install_invalidation_hooks()
@@ -0,0 +1,96 @@
+"""
+Commit Hooks
+
+Caches and write buffers that react to ORM writes share the same plumbing:
+mapper events record what changed in ``session.info``, the record is acted
+on once the transaction commits, and it is dropped when the transaction
+rolls back, so uncommitted changes never leak into a cache.
+
+``CommitHook`` implements that once. Each user creates one hook with its
+own ``session.info`` key and callback, and registers the models it watches.
+"""
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+
+WRITE_EVENTS = ("after_insert", "after_update", "after_delete")
+
+# Recorded by watchers that only need to know that something changed
+CHANGED = True
+
+
+class CommitHook:
+    """Records changes per session and hands them to a callback after commit."""
+
+    def __init__(self, key, on_commit, factory=set):
+        """
+        Register the session hooks.
+
+        Args:
+            key: ``session.info`` key holding the record
+            on_commit: Called with the record after a commit that recorded something
+            factory: Creates an empty record (``set`` unless the caller stashes a list)
+        """
+        self.key = key
+        self.on_commit = on_commit
+        self.factory = factory
+        self._listeners = [
+            (Session, "after_commit", self._committed),
+            (Session, "after_transaction_end", self._transaction_ended),
+        ]
+        for target, event_name, listener in self._listeners:
+            event.listen(target, event_name, listener)
+
+    def pending(self, session):
+        """The record of the session's current transaction, created if missing."""
+        record = session.info.get(self.key)
+        if record is None:
+            record = session.info[self.key] = self.factory()
+        return record
+
+    def record(self, session, *keys):
+        """Add keys to the session's record (set records only)."""
+        self.pending(session).update(keys)
+
+    def watch(self, models, keys=None, changed_columns=None):
+        """
+        Record inserts, updates and deletes of the given models.
+
+        Args:
+            models: Mapped classes to watch
+            keys: Callable returning the keys to record for a changed row;
+                without it the change is only flagged with ``CHANGED``
+            changed_columns: Only record updates that change one of these attributes
+        """
+        def record_change(mapper, connection, target):
+            session = object_session(target)
+            if session is not None:
+                self.record(session, *(keys(target) if keys else (CHANGED,)))
+
+        def record_update(mapper, connection, target):
+            state = inspect(target)
+            if any(state.attrs[name].history.has_changes() for name in changed_columns):
+                record_change(mapper, connection, target)
+
+        for model in models:
+            for event_name in WRITE_EVENTS:
+                listener = record_update if changed_columns and event_name == "after_update" else record_change
+                event.listen(model, event_name, listener)
+                self._listeners.append((model, event_name, listener))
+
+    def remove(self):
+        """Unregister every listener of this hook."""
+        for target, event_name, listener in self._listeners:
+            event.remove(target, event_name, listener)
+        self._listeners = []
+
+    def _committed(self, session):
+        record = session.info.pop(self.key, None)
+        if record:
+            self.on_commit(record)
+
+    def _transaction_ended(self, session, transaction):
+        # after_commit has already taken the record when the transaction committed
+        if transaction.parent is None:
+            session.info.pop(self.key, None)
@@ -0,0 +1,123 @@
+"""
+Keyset Pagination
+
+Pages through a query by remembering the sort key of the last row served
+instead of using OFFSET, so deep pages cost the same as the first one and
+rows inserted while a client is paging do not shift later pages.
+
+A sort is a list of ``(expression, "asc" | "desc")`` pairs that must end
+with a unique column (normally the primary key) and must not produce
+NULLs; wrap nullable columns in ``coalesce``. The cursor handed to clients
+is an opaque URL-safe token that records the sort name and the last row's
+key values.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+from utils.error_handler import ValidationError
+
+
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 500
+
+
+def parse_keyset_args(args, default_per_page=DEFAULT_PER_PAGE):
+    """
+    Read ``per_page`` and ``cursor`` from request arguments.
+
+    Returns:
+        (per_page, cursor) when either argument is present, otherwise None so
+        callers can keep serving their unpaginated response
+    """
+    if "per_page" not in args and "cursor" not in args:
+        return None
+
+    per_page = args.get("per_page", default_per_page, type=int)
+    if per_page is None or per_page < 1 or per_page > MAX_PER_PAGE:
+        raise ValidationError(f"per_page must be between 1 and {MAX_PER_PAGE}")
+
+    return per_page, args.get("cursor") or None
+
+
+def encode_cursor(sort_name, values):
+    """Encode the sort name and a row's key values as an opaque cursor."""
+    payload = {
+        "s": sort_name,
+        "v": [{"dt": value.isoformat()} if isinstance(value, datetime) else value for value in values],
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor, sort_name, key_count):
+    """
+    Decode a cursor produced by ``encode_cursor`` for the given sort.
+
+    Raises:
+        ValidationError: If the cursor is malformed or belongs to another sort
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        values = [
+            datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value
+            for value in payload["v"]
+        ]
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError) as exc:
+        raise ValidationError("Invalid cursor") from exc
+
+    if payload.get("s") != sort_name or len(values) != key_count:
+        raise ValidationError("Cursor does not match the requested sort")
+    return values
+
+
+def order_by_keys(query, sort_keys):
+    """Apply a keyset sort to a query without paging it."""
+    return query.order_by(*[
+        expression.desc() if direction == "desc" else expression.asc()
+        for expression, direction in sort_keys
+    ])
+
+
+def _after(sort_keys, values):
+    """Rows that sort strictly after the row with the given key values."""
+    clauses = []
+    for index, (expression, direction) in enumerate(sort_keys):
+        beyond = expression < values[index] if direction == "desc" else expression > values[index]
+        ties = [sort_keys[j][0] == values[j] for j in range(index)]
+        clauses.append(and_(*ties, beyond))
+    return or_(*clauses)
+
+
+def keyset_page(query, sort_name, sort_keys, per_page, cursor=None):
+    """
+    Fetch one page of a query.
+
+    Args:
+        query: Unordered ORM query over a single entity
+        sort_name: Name of the sort, recorded in cursors
+        sort_keys: List of (expression, "asc" | "desc") pairs
+        per_page: Maximum number of rows to return
+        cursor: Cursor returned with the previous page
+
+    Returns:
+        tuple: (list of entities, pagination dict with per_page, has_next and next_cursor)
+    """
+    if cursor:
+        query = query.filter(_after(sort_keys, decode_cursor(cursor, sort_name, len(sort_keys))))
+
+    keys = [expression.label(f"sort_key_{index}") for index, (expression, _) in enumerate(sort_keys)]
+    rows = order_by_keys(query.add_columns(*keys), sort_keys).limit(per_page + 1).all()
+
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    next_cursor = encode_cursor(sort_name, list(rows[-1][1:])) if has_next else None
+
+    return [row[0] for row in rows], {
+        "per_page": per_page,
+        "has_next": has_next,
+        "next_cursor": next_cursor,
+    }
@@ -0,0 +1,265 @@
+"""
+Kit Analytics Service
+
+Computes kit usage metrics for any set of kits with one grouped query per
+fact table (KitIssuance, KitTransfer, KitReorderRequest) instead of a
+COUNT per kit and metric.
+
+Results are cached per (kit set, day window) for
+``KIT_ANALYTICS_CACHE_SECONDS``, keeping at most ``MAX_CACHE_ENTRIES``
+(least recently used first out). Committed issuance, transfer or reorder
+writes made through the ORM invalidate every cached result that covers an
+affected kit; bulk SQL updates are only picked up when the entry expires.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, case, func, or_, select
+
+from utils.commit_hooks import CommitHook
+
+
+logger = logging.getLogger(__name__)
+
+CHANGED_KITS_KEY = "kit_analytics_changed_kits"
+
+DEFAULT_CACHE_SECONDS = 300
+
+# Every distinct kit selection is its own key, so the cache is bounded
+MAX_CACHE_ENTRIES = 256
+
+# The activity chart always shows the last four weeks
+ACTIVITY_WEEKS = 4
+
+
+def _count_when(*criteria):
+    return func.coalesce(func.sum(case((and_(*criteria), 1), else_=0)), 0)
+
+
+class KitAnalyticsService:
+    """Grouped, cached kit usage metrics."""
+
+    def __init__(self):
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_metrics(self, kit_ids, days):
+        """
+        Usage metrics for a set of kits over the last ``days`` days.
+
+        Args:
+            kit_ids: IDs of the kits to analyze
+            days: Size of the reporting window in days
+
+        Returns:
+            dict with:
+                kits: kit ID -> issuances, transfers_in, transfers_out,
+                    pending_reorders and fulfilled_reorders
+                transfers: kit_to_kit, kit_to_warehouse, warehouse_to_kit and
+                    total for transfers touching any of the kits
+                activity: one {issuances, transfers} dict per week, oldest first
+        """
+        kit_ids = frozenset(kit_ids)
+        key = (kit_ids, days)
+
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._cache.move_to_end(key)
+                return entry[1]
+
+        metrics = self._compute(kit_ids, days)
+
+        with self._lock:
+            self._store(key, metrics)
+        return metrics
+
+    def _store(self, key, metrics):
+        now = time.monotonic()
+        expired = [cached_key for cached_key, (expires, _) in self._cache.items() if expires <= now]
+        for cached_key in expired:
+            del self._cache[cached_key]
+
+        self._cache[key] = (now + self._ttl(), metrics)
+        self._cache.move_to_end(key)
+        while len(self._cache) > MAX_CACHE_ENTRIES:
+            self._cache.popitem(last=False)
+
+    def invalidate(self, kit_ids=None):
+        """
+        Drop cached results covering any of ``kit_ids`` (all results when None).
+
+        Returns:
+            Number of cache entries removed
+        """
+        with self._lock:
+            if kit_ids is None:
+                removed = len(self._cache)
+                self._cache.clear()
+                return removed
+
+            kit_ids = set(kit_ids)
+            stale = [key for key in self._cache if not kit_ids.isdisjoint(key[0])]
+            for key in stale:
+                del self._cache[key]
+            return len(stale)
+
+    def _ttl(self):
+        from flask import current_app
+
+        return current_app.config.get("KIT_ANALYTICS_CACHE_SECONDS", DEFAULT_CACHE_SECONDS)
+
+    def _compute(self, kit_ids, days):
+        kits = {kit_id: {
+            "issuances": 0,
+            "transfers_in": 0,
+            "transfers_out": 0,
+            "pending_reorders": 0,
+            "fulfilled_reorders": 0,
+        } for kit_id in kit_ids}
+        transfers = {"kit_to_kit": 0, "kit_to_warehouse": 0, "warehouse_to_kit": 0, "total": 0}
+        activity = [{"issuances": 0, "transfers": 0} for _ in range(ACTIVITY_WEEKS)]
+        metrics = {"kits": kits, "transfers": transfers, "activity": activity}
+
+        if not kit_ids:
+            return metrics
+
+        now = datetime.now()
+        start_date = now - timedelta(days=days)
+        week_starts = [now - timedelta(days=(ACTIVITY_WEEKS - i) * 7) for i in range(ACTIVITY_WEEKS)]
+        earliest = min(start_date, week_starts[0])
+        ids = list(kit_ids)
+
+        self._add_issuances(metrics, ids, start_date, week_starts, earliest)
+        self._add_transfers(metrics, kit_ids, start_date, week_starts, earliest)
+        self._add_reorders(metrics, ids, start_date)
+        return metrics
+
+    @staticmethod
+    def _week_columns(column, week_starts):
+        return [
+            _count_when(column >= week_start, column < week_start + timedelta(days=7)).label(f"week_{i}")
+            for i, week_start in enumerate(week_starts)
+        ]
+
+    def _add_issuances(self, metrics, ids, start_date, week_starts, earliest):
+        from models import db
+        from models_kits import KitIssuance
+
+        rows = db.session.execute(
+            select(
+                KitIssuance.kit_id,
+                _count_when(KitIssuance.issued_date >= start_date).label("in_window"),
+                *self._week_columns(KitIssuance.issued_date, week_starts),
+            )
+            .where(KitIssuance.kit_id.in_(ids), KitIssuance.issued_date >= earliest)
+            .group_by(KitIssuance.kit_id)
+        )
+        for row in rows:
+            metrics["kits"][row.kit_id]["issuances"] = row.in_window
+            for i in range(ACTIVITY_WEEKS):
+                metrics["activity"][i]["issuances"] += row[2 + i]
+
+    def _add_transfers(self, metrics, kit_ids, start_date, week_starts, earliest):
+        from models import db
+        from models_kits import KitTransfer
+
+        ids = list(kit_ids)
+        from_kit = and_(KitTransfer.from_location_type == "kit", KitTransfer.from_location_id.in_(ids))
+        to_kit = and_(KitTransfer.to_location_type == "kit", KitTransfer.to_location_id.in_(ids))
+
+        # One row per route; the route decides which kit and category each count belongs to
+        rows = db.session.execute(
+            select(
+                KitTransfer.from_location_type,
+                KitTransfer.from_location_id,
+                KitTransfer.to_location_type,
+                KitTransfer.to_location_id,
+                _count_when(KitTransfer.transfer_date >= start_date).label("in_window"),
+                *self._week_columns(KitTransfer.transfer_date, week_starts),
+            )
+            .where(or_(from_kit, to_kit), KitTransfer.transfer_date >= earliest)
+            .group_by(
+                KitTransfer.from_location_type,
+                KitTransfer.from_location_id,
+                KitTransfer.to_location_type,
+                KitTransfer.to_location_id,
+            )
+        )
+
+        kits = metrics["kits"]
+        transfers = metrics["transfers"]
+        for row in rows:
+            source_is_kit = row.from_location_type == "kit" and row.from_location_id in kit_ids
+            target_is_kit = row.to_location_type == "kit" and row.to_location_id in kit_ids
+            count = row.in_window
+
+            if source_is_kit:
+                kits[row.from_location_id]["transfers_out"] += count
+            if target_is_kit:
+                kits[row.to_location_id]["transfers_in"] += count
+
+            if row.from_location_type == "kit" and row.to_location_type == "kit":
+                transfers["kit_to_kit"] += count
+            elif source_is_kit and row.to_location_type == "warehouse":
+                transfers["kit_to_warehouse"] += count
+            elif target_is_kit and row.from_location_type == "warehouse":
+                transfers["warehouse_to_kit"] += count
+            transfers["total"] += count
+
+            for i in range(ACTIVITY_WEEKS):
+                metrics["activity"][i]["transfers"] += row[5 + i]
+
+    def _add_reorders(self, metrics, ids, start_date):
+        from models import db
+        from models_kits import KitReorderRequest
+
+        rows = db.session.execute(
+            select(
+                KitReorderRequest.kit_id,
+                _count_when(KitReorderRequest.status == "pending").label("pending"),
+                _count_when(
+                    KitReorderRequest.status == "fulfilled",
+                    KitReorderRequest.fulfillment_date >= start_date,
+                ).label("fulfilled"),
+            )
+            .where(KitReorderRequest.kit_id.in_(ids))
+            .group_by(KitReorderRequest.kit_id)
+        )
+        for row in rows:
+            metrics["kits"][row.kit_id]["pending_reorders"] = row.pending
+            metrics["kits"][row.kit_id]["fulfilled_reorders"] = row.fulfilled
+
+
+kit_analytics = KitAnalyticsService()
+
+
+def _affected_kit_ids(target):
+    from models_kits import KitTransfer
+
+    if isinstance(target, KitTransfer):
+        return {
+            location_id
+            for location_type, location_id in (
+                (target.from_location_type, target.from_location_id),
+                (target.to_location_type, target.to_location_id),
+            )
+            if location_type == "kit"
+        }
+    return {target.kit_id}
+
+
+_invalidation_hook = CommitHook(CHANGED_KITS_KEY, kit_analytics.invalidate)
+
+
+def _install_invalidation_hooks():
+    from models_kits import KitIssuance, KitReorderRequest, KitTransfer
+
+    _invalidation_hook.watch((KitIssuance, KitTransfer, KitReorderRequest), keys=_affected_kit_ids)
+
+
+_install_invalidation_hooks()
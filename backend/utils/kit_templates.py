@@ -0,0 +1,169 @@
+"""
+Kit Template Engine
+
+Instantiates new kits from an existing kit used as a template. Boxes and
+expendable item slots (part number, description, unit, location and
+minimum stock level) are copied with set-based ``INSERT ... SELECT``
+statements, one per table for all new kits together, inside the caller's
+transaction.
+
+Slots are created empty: quantity 0, no lot or serial number and tracking
+type "none", ready to be stocked for the new tail number. Tools and
+chemicals are physical items and are never cloned.
+"""
+
+import logging
+import time
+
+from sqlalchemy import func, insert, literal, select
+
+from models import Expendable, db, get_current_time
+from models_kits import Kit, KitBox, KitExpendable, KitItem
+
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of kits instantiated by a single call
+MAX_CLONES_PER_CALL = 100
+
+
+def create_kit_boxes(kit_id, boxes):
+    """
+    Insert a kit's boxes with one executemany.
+
+    Args:
+        kit_id: ID of the kit the boxes belong to
+        boxes: Dictionaries with box_number, box_type and optional description
+
+    Returns:
+        Number of boxes created
+    """
+    if not boxes:
+        return 0
+
+    now = get_current_time()
+    db.session.execute(insert(KitBox), [
+        {
+            "kit_id": kit_id,
+            "box_number": box["box_number"],
+            "box_type": box["box_type"],
+            "description": box.get("description", ""),
+            "created_at": now,
+        }
+        for box in boxes
+    ])
+    return len(boxes)
+
+
+def clone_kit(source_kit, names, created_by, description=None, include_slots=True):
+    """
+    Create one kit per name from a template kit.
+
+    Args:
+        source_kit: Kit to copy
+        names: Names of the new kits (must be unique and unused)
+        created_by: ID of the user creating the kits
+        description: Description for the new kits (defaults to the template's)
+        include_slots: Also copy expendable item slots and their minimum stock levels
+
+    Returns:
+        tuple: (list of new Kit objects ordered as ``names``, stats dict with
+        kits_created, boxes_created, slots_created and elapsed_ms)
+    """
+    started = time.perf_counter()
+    now = get_current_time()
+    if description is None:
+        description = source_kit.description
+
+    db.session.execute(insert(Kit), [
+        {
+            "name": name,
+            "aircraft_type_id": source_kit.aircraft_type_id,
+            "description": description,
+            "status": "active",
+            "created_at": now,
+            "updated_at": now,
+            "created_by": created_by,
+        }
+        for name in names
+    ])
+    new_kits = Kit.query.filter(Kit.name.in_(names)).all()
+    new_kit_ids = [kit.id for kit in new_kits]
+
+    boxes_created = db.session.execute(
+        insert(KitBox).from_select(
+            ["kit_id", "box_number", "box_type", "description", "created_at"],
+            select(Kit.id, KitBox.box_number, KitBox.box_type, KitBox.description, literal(now))
+            .select_from(KitBox)
+            .join(Kit, Kit.id.in_(new_kit_ids))
+            .where(KitBox.kit_id == source_kit.id)
+        )
+    ).rowcount
+
+    slots_created = 0
+    if include_slots:
+        slots_created = _clone_slots(source_kit.id, new_kit_ids, now)
+
+    stats = {
+        "kits_created": len(new_kits),
+        "boxes_created": boxes_created,
+        "slots_created": slots_created,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+    logger.info(f"Cloned kit {source_kit.name} into {len(new_kits)} kits", extra=stats)
+
+    order = {name: index for index, name in enumerate(names)}
+    return sorted(new_kits, key=lambda kit: order[kit.name]), stats
+
+
+def _clone_slots(source_kit_id, new_kit_ids, now):
+    """Copy expendable slots into the boxes with the same box number in each new kit."""
+    source_box = db.aliased(KitBox)
+    target_box = db.aliased(KitBox)
+    columns = [
+        "kit_id", "box_id", "part_number", "tracking_type", "description", "quantity",
+        "unit", "location", "status", "minimum_stock_level", "added_date", "last_updated",
+    ]
+
+    def slot_values(part_number, description, unit, location, minimum_stock_level):
+        return (
+            target_box.kit_id, target_box.id, part_number, literal("none"), description, literal(0.0),
+            unit, location, literal("out_of_stock"), minimum_stock_level, literal(now), literal(now),
+        )
+
+    # Legacy KitExpendable rows
+    legacy = db.session.execute(
+        insert(KitExpendable).from_select(
+            columns,
+            select(*slot_values(
+                KitExpendable.part_number, KitExpendable.description, KitExpendable.unit,
+                KitExpendable.location, KitExpendable.minimum_stock_level,
+            ))
+            .select_from(KitExpendable)
+            .join(source_box, source_box.id == KitExpendable.box_id)
+            .join(target_box, target_box.box_number == source_box.box_number)
+            .where(KitExpendable.kit_id == source_kit_id, target_box.kit_id.in_(new_kit_ids))
+        )
+    ).rowcount
+
+    # Expendables stocked as KitItems keep their configuration on the Expendable record
+    linked = db.session.execute(
+        insert(KitExpendable).from_select(
+            columns,
+            select(*slot_values(
+                Expendable.part_number, Expendable.description, Expendable.unit,
+                func.coalesce(KitItem.location, Expendable.location), Expendable.minimum_stock_level,
+            ))
+            .select_from(KitItem)
+            .join(Expendable, Expendable.id == KitItem.item_id)
+            .join(source_box, source_box.id == KitItem.box_id)
+            .join(target_box, target_box.box_number == source_box.box_number)
+            .where(
+                KitItem.kit_id == source_kit_id,
+                KitItem.item_type == "expendable",
+                target_box.kit_id.in_(new_kit_ids),
+            )
+        )
+    ).rowcount
+
+    return legacy + linked
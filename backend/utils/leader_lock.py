@@ -0,0 +1,336 @@
+"""
+Leader Lock for Singleton Background Services
+
+The background job scheduler (utils/scheduler.py) must run in exactly one
+process. Under gunicorn every worker builds the same app, so it is started
+only by the process holding the leader lock:
+
+- on PostgreSQL, a session-level advisory lock held on a dedicated
+  connection, so there is one leader across every host sharing the
+  database
+- otherwise, an exclusive ``flock`` on ``LEADER_LOCK_FILE``
+
+Set ``LEADER_LOCK_BACKEND`` to "file" or "database" to override the
+choice. The lock is released when the leader exits or its connection
+drops, so the other processes retry every ``LEADER_LOCK_RETRY_SECONDS``
+and one of them takes over.
+
+``fcntl`` is not available on Windows, where gunicorn does not run
+either; there the single development server process is always leader.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETRY_SECONDS = 30
+
+# Advisory lock key for the background service leader ("SUPL")
+ADVISORY_LOCK_KEY = 0x5355504C
+
+
+class LeaderLock:
+    """Non-blocking exclusive lock on a file, held until released or the process exits."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    @property
+    def held(self):
+        return self._file is not None
+
+    def try_acquire(self):
+        """
+        Take the lock if no other process holds it.
+
+        Returns:
+            True if this process holds the lock
+        """
+        if self._file is not None:
+            return True
+
+        if fcntl is None:
+            self._file = True
+            return True
+
+        lock_dir = os.path.dirname(self.path)
+        if lock_dir:
+            os.makedirs(lock_dir, exist_ok=True)
+
+        lock_file = open(self.path, "a+")  # noqa: SIM115 - held open for the life of the lock
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(f"{os.getpid()}\n")
+        lock_file.flush()
+        self._file = lock_file
+        return True
+
+    def verify(self):
+        """Whether the lock is still held (a held flock cannot be lost)."""
+        return self.held
+
+    def release(self):
+        """Release the lock if this process holds it."""
+        lock_file, self._file = self._file, None
+        if lock_file is None or lock_file is True:
+            return
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+        finally:
+            lock_file.close()
+
+
+class DatabaseLeaderLock:
+    """PostgreSQL session advisory lock, held on its own connection until released."""
+
+    def __init__(self, engine, key=ADVISORY_LOCK_KEY):
+        self.engine = engine
+        self.key = key
+        self.path = f"{engine.url.render_as_string(hide_password=True)} advisory lock {key}"
+        self._connection = None
+
+    @property
+    def held(self):
+        return self._connection is not None
+
+    def try_acquire(self):
+        """
+        Take the lock if no other session holds it.
+
+        Returns:
+            True if this process holds the lock
+        """
+        from sqlalchemy import text
+
+        if self._connection is not None:
+            return True
+
+        connection = self.engine.connect()
+        try:
+            acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}).scalar()
+            # Leave no transaction open on the held connection
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        if not acquired:
+            connection.close()
+            return False
+
+        self._connection = connection
+        return True
+
+    def verify(self):
+        """
+        Whether the lock is still held.
+
+        The lock goes with its connection, so a connection that fails a
+        round trip means another process may already be leader.
+        """
+        from sqlalchemy import text
+
+        if self._connection is None:
+            return False
+        try:
+            self._connection.execute(text("SELECT 1"))
+            self._connection.commit()
+            return True
+        except Exception as e:
+            logger.warning("Advisory lock connection lost", extra={"error_message": str(e)})
+            connection, self._connection = self._connection, None
+            connection.invalidate()
+            return False
+
+    def release(self):
+        """Release the lock if this process holds it."""
+        from sqlalchemy import text
+
+        connection, self._connection = self._connection, None
+        if connection is None:
+            return
+        try:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+            connection.commit()
+        except Exception as e:
+            logger.warning("Could not release advisory lock", extra={"error_message": str(e)})
+        finally:
+            connection.close()
+
+
+def create_leader_lock(app):
+    """
+    The leader lock for the app's database.
+
+    Args:
+        app: Flask application instance
+
+    Returns:
+        DatabaseLeaderLock on PostgreSQL (or when LEADER_LOCK_BACKEND is
+        "database"), otherwise LeaderLock on LEADER_LOCK_FILE
+    """
+    from models import db
+
+    backend = app.config.get("LEADER_LOCK_BACKEND", "auto")
+    with app.app_context():
+        engine = db.engine
+    if backend == "database" or (backend == "auto" and engine.dialect.name == "postgresql"):
+        return DatabaseLeaderLock(engine)
+
+    return LeaderLock(app.config.get("LEADER_LOCK_FILE") or default_lock_file(app))
+
+
+def default_lock_file(app):
+    """
+    Lock file used when ``LEADER_LOCK_FILE`` is not set.
+
+    It lives in the temp directory rather than the source tree, and is named
+    after the database so separate deployments on one host do not share a
+    leader.
+    """
+    database = app.config.get("SQLALCHEMY_DATABASE_URI", "")
+    suffix = hashlib.sha256(database.encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"supplyline-background-services-{suffix}.lock")
+
+
+class LeaderElection:
+    """Start singleton services once this process becomes leader."""
+
+    def __init__(self, app, start_services, lock, retry_seconds=DEFAULT_RETRY_SECONDS):
+        self.app = app
+        self.start_services = start_services
+        self.lock = lock
+        self.retry_seconds = retry_seconds
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def is_leader(self):
+        return self.lock.held
+
+    def start(self):
+        """Become leader now if possible, otherwise keep retrying in the background."""
+        if self._try_lead():
+            return
+
+        logger.info("Another process runs the background services; waiting for leadership", extra={
+            "pid": os.getpid(),
+            "lock": self.lock.path,
+        })
+        self._start_retrying()
+
+    def confirm(self):
+        """
+        Check that this process is still leader before doing leader-only work.
+
+        If leadership was lost, go back to waiting for it.
+
+        Returns:
+            True if this process still holds the lock
+        """
+        if self.lock.verify():
+            return True
+
+        logger.warning("Lost background service leadership", extra={
+            "pid": os.getpid(),
+            "lock": self.lock.path,
+        })
+        self.lock.release()
+        if not self._stop_event.is_set():
+            self._start_retrying()
+        return False
+
+    def stop(self):
+        """Stop retrying and give up leadership."""
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=5)
+        self.lock.release()
+
+    def _start_retrying(self):
+        self._thread = threading.Thread(target=self._retry_loop, daemon=True, name="LeaderElection")
+        self._thread.start()
+
+    def _retry_loop(self):
+        while not self._stop_event.wait(self.retry_seconds):
+            if self._try_lead():
+                return
+
+    def _try_lead(self):
+        try:
+            if not self.lock.try_acquire():
+                return False
+        except Exception as e:
+            logger.warning("Could not check background service leadership", extra={
+                "error_message": str(e)
+            })
+            return False
+
+        logger.info("Acquired background service leadership", extra={
+            "pid": os.getpid(),
+            "lock": self.lock.path,
+        })
+        try:
+            self.start_services(self.app)
+        except Exception as e:
+            logger.error("Error starting background services", exc_info=True, extra={
+                "error_message": str(e)
+            })
+        return True
+
+
+# Global instance
+_leader_election = None
+
+
+def init_leader_election(app, start_services):
+    """
+    Run ``start_services(app)`` in this process once it holds the leader lock.
+
+    Args:
+        app: Flask application instance
+        start_services: Callable starting the singleton background services
+    """
+    global _leader_election
+
+    if _leader_election is None:
+        _leader_election = LeaderElection(
+            app,
+            start_services,
+            create_leader_lock(app),
+            retry_seconds=app.config.get("LEADER_LOCK_RETRY_SECONDS", DEFAULT_RETRY_SECONDS),
+        )
+        _leader_election.start()
+
+    return _leader_election
+
+
+def shutdown_leader_election():
+    """Stop waiting for leadership and release the lock."""
+    global _leader_election
+
+    if _leader_election:
+        election, _leader_election = _leader_election, None
+        election.stop()
+
+
+def get_leader_election():
+    """Get the global leader election."""
+    return _leader_election
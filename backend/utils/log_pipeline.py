@@ -0,0 +1,319 @@
+"""
+Asynchronous Logging Pipeline
+
+Request threads should not wait on JSON formatting and file writes. When the
+pipeline is enabled, the root logger's handlers from ``Config.LOGGING_CONFIG``
+are moved behind a ``QueueListener`` thread: the logging thread only merges the
+message arguments and puts the record on a bounded queue.
+
+Hot routes (health checks, unread polling) can have their DEBUG/INFO records
+sampled per request, so a sampled request keeps both its start and end lines.
+Warnings and errors are never sampled.
+"""
+
+import atexit
+import functools
+import json
+import logging
+import logging.config
+import queue
+import random
+import re
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, has_request_context, request
+
+
+logger = logging.getLogger(__name__)
+
+# Attributes every LogRecord has; anything else on a record came from ``extra``
+_RESERVED_ATTRS = frozenset(
+    logging.LogRecord("", logging.INFO, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "taskName"}
+
+_FIELD_PATTERN = re.compile(r"%\((\w+)\)")
+
+# Records that cannot wait for queue space are put with this timeout (seconds)
+_BLOCKING_PUT_TIMEOUT = 1.0
+
+
+class FastJsonFormatter(logging.Formatter):
+    """
+    JSON formatter producing the same fields as ``pythonjsonlogger``'s.
+
+    The field names from the format string are JSON-encoded once, the
+    second-resolution part of the timestamp is cached, and ``extra``
+    attributes are encoded in one pass with a shared encoder.
+    """
+
+    def __init__(self, fmt=None, datefmt=None, style="%", validate=True, static_fields=None, **_kwargs):
+        super().__init__(fmt, datefmt, style, validate)
+        fields = _FIELD_PATTERN.findall(fmt or "%(message)s")
+        self._fields = frozenset(fields)
+        self._encode = json.JSONEncoder(default=str, ensure_ascii=False).encode
+        self._keys = [(field, json.dumps(field) + ": ") for field in fields]
+        # Constant fields (e.g. service name) are serialized once
+        self._static = self._encode(static_fields)[1:-1] if static_fields else None
+        self._time_cache = (None, "")
+
+    def formatTime(self, record, datefmt=None):  # noqa: N802 - logging.Formatter API
+        if datefmt or self.datefmt:
+            return super().formatTime(record, datefmt)
+
+        second = int(record.created)
+        cached_second, prefix = self._time_cache
+        if cached_second != second:
+            prefix = time.strftime(self.default_time_format, self.converter(second))
+            self._time_cache = (second, prefix)
+        return f"{prefix},{int(record.msecs):03d}"
+
+    def format(self, record):
+        record.message = record.getMessage()
+        encode = self._encode
+
+        parts = []
+        for field, key in self._keys:
+            if field == "asctime":
+                value = self.formatTime(record)
+            else:
+                value = getattr(record, field, None)
+            parts.append(key + encode(value))
+
+        if self._static:
+            parts.append(self._static)
+
+        extras = {
+            name: value for name, value in record.__dict__.items()
+            if name not in _RESERVED_ATTRS and name not in self._fields
+        }
+        if extras:
+            parts.append(encode(extras)[1:-1])
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            parts.append('"exc_info": ' + encode(record.exc_text))
+        if record.stack_info:
+            parts.append('"stack_info": ' + encode(self.formatStack(record.stack_info)))
+
+        return "{" + ", ".join(parts) + "}"
+
+
+def parse_sample_rules(value):
+    """
+    Parse ``LOG_SAMPLE_RULES`` ("/api/health=0.01,/api/me/unread=0.1").
+
+    Args:
+        value: Comma-separated ``prefix=rate`` rules
+
+    Returns:
+        dict of path prefix to the fraction of requests whose logs are kept
+
+    Raises:
+        ValueError: If a rule is malformed or a rate is outside 0..1
+    """
+    rules = {}
+    for rule in filter(None, (part.strip() for part in (value or "").split(","))):
+        prefix, separator, rate = rule.rpartition("=")
+        if not separator or not prefix.startswith("/"):
+            raise ValueError(f"Invalid log sampling rule: {rule!r}")
+        rules[prefix] = float(rate)
+        if not 0 <= rules[prefix] <= 1:
+            raise ValueError(f"Log sampling rate must be between 0 and 1: {rule!r}")
+    return rules
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a fraction of the low-level records logged while serving hot routes.
+
+    The decision is made once per request and stored on ``g``; records above
+    ``max_level`` and records logged outside a request always pass.
+    """
+
+    def __init__(self, rules, max_level=logging.INFO, rng=random.random):
+        super().__init__()
+        # Longest prefix wins
+        self.rules = sorted(rules.items(), key=lambda item: len(item[0]), reverse=True)
+        self.max_level = max_level
+        self._rng = rng
+
+    def rate_for(self, path):
+        """The sampling rate for a request path (1.0 when no rule matches)."""
+        for prefix, rate in self.rules:
+            if path.startswith(prefix):
+                return rate
+        return 1.0
+
+    def filter(self, record):
+        if record.levelno > self.max_level or not has_request_context():
+            return True
+
+        rate = g.get("_log_sample_rate")
+        if rate is None:
+            rate = self.rate_for(request.path)
+            g._log_sample_rate = rate
+            g._log_sampled = rate >= 1 or self._rng() < rate
+
+        if g._log_sampled and rate < 1:
+            record.sample_rate = rate
+        return g._log_sampled
+
+
+class AsyncQueueHandler(QueueHandler):
+    """
+    QueueHandler that drops low-level records instead of blocking when full.
+
+    ``prepare`` only merges the message arguments and renders any traceback,
+    leaving the full formatting to the listener's handlers.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+        self._exc_formatter = logging.Formatter()
+
+    def prepare(self, record):
+        message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self._exc_formatter.formatException(record.exc_info)
+
+        prepared = logging.makeLogRecord(record.__dict__)
+        prepared.message = message
+        prepared.msg = message
+        prepared.args = None
+        prepared.exc_info = None
+        return prepared
+
+    def enqueue(self, record):
+        try:
+            if record.levelno >= logging.WARNING:
+                self.queue.put(record, timeout=_BLOCKING_PUT_TIMEOUT)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+class LogPipeline:
+    """Owns the root logger's queue handler and the listener thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.handler = None
+        self.listener = None
+        self.queue_size = 0
+
+    def configure(self, config):
+        """
+        Apply ``LOGGING_CONFIG`` and, if enabled, move the root handlers behind a queue.
+
+        Safe to call again (e.g. for every ``create_app``); the previous
+        listener is flushed and stopped first.
+
+        Args:
+            config: Config class or mapping with the LOG_* settings
+        """
+        get = config.get if isinstance(config, dict) else functools.partial(getattr, config)
+
+        with self._lock:
+            self._stop_listener()
+            logging.config.dictConfig(get("LOGGING_CONFIG"))
+
+            root = logging.getLogger()
+            sampling = None
+            rules = parse_sample_rules(get("LOG_SAMPLE_RULES", ""))
+            if rules:
+                sampling = SamplingFilter(rules, logging.getLevelName(get("LOG_SAMPLE_MAX_LEVEL", "INFO")))
+
+            if not get("LOG_ASYNC", True):
+                self.handler = None
+                if sampling:
+                    for handler in root.handlers:
+                        handler.addFilter(sampling)
+                return
+
+            self.queue_size = get("LOG_QUEUE_SIZE", 10000)
+            handlers = list(root.handlers)
+            self.handler = AsyncQueueHandler(queue.Queue(self.queue_size))
+            if sampling:
+                self.handler.addFilter(sampling)
+            for handler in handlers:
+                root.removeHandler(handler)
+            root.addHandler(self.handler)
+
+            self.listener = QueueListener(self.handler.queue, *handlers, respect_handler_level=True)
+            self.listener.start()
+
+    def restart_after_fork(self):
+        """
+        Start a listener in a forked child (gunicorn preload).
+
+        The parent's listener thread does not exist in the child, and its queue
+        may have been mid-operation at the fork, so both are replaced.
+        """
+        with self._lock:
+            if self.listener is None:
+                return
+            handlers = self.listener.handlers
+            self.handler.queue = queue.Queue(self.queue_size)
+            self.listener = QueueListener(self.handler.queue, *handlers, respect_handler_level=True)
+            self.listener.start()
+
+    def stop(self):
+        """Flush queued records to the handlers and stop the listener."""
+        with self._lock:
+            self._stop_listener()
+
+    def _stop_listener(self):
+        if self.listener is not None:
+            try:
+                self.listener.stop()
+            except Exception:
+                logger.exception("Error stopping log listener")
+            self.listener = None
+
+    @property
+    def dropped(self):
+        """Records dropped because the queue was full."""
+        return self.handler.dropped if self.handler else 0
+
+
+# Global instance
+_log_pipeline = LogPipeline()
+_atexit_registered = False
+
+
+def init_logging(config):
+    """
+    Configure logging from ``config.LOGGING_CONFIG`` through the pipeline.
+
+    Args:
+        config: Config class or mapping with LOGGING_CONFIG and the LOG_* settings
+    """
+    global _atexit_registered
+
+    _log_pipeline.configure(config)
+    if not _atexit_registered:
+        atexit.register(shutdown_logging)
+        _atexit_registered = True
+    return _log_pipeline
+
+
+def restart_log_listener():
+    """Restart the listener thread in a forked worker."""
+    _log_pipeline.restart_after_fork()
+
+
+def shutdown_logging():
+    """Flush queued log records and stop the listener thread."""
+    _log_pipeline.stop()
+
+
+def get_log_pipeline():
+    """Get the global logging pipeline."""
+    return _log_pipeline
@@ -251,6 +251,8 @@ def log_request_start():
     g.start_time = time.time()
 
     request_logger = logging.getLogger("requests")
+    if not request_logger.isEnabledFor(logging.INFO):
+        return
     request_logger.info("Request started", extra={
         "correlation_id": correlation_id,
         "method": request.method,
@@ -262,10 +264,10 @@ def log_request_start():
 
 def log_request_end(response):
     """Log the end of a request."""
-    if hasattr(g, "start_time"):
+    request_logger = logging.getLogger("requests")
+    if hasattr(g, "start_time") and request_logger.isEnabledFor(logging.INFO):
         duration = (time.time() - g.start_time) * 1000
 
-        request_logger = logging.getLogger("requests")
         request_logger.info("Request completed", extra={
             "correlation_id": getattr(g, "correlation_id", None),
             "method": request.method,
@@ -0,0 +1,524 @@
+"""
+In-process metrics registry with a Prometheus text exporter
+
+Counters, gauges and fixed-bucket histograms keyed by label values, each
+guarded by its own lock held only for a dict update. ``/metrics``
+(routes_metrics.py) renders them in the Prometheus text format.
+
+Under gunicorn each worker has its own registry. When ``METRICS_DIR`` is
+set, every worker writes a JSON snapshot of its registry to
+``<METRICS_DIR>/<pid>.json`` every ``METRICS_FLUSH_SECONDS``, and the worker
+answering a scrape merges the other workers' snapshots with its live one:
+
+- counters and histograms are summed, including those of workers that have
+  exited, so totals stay monotonic until the server restarts;
+- gauges only count live workers and are summed, maxed, or reported per
+  worker with a ``pid`` label, as declared on the gauge.
+"""
+
+import atexit
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+
+# How gauges from several workers are combined
+AGGREGATE_SUM = "sum"
+AGGREGATE_MAX = "max"
+AGGREGATE_PER_WORKER = "pid"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+JOB_DURATION_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class Metric:
+    """Base class: a named metric with samples keyed by label values."""
+
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _check_labels(self, label_values):
+        if len(label_values) != len(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {label_values}")
+
+    def samples(self):
+        """Current samples as ``[label_values, value]`` pairs."""
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def describe(self):
+        return {"kind": self.kind, "help": self.documentation, "labels": list(self.labels)}
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+
+    kind = COUNTER
+
+    def inc(self, *label_values, amount=1):
+        self._check_labels(label_values)
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+
+class Gauge(Metric):
+    """
+    Value that goes up and down.
+
+    A gauge can instead be read at collection time from ``collect``, a
+    callable returning ``(label_values, value)`` pairs.
+    """
+
+    kind = GAUGE
+
+    def __init__(self, name, documentation, labels=(), aggregate=AGGREGATE_SUM, collect=None):
+        super().__init__(name, documentation, labels)
+        self.aggregate = aggregate
+        self.collect = collect
+
+    def set(self, value, *label_values):
+        self._check_labels(label_values)
+        with self._lock:
+            self._values[label_values] = value
+
+    def inc(self, *label_values, amount=1):
+        self._check_labels(label_values)
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dec(self, *label_values, amount=1):
+        self.inc(*label_values, amount=-amount)
+
+    def samples(self):
+        if self.collect is None:
+            return super().samples()
+        try:
+            return [[list(label_values), value] for label_values, value in self.collect()]
+        except Exception:
+            logger.exception("Error collecting gauge %s", self.name)
+            return []
+
+    def describe(self):
+        return {**super().describe(), "aggregate": self.aggregate}
+
+
+class Histogram(Metric):
+    """Fixed-bucket histogram; each sample is ``[bucket_counts, sum]``."""
+
+    kind = HISTOGRAM
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *label_values):
+        self._check_labels(label_values)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            sample = self._values.get(label_values)
+            if sample is None:
+                sample = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            sample[0][index] += 1
+            sample[1] += value
+
+    def samples(self):
+        with self._lock:
+            return [[list(key), [list(counts), total]] for key, (counts, total) in self._values.items()]
+
+    def _sample(self, label_values):
+        with self._lock:
+            sample = self._values.get(label_values)
+            if sample is None:
+                return [0] * (len(self.buckets) + 1), 0.0
+            return list(sample[0]), sample[1]
+
+    def quantile(self, q, *label_values):
+        """
+        Estimate a quantile as the upper bound of the bucket containing it.
+
+        Returns:
+            The bucket bound, None with no observations, or inf for the overflow bucket
+        """
+        counts, _ = self._sample(label_values)
+        total = sum(counts)
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for bound, count in zip(self.buckets, counts, strict=False):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def summary(self, *label_values):
+        """Cumulative bucket counts, count and sum of one sample, Prometheus style."""
+        counts, total = self._sample(label_values)
+        cumulative = 0
+        buckets = []
+        for bound, count in zip((*self.buckets, "+Inf"), counts, strict=True):
+            cumulative += count
+            buckets.append({"le": bound, "count": cumulative})
+        return {"buckets": buckets, "count": cumulative, "sum": round(total, 3)}
+
+    def describe(self):
+        return {**super().describe(), "buckets": list(self.buckets)}
+
+
+class MetricsRegistry:
+    """Named metrics of this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _register(self, metric_class, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, *args, **kwargs)
+            elif not isinstance(metric, metric_class):
+                raise ValueError(f"Metric {name!r} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name, documentation, labels=()):
+        return self._register(Counter, name, documentation, labels)
+
+    def gauge(self, name, documentation, labels=(), aggregate=AGGREGATE_SUM, collect=None):
+        return self._register(Gauge, name, documentation, labels, aggregate=aggregate, collect=collect)
+
+    def histogram(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram, name, documentation, labels, buckets=buckets)
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def snapshot(self):
+        """
+        JSON-serializable state of every metric.
+
+        Returns:
+            dict of metric name to its description and samples
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: {**metric.describe(), "samples": metric.samples()} for metric in metrics}
+
+    def reset(self):
+        """Zero every metric (tests and admin use)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+class SnapshotStore:
+    """Per-worker snapshot files in a shared directory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, pid):
+        return os.path.join(self.directory, f"{pid}.json")
+
+    def write(self, snapshot, pid=None):
+        """Atomically replace this worker's snapshot file."""
+        pid = pid or os.getpid()
+        tmp_path = self._path(pid) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        os.replace(tmp_path, self._path(pid))
+
+    def read_all(self, exclude_pid=None):
+        """
+        Snapshots written by workers.
+
+        Returns:
+            list of (pid, snapshot) tuples
+        """
+        snapshots = []
+        for filename in os.listdir(self.directory):
+            stem, ext = os.path.splitext(filename)
+            if ext != ".json" or not stem.isdigit() or int(stem) == exclude_pid:
+                continue
+            try:
+                with open(os.path.join(self.directory, filename), encoding="utf-8") as f:
+                    snapshots.append((int(stem), json.load(f)))
+            except (OSError, ValueError):
+                logger.warning("Skipping unreadable metrics snapshot %s", filename)
+        return snapshots
+
+    def clear(self):
+        """Remove all snapshots (on server start)."""
+        for filename in os.listdir(self.directory):
+            if filename.endswith((".json", ".tmp")):
+                os.unlink(os.path.join(self.directory, filename))
+
+
+def merge_snapshots(snapshots, alive=_pid_alive):
+    """
+    Combine worker snapshots into one.
+
+    Args:
+        snapshots: list of (pid, snapshot) tuples; the first is treated as live
+        alive: Predicate telling whether a worker pid is still running
+
+    Returns:
+        Merged snapshot in the same format
+    """
+    merged = {}
+    for position, (pid, snapshot) in enumerate(snapshots):
+        live = position == 0 or alive(pid)
+        for name, metric in snapshot.items():
+            kind = metric["kind"]
+            aggregate = metric.get("aggregate", AGGREGATE_SUM)
+            if kind == GAUGE and not live:
+                continue
+
+            target = merged.get(name)
+            if target is None:
+                target = merged[name] = {**metric, "samples": {}}
+                if kind == GAUGE and aggregate == AGGREGATE_PER_WORKER:
+                    target["labels"] = [*metric["labels"], "pid"]
+
+            samples = target["samples"]
+            for label_values, value in metric["samples"]:
+                key = tuple(label_values)
+                if kind == GAUGE and aggregate == AGGREGATE_PER_WORKER:
+                    samples[(*key, str(pid))] = value
+                elif key not in samples:
+                    samples[key] = [list(value[0]), value[1]] if kind == HISTOGRAM else value
+                elif kind == HISTOGRAM:
+                    counts, total = samples[key]
+                    samples[key] = [[a + b for a, b in zip(counts, value[0], strict=True)], total + value[1]]
+                elif kind == GAUGE and aggregate == AGGREGATE_MAX:
+                    samples[key] = max(samples[key], value)
+                else:
+                    samples[key] += value
+
+    for metric in merged.values():
+        metric["samples"] = [[list(key), value] for key, value in metric["samples"].items()]
+    return merged
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(snapshot):
+    """
+    Render a snapshot in the Prometheus text exposition format (0.0.4).
+
+    Returns:
+        str
+    """
+    lines = []
+    for name in sorted(snapshot):
+        metric = snapshot[name]
+        labels = metric["labels"]
+        lines.append(f"# HELP {name} {_escape(metric['help'])}")
+        lines.append(f"# TYPE {name} {metric['kind']}")
+        for label_values, value in sorted(metric["samples"], key=lambda sample: sample[0]):
+            if metric["kind"] != HISTOGRAM:
+                lines.append(f"{name}{_label_text(labels, label_values)} {_number(value)}")
+                continue
+
+            counts, total = value
+            cumulative = 0
+            for bound, count in zip((*metric["buckets"], float("inf")), counts, strict=True):
+                cumulative += count
+                le = f'le="{_number(float(bound))}"'
+                lines.append(f"{name}_bucket{_label_text(labels, label_values, le)} {cumulative}")
+            lines.append(f"{name}_sum{_label_text(labels, label_values)} {_number(float(total))}")
+            lines.append(f"{name}_count{_label_text(labels, label_values)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """Writes this worker's snapshot to the shared store on an interval."""
+
+    def __init__(self, registry, store, interval=5.0):
+        self.registry = registry
+        self.store = store
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="MetricsExporter")
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def flush(self):
+        try:
+            self.store.write(self.registry.snapshot())
+        except Exception:
+            logger.exception("Error writing metrics snapshot")
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+
+# Global instance
+metrics_registry = MetricsRegistry()
+
+http_requests_total = metrics_registry.counter(
+    "http_requests_total", "HTTP requests served", ("method", "endpoint", "status"))
+http_request_duration_seconds = metrics_registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "endpoint"))
+http_request_db_queries = metrics_registry.histogram(
+    "http_request_db_queries", "SQL statements issued per HTTP request", ("method", "endpoint"),
+    buckets=QUERY_COUNT_BUCKETS)
+socketio_connections = metrics_registry.gauge(
+    "socketio_connections", "Connected Socket.IO clients")
+scheduled_job_duration_seconds = metrics_registry.histogram(
+    "scheduled_job_duration_seconds", "Background scheduler job run time", ("job", "status"),
+    buckets=JOB_DURATION_BUCKETS)
+scheduled_job_last_success_seconds = metrics_registry.gauge(
+    "scheduled_job_last_success_timestamp_seconds", "Unix time of each job's last successful run", ("job",),
+    aggregate=AGGREGATE_MAX)
+
+_store = None
+_exporter = None
+
+
+def _pool_samples(engines):
+    for bind, engine in engines.items():
+        pool = engine.pool
+        bind_name = bind or "default"
+        for state, method in (("size", "size"), ("checked_out", "checkedout"), ("overflow", "overflow")):
+            if hasattr(pool, method):
+                yield (bind_name, state), getattr(pool, method)()
+
+
+def _process_samples():
+    import psutil
+
+    process = psutil.Process()
+    yield ("resident_memory_bytes",), process.memory_info().rss
+    yield ("threads",), process.num_threads()
+
+
+def init_metrics(app):
+    """
+    Register the collectors that read the app's state at scrape time.
+
+    Must run after ``db.init_app``.
+
+    Args:
+        app: Flask application instance
+    """
+    global _store
+    from models import db
+
+    with app.app_context():
+        engines = dict(db.engines)
+
+    metrics_registry.gauge(
+        "db_pool_connections", "Database connection pool usage by state", ("bind", "state"),
+        collect=lambda: _pool_samples(engines))
+    metrics_registry.gauge(
+        "process_stats", "Worker process resource usage", ("stat",),
+        aggregate=AGGREGATE_PER_WORKER, collect=_process_samples)
+
+    directory = app.config.get("METRICS_DIR")
+    _store = SnapshotStore(directory) if directory else None
+    return metrics_registry
+
+
+def init_metrics_exporter(app):
+    """
+    Start writing this worker's snapshots when ``METRICS_DIR`` is set.
+
+    Args:
+        app: Flask application instance
+    """
+    global _exporter
+
+    if _store is None:
+        return None
+    if _exporter is None:
+        _exporter = MetricsExporter(metrics_registry, _store, app.config.get("METRICS_FLUSH_SECONDS", 5))
+        atexit.register(shutdown_metrics_exporter)
+    _exporter.start()
+    return _exporter
+
+
+def shutdown_metrics_exporter():
+    """Write a final snapshot and stop the exporter thread."""
+    if _exporter is not None:
+        _exporter.stop()
+
+
+def collect_metrics():
+    """
+    This worker's metrics merged with the other workers' latest snapshots.
+
+    Returns:
+        Snapshot dict for ``render_prometheus``
+    """
+    pid = os.getpid()
+    snapshots = [(pid, metrics_registry.snapshot())]
+    if _store is not None:
+        snapshots.extend(_store.read_all(exclude_pid=pid))
+    return merge_snapshots(snapshots)
+
+
+def observe_job_run(job_name, status, duration_seconds, success):
+    """Record a background job run."""
+    scheduled_job_duration_seconds.observe(duration_seconds, job_name, status)
+    if success:
+        scheduled_job_last_success_seconds.set(time.time(), job_name)
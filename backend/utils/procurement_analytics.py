@@ -0,0 +1,229 @@
+"""
+Procurement Analytics Service
+
+Computes the procurement dashboard figures for orders and user requests
+with grouped SQL aggregates (status, type, priority, item status, due-date
+month buckets, late/due-soon counts and average open days), so the cost of
+a dashboard load depends on the number of distinct groups rather than the
+number of rows.
+
+Results are cached for ``PROCUREMENT_ANALYTICS_CACHE_SECONDS``. Committed
+order, request or request item writes made through the ORM clear the cache;
+bulk SQL updates are only picked up when the entry expires.
+"""
+
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from sqlalchemy import Integer, and_, case, cast, extract, func, literal, select
+
+from utils.commit_hooks import CommitHook
+
+
+logger = logging.getLogger(__name__)
+
+CHANGED_KEY = "procurement_analytics_changed"
+
+DEFAULT_CACHE_SECONDS = 30
+
+# An order is due soon when its due date falls within this many days
+DUE_SOON_DAYS = 3
+
+
+def _count_when(*criteria):
+    return func.coalesce(func.sum(case((and_(*criteria), 1), else_=0)), 0)
+
+
+def _whole_days_since(column, now):
+    """SQL expression for the whole days elapsed between ``column`` and ``now``."""
+    from models import db
+
+    if db.engine.dialect.name == "sqlite":
+        return cast(func.julianday(literal(now)) - func.julianday(column), Integer)
+    return func.floor(extract("epoch", literal(now) - column) / 86400)
+
+
+class ProcurementAnalyticsService:
+    """Grouped, cached order and user request analytics."""
+
+    def __init__(self):
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def get_order_analytics(self):
+        """
+        Aggregated analytics for all procurement orders.
+
+        Returns:
+            dict with status_breakdown, type_breakdown, priority_breakdown,
+            late_count, due_soon_count, total_open, orders_per_month and
+            average_open_days
+        """
+        return self._cached(("orders",), self._compute_order_analytics)
+
+    def get_request_analytics(self, requester_id=None):
+        """
+        Aggregated analytics for user requests.
+
+        Args:
+            requester_id: Only count requests made by this user (all requests when None)
+
+        Returns:
+            dict with total_requests, total_items, by_status, by_priority and
+            items_by_status
+        """
+        return self._cached(
+            ("requests", requester_id),
+            lambda: self._compute_request_analytics(requester_id),
+        )
+
+    def invalidate(self):
+        """
+        Drop all cached results.
+
+        Returns:
+            Number of cache entries removed
+        """
+        with self._lock:
+            removed = len(self._cache)
+            self._cache.clear()
+            return removed
+
+    def _cached(self, key, compute):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+
+        result = compute()
+
+        with self._lock:
+            self._cache[key] = (time.monotonic() + self._ttl(), result)
+        return result
+
+    def _ttl(self):
+        from flask import current_app
+
+        return current_app.config.get("PROCUREMENT_ANALYTICS_CACHE_SECONDS", DEFAULT_CACHE_SECONDS)
+
+    def _compute_order_analytics(self):
+        from models import ProcurementOrder, db, get_current_time
+
+        now = get_current_time()
+        # Closed orders are not counted as open, late or due soon
+        is_open = ProcurementOrder.status.notin_(list(ProcurementOrder.CLOSED_STATUSES))
+        has_due_date = ProcurementOrder.expected_due_date.isnot(None)
+        status = func.coalesce(ProcurementOrder.status, "unknown").label("status")
+        order_type = func.coalesce(ProcurementOrder.order_type, "unspecified").label("order_type")
+        priority = func.coalesce(ProcurementOrder.priority, "normal").label("priority")
+
+        # One row per (status, type, priority) combination carries every counter
+        rows = db.session.execute(
+            select(
+                status,
+                order_type,
+                priority,
+                func.count().label("total"),
+                _count_when(is_open).label("open"),
+                _count_when(is_open, has_due_date, ProcurementOrder.expected_due_date < now).label("late"),
+                _count_when(
+                    is_open,
+                    has_due_date,
+                    ProcurementOrder.expected_due_date >= now,
+                    ProcurementOrder.expected_due_date < now + timedelta(days=DUE_SOON_DAYS + 1),
+                ).label("due_soon"),
+                _count_when(is_open, ProcurementOrder.created_at.isnot(None)).label("aged"),
+                func.coalesce(func.sum(case(
+                    (and_(is_open, ProcurementOrder.created_at.isnot(None)),
+                     _whole_days_since(ProcurementOrder.created_at, now)),
+                    else_=0,
+                )), 0).label("open_days"),
+            ).group_by(status, order_type, priority)
+        ).all()
+
+        status_counts, type_counts, priority_counts = {}, {}, {}
+        late_count = due_soon_count = total_open = aged = open_days = 0
+        for row in rows:
+            status_counts[row.status] = status_counts.get(row.status, 0) + row.total
+            type_counts[row.order_type] = type_counts.get(row.order_type, 0) + row.total
+            priority_counts[row.priority] = priority_counts.get(row.priority, 0) + row.total
+            late_count += row.late
+            due_soon_count += row.due_soon
+            total_open += row.open
+            aged += row.aged
+            open_days += row.open_days
+
+        year = extract("year", ProcurementOrder.expected_due_date).label("year")
+        month = extract("month", ProcurementOrder.expected_due_date).label("month")
+        month_rows = db.session.execute(
+            select(year, month, func.count().label("total"))
+            .where(has_due_date)
+            .group_by(year, month)
+            .order_by(year, month)
+        ).all()
+
+        return {
+            "status_breakdown": [
+                {"status": key, "count": count} for key, count in sorted(status_counts.items())
+            ],
+            "type_breakdown": [
+                {"type": key, "count": count} for key, count in sorted(type_counts.items())
+            ],
+            "priority_breakdown": [
+                {"priority": key, "count": count} for key, count in sorted(priority_counts.items())
+            ],
+            "late_count": late_count,
+            "due_soon_count": due_soon_count,
+            "total_open": total_open,
+            "orders_per_month": [
+                {"month": f"{int(row.year):04d}-{int(row.month):02d}", "count": row.total}
+                for row in month_rows
+            ],
+            "average_open_days": (open_days / aged) if aged else 0,
+        }
+
+    def _compute_request_analytics(self, requester_id):
+        from models import RequestItem, UserRequest, db
+
+        request_filter = [UserRequest.requester_id == requester_id] if requester_id else []
+
+        rows = db.session.execute(
+            select(UserRequest.status, UserRequest.priority, func.count().label("total"))
+            .where(*request_filter)
+            .group_by(UserRequest.status, UserRequest.priority)
+        ).all()
+
+        by_status, by_priority = {}, {}
+        for row in rows:
+            by_status[row.status] = by_status.get(row.status, 0) + row.total
+            by_priority[row.priority] = by_priority.get(row.priority, 0) + row.total
+
+        item_query = select(RequestItem.status, func.count().label("total")).group_by(RequestItem.status)
+        if request_filter:
+            item_query = item_query.join(UserRequest, UserRequest.id == RequestItem.request_id).where(*request_filter)
+        items_by_status = {row.status: row.total for row in db.session.execute(item_query)}
+
+        return {
+            "total_requests": sum(by_status.values()),
+            "total_items": sum(items_by_status.values()),
+            "by_status": by_status,
+            "by_priority": by_priority,
+            "items_by_status": items_by_status,
+        }
+
+
+procurement_analytics = ProcurementAnalyticsService()
+
+
+_invalidation_hook = CommitHook(CHANGED_KEY, lambda _changes: procurement_analytics.invalidate())
+
+
+def _install_invalidation_hooks():
+    from models import ProcurementOrder, RequestItem, UserRequest
+
+    _invalidation_hook.watch((ProcurementOrder, UserRequest, RequestItem))
+
+
+_install_invalidation_hooks()
@@ -0,0 +1,191 @@
+"""
+Channel Read Markers
+
+Debounces ``ChannelMember.last_read_message_id`` updates. Reading a channel
+used to commit a marker update on every poll; now the newest message ID a
+member has seen is kept in memory (repeated polls of the same channel
+collapse into one entry) and a background thread writes all pending
+markers with one executemany UPDATE every ``flush_interval`` seconds.
+
+Markers only move forward: reading older history never moves a member's
+marker back. Readers that need an exact unread count should combine the
+stored marker with ``pending_marker``.
+"""
+
+import logging
+
+from sqlalchemy import bindparam, or_
+
+from utils.background_batcher import BackgroundBatcher
+
+
+logger = logging.getLogger(__name__)
+
+
+class ReadMarkerBuffer(BackgroundBatcher):
+    """
+    Collects channel read markers and writes them in batches.
+    """
+
+    thread_name = "ChannelReadMarkers"
+
+    def __init__(self, app, flush_interval=2.0, batch_size=500):
+        """
+        Initialize the read marker buffer.
+
+        Args:
+            app: Flask application instance
+            flush_interval: Maximum seconds a marker waits before being written
+            batch_size: Number of pending members that triggers an early flush
+        """
+        super().__init__(flush_interval, batch_size)
+        self.app = app
+        self._markers = {}
+
+    def mark(self, channel_id, user_id, message_id):
+        """
+        Record that a member has read a channel up to ``message_id``.
+
+        Returns:
+            True when the pending marker moved forward
+        """
+        key = (channel_id, user_id)
+        with self._lock:
+            if message_id <= self._markers.get(key, 0):
+                return False
+            self._markers[key] = message_id
+            pending = len(self._markers)
+
+        self._queued(pending)
+        return True
+
+    def pending_marker(self, channel_id, user_id):
+        """Newest message ID read by a member that has not been written yet (or None)."""
+        with self._lock:
+            return self._markers.get((channel_id, user_id))
+
+    def pending_markers(self, user_ids):
+        """Pending markers of the given users, keyed by (channel_id, user_id)."""
+        user_ids = set(user_ids)
+        with self._lock:
+            return {key: message_id for key, message_id in self._markers.items() if key[1] in user_ids}
+
+    def pending_count(self):
+        """Number of members with a marker waiting to be written."""
+        with self._lock:
+            return len(self._markers)
+
+    def flush(self):
+        """
+        Write all pending read markers to the database.
+
+        Returns:
+            Number of markers written
+        """
+        from models import db
+        from models_messaging import ChannelMember
+
+        with self._flush_lock:
+            with self._lock:
+                markers, self._markers = self._markers, {}
+            if not markers:
+                return 0
+
+            members = ChannelMember.__table__
+            update_stmt = (
+                members.update()
+                .where(
+                    members.c.channel_id == bindparam("b_channel_id"),
+                    members.c.user_id == bindparam("b_user_id"),
+                    or_(
+                        members.c.last_read_message_id.is_(None),
+                        members.c.last_read_message_id < bindparam("b_message_id"),
+                    ),
+                )
+                .values(last_read_message_id=bindparam("b_message_id"))
+            )
+
+            with self.app.app_context():
+                try:
+                    db.session.execute(update_stmt, [
+                        {"b_channel_id": channel_id, "b_user_id": user_id, "b_message_id": message_id}
+                        for (channel_id, user_id), message_id in markers.items()
+                    ])
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    self._restore(markers)
+                    logger.error("Error flushing channel read markers", exc_info=True, extra={
+                        "marker_count": len(markers),
+                        "error_message": str(e)
+                    })
+                    return 0
+                finally:
+                    db.session.remove()
+
+        logger.debug("Flushed channel read markers", extra={"marker_count": len(markers)})
+        return len(markers)
+
+    def _restore(self, markers):
+        with self._lock:
+            for key, message_id in markers.items():
+                if message_id > self._markers.get(key, 0):
+                    self._markers[key] = message_id
+
+
+def mark_channel_read(membership, message_id):
+    """
+    Advance a member's read marker, through the buffer when it is running.
+
+    Without a buffer the marker is updated on the session and the caller
+    commits, as before.
+
+    Returns:
+        True when the session was changed and needs a commit
+    """
+    if _read_markers is not None:
+        if _read_markers.mark(membership.channel_id, membership.user_id, message_id):
+            from utils.unread_counters import unread_counters
+
+            unread_counters.refresh(membership.user_id, "channels")
+        return False
+    if not membership.last_read_message_id or membership.last_read_message_id < message_id:
+        membership.last_read_message_id = message_id
+        return True
+    return False
+
+
+# Global instance
+_read_markers = None
+
+
+def init_read_markers(app):
+    """
+    Initialize the channel read marker buffer.
+
+    Args:
+        app: Flask application instance
+    """
+    global _read_markers
+
+    if _read_markers is None:
+        _read_markers = ReadMarkerBuffer(
+            app,
+            flush_interval=app.config.get("CHANNEL_READ_MARKER_FLUSH_SECONDS", 2.0),
+            batch_size=app.config.get("CHANNEL_READ_MARKER_BATCH_SIZE", 500),
+        )
+    return _read_markers
+
+
+def shutdown_read_markers():
+    """Flush pending read markers and stop the buffer."""
+    global _read_markers
+
+    if _read_markers:
+        buffer, _read_markers = _read_markers, None
+        buffer.stop()
+
+
+def get_read_markers():
+    """Get the global read marker buffer."""
+    return _read_markers
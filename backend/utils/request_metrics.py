@@ -0,0 +1,239 @@
+"""
+Per-request performance instrumentation
+
+Counts the SQL statements and database time of every request through
+SQLAlchemy's ``before/after_cursor_execute`` events, reports them to the
+client in a ``Server-Timing`` header, warns about requests that issue more
+queries than ``QUERY_BUDGET_PER_REQUEST`` (the usual sign of an N+1), and
+keeps per-endpoint histograms for the admin metrics endpoint. The same
+observations feed the Prometheus metrics in utils/metrics.py.
+
+Statistics are kept per process; each gunicorn worker reports its own.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from flask import current_app, g, request
+from sqlalchemy import event
+
+from utils.metrics import (
+    QUERY_COUNT_BUCKETS,
+    Histogram,
+    http_request_db_queries,
+    http_request_duration_seconds,
+    http_requests_total,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the duration buckets; a final +Inf bucket is implied.
+# Query counts use QUERY_COUNT_BUCKETS from utils/metrics.py.
+DURATION_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+UNMATCHED_ENDPOINT = "<unmatched>"
+
+_current = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """Query count and database time of the request being served."""
+
+    __slots__ = ("db_time", "query_count", "started")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.db_time = 0.0
+
+
+def current_request_metrics():
+    """The metrics of the request running on this thread, or None."""
+    return _current.get()
+
+
+class EndpointStats:
+    """Aggregated request metrics for one method and endpoint."""
+
+    def __init__(self, method, endpoint):
+        self.method = method
+        self.endpoint = endpoint
+        self.errors = 0
+        self.over_budget = 0
+        self.max_queries = 0
+        self.db_time_ms = 0.0
+        self.duration = Histogram("duration_ms", "Request duration", buckets=DURATION_BUCKETS_MS)
+        self.queries = Histogram("queries", "Queries per request", buckets=QUERY_COUNT_BUCKETS)
+
+    def observe(self, duration_ms, query_count, db_time_ms, status_code, over_budget):
+        self.duration.observe(duration_ms)
+        self.queries.observe(query_count)
+        self.db_time_ms += db_time_ms
+        self.max_queries = max(self.max_queries, query_count)
+        if status_code >= 500:
+            self.errors += 1
+        if over_budget:
+            self.over_budget += 1
+
+    def to_dict(self):
+        duration = self.duration.summary()
+        queries = self.queries.summary()
+        count = duration["count"]
+        return {
+            "method": self.method,
+            "endpoint": self.endpoint,
+            "count": count,
+            "errors": self.errors,
+            "over_budget": self.over_budget,
+            "avg_duration_ms": round(duration["sum"] / count, 2) if count else None,
+            "p50_duration_ms": self.duration.quantile(0.5),
+            "p95_duration_ms": self.duration.quantile(0.95),
+            "avg_queries": round(queries["sum"] / count, 2) if count else None,
+            "max_queries": self.max_queries,
+            "avg_db_time_ms": round(self.db_time_ms / count, 2) if count else None,
+            "duration_histogram": duration,
+            "query_histogram": queries,
+        }
+
+
+class RequestMetricsRegistry:
+    """Thread-safe per-endpoint statistics for this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+        self.started_at = time.time()
+
+    def record(self, method, endpoint, duration_ms, query_count, db_time_ms, status_code, over_budget=False):
+        key = (method, endpoint)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = EndpointStats(method, endpoint)
+            stats.observe(duration_ms, query_count, db_time_ms, status_code, over_budget)
+
+    def snapshot(self):
+        """
+        All endpoint statistics, busiest (by total time) first.
+
+        Returns:
+            list of dicts from ``EndpointStats.to_dict``
+        """
+        with self._lock:
+            endpoints = [stats.to_dict() for stats in self._stats.values()]
+        return sorted(endpoints, key=lambda item: item["duration_histogram"]["sum"], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.started_at = time.time()
+
+
+# Global instance
+request_metrics = RequestMetricsRegistry()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("request_metrics_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics = _current.get()
+    starts = conn.info.get("request_metrics_started")
+    if metrics is None or not starts:
+        return
+    metrics.db_time += time.perf_counter() - starts.pop()
+    metrics.query_count += 1
+
+
+def instrument_engine(engine):
+    """Count the statements an engine executes toward the current request."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _start_request_metrics():
+    _current.set(RequestMetrics())
+
+
+def _finish_request_metrics(response):
+    metrics = _current.get()
+    if metrics is None:
+        return response
+
+    budget = current_app.config.get("QUERY_BUDGET_PER_REQUEST", 25)
+    duration_ms = (time.perf_counter() - metrics.started) * 1000
+    db_time_ms = metrics.db_time * 1000
+    endpoint = request.endpoint or UNMATCHED_ENDPOINT
+    over_budget = bool(budget) and metrics.query_count > budget
+
+    if current_app.config.get("SERVER_TIMING_ENABLED", True):
+        response.headers["Server-Timing"] = (
+            f'db;dur={db_time_ms:.1f};desc="{metrics.query_count} queries", app;dur={duration_ms:.1f}'
+        )
+
+    if over_budget:
+        logger.warning(
+            "Request exceeded query budget: %s %s issued %d queries (budget %d)",
+            request.method, endpoint, metrics.query_count, budget,
+            extra={
+                "correlation_id": getattr(g, "correlation_id", None),
+                "path": request.path,
+                "query_count": metrics.query_count,
+                "query_budget": budget,
+                "db_time_ms": round(db_time_ms, 2),
+                "duration_ms": round(duration_ms, 2),
+            },
+        )
+
+    request_metrics.record(
+        request.method, endpoint, duration_ms, metrics.query_count, db_time_ms,
+        response.status_code, over_budget,
+    )
+    http_requests_total.inc(request.method, endpoint, str(response.status_code))
+    http_request_duration_seconds.observe(duration_ms / 1000, request.method, endpoint)
+    http_request_db_queries.observe(metrics.query_count, request.method, endpoint)
+    return response
+
+
+def _clear_request_metrics(_exc=None):
+    _current.set(None)
+
+
+def init_request_metrics(app):
+    """
+    Instrument the app's engines and requests.
+
+    Must run after ``db.init_app``.
+
+    Args:
+        app: Flask application instance
+    """
+    from models import db
+
+    if not app.config.get("REQUEST_METRICS_ENABLED", True):
+        return
+
+    with app.app_context():
+        for engine in db.engines.values():
+            instrument_engine(engine)
+
+    app.before_request(_start_request_metrics)
+    app.after_request(_finish_request_metrics)
+    app.teardown_request(_clear_request_metrics)
+
+    logger.info("Request metrics enabled", extra={
+        "query_budget": app.config.get("QUERY_BUDGET_PER_REQUEST", 25),
+        "worker_pid": os.getpid(),
+    })
+
+
+def get_request_metrics():
+    """Get the global per-endpoint request metrics."""
+    return request_metrics
@@ -145,16 +145,19 @@ class ResourceMonitor:
             except Exception as e:
                 logger.debug(f"Could not check database connections: {e}")
 
-            # Log periodic resource stats (debug level)
-            logger.debug("Resource check completed", extra={
-                "metric_type": "resource_check",
+            # Log periodic resource stats (debug level); CPU is measured since
+            # the previous check instead of blocking the scheduler for a second
+            summary = {
                 "memory_percent": memory.percent,
                 "disk_percent": disk.percent if disk else 0,
-                "cpu_percent": psutil.cpu_percent(interval=1)
-            })
+                "cpu_percent": psutil.cpu_percent(interval=None)
+            }
+            logger.debug("Resource check completed", extra={"metric_type": "resource_check", **summary})
+            return summary
 
         except Exception as e:
             logger.error(f"Error checking resources: {e}", exc_info=True)
+            return {"errors": {"resource_check": str(e)}}
 
     def get_current_stats(self):
         """
@@ -291,18 +294,41 @@ def init_resource_monitoring(app):
     """
     Initialize resource monitoring for the Flask application.
 
+    Periodic checks run as the ``resource_check`` job of the background
+    scheduler (utils/scheduler.py) rather than a thread per process.
+
     Args:
         app: Flask application instance
     """
     global _resource_monitor
 
-    check_interval = app.config.get("RESOURCE_CHECK_INTERVAL", 60)
-    thresholds = app.config.get("RESOURCE_THRESHOLDS", {})
+    if _resource_monitor is None:
+        check_interval = app.config.get("RESOURCE_CHECK_INTERVAL", 60)
+        thresholds = app.config.get("RESOURCE_THRESHOLDS", {})
+
+        _resource_monitor = ResourceMonitor(check_interval, thresholds)
+        logger.info(f"Resource monitoring initialized with thresholds: {thresholds}")
+
+    return _resource_monitor
+
+
+def resource_check_job(app):
+    """
+    The periodic resource check as a background scheduler job.
+
+    The monitor is created when the job first runs, in the leader.
+    """
+    from utils.scheduler import IntervalSchedule, Job
 
-    _resource_monitor = ResourceMonitor(check_interval, thresholds)
-    _resource_monitor.start_monitoring()
+    def check_resources():
+        init_resource_monitoring(app)._check_resources()
 
-    logger.info(f"Resource monitoring initialized with thresholds: {thresholds}")
+    return Job(
+        "resource_check",
+        check_resources,
+        IntervalSchedule(app.config.get("RESOURCE_CHECK_INTERVAL", 60)),
+        description="Memory, disk, open file and database connection thresholds",
+    )
 
 
 def get_resource_monitor():
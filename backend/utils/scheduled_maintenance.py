@@ -1,16 +1,19 @@
 """
 Scheduled Maintenance Service
 
-Provides automatic periodic maintenance tasks for the database.
-Runs in a background thread to avoid blocking the main application.
+Provides automatic periodic maintenance tasks for the database, run as a
+job of the background scheduler (utils/scheduler.py) in the leader process.
 """
 
 import logging
 import os
-import threading
-from datetime import datetime, timedelta
+from datetime import timedelta
 
-from utils.bulk_operations import bulk_update_chemical_status, bulk_update_tool_calibration_status
+from utils.attachment_storage import blob_store
+from utils.audit_writer import archive_audit_logs
+from utils.bulk_operations import bulk_update_chemical_status
+from utils.calibration_scheduler import calibration_scheduler
+from utils.scheduler import Job, parse_schedule, prune_job_history
 
 
 logger = logging.getLogger(__name__)
@@ -27,130 +30,114 @@ class ScheduledMaintenanceService:
             app: Flask application instance
         """
         self.app = app
-        self.maintenance_thread = None
-        self.stop_event = threading.Event()
-
-        # Configuration from environment variables
-        self.enabled = os.environ.get("AUTO_MAINTENANCE_ENABLED", "true").lower() == "true"
-        # Default to 1 hour interval for maintenance tasks
-        self.interval_hours = int(os.environ.get("AUTO_MAINTENANCE_INTERVAL_HOURS", "1"))
-        self.run_on_startup = os.environ.get("MAINTENANCE_ON_STARTUP", "true").lower() == "true"
-
-    def start(self):
-        """Start the scheduled maintenance service."""
-        if not self.enabled:
-            logger.info("Scheduled maintenance is disabled")
-            return
-
-        if self.maintenance_thread and self.maintenance_thread.is_alive():
-            logger.warning("Scheduled maintenance service is already running")
-            return
-
-        logger.info(f"Starting scheduled maintenance service (interval: {self.interval_hours} hours)")
-
-        self.stop_event.clear()
-        self.maintenance_thread = threading.Thread(
-            target=self._maintenance_loop,
-            daemon=True,
-            name="ScheduledMaintenanceThread"
-        )
-        self.maintenance_thread.start()
-
-    def stop(self):
-        """Stop the scheduled maintenance service."""
-        if not self.maintenance_thread or not self.maintenance_thread.is_alive():
-            return
-
-        logger.info("Stopping scheduled maintenance service...")
-        self.stop_event.set()
-
-        # Wait for thread to finish (with timeout)
-        self.maintenance_thread.join(timeout=10)
-
-        if self.maintenance_thread.is_alive():
-            logger.warning("Scheduled maintenance thread did not stop gracefully")
-        else:
-            logger.info("Scheduled maintenance service stopped")
-
-    def _maintenance_loop(self):
-        """Main loop for scheduled maintenance."""
+
+        # Unreferenced attachment blobs are kept for this long before being deleted
+        self.blob_gc_grace_hours = int(os.environ.get("ATTACHMENT_BLOB_GC_GRACE_HOURS", "24"))
+        # Audit log rows older than this are moved into compressed archive segments
+        self.audit_log_retention_days = int(os.environ.get("AUDIT_LOG_RETENTION_DAYS", "365"))
+        # Scheduler job run history is kept for this long
+        self.job_history_retention_days = app.config.get("SCHEDULER_HISTORY_RETENTION_DAYS", 30)
+
+    def _run_maintenance_tasks(self):
+        """
+        Run all maintenance tasks.
+
+        A failing task is logged and skipped so the others still run.
+
+        Returns:
+            dict of each task's results, with failed tasks' errors under "errors"
+        """
+        from models import db
+
+        logger.info("Starting maintenance tasks...")
+        results = {}
+        errors = {}
+
+        # Move tools whose calibration boundaries passed since the last run (commits its own work)
         try:
-            # Run initial maintenance on startup if enabled
-            if self.run_on_startup:
-                logger.info("Running startup maintenance tasks...")
-                with self.app.app_context():
-                    self._run_maintenance_tasks()
-
-            # Main maintenance loop
-            while not self.stop_event.is_set():
-                # Calculate next maintenance time
-                next_maintenance = datetime.now() + timedelta(hours=self.interval_hours)
-                logger.info(f"Next scheduled maintenance at: {next_maintenance.strftime('%Y-%m-%d %H:%M:%S')}")
-
-                # Wait for the interval (or until stop event is set)
-                if self.stop_event.wait(timeout=self.interval_hours * 3600):
-                    # Stop event was set
-                    break
-
-                # Run scheduled maintenance
-                with self.app.app_context():
-                    self._run_maintenance_tasks()
+            logger.info("Updating tool calibration statuses...")
+            calibration_results = calibration_scheduler.run()
+            results["calibration"] = calibration_results
+            logger.info("Tool calibration status update complete", extra={
+                "overdue_count": calibration_results.get("overdue", 0),
+                "due_soon_count": calibration_results.get("due_soon", 0),
+                "current_count": calibration_results.get("current", 0),
+                "full_reconcile": calibration_results.get("full_reconcile"),
+                "next_boundary": calibration_results.get("next_boundary")
+            })
+        except Exception as e:
+            errors["calibration"] = str(e)
+            logger.error("Error updating tool calibration statuses", exc_info=True, extra={
+                "error_message": str(e)
+            })
 
+        # Update chemical statuses
+        try:
+            logger.info("Updating chemical statuses...")
+            chemical_results = bulk_update_chemical_status()
+            results["chemicals"] = chemical_results
+            logger.info("Chemical status update complete", extra={
+                "expired_count": chemical_results.get("expired", 0),
+                "expiring_soon_count": chemical_results.get("expiring_soon", 0),
+                "current_count": chemical_results.get("current", 0)
+            })
         except Exception as e:
-            logger.error("Error in maintenance loop", exc_info=True, extra={
+            errors["chemicals"] = str(e)
+            logger.error("Error updating chemical statuses", exc_info=True, extra={
                 "error_message": str(e)
             })
 
-    def _run_maintenance_tasks(self):
-        """Run all maintenance tasks."""
+        # Commit all changes
         try:
-            from models import db
-
-            logger.info("Starting maintenance tasks...")
-
-            # Update tool calibration statuses
-            try:
-                logger.info("Updating tool calibration statuses...")
-                calibration_results = bulk_update_tool_calibration_status()
-                logger.info("Tool calibration status update complete", extra={
-                    "overdue_count": calibration_results.get("overdue", 0),
-                    "due_soon_count": calibration_results.get("due_soon", 0),
-                    "current_count": calibration_results.get("current", 0)
-                })
-            except Exception as e:
-                logger.error("Error updating tool calibration statuses", exc_info=True, extra={
-                    "error_message": str(e)
-                })
-
-            # Update chemical statuses
-            try:
-                logger.info("Updating chemical statuses...")
-                chemical_results = bulk_update_chemical_status()
-                logger.info("Chemical status update complete", extra={
-                    "expired_count": chemical_results.get("expired", 0),
-                    "expiring_soon_count": chemical_results.get("expiring_soon", 0),
-                    "current_count": chemical_results.get("current", 0)
-                })
-            except Exception as e:
-                logger.error("Error updating chemical statuses", exc_info=True, extra={
-                    "error_message": str(e)
-                })
-
-            # Commit all changes
-            try:
-                db.session.commit()
-                logger.info("Maintenance tasks completed successfully")
-            except Exception as e:
-                logger.error("Error committing maintenance changes", exc_info=True, extra={
-                    "error_message": str(e)
-                })
-                db.session.rollback()
+            db.session.commit()
+            logger.info("Maintenance tasks completed successfully")
+        except Exception as e:
+            errors["commit"] = str(e)
+            logger.error("Error committing maintenance changes", exc_info=True, extra={
+                "error_message": str(e)
+            })
+            db.session.rollback()
 
+        # Garbage-collect unreferenced attachment blobs (commits its own work)
+        try:
+            logger.info("Collecting unreferenced attachment blobs...")
+            gc_results = blob_store.collect_garbage(grace_period=timedelta(hours=self.blob_gc_grace_hours))
+            results["attachment_blobs"] = gc_results
+            logger.info("Attachment blob garbage collection complete", extra=gc_results)
         except Exception as e:
-            logger.error("Error running maintenance tasks", exc_info=True, extra={
+            db.session.rollback()
+            errors["attachment_blobs"] = str(e)
+            logger.error("Error collecting attachment blobs", exc_info=True, extra={
                 "error_message": str(e)
             })
 
+        # Archive old audit log rows (commits its own work)
+        try:
+            logger.info("Archiving old audit log rows...")
+            archive_results = archive_audit_logs(retention_days=self.audit_log_retention_days)
+            results["audit_log"] = archive_results
+            logger.info("Audit log archival complete", extra=archive_results)
+        except Exception as e:
+            db.session.rollback()
+            errors["audit_log"] = str(e)
+            logger.error("Error archiving audit log rows", exc_info=True, extra={
+                "error_message": str(e)
+            })
+
+        # Drop old scheduler job run history (commits its own work)
+        try:
+            results["job_history"] = prune_job_history(self.job_history_retention_days)
+        except Exception as e:
+            db.session.rollback()
+            errors["job_history"] = str(e)
+            logger.error("Error pruning scheduler job history", exc_info=True, extra={
+                "error_message": str(e)
+            })
+
+        if errors:
+            results["errors"] = errors
+        return results
+
     def run_manual_maintenance(self):
         """Run maintenance tasks immediately (for testing or admin use)."""
         logger.info("Running manual maintenance tasks...")
@@ -165,7 +152,7 @@ _maintenance_service = None
 
 def init_scheduled_maintenance(app):
     """
-    Initialize and start the scheduled maintenance service.
+    Initialize the scheduled maintenance service.
 
     Args:
         app: Flask application instance
@@ -174,21 +161,39 @@ def init_scheduled_maintenance(app):
 
     if _maintenance_service is None:
         _maintenance_service = ScheduledMaintenanceService(app)
-        _maintenance_service.start()
 
     return _maintenance_service
 
 
-def shutdown_scheduled_maintenance():
-    """Shutdown the scheduled maintenance service."""
-    global _maintenance_service
+def maintenance_job(app):
+    """
+    The maintenance job for the background scheduler.
 
-    if _maintenance_service:
-        _maintenance_service.stop()
-        _maintenance_service = None
+    Built from the environment alone; the maintenance service is created
+    when the job first runs, in the leader. ``MAINTENANCE_SCHEDULE`` takes a
+    cron expression; without one the job runs every
+    ``AUTO_MAINTENANCE_INTERVAL_HOURS``.
+
+    Returns:
+        Job, or None when scheduled maintenance is disabled
+    """
+    if os.environ.get("AUTO_MAINTENANCE_ENABLED", "true").lower() != "true":
+        return None
+
+    interval_hours = int(os.environ.get("AUTO_MAINTENANCE_INTERVAL_HOURS", "1"))
+
+    def run_maintenance():
+        return init_scheduled_maintenance(app)._run_maintenance_tasks()
+
+    return Job(
+        "maintenance",
+        run_maintenance,
+        parse_schedule(cron=os.environ.get("MAINTENANCE_SCHEDULE") or None, interval_seconds=interval_hours * 3600),
+        run_on_start=os.environ.get("MAINTENANCE_ON_STARTUP", "true").lower() == "true",
+        description="Calibration and chemical statuses, attachment blob GC, audit log and job history archival",
+    )
 
 
 def get_maintenance_service():
     """Get the global maintenance service instance."""
     return _maintenance_service
-
@@ -0,0 +1,469 @@
+"""
+Background Job Scheduler
+
+Periodic work (database maintenance, scheduled backups and resource
+checks) used to run in one daemon thread per service in every process, so
+N gunicorn workers ran N copies of the same bulk UPDATEs and N concurrent
+backups. It now runs as jobs of a single scheduler thread, started only in
+the process that wins the leader election (utils/leader_lock.py). On
+PostgreSQL leadership is a session advisory lock, so there is one leader
+per cluster; on SQLite, whose database lives on one host, it is a file
+lock.
+
+Jobs run on an interval or on a cron expression
+(``minute hour day-of-month month day-of-week``, supporting ``*``,
+lists, ranges and ``/step``). Every run is recorded in
+``scheduled_job_runs`` with its status, duration and result. The next run
+is scheduled from that history, so a newly elected leader picks up where
+the previous one stopped instead of re-running every job at startup.
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from sqlalchemy import case, func
+
+from utils.metrics import observe_job_run
+
+
+logger = logging.getLogger(__name__)
+
+SUCCESS = "success"
+FAILED = "failed"
+
+DEFAULT_HISTORY_RETENTION_DAYS = 30
+
+# Longest the scheduler thread sleeps before re-checking the schedule
+MAX_SLEEP_SECONDS = 60
+
+
+class IntervalSchedule:
+    """Run every ``seconds`` seconds."""
+
+    def __init__(self, seconds):
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.seconds = seconds
+
+    def next_after(self, moment):
+        return moment + timedelta(seconds=self.seconds)
+
+    def describe(self):
+        return f"every {self.seconds}s"
+
+
+class CronSchedule:
+    """Run at the times matching a five-field cron expression."""
+
+    FIELDS = (
+        ("minute", 0, 59),
+        ("hour", 0, 23),
+        ("day of month", 1, 31),
+        ("month", 1, 12),
+        ("day of week", 0, 7),
+    )
+
+    def __init__(self, expression):
+        parts = expression.split()
+        if len(parts) != len(self.FIELDS):
+            raise ValueError(f"Cron expression must have 5 fields: {expression!r}")
+
+        self.expression = expression
+        values = [self._parse_field(part, *field) for part, field in zip(parts, self.FIELDS, strict=True)]
+        self.minutes, self.hours, self.days, self.months, days_of_week = values
+        # 0 and 7 both mean Sunday
+        self.days_of_week = {day % 7 for day in days_of_week}
+        self._any_day = parts[2] == "*"
+        self._any_day_of_week = parts[4] == "*"
+
+    @staticmethod
+    def _parse_field(text, name, low, high):
+        values = set()
+        for part in text.split(","):
+            item, _, step_text = part.partition("/")
+            step = int(step_text) if step_text else 1
+            if step <= 0:
+                raise ValueError(f"Invalid step in cron {name} field: {text!r}")
+            if item == "*":
+                start, end = low, high
+            elif "-" in item:
+                start, end = (int(value) for value in item.split("-", 1))
+            else:
+                start = end = int(item)
+                if step_text:
+                    end = high
+            if start < low or end > high or start > end:
+                raise ValueError(f"Cron {name} field out of range: {text!r}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment):
+        day_of_week = (moment.weekday() + 1) % 7
+        if self._any_day:
+            return day_of_week in self.days_of_week
+        if self._any_day_of_week:
+            return moment.day in self.days
+        # Cron runs when either day field matches if both are restricted
+        return moment.day in self.days or day_of_week in self.days_of_week
+
+    def next_after(self, moment):
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Five years covers any satisfiable expression, including Feb 29
+        for _ in range(366 * 5):
+            if candidate.month in self.months and self._day_matches(candidate):
+                for hour in sorted(h for h in self.hours if h >= candidate.hour):
+                    first_minute = candidate.minute if hour == candidate.hour else 0
+                    for minute in sorted(m for m in self.minutes if m >= first_minute):
+                        return candidate.replace(hour=hour, minute=minute)
+            candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+
+    def describe(self):
+        return f"cron {self.expression}"
+
+
+def parse_schedule(cron=None, interval_seconds=None):
+    """Build a schedule from a cron expression, falling back to an interval."""
+    if cron:
+        return CronSchedule(cron)
+    return IntervalSchedule(interval_seconds)
+
+
+class Job:
+    """A named unit of periodic work."""
+
+    def __init__(self, name, func, schedule, run_on_start=True, description=None):
+        """
+        Args:
+            name: Unique job name, used as the history key
+            func: Callable run inside an app context; may return a
+                JSON-serializable summary, with failed subtasks under "errors"
+            schedule: IntervalSchedule or CronSchedule
+            run_on_start: Run as soon as a leader starts if the job has never
+                run or missed its last scheduled time
+            description: Human-readable summary for the admin API
+        """
+        self.name = name
+        self.func = func
+        self.schedule = schedule
+        self.run_on_start = run_on_start
+        self.description = description or name
+
+
+class JobScheduler:
+    """Runs registered jobs on their schedules in one background thread."""
+
+    def __init__(self, app, leadership=None):
+        """
+        Args:
+            app: Flask application instance
+            leadership: LeaderElection to confirm before running jobs
+        """
+        self.app = app
+        self.leadership = leadership
+        self.jobs = {}
+        self.next_runs = {}
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._thread = None
+        self._run_lock = threading.Lock()
+        self.worker = f"{socket.gethostname()}:{os.getpid()}"
+
+    def add_job(self, job):
+        if job.name in self.jobs:
+            raise ValueError(f"Job {job.name!r} is already registered")
+        self.jobs[job.name] = job
+
+    @property
+    def running(self):
+        return bool(self._thread and self._thread.is_alive())
+
+    def start(self):
+        """Schedule every job from its run history and start the scheduler thread."""
+        if self._thread and self._thread.is_alive():
+            return
+
+        from models import get_current_time
+
+        now = get_current_time()
+        with self.app.app_context():
+            last_runs = last_run_times(self.jobs)
+        for name, job in self.jobs.items():
+            self.next_runs[name] = first_run_time(job, last_runs.get(name), now)
+
+        logger.info("Starting job scheduler", extra={
+            "jobs": {name: job.schedule.describe() for name, job in self.jobs.items()},
+            "next_runs": {name: moment.isoformat() for name, moment in self.next_runs.items()},
+        })
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="JobScheduler")
+        self._thread.start()
+
+    def stop(self):
+        """Stop the scheduler thread after the running job finishes."""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=10)
+            if self._thread.is_alive():
+                logger.warning("Job scheduler thread did not stop gracefully")
+
+    def run_job(self, name, now=None):
+        """
+        Run a job immediately and record the run.
+
+        Args:
+            name: Registered job name
+            now: Start time to record (defaults to the current time)
+
+        Returns:
+            The recorded run as a dict
+        """
+        from models import ScheduledJobRun, db, get_current_time
+
+        job = self.jobs[name]
+        with self._run_lock, self.app.app_context():
+            started_at = now or get_current_time()
+            start = time.perf_counter()
+            status, error_message, result = SUCCESS, None, None
+            try:
+                result = job.func()
+                if isinstance(result, dict) and result.get("errors"):
+                    status = FAILED
+                    error_message = "; ".join(f"{task}: {error}" for task, error in result["errors"].items())
+            except Exception as e:
+                db.session.rollback()
+                status, error_message = FAILED, str(e)
+                logger.error("Scheduled job failed", exc_info=True, extra={
+                    "job_name": name,
+                    "error_message": str(e),
+                })
+            duration = time.perf_counter() - start
+            duration_ms = int(duration * 1000)
+            observe_job_run(name, status, duration, success=status == SUCCESS)
+
+            run = ScheduledJobRun(
+                job_name=name,
+                started_at=started_at,
+                finished_at=started_at + timedelta(milliseconds=duration_ms),
+                duration_ms=duration_ms,
+                status=status,
+                error_message=error_message,
+                result=json.dumps(result, default=str) if result is not None else None,
+                worker=self.worker,
+            )
+            try:
+                db.session.add(run)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error("Error recording scheduled job run", exc_info=True, extra={
+                    "job_name": name,
+                    "error_message": str(e),
+                })
+
+            logger.info("Scheduled job finished", extra={
+                "job_name": name,
+                "status": status,
+                "duration_ms": duration_ms,
+            })
+            return run.to_dict()
+
+    def _loop(self):
+        from models import get_current_time
+
+        while not self._stop_event.is_set():
+            now = get_current_time()
+            due = [name for name, next_run in self.next_runs.items() if next_run <= now]
+            if due and self.leadership is not None and not self.leadership.confirm():
+                # Leadership moved to another process; it will run the jobs
+                logger.warning("Job scheduler stopping after losing leadership")
+                return
+
+            for name in sorted(self.next_runs, key=self.next_runs.get):
+                if self._stop_event.is_set() or self.next_runs[name] > now:
+                    break
+                self.run_job(name)
+                # Schedule from the planned time so runs do not drift
+                job = self.jobs[name]
+                self.next_runs[name] = next_run_after(job.schedule, self.next_runs[name], get_current_time())
+
+            wait = (min(self.next_runs.values()) - get_current_time()).total_seconds() if self.next_runs else None
+            wait = MAX_SLEEP_SECONDS if wait is None else max(0, min(wait, MAX_SLEEP_SECONDS))
+            self._wake_event.wait(timeout=wait)
+            self._wake_event.clear()
+
+
+def next_run_after(schedule, scheduled_at, now):
+    """Next run of a schedule after ``scheduled_at`` that is not already in the past."""
+    next_run = schedule.next_after(scheduled_at)
+    if next_run <= now:
+        # Missed runs collapse into one catch-up run rather than a burst
+        next_run = schedule.next_after(now)
+    return next_run
+
+
+def first_run_time(job, last_run, now):
+    """
+    When a newly started scheduler should first run a job.
+
+    Args:
+        job: Job definition
+        last_run: Start time of the job's latest recorded run, or None
+        now: Current time
+
+    Returns:
+        datetime of the first run
+    """
+    if last_run is None:
+        return now if job.run_on_start else job.schedule.next_after(now)
+
+    due = job.schedule.next_after(last_run)
+    if due <= now:
+        return now if job.run_on_start else job.schedule.next_after(now)
+    return due
+
+
+def last_run_times(job_names):
+    """Start time of each job's latest recorded run."""
+    from models import ScheduledJobRun, db
+
+    return dict(
+        db.session.query(ScheduledJobRun.job_name, func.max(ScheduledJobRun.started_at))
+        .filter(ScheduledJobRun.job_name.in_(list(job_names)))
+        .group_by(ScheduledJobRun.job_name)
+        .all()
+    )
+
+
+def job_statistics(jobs, since):
+    """
+    Run counts and durations per job, with each job's latest run.
+
+    Args:
+        jobs: Job definitions keyed by name
+        since: Only count runs started at or after this time
+
+    Returns:
+        List of dicts, one per job
+    """
+    from models import ScheduledJobRun, db
+
+    stats = {
+        row.job_name: row
+        for row in db.session.query(
+            ScheduledJobRun.job_name,
+            func.count(ScheduledJobRun.id).label("runs"),
+            func.sum(case((ScheduledJobRun.status == FAILED, 1), else_=0)).label("failures"),
+            func.avg(ScheduledJobRun.duration_ms).label("avg_duration_ms"),
+            func.max(ScheduledJobRun.duration_ms).label("max_duration_ms"),
+        )
+        .filter(ScheduledJobRun.started_at >= since)
+        .group_by(ScheduledJobRun.job_name)
+    }
+
+    latest_ids = (
+        db.session.query(func.max(ScheduledJobRun.id))
+        .filter(ScheduledJobRun.job_name.in_(list(jobs)))
+        .group_by(ScheduledJobRun.job_name)
+    )
+    latest = {run.job_name: run for run in ScheduledJobRun.query.filter(ScheduledJobRun.id.in_(latest_ids))}
+
+    summaries = []
+    for name, job in jobs.items():
+        row = stats.get(name)
+        last_run = latest.get(name)
+        summaries.append({
+            "name": name,
+            "description": job.description,
+            "schedule": job.schedule.describe(),
+            "runs": row.runs if row else 0,
+            "failures": int(row.failures or 0) if row else 0,
+            "avg_duration_ms": round(float(row.avg_duration_ms), 1) if row and row.avg_duration_ms is not None else None,
+            "max_duration_ms": row.max_duration_ms if row else None,
+            "last_run": last_run.to_dict() if last_run else None,
+            "next_run": job.schedule.next_after(last_run.started_at).isoformat() if last_run else None,
+        })
+    return summaries
+
+
+def prune_job_history(retention_days=DEFAULT_HISTORY_RETENTION_DAYS):
+    """
+    Delete job runs older than the retention window.
+
+    Returns:
+        dict with the number of deleted runs
+    """
+    from models import ScheduledJobRun, db, get_current_time
+
+    cutoff = get_current_time() - timedelta(days=retention_days)
+    deleted = ScheduledJobRun.query.filter(ScheduledJobRun.started_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    return {"deleted_runs": deleted}
+
+
+def build_jobs(app):
+    """
+    The background jobs configured for this app.
+
+    Jobs are built from configuration alone, so any worker can list them;
+    the services behind them are only created when a job runs.
+
+    Returns:
+        dict of Job keyed by name
+    """
+    from utils.resource_monitor import resource_check_job
+    from utils.scheduled_backup import backup_job
+    from utils.scheduled_maintenance import maintenance_job
+
+    jobs = [maintenance_job(app), backup_job(app), resource_check_job(app)]
+    return {job.name: job for job in jobs if job is not None}
+
+
+# Global instance
+_scheduler = None
+
+
+def init_scheduler(app):
+    """
+    Start the job scheduler with the app's background jobs.
+
+    Only the leader process should call this (see ``init_leader_election``).
+
+    Args:
+        app: Flask application instance
+    """
+    from utils.leader_lock import get_leader_election
+
+    global _scheduler
+
+    if _scheduler is None:
+        _scheduler = JobScheduler(app, leadership=get_leader_election())
+        jobs = build_jobs(app)
+        for job in jobs.values():
+            _scheduler.add_job(job)
+        logger.info("Background jobs scheduled", extra={"jobs": sorted(jobs)})
+    # Also restarts a scheduler that stopped when this process lost leadership
+    _scheduler.start()
+
+    return _scheduler
+
+
+def shutdown_scheduler():
+    """Stop the job scheduler."""
+    global _scheduler
+
+    if _scheduler:
+        scheduler, _scheduler = _scheduler, None
+        scheduler.stop()
+
+
+def get_scheduler():
+    """Get the global job scheduler (None outside the leader process)."""
+    return _scheduler
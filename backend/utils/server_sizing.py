@@ -0,0 +1,61 @@
+"""
+Gunicorn Thread Sizing
+
+Used by ``gunicorn_config.py`` to size the production server from the
+database pool rather than a hard-coded number.
+
+The server always runs a single worker and scales with threads.
+Flask-SocketIO supports only one gunicorn worker: the client may fall back
+to long polling, whose requests must reach the process holding its
+session, and the in-process caches and write buffers are not shared
+between processes. To scale further, run several single-worker instances
+behind a proxy with sticky sessions.
+
+The gthread worker handles one request or WebSocket per thread. Threads
+serving requests beyond the database pool would only wait for a
+connection, so a worker gets one thread per pooled connection plus a
+fixed allowance for long-lived WebSocket connections, which hold a thread
+but rarely a database connection.
+"""
+
+# SQLAlchemy's QueuePool defaults, used when the engine options leave them unset
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 10
+
+DEFAULT_WEBSOCKET_THREADS = 50
+
+
+def database_connections(config):
+    """
+    Connections a single process can hold across its database engines.
+
+    Args:
+        config: Mapping with the SQLALCHEMY_* and SQLITE_* settings
+
+    Returns:
+        int
+    """
+    uri = config.get("SQLALCHEMY_DATABASE_URI") or ""
+    if uri.startswith("sqlite") and config.get("SQLITE_PROFILE", "tuned") == "tuned":
+        # The capped writer pool plus the read engine's default pool
+        connections = config.get("SQLITE_WRITER_POOL_SIZE", 1)
+        if config.get("SQLITE_READ_ENGINE", True):
+            connections += DEFAULT_POOL_SIZE + DEFAULT_MAX_OVERFLOW
+        return connections
+
+    options = config.get("SQLALCHEMY_ENGINE_OPTIONS") or {}
+    return options.get("pool_size", DEFAULT_POOL_SIZE) + options.get("max_overflow", DEFAULT_MAX_OVERFLOW)
+
+
+def thread_count(config, websocket_threads=DEFAULT_WEBSOCKET_THREADS):
+    """
+    Number of threads for the gunicorn worker.
+
+    Args:
+        config: Mapping with the SQLALCHEMY_* and SQLITE_* settings
+        websocket_threads: Threads reserved for WebSocket connections
+
+    Returns:
+        int
+    """
+    return database_connections(config) + websocket_threads
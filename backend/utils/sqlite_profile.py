@@ -0,0 +1,215 @@
+"""
+SQLite Engine Profile
+
+SQLite ships with settings tuned for a single embedded user: a rollback
+journal that blocks readers while anyone writes, a 2 MB page cache and
+``synchronous=FULL``. Under concurrent requests that shows up as
+"database is locked" errors and readers queued behind writers.
+
+The ``tuned`` profile (``SQLITE_PROFILE``) applies, on every new
+connection through a ``connect`` event listener:
+
+- ``journal_mode=WAL`` so readers and the writer do not block each other
+- ``busy_timeout`` so a writer waits for the lock instead of failing
+- ``synchronous=NORMAL``, which is durable against crashes in WAL mode
+- a larger page cache, memory-mapped I/O and in-memory temp tables
+
+It also adds a read-only ``read`` engine with its own connection pool
+(``query_only=ON``). ``RoutingSession`` sends SELECTs made while handling
+GET and HEAD requests to it. Everything else goes to the default engine,
+which is the single writer: its pool is capped at
+``SQLITE_WRITER_POOL_SIZE`` connections, so writers queue for a
+connection instead of contending for the database lock. Once a session
+has written in a transaction it stays on the writer until the
+transaction ends, so it always reads its own writes.
+
+The ``default`` profile keeps SQLite's defaults and a single engine;
+``tests/test_performance.py`` benchmarks the two against each other.
+"""
+
+import logging
+
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+
+logger = logging.getLogger(__name__)
+
+READ_BIND_KEY = "read"
+
+WROTE_KEY = "sqlite_profile_wrote"
+
+ROUTING_ENVIRON_KEY = "sqlite_profile.read_routing"
+
+# Request methods whose reads may be served by the read-only engine
+READ_ONLY_METHODS = ("GET", "HEAD")
+
+
+def sqlite_pragmas(config, read_only=False):
+    """
+    PRAGMA statements for a connection under the configured profile.
+
+    Args:
+        config: Flask config (or any mapping with the SQLITE_* settings)
+        read_only: Build the pragmas for the read-only engine
+
+    Returns:
+        List of (pragma, value) pairs, empty for the default profile
+    """
+    if config.get("SQLITE_PROFILE", "tuned") != "tuned":
+        return []
+
+    pragmas = []
+    if not read_only:
+        pragmas.append(("journal_mode", "WAL"))
+    pragmas += [
+        ("busy_timeout", int(config.get("SQLITE_BUSY_TIMEOUT_MS", 5000))),
+        ("synchronous", "NORMAL"),
+        # Negative cache sizes are in KiB rather than pages
+        ("cache_size", -int(config.get("SQLITE_CACHE_SIZE_KB", 65536))),
+        ("mmap_size", int(config.get("SQLITE_MMAP_SIZE_MB", 256)) * 1024 * 1024),
+        ("temp_store", "MEMORY"),
+    ]
+    if read_only:
+        pragmas.append(("query_only", "ON"))
+    return pragmas
+
+
+def install_pragmas(engine, pragmas):
+    """Run the given pragmas on every new connection the engine opens."""
+    if not pragmas:
+        return
+
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    event.listen(engine, "connect", set_pragmas)
+
+
+def _is_file_database(uri):
+    return (
+        uri.startswith("sqlite")
+        and uri not in ("sqlite://", "sqlite:///:memory:")
+        and "mode=memory" not in uri
+    )
+
+
+def configure_sqlite_engines(app, is_testing=False):
+    """
+    Set the engine options (and the read bind) for a SQLite database URI.
+
+    Must run before ``db.init_app``.
+
+    Args:
+        app: Flask application instance
+        is_testing: Test sessions keep their connection across requests, so
+            the writer pool is not capped under test
+    """
+    db_uri = app.config.get("SQLALCHEMY_DATABASE_URI", "")
+    base_options = {
+        "echo": False,
+        "pool_pre_ping": True,
+        "connect_args": {"check_same_thread": False},
+    }
+
+    writer_options = dict(base_options)
+    tuned = app.config.get("SQLITE_PROFILE", "tuned") == "tuned"
+    if tuned and _is_file_database(db_uri) and not is_testing:
+        writer_options.update({
+            "pool_size": int(app.config.get("SQLITE_WRITER_POOL_SIZE", 1)),
+            "max_overflow": 0,
+            "pool_timeout": int(app.config.get("SQLITE_POOL_TIMEOUT", 30)),
+        })
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = writer_options
+
+    if tuned and _is_file_database(db_uri) and app.config.get("SQLITE_READ_ENGINE", True):
+        binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+        binds[READ_BIND_KEY] = {"url": db_uri, **base_options}
+        app.config["SQLALCHEMY_BINDS"] = binds
+
+
+def init_sqlite_profile(app):
+    """
+    Install the connection pragmas on the app's SQLite engines.
+
+    Must run after ``db.init_app``.
+
+    Args:
+        app: Flask application instance
+    """
+    from models import db
+
+    with app.app_context():
+        engines = db.engines
+        writer = engines.get(None)
+        if writer is None or writer.dialect.name != "sqlite":
+            return
+
+        install_pragmas(writer, sqlite_pragmas(app.config))
+        if READ_BIND_KEY in engines:
+            install_pragmas(engines[READ_BIND_KEY], sqlite_pragmas(app.config, read_only=True))
+            app.before_request(_enable_read_routing)
+
+    logger.info("SQLite engine profile applied", extra={
+        "profile": app.config.get("SQLITE_PROFILE", "tuned"),
+        "read_engine": READ_BIND_KEY in engines,
+    })
+
+
+def _enable_read_routing():
+    from flask import request
+
+    request.environ[ROUTING_ENVIRON_KEY] = True
+
+
+def read_engine_for(session, clause):
+    """
+    The read-only engine when a statement may be served by it, otherwise None.
+
+    Only SELECTs issued while a GET or HEAD route is handled qualify, and
+    only until the session writes in its current transaction.
+    """
+    from flask import has_request_context, request
+
+    engines = session._db.engines
+    if READ_BIND_KEY not in engines or session.info.get(WROTE_KEY):
+        return None
+    if not getattr(clause, "is_select", False):
+        if clause is not None and (getattr(clause, "is_dml", False) or getattr(clause, "is_ddl", False)):
+            session.info[WROTE_KEY] = True
+        return None
+    if not has_request_context() or request.method not in READ_ONLY_METHODS:
+        return None
+    # Only requests the app dispatched, not bare request contexts
+    if not request.environ.get(ROUTING_ENVIRON_KEY):
+        return None
+    return engines[READ_BIND_KEY]
+
+
+class RoutingSession(Session):
+    """Session that serves eligible reads from the read-only engine."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            engine = read_engine_for(self, clause)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _session_wrote(session, flush_context):
+    session.info[WROTE_KEY] = True
+
+
+def _transaction_ended(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(WROTE_KEY, None)
+
+
+event.listen(RoutingSession, "after_flush", _session_wrote)
+event.listen(RoutingSession, "after_transaction_end", _transaction_ended)
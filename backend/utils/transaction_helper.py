@@ -7,12 +7,33 @@ across all inventory types (tools, chemicals, expendables).
 
 import logging
 
-from models import Chemical, InventoryTransaction, Tool, db
+from sqlalchemy import select
+
+from models import Chemical, InventoryTransaction, Tool, db, get_current_time
 from models_kits import KitExpendable, KitItem
 
 
 logger = logging.getLogger(__name__)
 
+# Model that supplies lot/serial numbers for each item type (chemicals have no serial number)
+LOT_SERIAL_SOURCES = {
+    "tool": (Tool, True),
+    "chemical": (Chemical, False),
+    "expendable": (KitExpendable, True),
+    "kit_item": (KitItem, True),
+}
+
+# Maximum number of IDs bound into a single IN clause (stays under SQLite's variable limit)
+IN_CLAUSE_CHUNK_SIZE = 500
+
+TRANSACTION_FIELDS = (
+    "quantity_change",
+    "location_from",
+    "location_to",
+    "reference_number",
+    "notes",
+)
+
 
 def record_transaction(item_type, item_id, transaction_type, user_id, **kwargs):
     """
@@ -87,6 +108,99 @@ def record_transaction(item_type, item_id, transaction_type, user_id, **kwargs):
         raise
 
 
+def _lookup_lot_serial_numbers(ids_by_type):
+    """
+    Resolve lot/serial numbers for many items with one IN query per item type.
+
+    Args:
+        ids_by_type (dict): Mapping of item type to a set of item IDs
+
+    Returns:
+        dict: Mapping of (item_type, item_id) to (lot_number, serial_number)
+    """
+    numbers = {}
+    for item_type, item_ids in ids_by_type.items():
+        source = LOT_SERIAL_SOURCES.get(item_type)
+        if source is None or not item_ids:
+            continue
+
+        model, has_serial = source
+        columns = [model.id, model.lot_number]
+        if has_serial:
+            columns.append(model.serial_number)
+
+        id_list = list(item_ids)
+        for start in range(0, len(id_list), IN_CLAUSE_CHUNK_SIZE):
+            chunk = id_list[start:start + IN_CLAUSE_CHUNK_SIZE]
+            for row in db.session.execute(select(*columns).where(model.id.in_(chunk))):
+                numbers[(item_type, row[0])] = (row[1], row[2] if has_serial else None)
+
+    return numbers
+
+
+def record_transactions_bulk(transactions, user_id):
+    """
+    Record many inventory transactions at once.
+
+    Vectorized counterpart of ``record_transaction``: lot/serial numbers are
+    auto-detected with one IN query per item type instead of one lookup per
+    item, and all rows are written with a single ``bulk_insert_mappings``.
+    The caller is responsible for committing.
+
+    Args:
+        transactions (list): Dictionaries with ``item_type``, ``item_id`` and
+            ``transaction_type`` plus the optional fields accepted by
+            ``record_transaction``
+        user_id (int): ID of user performing the transactions
+
+    Returns:
+        int: Number of transactions recorded
+    """
+    if not transactions:
+        return 0
+
+    # Only items without explicit lot/serial numbers need a lookup
+    ids_by_type = {}
+    for trans_data in transactions:
+        if not trans_data.get("lot_number") and not trans_data.get("serial_number"):
+            ids_by_type.setdefault(trans_data["item_type"], set()).add(trans_data["item_id"])
+
+    detected = _lookup_lot_serial_numbers(ids_by_type)
+    timestamp = get_current_time()
+
+    mappings = []
+    for trans_data in transactions:
+        lot_number = trans_data.get("lot_number")
+        serial_number = trans_data.get("serial_number")
+        if not lot_number and not serial_number:
+            lot_number, serial_number = detected.get(
+                (trans_data["item_type"], trans_data["item_id"]), (None, None)
+            )
+
+        mapping = {
+            "item_type": trans_data["item_type"],
+            "item_id": trans_data["item_id"],
+            "transaction_type": trans_data["transaction_type"],
+            "user_id": user_id,
+            "timestamp": timestamp,
+            "lot_number": lot_number,
+            "serial_number": serial_number,
+        }
+        for field in TRANSACTION_FIELDS:
+            mapping[field] = trans_data.get(field)
+        mappings.append(mapping)
+
+    try:
+        # render_nulls keeps every row in one executemany instead of grouping by non-null keys
+        db.session.bulk_insert_mappings(InventoryTransaction, mappings, render_nulls=True)
+    except Exception as e:
+        logger.error(f"Error recording bulk transactions: {e!s}")
+        raise
+
+    logger.info(f"Recorded {len(mappings)} transactions in bulk")
+    return len(mappings)
+
+
 def record_tool_checkout(tool_id, user_id, expected_return_date=None, notes=None):
     """Record a tool checkout transaction"""
     tool = db.session.get(Tool, tool_id)
@@ -0,0 +1,406 @@
+"""
+Unread Counter Service
+
+Keeps one set of unread badge counts per user: channel messages past the
+member's read marker, kit messages, unread announcements and user
+request / procurement order messages. Counts are computed with grouped
+queries the first time a user asks for them and are then kept current on
+write: committed ORM changes to messages, read markers, announcements and
+announcement reads are queued, and a background thread recounts only the
+affected categories for the affected users and pushes the new counts to
+the user's Socket.IO room as an ``unread_counts`` event.
+
+The commit hook only records what changed. Recounting runs on the worker
+thread, on its own connection (the read-only engine when there is one),
+so committing sessions, including background writer threads, never wait
+on it or on a second connection from the capped SQLite writer pool.
+Changes queued by several commits are merged into one recount.
+
+Counts live in process memory for ``UNREAD_COUNTER_CACHE_SECONDS``. Only
+users with a cached entry in this process are recounted and pushed, so
+the cost of a write does not grow with the number of users who never
+look at their badges. With several server workers a write is only pushed
+to users whose counts are cached in the worker that made it: clients
+still need to poll ``/api/me/unread``, and counts cached in other workers
+(like bulk SQL updates and announcement expiry) are only picked up when
+the entry expires.
+"""
+
+import logging
+import threading
+import time
+
+from sqlalchemy import and_, func, or_, select
+
+from utils.background_batcher import BackgroundBatcher
+from utils.commit_hooks import CommitHook
+
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ("channels", "kit_messages", "announcements", "requests")
+
+PENDING_KEY = "unread_counters_pending"
+
+DEFAULT_CACHE_SECONDS = 300
+
+# Seconds the recount thread waits for queued changes before checking again
+RECOUNT_POLL_SECONDS = 1.0
+
+# Marks a change that affects every cached user (broadcasts, announcements)
+ALL_USERS = "*"
+
+# Pseudo-category for channel message changes, resolved to channel members on commit
+CHANNEL_MESSAGES = "channel_messages"
+
+
+class UnreadCounterService(BackgroundBatcher):
+    """Per-user unread counts, recounted on write and pushed over Socket.IO."""
+
+    thread_name = "UnreadCounterRecount"
+
+    def __init__(self):
+        super().__init__(RECOUNT_POLL_SECONDS)
+        self._counts = {}
+        self._counts_lock = threading.Lock()
+        self._pending = []
+
+    def get_counts(self, user_id):
+        """
+        Unread counts for a user.
+
+        Returns:
+            dict with one count per category and the total
+        """
+        counts = self._cached(user_id)
+        if counts is None:
+            from models import db
+
+            counts = self._count(db.session, CATEGORIES, [user_id])[user_id]
+            self._store(user_id, counts)
+        return _payload(counts)
+
+    def enqueue(self, changes):
+        """
+        Queue changes for the recount thread.
+
+        Args:
+            changes: dict in the form taken by ``apply_changes``
+        """
+        from flask import current_app, has_app_context
+
+        if not has_app_context():
+            # Nothing to recount against; cached counts fall back to the TTL
+            self.invalidate()
+            return
+
+        with self._lock:
+            self._pending.append((current_app._get_current_object(), changes))
+            pending = len(self._pending)
+        self._queued(pending)
+
+    def pending_count(self):
+        """Number of queued change sets."""
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self):
+        """
+        Apply all queued changes now, merged per application.
+
+        Returns:
+            Number of users whose counts changed
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+
+            merged = {}
+            for app, changes in batch:
+                target = merged.setdefault(app, {})
+                for category, keys in changes.items():
+                    target.setdefault(category, set()).update(keys)
+
+            changed = 0
+            for app, changes in merged.items():
+                with app.app_context():
+                    try:
+                        changed += self.apply_changes(changes)
+                    except Exception as e:
+                        # Counts fall back to the cache TTL
+                        self.invalidate()
+                        logger.error("Error updating unread counters", exc_info=True, extra={
+                            "error_message": str(e)
+                        })
+            return changed
+
+    def apply_changes(self, changes):
+        """
+        Recount changed categories for cached users and push the new counts.
+
+        Runs queries on a connection of its own, so it must not be called
+        while the caller's session holds the only writer connection; the
+        commit hook goes through ``enqueue`` instead.
+
+        Args:
+            changes: dict mapping a category to the user IDs it changed for;
+                ``ALL_USERS`` in the set means every user, and the
+                ``CHANNEL_MESSAGES`` entry holds channel IDs whose members changed
+
+        Returns:
+            Number of users whose counts changed
+        """
+        cached_users = self._cached_user_ids()
+        if not cached_users:
+            return 0
+
+        from models import db
+        from models_messaging import ChannelMember
+        from utils.sqlite_profile import READ_BIND_KEY
+
+        engine = db.engines.get(READ_BIND_KEY) or db.engine
+        updates = {}
+        with engine.connect() as connection:
+            channel_ids = changes.get(CHANNEL_MESSAGES)
+            if channel_ids:
+                members = connection.execute(
+                    select(ChannelMember.user_id).where(
+                        ChannelMember.channel_id.in_(channel_ids),
+                        ChannelMember.user_id.in_(cached_users),
+                    )
+                ).scalars()
+                changes = {**changes, "channels": changes.get("channels", set()) | set(members)}
+
+            for category in CATEGORIES:
+                user_ids = changes.get(category)
+                if not user_ids:
+                    continue
+                targets = cached_users if ALL_USERS in user_ids else cached_users & user_ids
+                if not targets:
+                    continue
+                for user_id, counts in self._count(connection, [category], targets).items():
+                    updates.setdefault(user_id, {}).update(counts)
+
+        changed = 0
+        for user_id, counts in updates.items():
+            deltas = self._update(user_id, counts)
+            if deltas:
+                changed += 1
+                self._push(user_id, deltas)
+        return changed
+
+    def refresh(self, user_id, category):
+        """Queue a recount of one category for a user if their counts are cached."""
+        self.enqueue({category: {user_id}})
+
+    def invalidate(self, user_id=None):
+        """
+        Drop cached counts for one user, or for everyone.
+
+        Returns:
+            Number of cache entries removed
+        """
+        with self._counts_lock:
+            if user_id is None:
+                removed = len(self._counts)
+                self._counts.clear()
+                return removed
+            return 1 if self._counts.pop(user_id, None) else 0
+
+    def _cached(self, user_id):
+        with self._counts_lock:
+            entry = self._counts.get(user_id)
+            if entry and entry[0] > time.monotonic():
+                return dict(entry[1])
+            return None
+
+    def _cached_user_ids(self):
+        now = time.monotonic()
+        with self._counts_lock:
+            return {user_id for user_id, entry in self._counts.items() if entry[0] > now}
+
+    def _store(self, user_id, counts):
+        with self._counts_lock:
+            self._counts[user_id] = (time.monotonic() + self._ttl(), dict(counts))
+
+    def _update(self, user_id, counts):
+        """Merge recounted categories into a cached entry and return what moved."""
+        with self._counts_lock:
+            entry = self._counts.get(user_id)
+            if entry is None:
+                return {}
+            current = entry[1]
+            deltas = {
+                category: count - current.get(category, 0)
+                for category, count in counts.items()
+                if count != current.get(category, 0)
+            }
+            current.update(counts)
+            return deltas
+
+    def _push(self, user_id, deltas):
+        from socketio_config import socketio
+
+        counts = self._cached(user_id)
+        if counts is None:
+            return
+        try:
+            socketio.emit("unread_counts", {
+                "counts": _payload(counts),
+                "changes": deltas,
+            }, to=f"user_{user_id}")
+        except Exception as e:
+            logger.warning("Error pushing unread counts", extra={
+                "user_id": user_id,
+                "error_message": str(e)
+            })
+
+    def _ttl(self):
+        from flask import current_app
+
+        return current_app.config.get("UNREAD_COUNTER_CACHE_SECONDS", DEFAULT_CACHE_SECONDS)
+
+    def _count(self, executor, categories, user_ids):
+        """
+        Count the given categories for a set of users.
+
+        Args:
+            executor: Session or connection to run the queries on
+            categories: Categories to count
+            user_ids: Users to count for
+
+        Returns:
+            dict mapping user ID to a dict of category counts
+        """
+        user_ids = list(user_ids)
+        counts = {user_id: {} for user_id in user_ids}
+        for category in categories:
+            rows = getattr(self, f"_count_{category}")(executor, user_ids)
+            for user_id in user_ids:
+                counts[user_id][category] = rows.get(user_id, 0)
+        return counts
+
+    def _count_channels(self, executor, user_ids):
+        from models_messaging import ChannelMember, ChannelMessage
+        from utils.read_markers import get_read_markers
+
+        unread = and_(
+            ChannelMessage.channel_id == ChannelMember.channel_id,
+            ChannelMessage.id > func.coalesce(ChannelMember.last_read_message_id, 0),
+            ChannelMessage.sender_id != ChannelMember.user_id,
+            ~ChannelMessage.is_deleted,
+        )
+        counts = dict(executor.execute(
+            select(ChannelMember.user_id, func.count(ChannelMessage.id))
+            .join(ChannelMessage, unread)
+            .where(ChannelMember.user_id.in_(user_ids))
+            .group_by(ChannelMember.user_id)
+        ).all())
+
+        read_markers = get_read_markers()
+        pending = read_markers.pending_markers(user_ids) if read_markers else {}
+        if pending:
+            # Markers still waiting in the read marker buffer count as read: take off
+            # the messages between the stored marker and the pending one
+            rows = executor.execute(
+                select(ChannelMember.channel_id, ChannelMember.user_id, ChannelMessage.id)
+                .join(ChannelMessage, unread)
+                .where(
+                    ChannelMember.channel_id.in_({channel_id for channel_id, _ in pending}),
+                    ChannelMember.user_id.in_({user_id for _, user_id in pending}),
+                    ChannelMessage.id <= max(pending.values()),
+                )
+            )
+            for channel_id, user_id, message_id in rows:
+                if message_id <= pending.get((channel_id, user_id), 0):
+                    counts[user_id] -= 1
+        return counts
+
+    def _count_kit_messages(self, executor, user_ids):
+        from models_kits import KitMessage
+
+        # Broadcast messages (no recipient) are unread for everyone, as in /api/messages/unread-count
+        broadcast = executor.execute(
+            select(func.count(KitMessage.id)).where(
+                KitMessage.recipient_id.is_(None),
+                KitMessage.is_read.is_(False),
+            )
+        ).scalar()
+        rows = dict(executor.execute(
+            select(KitMessage.recipient_id, func.count(KitMessage.id))
+            .where(KitMessage.recipient_id.in_(user_ids), KitMessage.is_read.is_(False))
+            .group_by(KitMessage.recipient_id)
+        ).all())
+        return {user_id: rows.get(user_id, 0) + broadcast for user_id in user_ids}
+
+    def _count_announcements(self, executor, user_ids):
+        from models import Announcement, AnnouncementRead, get_current_time
+
+        now = get_current_time()
+        active = and_(
+            Announcement.is_active.is_(True),
+            or_(Announcement.expiration_date.is_(None), Announcement.expiration_date > now),
+        )
+        total = executor.execute(select(func.count(Announcement.id)).where(active)).scalar()
+        read = dict(executor.execute(
+            select(AnnouncementRead.user_id, func.count(AnnouncementRead.id))
+            .join(Announcement, Announcement.id == AnnouncementRead.announcement_id)
+            .where(AnnouncementRead.user_id.in_(user_ids), active)
+            .group_by(AnnouncementRead.user_id)
+        ).all())
+        return {user_id: total - read.get(user_id, 0) for user_id in user_ids}
+
+    def _count_requests(self, executor, user_ids):
+        from models import ProcurementOrderMessage, UserRequestMessage
+
+        counts = {}
+        for model in (UserRequestMessage, ProcurementOrderMessage):
+            rows = executor.execute(
+                select(model.recipient_id, func.count(model.id))
+                .where(model.recipient_id.in_(user_ids), model.is_read.is_(False))
+                .group_by(model.recipient_id)
+            )
+            for user_id, count in rows:
+                counts[user_id] = counts.get(user_id, 0) + count
+        return counts
+
+
+def _payload(counts):
+    payload = {category: counts.get(category, 0) for category in CATEGORIES}
+    payload["total"] = sum(payload.values())
+    return payload
+
+
+unread_counters = UnreadCounterService()
+
+
+def _queue_committed_changes(pairs):
+    changes = {}
+    for category, key in pairs:
+        changes.setdefault(category, set()).add(key)
+    unread_counters.enqueue(changes)
+
+
+_commit_hook = CommitHook(PENDING_KEY, _queue_committed_changes)
+
+
+def _install_hooks():
+    from models import Announcement, AnnouncementRead, ProcurementOrderMessage, UserRequestMessage
+    from models_kits import KitMessage
+    from models_messaging import ChannelMember, ChannelMessage
+
+    # Changes are recorded as (category, user or channel ID) pairs
+    _commit_hook.watch((KitMessage,), keys=lambda message: {
+        ("kit_messages", message.recipient_id if message.recipient_id is not None else ALL_USERS)
+    })
+    # Request messages without a recipient are not counted for anyone
+    _commit_hook.watch((UserRequestMessage, ProcurementOrderMessage), keys=lambda message: (
+        {("requests", message.recipient_id)} if message.recipient_id is not None else set()
+    ))
+    _commit_hook.watch((ChannelMessage,), keys=lambda message: {(CHANNEL_MESSAGES, message.channel_id)})
+    _commit_hook.watch((ChannelMember,), keys=lambda member: {("channels", member.user_id)})
+    _commit_hook.watch((Announcement,), keys=lambda _announcement: {("announcements", ALL_USERS)})
+    _commit_hook.watch((AnnouncementRead,), keys=lambda read: {("announcements", read.user_id)})
+
+
+_install_hooks()
@@ -5,11 +5,11 @@ This module provides validation schemas and functions for all data types
 used in the SupplyLine MRO Suite application.
 """
 
-import html
 import re
 from datetime import datetime
 
-from utils.error_handler import ValidationError, validate_input
+from utils.error_handler import ValidationError
+from utils.schema_compiler import compile_schema, strip_html
 
 
 def sanitize_string(value, max_length=None, allow_html=False):
@@ -28,10 +28,8 @@ def sanitize_string(value, max_length=None, allow_html=False):
         value = str(value)
 
     if not allow_html:
-        # 1. strip raw dangerous characters
-        value = re.sub(r'[<>\"\'\\]', "", value)
-        # 2. escape whatever is left
-        value = html.escape(value)
+        # Strip raw dangerous characters and escape whatever is left
+        return strip_html(value, max_length)
 
     # Limit length
     if max_length and len(value) > max_length:
@@ -50,7 +48,9 @@ def validate_types(data, type_schema):
     """
     for field, expected_type in type_schema.items():
         if field in data and data[field] is not None and not isinstance(data[field], expected_type):
-            raise ValidationError(f"{field} must be of type {expected_type.__name__}")
+            type_name = (" or ".join(t.__name__ for t in expected_type)
+                         if isinstance(expected_type, tuple) else expected_type.__name__)
+            raise ValidationError(f"{field} must be of type {type_name}")
 
 
 def validate_constraints(data, constraint_schema):
@@ -287,63 +287,38 @@ CYCLE_COUNT_RESULT_SCHEMA = {
 }
 
 
+SCHEMAS = {
+    "tool": TOOL_SCHEMA,
+    "chemical": CHEMICAL_SCHEMA,
+    "user": USER_SCHEMA,
+    "chemical_issuance": CHEMICAL_ISSUANCE_SCHEMA,
+    "calibration": CALIBRATION_SCHEMA,
+    "checkout": CHECKOUT_SCHEMA,
+    "cycle_count_schedule": CYCLE_COUNT_SCHEDULE_SCHEMA,
+    "cycle_count_result": CYCLE_COUNT_RESULT_SCHEMA
+}
+
+COMPILED_SCHEMAS = {name: compile_schema(name, schema) for name, schema in SCHEMAS.items()}
+
+
 def validate_schema(data, schema_name):
     """
     Validate data against a predefined schema
 
+    Uses the single-pass validators compiled at import (see
+    utils/schema_compiler.py); the input dict is not modified.
+
     Args:
         data: Dictionary to validate
         schema_name: Name of the schema to use
 
     Returns:
-        Sanitized and validated data
+        Sanitized and validated data, with date fields converted to datetimes
     """
-    schemas = {
-        "tool": TOOL_SCHEMA,
-        "chemical": CHEMICAL_SCHEMA,
-        "user": USER_SCHEMA,
-        "chemical_issuance": CHEMICAL_ISSUANCE_SCHEMA,
-        "calibration": CALIBRATION_SCHEMA,
-        "checkout": CHECKOUT_SCHEMA,
-        "cycle_count_schedule": CYCLE_COUNT_SCHEDULE_SCHEMA,
-        "cycle_count_result": CYCLE_COUNT_RESULT_SCHEMA
-    }
-
-    if schema_name not in schemas:
+    compiled = COMPILED_SCHEMAS.get(schema_name)
+    if compiled is None:
         raise ValidationError(f"Unknown schema: {schema_name}")
-
-    schema = schemas[schema_name]
-
-    # Validate required/optional fields
-    validate_input(data, schema["required"], schema.get("optional", []))
-
-    # Validate types
-    validate_types(data, schema["types"])
-
-    # Validate constraints
-    if "constraints" in schema:
-        validate_constraints(data, schema["constraints"])
-
-    # Validate and convert dates
-    if "date_fields" in schema:
-        validate_dates(data, schema["date_fields"])
-
-    # Perform cross-field validation for specific schemas
-    if schema_name == "cycle_count_batch":
-        validate_cycle_count_batch_cross_fields(data)
-
-    # Sanitize string fields
-    sanitized_data = {}
-    for key, value in data.items():
-        if isinstance(value, str):
-            max_length = None
-            if "constraints" in schema and key in schema["constraints"]:
-                max_length = schema["constraints"][key].get("max_length")
-            sanitized_data[key] = sanitize_string(value, max_length)
-        else:
-            sanitized_data[key] = value
-
-    return sanitized_data
+    return compiled(data)
 
 
 def validate_cycle_count_batch_cross_fields(data):